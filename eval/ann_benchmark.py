@@ -0,0 +1,226 @@
+"""Recall and latency of IVF approximate vector search vs the exact scan.
+
+Builds a float32 matrix of N vectors (synthetic clustered embeddings by
+default, or rows from a ``.npy`` file), then for each size compares the
+exact path used by ``VectorStore`` (one matmul over every row) with
+``IVFFlatIndex`` at several ``nprobe`` values. Both paths go through
+``VectorStore._rank_rows``, so the numbers cover the same scoring and top-k
+code the store runs; SQLite detail fetches are excluded.
+
+Reports recall@k against the exact top-k, p50/p99 query latency, and the
+index build time. The matrix is written to a memory-mapped scratch file so
+the 5M-row run does not need the whole matrix in RAM. It does need twice
+N x dim x 4 bytes of disk (matrix plus the IVF list-ordered copy), about
+15 GB at 5M x 384.
+
+Usage:
+    python -m eval.ann_benchmark                          # 100k, 1M, 5M
+    python -m eval.ann_benchmark --sizes 100000 --queries 200
+    python -m eval.ann_benchmark --data embeddings.npy --nprobe 8 32 128
+    python -m eval.ann_benchmark --json ann.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "src"))
+
+from attocode.integrations.context.ann_index import (  # noqa: E402
+    IVFFlatIndex,
+    default_nprobe,
+    remove_index_files,
+)
+from attocode.integrations.context.vector_store import VectorStore  # noqa: E402
+
+_GEN_CHUNK_ROWS = 65536
+
+
+def _synthetic_matrix(
+    path: str, n: int, dim: int, clusters: int, noise: float, seed: int,
+) -> np.ndarray:
+    """Gaussian mixture around *clusters* random directions, streamed to *path*."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    matrix = np.lib.format.open_memmap(path, mode="w+", dtype=np.float32, shape=(n, dim))
+    for i in range(0, n, _GEN_CHUNK_ROWS):
+        m = min(_GEN_CHUNK_ROWS, n - i)
+        labels = rng.integers(0, clusters, m)
+        matrix[i:i + m] = centers[labels] + noise * rng.standard_normal((m, dim), dtype=np.float32)
+    matrix.flush()
+    return matrix
+
+
+def _synthetic_queries(
+    n_queries: int, dim: int, clusters: int, noise: float, seed: int,
+) -> np.ndarray:
+    # Same centers as the matrix (same seed), fresh noise
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    qrng = np.random.default_rng(seed + 1)
+    labels = qrng.integers(0, clusters, n_queries)
+    return centers[labels] + noise * qrng.standard_normal((n_queries, dim), dtype=np.float32)
+
+
+def _unit(q: np.ndarray) -> np.ndarray:
+    return q / np.linalg.norm(q)
+
+
+def _percentiles(samples: list[float]) -> tuple[float, float]:
+    arr = np.asarray(samples) * 1000.0
+    return float(np.percentile(arr, 50)), float(np.percentile(arr, 99))
+
+
+def run_size(
+    matrix: np.ndarray,
+    queries: np.ndarray,
+    top_k: int,
+    nprobes: list[int],
+    scratch: str,
+) -> dict:
+    """Benchmark one matrix; returns a JSON-serialisable result dict."""
+    n = len(matrix)
+    norms = VectorStore._row_norms(matrix)
+    live = np.ones(n, dtype=bool)
+    row_fids = np.zeros(n, dtype=np.int32)
+
+    def rank(rows: np.ndarray | None, dots: np.ndarray) -> list[tuple[int, float]]:
+        return VectorStore._rank_rows(norms, live, row_fids, None, rows, dots, top_k)
+
+    exact_top: list[set[int]] = []
+    exact_times: list[float] = []
+    for q in queries:
+        qu = _unit(q)
+        t0 = time.perf_counter()
+        top = rank(None, matrix @ qu)
+        exact_times.append(time.perf_counter() - t0)
+        exact_top.append({row for row, _ in top})
+    p50, p99 = _percentiles(exact_times)
+    result: dict = {
+        "rows": n,
+        "dim": matrix.shape[1],
+        "exact": {"p50_ms": round(p50, 2), "p99_ms": round(p99, 2)},
+    }
+
+    t0 = time.perf_counter()
+    index = IVFFlatIndex.train(os.path.join(scratch, "bench.ivf"), matrix, norms, live, "bench")
+    result["ivf_build_s"] = round(time.perf_counter() - t0, 2)
+    result["nlist"] = index.nlist
+    result["ivf"] = []
+
+    for nprobe in nprobes or [default_nprobe(index.nlist)]:
+        times: list[float] = []
+        recalls: list[float] = []
+        scanned = 0
+        for q, truth in zip(queries, exact_top, strict=True):
+            qu = _unit(q)
+            t0 = time.perf_counter()
+            rows, dots = index.score(qu, nprobe, matrix)
+            top = rank(rows, dots)
+            times.append(time.perf_counter() - t0)
+            scanned += len(rows)
+            if truth:
+                recalls.append(len(truth & {row for row, _ in top}) / len(truth))
+        p50, p99 = _percentiles(times)
+        result["ivf"].append({
+            "nprobe": nprobe,
+            f"recall@{top_k}": round(float(np.mean(recalls)), 4),
+            "p50_ms": round(p50, 2),
+            "p99_ms": round(p99, 2),
+            "scanned_frac": round(scanned / (len(queries) * n), 4),
+        })
+    remove_index_files(index.base_path)
+    return result
+
+
+def format_table(results: list[dict], top_k: int) -> str:
+    lines = [
+        f"| rows | method | nprobe | recall@{top_k} | p50 ms | p99 ms | rows scanned |",
+        "|-----:|--------|-------:|---------:|-------:|-------:|-------------:|",
+    ]
+    for r in results:
+        lines.append(
+            f"| {r['rows']:,} | exact | - | 1.0000 | "
+            f"{r['exact']['p50_ms']:.2f} | {r['exact']['p99_ms']:.2f} | 100% |"
+        )
+        for ivf in r["ivf"]:
+            lines.append(
+                f"| {r['rows']:,} | ivf (nlist={r['nlist']}, build {r['ivf_build_s']}s) | "
+                f"{ivf['nprobe']} | {ivf[f'recall@{top_k}']:.4f} | "
+                f"{ivf['p50_ms']:.2f} | {ivf['p99_ms']:.2f} | {ivf['scanned_frac']:.1%} |"
+            )
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare IVF approximate vector search with the exact scan",
+    )
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[100_000, 1_000_000, 5_000_000],
+        help="Matrix row counts to benchmark (default: 100k 1M 5M)",
+    )
+    parser.add_argument("--dim", type=int, default=384, help="Vector dimension (synthetic data)")
+    parser.add_argument(
+        "--clusters", type=int, default=2000,
+        help="Mixture components in the synthetic data",
+    )
+    parser.add_argument(
+        "--noise", type=float, default=1.0,
+        help="Per-coordinate noise around each component (higher = harder for IVF)",
+    )
+    parser.add_argument(
+        "--data", type=str, default=None,
+        help="Use rows of this .npy float32 matrix instead of synthetic data; "
+        "queries are held-out rows",
+    )
+    parser.add_argument("--queries", type=int, default=500, help="Queries per size")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument(
+        "--nprobe", type=int, nargs="+", default=[],
+        help="nprobe values to sweep (default: the store's default for each size)",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", type=str, default=None, help="Write results to this JSON path")
+    args = parser.parse_args()
+
+    results: list[dict] = []
+    with tempfile.TemporaryDirectory(prefix="ann_bench_") as tmp:
+        source = np.load(args.data, mmap_mode="r") if args.data else None
+        for n in args.sizes:
+            if source is not None:
+                if n + args.queries > len(source):
+                    print(f"skipping {n:,}: {args.data} has only {len(source):,} rows")
+                    continue
+                matrix = np.asarray(source[:n], dtype=np.float32)
+                queries = np.asarray(source[n:n + args.queries], dtype=np.float32)
+            else:
+                print(f"generating {n:,} x {args.dim} ...", flush=True)
+                matrix = _synthetic_matrix(
+                    os.path.join(tmp, f"m{n}.npy"), n, args.dim, args.clusters, args.noise, args.seed,
+                )
+                queries = _synthetic_queries(
+                    args.queries, args.dim, args.clusters, args.noise, args.seed,
+                )
+            print(f"benchmarking {n:,} rows ...", flush=True)
+            results.append(run_size(matrix, queries, args.top_k, args.nprobe, tmp))
+            del matrix
+
+    print()
+    print(format_table(results, args.top_k))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nwrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,6 +16,7 @@ if TYPE_CHECKING:
     from sqlalchemy.ext.asyncio import AsyncSession
 
     from attocode.code_intel.git.manager import GitRepoManager
+    from attocode.integrations.context.parse_cache import ParseCache
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +26,13 @@ _SKIP_EXTENSIONS = {".png", ".jpg", ".jpeg", ".gif", ".ico", ".svg", ".woff", ".
                     ".dll", ".so", ".dylib", ".pyc", ".pyo", ".class", ".o"}
 _MAX_FILE_SIZE = 1_000_000  # 1MB
 
+# Parse-cache identity for this module's extractors (see ``parse_cache``)
+_PARSER_NAME = "attocode.code_intel.parser"
+_PARSER_MODULES = (
+    "attocode.code_intel.indexing.parser",
+    "attocode.integrations.context.ts_parser",
+)
+
 
 def _load_path_aliases(known_paths: set[str], config_contents: dict[str, bytes]) -> dict[str, str]:
     """Parse tsconfig.json/jsconfig.json for path alias mappings.
@@ -116,6 +124,19 @@ def _resolve_import_path(
     return None
 
 
+def _cached_extract(
+    cache: ParseCache | None,
+    oid: str,
+    artifact_type: str,
+    language: str | None,
+    extract: Callable[[], list[dict]],
+) -> list[dict]:
+    """Run *extract* through the shared parse cache, keyed by git blob *oid*."""
+    if cache is None or not oid:
+        return extract()
+    return cache.get_or_compute(f"git:{oid}", artifact_type, language or "", extract)
+
+
 class FullIndexer:
     """Full repository indexer.
 
@@ -154,12 +175,16 @@ class FullIndexer:
         from attocode.code_intel.storage.content_store import ContentStore
         from attocode.code_intel.storage.dependency_store import DependencyStore
         from attocode.code_intel.storage.symbol_store import SymbolStore
+        from attocode.integrations.context.parse_cache import ParseCache
 
         start = time.monotonic()
         content_store = ContentStore(self._session)
         symbol_store = SymbolStore(self._session)
         dep_store = DependencyStore(self._session)
         overlay = BranchOverlay(self._session)
+        # Shared with every other indexer run on this host: a blob parsed for
+        # one repo/branch/worktree is not parsed again.
+        parse_cache = ParseCache.open(indexer_name=_PARSER_NAME, parser_modules=_PARSER_MODULES)
 
         stats = {
             "files_indexed": 0,
@@ -187,8 +212,8 @@ class FullIndexer:
         path_to_sha: dict[str, str] = {}
         # Deferred import extraction: (path, sha, imports, language)
         deferred_deps: list[tuple[str, str, list[str], str | None]] = []
-        # Deferred reference extraction: (sha, content, path)
-        deferred_refs: list[tuple[str, bytes, str]] = []
+        # Deferred reference extraction: (sha, blob oid, content, path)
+        deferred_refs: list[tuple[str, str, bytes, str]] = []
 
         for i, (path, oid) in enumerate(all_files):
             try:
@@ -212,7 +237,10 @@ class FullIndexer:
                 path_to_sha[path] = sha
 
                 # Extract symbols (skip if SHA already has symbols — cross-branch dedup)
-                symbols = extract_symbols(content, path)
+                symbols = _cached_extract(
+                    parse_cache, oid, "symbols", language,
+                    lambda: extract_symbols(content, path),  # noqa: B023
+                )
                 if symbols:
                     count = await symbol_store.upsert_symbols(
                         sha, symbols, skip_if_exists=True
@@ -229,7 +257,7 @@ class FullIndexer:
 
                 # Defer reference extraction for third pass
                 if language in ("python", "javascript", "typescript"):
-                    deferred_refs.append((sha, content, path))
+                    deferred_refs.append((sha, oid, content, path))
 
                 stats["files_indexed"] += 1
 
@@ -278,12 +306,15 @@ class FullIndexer:
         from attocode.code_intel.db.models import SymbolReference
 
         refs_seen_shas: set[str] = set()
-        for idx, (sha, content, file_path) in enumerate(deferred_refs):
+        for idx, (sha, oid, content, file_path) in enumerate(deferred_refs):
             if sha in refs_seen_shas:
                 continue
             refs_seen_shas.add(sha)
             try:
-                refs = extract_references(content, file_path)
+                refs = _cached_extract(
+                    parse_cache, oid, "references", detect_language(file_path),
+                    lambda: extract_references(content, file_path),  # noqa: B023
+                )
                 for r in refs:
                     self._session.add(SymbolReference(
                         content_sha=sha,
@@ -297,6 +328,9 @@ class FullIndexer:
                 logger.warning("Error extracting refs for %s: %s", file_path, e)
 
         await self._session.commit()
+        if parse_cache is not None:
+            stats["parse_cache_hits"] = parse_cache.hits
+            parse_cache.close()
 
         duration_ms = int((time.monotonic() - start) * 1000)
         stats["duration_ms"] = duration_ms
@@ -36,6 +36,7 @@ def pagerank(
     damping: float = 0.85,
     iterations: int = 30,
     tolerance: float = 1e-6,
+    personalization: dict[str, float] | None = None,
 ) -> dict[str, float]:
     """Compute PageRank scores for nodes in a directed graph.
 
@@ -44,58 +45,36 @@ def pagerank(
         damping: Damping factor (probability of following a link).
         iterations: Maximum iterations.
         tolerance: Convergence threshold.
+        personalization: Optional seed weights (node -> weight); random
+            jumps and dangling rank go to the seeds instead of everywhere,
+            ranking nodes by proximity to them.
 
     Returns:
         Dict mapping node -> PageRank score.
     """
-    nodes = set(adjacency.keys())
-    for targets in adjacency.values():
-        nodes.update(targets)
+    from attocode.integrations.context.graph_rank import (
+        LinkMatrix,
+        power_iteration,
+        teleport_vector,
+    )
 
-    if not nodes:
+    matrix = LinkMatrix.from_adjacency(adjacency)
+    if not len(matrix):
         return {}
 
-    n = len(nodes)
-    node_list = sorted(nodes)
-    node_idx = {node: i for i, node in enumerate(node_list)}
-
-    # Build reverse adjacency (who points to me?)
-    in_links: dict[int, list[int]] = {i: [] for i in range(n)}
-    out_degree: dict[int, int] = {i: 0 for i in range(n)}
-
-    for source, targets in adjacency.items():
-        src_idx = node_idx[source]
-        valid_targets = [t for t in targets if t in node_idx]
-        out_degree[src_idx] = len(valid_targets)
-        for target in valid_targets:
-            in_links[node_idx[target]].append(src_idx)
-
-    # Initialize uniform
-    scores = [1.0 / n] * n
-    base = (1.0 - damping) / n
-
-    # Identify dangling nodes (no outgoing edges)
-    dangling = [i for i in range(n) if out_degree[i] == 0]
-
-    for _ in range(iterations):
-        # Redistribute dangling node rank uniformly
-        dangling_sum = sum(scores[i] for i in dangling)
-        new_scores = [0.0] * n
-        for i in range(n):
-            rank_sum = sum(
-                scores[j] / out_degree[j]
-                for j in in_links[i]
-                if out_degree[j] > 0
-            )
-            new_scores[i] = base + damping * (rank_sum + dangling_sum / n)
-
-        # Check convergence
-        diff = sum(abs(new_scores[i] - scores[i]) for i in range(n))
-        scores = new_scores
-        if diff < tolerance:
-            break
-
-    return {node_list[i]: scores[i] for i in range(n)}
+    teleport = teleport_vector(matrix, personalization) if personalization else None
+    vector, _ = power_iteration(
+        matrix,
+        damping=damping,
+        iterations=iterations,
+        tolerance=tolerance,
+        teleport=teleport,
+        # Redistribute dangling node rank instead of leaking it
+        redistribute_dangling=True,
+        metric="l1",
+    )
+    scores = matrix.to_dict(vector)
+    return {node: scores[node] for node in sorted(scores)}
 
 
 def _task_relevance(path: str, task_keywords: list[str]) -> float:
@@ -145,8 +124,9 @@ def rank_repo_files(
     """Rank repository files by graph importance and task relevance.
 
     Combines PageRank connectivity score with task-context keyword
-    relevance to produce a token-budgeted list of the most important
-    files and their key symbols.
+    relevance, plus PageRank personalized to the files matching the task,
+    to produce a token-budgeted list of the most important files and
+    their key symbols.
 
     Args:
         adjacency: File dependency graph (file -> [imported files]).
@@ -168,13 +148,18 @@ def rank_repo_files(
     # Extract task keywords
     task_keywords = [w for w in task_context.split() if len(w) > 2] if task_context else []
 
+    # Personalized PageRank seeded from the files the task mentions, so
+    # what those files depend on ranks above unrelated hubs
+    relevance = {path: _task_relevance(path, task_keywords) for path in pr_scores}
+    seeds = {path: r for path, r in relevance.items() if r > 0.1} if task_keywords else {}
+    task_scores = pagerank(adjacency, personalization=seeds) if seeds else {}
+
     # Score each file
     scored: list[tuple[str, float]] = []
     for path, pr_score in pr_scores.items():
         if exclude_tests and _categorize_path(path) == "test":
             continue
-        relevance = _task_relevance(path, task_keywords)
-        combined = pr_score * relevance
+        combined = pr_score * relevance[path] + task_scores.get(path, 0.0)
         scored.append((path, combined))
 
     # Sort by combined score descending
@@ -10,7 +10,7 @@ from __future__ import annotations
 import logging
 import os
 import subprocess
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from pathlib import Path
 
 from attocode.code_intel.rules.model import EnrichedFinding, RuleSeverity
@@ -36,6 +36,7 @@ class CIResult:
     files_scanned: int = 0
     rules_applied: int = 0
     findings_above_threshold: int = 0
+    stopped_early: bool = False  # fail_fast hit; findings are partial
 
     @property
     def passed(self) -> bool:
@@ -52,6 +53,9 @@ class CIConfig:
     sarif_output: str = ""  # path to write SARIF
     min_confidence: float = 0.5
     max_findings: int = 200
+    workers: int = 0  # scan processes; 0 = all cores on large scans
+    fail_fast: bool = False  # stop at the first finding at or above fail_on
+    cache: bool = True  # reuse findings of unchanged files (.attocode/cache)
 
 
 def load_ci_config(project_dir: str) -> CIConfig:
@@ -76,6 +80,9 @@ def load_ci_config(project_dir: str) -> CIConfig:
         cfg.sarif_output = str(data.get("sarif_output", ""))
         cfg.min_confidence = float(data.get("min_confidence", 0.5))
         cfg.max_findings = int(data.get("max_findings", 200))
+        cfg.workers = int(data.get("workers", 0))
+        cfg.fail_fast = bool(data.get("fail_fast", False))
+        cfg.cache = bool(data.get("cache", True))
         return cfg
     except Exception as exc:
         logger.warning("Failed to load CI config: %s", exc)
@@ -170,9 +177,10 @@ class CIRunner:
         from attocode.code_intel.rules.registry import RuleRegistry
         from attocode.code_intel.rules.loader import load_builtin_rules, load_user_rules
         from attocode.code_intel.rules.packs.pack_loader import load_all_packs
-        from attocode.code_intel.rules.executor import execute_rules
+        from attocode.code_intel.rules.executor import iter_findings
         from attocode.code_intel.rules.enricher import enrich_findings
         from attocode.code_intel.rules.filters.pipeline import run_pipeline
+        from attocode.code_intel.rules.finding_cache import FindingCache
 
         # Build registry
         reg = RuleRegistry()
@@ -204,38 +212,74 @@ class CIRunner:
         if not file_list or not rules:
             return CIResult(findings=[], files_scanned=len(file_list or []), rules_applied=len(rules))
 
-        # Execute
-        findings = execute_rules(file_list, rules, project_dir=self.project_dir)
+        threshold = _SEV_ORDER.get(self.config.fail_on, 1)
+        changed_lines_cache: dict[str, set[int]] = {}
+
+        def on_changed_lines(finding: EnrichedFinding) -> bool:
+            abs_path = (
+                finding.file if os.path.isabs(finding.file)
+                else os.path.join(self.project_dir, finding.file)
+            )
+            if abs_path not in changed_lines_cache:
+                changed_lines_cache[abs_path] = get_changed_lines(
+                    self.config.baseline, abs_path, self.project_dir,
+                )
+            return finding.line in changed_lines_cache[abs_path]
+
+        def above_threshold(finding: EnrichedFinding) -> bool:
+            return _SEV_ORDER.get(RuleSeverity(finding.severity), 4) <= threshold
+
+        diff_filter = diff_only and bool(self.config.baseline)
+
+        # Execute, sharded over worker processes on large scans
+        findings: list[EnrichedFinding] = []
+        stopped_early = False
+        stream = iter_findings(
+            file_list, rules, project_dir=self.project_dir,
+            workers=self.config.workers or None,
+            cache=FindingCache.open(self.project_dir) if self.config.cache else None,
+        )
+        try:
+            for batch in stream:
+                findings.extend(batch)
+                if not self.config.fail_fast:
+                    continue
+                # Judge the batch as the pipeline will, on copies: the
+                # test-file adjustment mutates findings in place.
+                kept = run_pipeline(
+                    [replace(f) for f in batch],
+                    min_confidence=self.config.min_confidence,
+                )
+                if any(
+                    above_threshold(f) and (not diff_filter or on_changed_lines(f))
+                    for f in kept
+                ):
+                    stopped_early = True
+                    break
+        finally:
+            stream.close()
+
+        findings.sort(key=lambda f: (_SEV_ORDER.get(RuleSeverity(f.severity), 9), f.file, f.line))
         findings = run_pipeline(findings, min_confidence=self.config.min_confidence)
         enrich_findings(findings, project_dir=self.project_dir)
 
         # Diff-only filtering: only keep findings on changed lines
-        if diff_only and self.config.baseline:
-            changed_lines_cache: dict[str, set[int]] = {}
-            filtered = []
-            for f in findings:
-                abs_path = f.file if os.path.isabs(f.file) else os.path.join(self.project_dir, f.file)
-                if abs_path not in changed_lines_cache:
-                    changed_lines_cache[abs_path] = get_changed_lines(
-                        self.config.baseline, abs_path, self.project_dir,
-                    )
-                if f.line in changed_lines_cache[abs_path]:
-                    filtered.append(f)
-            findings = filtered
+        if diff_filter:
+            findings = [f for f in findings if on_changed_lines(f)]
 
         # Cap findings
         findings = findings[:self.config.max_findings]
 
         # Compute exit code based on threshold
-        threshold = _SEV_ORDER.get(self.config.fail_on, 1)
-        above = [f for f in findings if _SEV_ORDER.get(RuleSeverity(f.severity), 4) <= threshold]
+        above = [f for f in findings if above_threshold(f)]
 
         result = CIResult(
             findings=findings,
-            exit_code=1 if above else 0,
+            exit_code=1 if above or stopped_early else 0,
             files_scanned=len(file_list),
             rules_applied=len(rules),
             findings_above_threshold=len(above),
+            stopped_early=stopped_early,
         )
 
         # Write SARIF if configured
@@ -287,6 +331,8 @@ def format_ci_summary(result: CIResult) -> str:
         f"Files scanned: {result.files_scanned} | Rules applied: {result.rules_applied}",
         f"Findings: {len(result.findings)} total, {result.findings_above_threshold} above threshold",
     ]
+    if result.stopped_early:
+        lines.append("Stopped at the first finding above threshold (fail_fast); results are partial.")
 
     if result.findings:
         # Group by severity
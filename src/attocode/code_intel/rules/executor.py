@@ -4,12 +4,16 @@ from __future__ import annotations
 
 import json
 import logging
+import multiprocessing
 import os
 import shutil
 import subprocess
-from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import TYPE_CHECKING, Any
 
 from attocode.code_intel.rules.combinators import MatchContext
+from attocode.code_intel.rules.finding_cache import CachedMatch, rule_key
 from attocode.code_intel.rules.metavar import (
     apply_metavar_fix,
     check_metavar_constraints,
@@ -20,13 +24,30 @@ from attocode.code_intel.rules.model import (
     RuleTier,
     UnifiedRule,
 )
+from attocode.code_intel.rules.prefilter import RulePrefilter
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Generator, Iterable, Iterator
+
+    from attocode.code_intel.rules.finding_cache import FindingCache
+    from attocode.code_intel.rules.profiling import RuleProfiler
 
 logger = logging.getLogger(__name__)
 
 # Per-rule subprocess timeout for ast-grep (seconds). Structural patterns
-# can be expensive on huge files; cap to keep ``analyze`` responsive.
+# can be expensive on huge files; cap to keep ``analyze`` responsive. A
+# batched scan gets this budget once per rule it carries.
 _AST_GREP_TIMEOUT = 30.0
 
+# Files per ast-grep invocation, and the byte budget for their paths on
+# the command line (well under ARG_MAX).
+_AST_GREP_CHUNK_FILES = 500
+_AST_GREP_CHUNK_BYTES = 96 * 1024
+
+# Budget for the combined ``--inline-rules`` YAML; Linux caps a single
+# argv string at 128 KiB.
+_AST_GREP_RULES_BYTES = 96 * 1024
+
 # Languages where ast-grep ships a tree-sitter grammar. When a structural
 # rule targets a language outside this set we either skip the rule (no
 # fallback regex) or fall back to ``rule.pattern`` if the YAML defined one.
@@ -141,11 +162,16 @@ def _yaml_quote(value: str) -> str:
     return '"' + escaped + '"'
 
 
-def _build_inline_rule_yaml(rule: UnifiedRule, lang: str) -> str:
+def _build_inline_rule_yaml(
+    rule: UnifiedRule,
+    lang: str,
+    *,
+    rule_id: str | None = None,
+) -> str:
     """Build the minimal ast-grep YAML rule for ``sg scan --inline-rules``.
 
-    Used when the rule provides ``structural_context`` and/or
-    ``structural_selector`` to disambiguate the parse.
+    ``rule_id`` overrides the YAML ``id`` (batched scans use positional
+    ids to map matches back to rules).
 
     ast-grep accepts two pattern shapes under ``rule.pattern``:
 
@@ -156,7 +182,7 @@ def _build_inline_rule_yaml(rule: UnifiedRule, lang: str) -> str:
       matching; including it makes the YAML invalid.
     """
     parts: list[str] = [
-        f"id: {rule.id or 'inline'}",
+        f"id: {rule_id or rule.id or 'inline'}",
         f"language: {_ast_grep_lang_name(lang)}",
         "rule:",
     ]
@@ -186,213 +212,263 @@ def _build_inline_rule_yaml(rule: UnifiedRule, lang: str) -> str:
     return "\n".join(parts) + "\n"
 
 
-def _execute_structural_rule(
+def _structural_finding(
     rule: UnifiedRule,
-    files_by_lang: dict[str, list[str]],
+    match: dict[str, Any],
     *,
     project_dir: str = "",
-) -> list[EnrichedFinding]:
-    """Run a single structural rule across applicable files via ast-grep.
+) -> EnrichedFinding:
+    """Build a finding for *rule* from one ast-grep JSON match."""
+    file_path = match.get("file", "")
+    start = match.get("range", {}).get("start", {})
+    line_no = int(start.get("line", 0)) + 1  # ast-grep is 0-based
+    snippet = (match.get("lines") or "").rstrip()[:200]
+
+    captures: dict[str, str] = {}
+    metavars = match.get("metaVariables") or match.get("metavariables") or {}
+    singles = metavars.get("single") or {}
+    for var_name, info in singles.items():
+        text = info.get("text") if isinstance(info, dict) else None
+        if isinstance(text, str):
+            captures[var_name] = text
+    # ast-grep emits ``$$$X`` (variadic) bindings under ``multi``.
+    # Concatenate the segment texts so description templates that
+    # reference ``$X`` still resolve to something readable.
+    multis = metavars.get("multi") or {}
+    for var_name, segments in multis.items():
+        if var_name in captures or not isinstance(segments, list):
+            continue
+        parts = [
+            s.get("text", "") for s in segments
+            if isinstance(s, dict) and isinstance(s.get("text"), str)
+        ]
+        if parts:
+            captures[var_name] = "".join(parts)
+
+    description = rule.description
+    if captures:
+        description = interpolate_message(description, captures)
+
+    suggested_fix = ""
+    if rule.fix:
+        if rule.fix.uses_metavars and captures:
+            sf_search, sf_replace = apply_metavar_fix(
+                rule.fix.search, rule.fix.replace, captures,
+            )
+            suggested_fix = f"{sf_search} \u2192 {sf_replace}"
+        else:
+            suggested_fix = f"{rule.fix.search} \u2192 {rule.fix.replace}"
 
-    Per language: shells out to ``sg run --pattern <pat> --lang <lang>
-    --json=stream <files...>`` and parses one match per JSON line. Files
-    in languages without an ast-grep grammar are silently skipped — the
-    caller is responsible for supplying ``rule.pattern`` if they want a
-    Tier-1 fallback for those languages.
+    rel_path = file_path
+    if project_dir:
+        try:
+            rel_path = os.path.relpath(file_path, project_dir)
+        except ValueError:
+            pass
+
+    return EnrichedFinding(
+        rule_id=rule.qualified_id,
+        rule_name=rule.name,
+        severity=rule.severity,
+        category=rule.category,
+        confidence=rule.confidence,
+        file=rel_path,
+        line=line_no,
+        code_snippet=snippet,
+        description=description,
+        explanation=rule.explanation,
+        recommendation=rule.recommendation,
+        examples=list(rule.examples),
+        suggested_fix=suggested_fix,
+        captures=captures,
+        cwe=rule.cwe,
+        pack=rule.pack,
+        tags=list(rule.tags),
+    )
 
-    Returns the list of (partially populated) ``EnrichedFinding`` objects.
+
+def _chunk_paths(files: list[str]) -> list[list[str]]:
+    """Split *files* into command-line sized chunks."""
+    chunks: list[list[str]] = []
+    current: list[str] = []
+    size = 0
+    for fp in files:
+        cost = len(os.fsencode(fp)) + 1
+        if current and (
+            len(current) >= _AST_GREP_CHUNK_FILES or size + cost > _AST_GREP_CHUNK_BYTES
+        ):
+            chunks.append(current)
+            current, size = [], 0
+        current.append(fp)
+        size += cost
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _run_ast_grep_scan(
+    rules: list[UnifiedRule],
+    lang: str,
+    files: list[str],
+    *,
+    project_dir: str = "",
+) -> list[EnrichedFinding]:
+    """Run *rules* over *files* of one language in a single ``sg scan``.
+
+    The rules go in as one multi-document ``--inline-rules`` YAML with
+    positional ids (``r0``, ``r1``, ...); each match's ``ruleId`` maps it
+    back to its rule. Findings come back grouped by rule, in rule order,
+    the way one run per rule used to list them. A batch ast-grep rejects
+    (usually one malformed pattern) is retried rule by rule so the other
+    rules still report.
     """
-    if not rule.structural_pattern:
+    docs = [_build_inline_rule_yaml(rule, lang, rule_id=f"r{i}") for i, rule in enumerate(rules)]
+    # One argv string is capped at 128 KiB; split oversized rule sets.
+    if len(rules) > 1 and sum(len(d) for d in docs) > _AST_GREP_RULES_BYTES:
+        half = len(rules) // 2
+        return (
+            _run_ast_grep_scan(rules[:half], lang, files, project_dir=project_dir)
+            + _run_ast_grep_scan(rules[half:], lang, files, project_dir=project_dir)
+        )
+
+    cmd = [
+        _ast_grep_binary(), "scan",
+        "--inline-rules", "---\n".join(docs),
+        "--json=stream",
+        *files,
+    ]
+    what = rules[0].qualified_id if len(rules) == 1 else f"{len(rules)} rules"
+    try:
+        result = subprocess.run(
+            cmd,
+            capture_output=True,
+            text=True,
+            timeout=_AST_GREP_TIMEOUT * len(rules),
+            check=False,
+        )
+    except (subprocess.TimeoutExpired, FileNotFoundError) as exc:
+        logger.warning("ast-grep failed for %s lang=%s: %s", what, lang, exc)
         return []
 
-    # Determine which languages this rule applies to. An empty
-    # ``rule.languages`` means "all languages we have files for".
-    target_langs: list[str]
-    if rule.languages:
-        target_langs = [lang for lang in rule.languages if lang in files_by_lang]
-    else:
-        target_langs = list(files_by_lang.keys())
-
-    binary = _ast_grep_binary()
-    findings: list[EnrichedFinding] = []
+    # ast-grep returns non-zero when *no* matches are found. Only treat
+    # stderr-with-actual-content as an error signal.
+    if result.returncode not in (0, 1) and result.stderr.strip():
+        if len(rules) > 1:
+            logger.debug(
+                "ast-grep rejected a batch of %s lang=%s; retrying rule by rule",
+                what, lang,
+            )
+            findings: list[EnrichedFinding] = []
+            for rule in rules:
+                findings.extend(_run_ast_grep_scan([rule], lang, files, project_dir=project_dir))
+            return findings
+        logger.warning(
+            "ast-grep error for rule %s lang=%s: %s",
+            what, lang, result.stderr.strip()[:200],
+        )
+        return []
 
-    for lang in target_langs:
-        if lang not in _AST_GREP_LANGS:
+    by_rule: list[list[EnrichedFinding]] = [[] for _ in rules]
+    for line in result.stdout.splitlines():
+        line = line.strip()
+        if not line:
             continue
-        files = files_by_lang.get(lang, [])
-        if not files:
+        try:
+            match = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        rule_key = match.get("ruleId")
+        if not isinstance(rule_key, str) or not rule_key.startswith("r"):
             continue
-
-        # When the rule needs context/selector to disambiguate parsing
-        # (e.g. ``fmt.Println($X)`` in Go), shell out to ``sg scan
-        # --inline-rules`` with a YAML rule body. Otherwise the simpler
-        # ``sg run --pattern`` path is faster.
-        if rule.structural_context or rule.structural_selector:
-            inline_yaml = _build_inline_rule_yaml(rule, lang)
-            cmd = [
-                binary, "scan",
-                "--inline-rules", inline_yaml,
-                "--json=stream",
-                *files,
-            ]
-        else:
-            cmd = [
-                binary, "run",
-                "--pattern", rule.structural_pattern,
-                "--lang", lang,
-                "--json=stream",
-                *files,
-            ]
         try:
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=_AST_GREP_TIMEOUT,
-                check=False,
-            )
-        except (subprocess.TimeoutExpired, FileNotFoundError) as exc:
-            logger.warning(
-                "ast-grep failed for rule %s lang=%s: %s",
-                rule.qualified_id, lang, exc,
-            )
+            index = int(rule_key[1:])
+        except ValueError:
             continue
-
-        # ast-grep returns non-zero when *no* matches are found. Only treat
-        # stderr-with-actual-content as an error signal.
-        if result.returncode not in (0, 1) and result.stderr.strip():
-            logger.warning(
-                "ast-grep error for rule %s lang=%s: %s",
-                rule.qualified_id, lang, result.stderr.strip()[:200],
+        if 0 <= index < len(rules):
+            by_rule[index].append(
+                _structural_finding(rules[index], match, project_dir=project_dir),
             )
-            continue
+    return [f for found in by_rule for f in found]
 
-        for line in result.stdout.splitlines():
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                match = json.loads(line)
-            except json.JSONDecodeError:
-                continue
 
-            file_path = match.get("file", "")
-            start = match.get("range", {}).get("start", {})
-            line_no = int(start.get("line", 0)) + 1  # ast-grep is 0-based
-            snippet = (match.get("lines") or "").rstrip()[:200]
-
-            captures: dict[str, str] = {}
-            metavars = match.get("metaVariables") or match.get("metavariables") or {}
-            singles = metavars.get("single") or {}
-            for var_name, info in singles.items():
-                text = info.get("text") if isinstance(info, dict) else None
-                if isinstance(text, str):
-                    captures[var_name] = text
-            # ast-grep emits ``$$$X`` (variadic) bindings under ``multi``.
-            # Concatenate the segment texts so description templates that
-            # reference ``$X`` still resolve to something readable.
-            multis = metavars.get("multi") or {}
-            for var_name, segments in multis.items():
-                if var_name in captures or not isinstance(segments, list):
-                    continue
-                parts = [
-                    s.get("text", "") for s in segments
-                    if isinstance(s, dict) and isinstance(s.get("text"), str)
-                ]
-                if parts:
-                    captures[var_name] = "".join(parts)
-
-            description = rule.description
-            if captures:
-                description = interpolate_message(description, captures)
-
-            suggested_fix = ""
-            if rule.fix:
-                if rule.fix.uses_metavars and captures:
-                    sf_search, sf_replace = apply_metavar_fix(
-                        rule.fix.search, rule.fix.replace, captures,
-                    )
-                    suggested_fix = f"{sf_search} → {sf_replace}"
-                else:
-                    suggested_fix = f"{rule.fix.search} → {rule.fix.replace}"
-
-            rel_path = file_path
-            if project_dir:
-                try:
-                    rel_path = os.path.relpath(file_path, project_dir)
-                except ValueError:
-                    pass
-
-            findings.append(EnrichedFinding(
-                rule_id=rule.qualified_id,
-                rule_name=rule.name,
-                severity=rule.severity,
-                category=rule.category,
-                confidence=rule.confidence,
-                file=rel_path,
-                line=line_no,
-                code_snippet=snippet,
-                description=description,
-                explanation=rule.explanation,
-                recommendation=rule.recommendation,
-                examples=list(rule.examples),
-                suggested_fix=suggested_fix,
-                captures=captures,
-                cwe=rule.cwe,
-                pack=rule.pack,
-                tags=list(rule.tags),
-            ))
-    return findings
+def _iter_structural_batches(
+    rules: list[UnifiedRule],
+    files_by_lang: dict[str, list[str]],
+    *,
+    project_dir: str = "",
+) -> Iterator[list[EnrichedFinding]]:
+    """Run structural rules with one ast-grep scan per language and file chunk.
+
+    Each file is parsed once per scan however many rules apply to its
+    language. The scans run concurrently (ast-grep does the work in its
+    own process) and their findings are yielded as each one finishes.
+    Files in languages without an ast-grep grammar are silently skipped —
+    the caller is responsible for supplying ``rule.pattern`` if they want
+    a Tier-1 fallback for those languages.
+    """
+    # An empty ``rule.languages`` means "all languages we have files for".
+    rules_by_lang: dict[str, list[UnifiedRule]] = {}
+    for rule in rules:
+        if not rule.structural_pattern:
+            continue
+        target_langs = rule.languages or list(files_by_lang)
+        for lang in target_langs:
+            if lang in _AST_GREP_LANGS and files_by_lang.get(lang):
+                rules_by_lang.setdefault(lang, []).append(rule)
+
+    jobs = [
+        (lang_rules, lang, chunk)
+        for lang, lang_rules in rules_by_lang.items()
+        for chunk in _chunk_paths(files_by_lang[lang])
+    ]
+    if not jobs:
+        return
+    if len(jobs) == 1:
+        lang_rules, lang, chunk = jobs[0]
+        found = _run_ast_grep_scan(lang_rules, lang, chunk, project_dir=project_dir)
+        if found:
+            yield found
+        return
+
+    with ThreadPoolExecutor(max_workers=min(len(jobs), os.cpu_count() or 1)) as pool:
+        futures = [
+            pool.submit(_run_ast_grep_scan, lang_rules, lang, chunk, project_dir=project_dir)
+            for lang_rules, lang, chunk in jobs
+        ]
+        for future in as_completed(futures):
+            found = future.result()
+            if found:
+                yield found
 
 
-def execute_rules(
-    files: list[str],
-    rules: list[UnifiedRule],
+def _execute_structural_rule(
+    rule: UnifiedRule,
+    files_by_lang: dict[str, list[str]],
     *,
     project_dir: str = "",
 ) -> list[EnrichedFinding]:
-    """Execute rules against a list of files.
-
-    Args:
-        files: Absolute file paths to scan.
-        rules: Rules to execute (should be pre-filtered to enabled only).
-        project_dir: Project root for relative path computation.
+    """Run a single structural rule across applicable files via ast-grep.
 
-    Returns:
-        List of EnrichedFinding (partially populated — use enricher for full context).
+    Returns the list of (partially populated) ``EnrichedFinding`` objects.
     """
     findings: list[EnrichedFinding] = []
+    for found in _iter_structural_batches([rule], files_by_lang, project_dir=project_dir):
+        findings.extend(found)
+    return findings
 
-    # ----- Tier 2: structural rules via ast-grep --------------------------
-    structural_rules = [
-        r for r in rules
-        if r.tier == RuleTier.STRUCTURAL and r.structural_pattern
-    ]
-    if structural_rules:
-        if _ast_grep_available():
-            files_by_lang: dict[str, list[str]] = {}
-            for fp in files:
-                lang = detect_language(fp)
-                if lang:
-                    files_by_lang.setdefault(lang, []).append(fp)
-            for rule in structural_rules:
-                findings.extend(_execute_structural_rule(
-                    rule, files_by_lang, project_dir=project_dir,
-                ))
-        else:
-            logger.info(
-                "ast-grep not on PATH; skipping %d structural rule(s). "
-                "Install with: cargo install ast-grep || brew install ast-grep",
-                len(structural_rules),
-            )
 
-    # Pre-group rules by language for fast lookup. Tier-1 rules always run
-    # here; Tier-2 (structural) rules also run here as a regex fallback
-    # for languages where ast-grep can't help — either because the language
-    # has no ast-grep grammar, or because the binary is missing entirely.
-    # Roadmap Phase 1: "Fallback to regex Tier 1 for languages without
-    # ast-grep grammars".
-    ast_grep_ok = _ast_grep_available()
+def _regex_rule_groups(
+    rules: list[UnifiedRule],
+    ast_grep_ok: bool,
+) -> tuple[dict[str, list[UnifiedRule]], list[UnifiedRule]]:
+    """Split the rules that run as regex into per-language and universal ones.
+
+    Tier-1 rules always run here; Tier-2 (structural) rules also run here
+    as a regex fallback for languages where ast-grep can't help — either
+    because the language has no ast-grep grammar, or because the binary is
+    missing entirely. Roadmap Phase 1: "Fallback to regex Tier 1 for
+    languages without ast-grep grammars".
+    """
     lang_rules: dict[str, list[UnifiedRule]] = {}
     universal_rules: list[UnifiedRule] = []
 
@@ -430,32 +506,66 @@ def execute_rules(
             for lang in regex_langs:
                 lang_rules.setdefault(lang, []).append(rule)
 
-    for file_path in files:
+    return lang_rules, universal_rules
+
+
+class _RegexScanner:
+    """Runs the regex-executable rules over one file at a time.
+
+    Keeps one prefilter per language: each file is scanned once per
+    distinct literal atom, and rules only run on the lines holding their
+    atoms.
+    """
+
+    def __init__(
+        self,
+        rules: list[UnifiedRule],
+        *,
+        project_dir: str = "",
+        ast_grep_ok: bool = False,
+    ) -> None:
+        self.project_dir = project_dir
+        self._lang_rules, self._universal_rules = _regex_rule_groups(rules, ast_grep_ok)
+        self._prefilters: dict[str, RulePrefilter] = {}
+
+    def _prefilter(self, lang: str) -> RulePrefilter:
+        prefilter = self._prefilters.get(lang)
+        if prefilter is None:
+            applicable = list(self._universal_rules)
+            if lang:
+                applicable.extend(self._lang_rules.get(lang, []))
+            prefilter = self._prefilters[lang] = RulePrefilter(applicable)
+        return prefilter
+
+    def scan(self, file_path: str) -> list[EnrichedFinding]:
+        """Findings of the regex rules in *file_path*, in line order."""
         lang = detect_language(file_path)
-        applicable = list(universal_rules)
-        if lang:
-            applicable.extend(lang_rules.get(lang, []))
-        if not applicable:
-            continue
+        prefilter = self._prefilter(lang)
+        if not prefilter.rules:
+            return []
+
+        from attocode.integrations.context.workspace import read_text
 
         try:
-            content = Path(file_path).read_text(encoding="utf-8", errors="replace")
+            content = read_text(file_path)
         except OSError:
-            continue
+            return []
 
         lines = content.splitlines()
         rel_path = file_path
-        if project_dir:
+        if self.project_dir:
             try:
-                rel_path = os.path.relpath(file_path, project_dir)
+                rel_path = os.path.relpath(file_path, self.project_dir)
             except ValueError:
                 pass
 
-        for i, line in enumerate(lines):
+        findings: list[EnrichedFinding] = []
+        for i, line_rules in prefilter.candidates(content, lines):
+            line = lines[i]
             line_no = i + 1
             is_comment = _is_comment_line(line, lang)
 
-            for rule in applicable:
+            for rule in line_rules:
                 if is_comment and not rule.scan_comments:
                     continue
 
@@ -522,8 +632,440 @@ def execute_rules(
                     pack=rule.pack,
                     tags=list(rule.tags),
                 ))
+        return findings
+
+    def scan_batch(self, files: list[str]) -> list[list[EnrichedFinding]]:
+        return [self.scan(fp) for fp in files]
+
+
+# ---------------------------------------------------------------------------
+# Sharded execution
+# ---------------------------------------------------------------------------
+
+# Worker count for ``workers=None``; defaults to the usable CPU count.
+_WORKERS_ENV = "ATTOCODE_RULE_WORKERS"
+
+# Below this many files a process pool costs more (worker start-up and
+# shipping the rules) than it saves, so automatic mode scans serially.
+_MIN_PARALLEL_FILES = 256
+
+# Upper bound on files per task: small enough that findings stream back
+# steadily and the last batches balance across workers.
+_MAX_BATCH_FILES = 64
 
-    # Sort: severity first, then file, then line
-    _sev_order = {"critical": 0, "high": 1, "medium": 2, "low": 3, "info": 4}
-    findings.sort(key=lambda f: (_sev_order.get(f.severity, 9), f.file, f.line))
+# Scanner of the current worker process, built once by the pool initializer.
+_worker_scanner: _RegexScanner | None = None
+
+
+def _init_worker(rules: list[UnifiedRule], project_dir: str, ast_grep_ok: bool) -> None:
+    global _worker_scanner
+    _worker_scanner = _RegexScanner(rules, project_dir=project_dir, ast_grep_ok=ast_grep_ok)
+
+
+def _scan_batch_in_worker(files: list[str]) -> list[list[EnrichedFinding]]:
+    assert _worker_scanner is not None
+    return _worker_scanner.scan_batch(files)
+
+
+def _resolve_workers(workers: int | None, file_count: int) -> int:
+    if multiprocessing.parent_process() is not None:
+        return 1  # never nest pools, e.g. from an unguarded __main__ re-import
+    if workers is None:
+        raw = os.environ.get(_WORKERS_ENV, "").strip()
+        try:
+            workers = int(raw) if raw else 0
+        except ValueError:
+            workers = 0
+        if workers <= 0:
+            if file_count < _MIN_PARALLEL_FILES:
+                return 1
+            try:
+                workers = len(os.sched_getaffinity(0))
+            except AttributeError:
+                workers = os.cpu_count() or 1
+    return max(1, min(workers, file_count))
+
+
+def iter_findings(
+    files: list[str],
+    rules: list[UnifiedRule],
+    *,
+    project_dir: str = "",
+    workers: int | None = 1,
+    cache: FindingCache | None = None,
+    profiler: RuleProfiler | None = None,
+) -> Generator[list[EnrichedFinding], None, None]:
+    """Execute rules against *files*, yielding findings as they are produced.
+
+    Each yielded list holds the regex findings of one file (in line order),
+    the findings of one ast-grep scan (one language's files, or a chunk of
+    them), or the cached findings of one file. Batches arrive in completion
+    order, not sorted; closing the iterator early cancels the work not yet
+    started.
+
+    Args:
+        files: Absolute file paths to scan.
+        rules: Rules to execute (should be pre-filtered to enabled only).
+        project_dir: Project root for relative path computation.
+        workers: Processes for the regex scan. ``1`` scans in this
+            process; ``None`` uses ``$ATTOCODE_RULE_WORKERS`` or every
+            usable CPU, scanning serially for small file lists.
+        cache: Finding cache; only files whose content or applicable
+            rules changed since they were cached are scanned. Results are
+            stored once the iterator is exhausted.
+        profiler: Receives, per rule, the files scanned, the files served
+            from *cache* and the matches.
+    """
+    if cache is None:
+        stream = _iter_scan(files, rules, project_dir=project_dir, workers=workers)
+        if profiler is not None:
+            keyed_for = _keyed_rules_by_language(rules, _ast_grep_available())
+            _record_rule_files(
+                profiler, (keyed_for(detect_language(fp)) for fp in files), cached=False,
+            )
+    else:
+        stream = _iter_cached_scan(
+            files, rules, cache, project_dir=project_dir, workers=workers, profiler=profiler,
+        )
+    if profiler is None:
+        yield from stream
+        return
+    for batch in stream:
+        for finding in batch:
+            profiler.record_match(finding.rule_id)
+        yield batch
+
+
+def _record_rule_files(
+    profiler: RuleProfiler,
+    keyed_sets: Iterable[_KeyedRules | None],
+    *,
+    cached: bool,
+) -> None:
+    """Count one file per applicable rule, as cache hits or as scans."""
+    counts: dict[str, int] = {}
+    for keyed in keyed_sets:
+        for _, rule, _ in (keyed or {}).values():
+            counts[rule.qualified_id] = counts.get(rule.qualified_id, 0) + 1
+    record = profiler.record_cache_hit if cached else profiler.record_file_scanned
+    for qid, count in counts.items():
+        record(qid, count)
+
+
+def _iter_scan(
+    files: list[str],
+    rules: list[UnifiedRule],
+    *,
+    project_dir: str = "",
+    workers: int | None = 1,
+) -> Generator[list[EnrichedFinding], None, None]:
+    ast_grep_ok = _ast_grep_available()
+    n_workers = _resolve_workers(workers, len(files))
+
+    if n_workers <= 1:
+        yield from _iter_structural(files, rules, project_dir=project_dir)
+        scanner = _RegexScanner(rules, project_dir=project_dir, ast_grep_ok=ast_grep_ok)
+        for fp in files:
+            found = scanner.scan(fp)
+            if found:
+                yield found
+        return
+
+    batch_size = max(1, min(_MAX_BATCH_FILES, -(-len(files) // (n_workers * 4))))
+    batches = [files[i:i + batch_size] for i in range(0, len(files), batch_size)]
+    # spawn: callers such as the MCP server are multi-threaded (including
+    # non-Python threads), so forking them is unsafe. Rules reach the
+    # workers through initargs.
+    pool = ProcessPoolExecutor(
+        max_workers=n_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(rules, project_dir, ast_grep_ok),
+    )
+    try:
+        pending = {pool.submit(_scan_batch_in_worker, batch): batch for batch in batches}
+        # Structural rules shell out to ast-grep from here while the
+        # workers scan.
+        yield from _iter_structural(files, rules, project_dir=project_dir)
+        leftover: list[str] = []
+        for future in as_completed(pending):
+            try:
+                per_file = future.result()
+            except BrokenProcessPool:
+                leftover.extend(pending[future])
+                continue
+            for found in per_file:
+                if found:
+                    yield found
+        if leftover:
+            logger.warning(
+                "Rule worker pool failed; scanning %d file(s) in-process", len(leftover),
+            )
+            scanner = _RegexScanner(rules, project_dir=project_dir, ast_grep_ok=ast_grep_ok)
+            for fp in leftover:
+                found = scanner.scan(fp)
+                if found:
+                    yield found
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _iter_structural(
+    files: list[str],
+    rules: list[UnifiedRule],
+    *,
+    project_dir: str = "",
+) -> Iterator[list[EnrichedFinding]]:
+    """Tier 2: structural rules via ast-grep, one batch per scan."""
+    structural_rules = [
+        r for r in rules
+        if r.tier == RuleTier.STRUCTURAL and r.structural_pattern
+    ]
+    if not structural_rules:
+        return
+    if not _ast_grep_available():
+        logger.info(
+            "ast-grep not on PATH; skipping %d structural rule(s). "
+            "Install with: cargo install ast-grep || brew install ast-grep",
+            len(structural_rules),
+        )
+        return
+    files_by_lang: dict[str, list[str]] = {}
+    for fp in files:
+        lang = detect_language(fp)
+        if lang:
+            files_by_lang.setdefault(lang, []).append(fp)
+    yield from _iter_structural_batches(
+        structural_rules, files_by_lang, project_dir=project_dir,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Finding cache
+# ---------------------------------------------------------------------------
+
+
+def _display_path(file_path: str, project_dir: str) -> str:
+    """The ``file`` a finding reports for *file_path*."""
+    if project_dir:
+        try:
+            return os.path.relpath(file_path, project_dir)
+        except ValueError:
+            pass
+    return file_path
+
+
+# rule key -> (position in the rule list, rule, engine)
+_KeyedRules = dict[str, tuple[int, UnifiedRule, str]]
+
+
+def _keyed_rules_by_language(
+    rules: list[UnifiedRule],
+    ast_grep_ok: bool,
+) -> Callable[[str], _KeyedRules | None]:
+    """Map a language to the cache keys of the rules that run on its files.
+
+    Mirrors the routing of :func:`_regex_rule_groups` and
+    :func:`_iter_structural_batches`. Returns None for languages whose
+    rules share a qualified id, which the cache could not tell apart.
+    """
+    lang_rules, universal_rules = _regex_rule_groups(rules, ast_grep_ok)
+    position = {id(rule): i for i, rule in enumerate(rules)}
+    structural = [
+        r for r in rules
+        if ast_grep_ok and r.tier == RuleTier.STRUCTURAL and r.structural_pattern
+    ]
+    keys_by_rule: dict[tuple[int, str], str] = {}
+    memo: dict[str, _KeyedRules | None] = {}
+
+    def keyed(lang: str) -> _KeyedRules | None:
+        if lang in memo:
+            return memo[lang]
+        applicable = [(rule, "re") for rule in universal_rules]
+        if lang:
+            applicable.extend((rule, "re") for rule in lang_rules.get(lang, []))
+        if lang in _AST_GREP_LANGS:
+            applicable.extend(
+                (rule, "sg") for rule in structural
+                if not rule.languages or lang in rule.languages
+            )
+        result: _KeyedRules = {}
+        seen: set[str] = set()
+        for rule, engine in applicable:
+            if rule.qualified_id in seen:
+                memo[lang] = None
+                return None
+            seen.add(rule.qualified_id)
+            slot = (id(rule), engine)
+            if slot not in keys_by_rule:
+                keys_by_rule[slot] = rule_key(rule, engine)
+            result[keys_by_rule[slot]] = (position[id(rule)], rule, engine)
+        memo[lang] = result
+        return result
+
+    return keyed
+
+
+def _finding_from_cache(rule: UnifiedRule, match: CachedMatch, rel_path: str) -> EnrichedFinding:
+    return EnrichedFinding(
+        rule_id=rule.qualified_id,
+        rule_name=rule.name,
+        severity=rule.severity,
+        category=rule.category,
+        confidence=rule.confidence,
+        file=rel_path,
+        line=match.line,
+        code_snippet=match.code_snippet,
+        description=match.description,
+        explanation=rule.explanation,
+        recommendation=rule.recommendation,
+        examples=list(rule.examples),
+        suggested_fix=match.suggested_fix,
+        captures=dict(match.captures),
+        cwe=rule.cwe,
+        pack=rule.pack,
+        tags=list(rule.tags),
+    )
+
+
+def _iter_cached_scan(
+    files: list[str],
+    rules: list[UnifiedRule],
+    cache: FindingCache,
+    *,
+    project_dir: str = "",
+    workers: int | None = 1,
+    profiler: RuleProfiler | None = None,
+) -> Generator[list[EnrichedFinding], None, None]:
+    """Serve unchanged files from *cache* and scan the rest.
+
+    A cached file's findings are rebuilt in the order a scan yields them
+    (ast-grep matches rule by rule, then regex matches line by line), so
+    the sorted result of :func:`execute_rules` does not depend on which
+    files were cached.
+    """
+    keyed_for = _keyed_rules_by_language(rules, _ast_grep_available())
+    oids = cache.blob_oids(files)
+    wanted: dict[str, frozenset[str]] = {}
+    plan: dict[str, tuple[str, _KeyedRules]] = {}  # file -> (oid, keyed rules)
+    for fp in files:
+        oid = oids.get(fp)
+        keyed = keyed_for(detect_language(fp))
+        if oid is None or keyed is None:
+            continue
+        plan[fp] = (oid, keyed)
+        # Identical content in files of two languages needs both rule sets.
+        wanted[oid] = wanted.get(oid, frozenset()) | frozenset(keyed)
+    cached = cache.lookup(wanted)
+
+    dirty: list[str] = []
+    for fp in files:
+        entry = plan.get(fp)
+        if entry is None or entry[0] not in cached:
+            dirty.append(fp)
+            continue
+        oid, keyed = entry
+        structural: list[tuple[int, int, EnrichedFinding]] = []
+        regex: list[tuple[int, int, EnrichedFinding]] = []
+        rel_path = _display_path(fp, project_dir)
+        for match in cached[oid]:
+            if match.rule_key not in keyed:
+                continue
+            index, rule, engine = keyed[match.rule_key]
+            finding = _finding_from_cache(rule, match, rel_path)
+            if engine == "sg":
+                structural.append((index, match.seq, finding))
+            else:
+                regex.append((match.line, index, finding))
+        structural.sort(key=lambda t: t[:2])
+        regex.sort(key=lambda t: t[:2])
+        found = [t[2] for t in structural] + [t[2] for t in regex]
+        if found:
+            yield found
+    cache.hits += len(files) - len(dirty)
+    cache.misses += len(dirty)
+    if profiler is not None:
+        dirty_set = set(dirty)
+        _record_rule_files(
+            profiler, (plan[fp][1] for fp in files if fp not in dirty_set), cached=True,
+        )
+        _record_rule_files(
+            profiler,
+            (plan[fp][1] if fp in plan else keyed_for(detect_language(fp)) for fp in dirty),
+            cached=False,
+        )
+    if not dirty:
+        return
+
+    by_path = {_display_path(fp, project_dir): fp for fp in dirty if fp in plan}
+    scanned: dict[str, list[EnrichedFinding]] = {fp: [] for fp in by_path.values()}
+    for batch in _iter_scan(dirty, rules, project_dir=project_dir, workers=workers):
+        for finding in batch:
+            owner = by_path.get(finding.file)
+            if owner is not None:
+                scanned[owner].append(finding)
+        yield batch
+
+    # Only reached when the caller consumed every batch.
+    entries: list[tuple[str, frozenset[str], list[CachedMatch]]] = []
+    for fp, found in scanned.items():
+        oid, keyed = plan[fp]
+        key_of = {rule.qualified_id: key for key, (_, rule, _) in keyed.items()}
+        seqs: dict[str, int] = {}
+        matches: list[CachedMatch] = []
+        for finding in found:
+            key = key_of.get(finding.rule_id)
+            if key is None:
+                break
+            seqs[key] = seqs.get(key, -1) + 1
+            matches.append(CachedMatch(
+                rule_key=key,
+                seq=seqs[key],
+                line=finding.line,
+                code_snippet=finding.code_snippet,
+                description=finding.description,
+                suggested_fix=finding.suggested_fix,
+                captures=dict(finding.captures),
+            ))
+        else:
+            entries.append((oid, frozenset(keyed), matches))
+    cache.store(entries)
+
+
+_SEV_ORDER = {"critical": 0, "high": 1, "medium": 2, "low": 3, "info": 4}
+
+
+def execute_rules(
+    files: list[str],
+    rules: list[UnifiedRule],
+    *,
+    project_dir: str = "",
+    workers: int | None = 1,
+    cache: FindingCache | None = None,
+    profiler: RuleProfiler | None = None,
+) -> list[EnrichedFinding]:
+    """Execute rules against a list of files.
+
+    Args:
+        files: Absolute file paths to scan.
+        rules: Rules to execute (should be pre-filtered to enabled only).
+        project_dir: Project root for relative path computation.
+        workers: Processes for the regex scan (see :func:`iter_findings`).
+        cache: Optional finding cache for incremental scans.
+        profiler: Optional per-rule scan/cache-hit/match counters.
+
+    Returns:
+        List of EnrichedFinding (partially populated — use enricher for full context).
+    """
+    findings: list[EnrichedFinding] = []
+    for batch in iter_findings(
+        files, rules, project_dir=project_dir, workers=workers, cache=cache,
+        profiler=profiler,
+    ):
+        findings.extend(batch)
+
+    # Sort: severity first, then file, then line. Structural findings come
+    # first and each file's regex findings stay together, so the order is
+    # the same however the files were sharded.
+    findings.sort(key=lambda f: (_SEV_ORDER.get(f.severity, 9), f.file, f.line))
     return findings
@@ -0,0 +1,398 @@
+"""Persistent cache of rule findings keyed by file content.
+
+``analyze`` and ``ci_scan`` used to re-read and re-match every file on
+each call.  :class:`FindingCache` remembers, per file *content* (its blob
+OID, see :mod:`attocode.integrations.context.blob_oid`), which rules have
+already been evaluated on it and what they reported.  The executor then
+only scans files whose content changed or whose applicable rule set is
+not yet covered, and rebuilds the other findings from the cache.
+
+Rules are identified by a *rule key*: the qualified id, the engine that
+ran it (``re`` for the regex path, ``sg`` for ast-grep) and a hash of the
+rule's matching and message fields.  Editing a rule's pattern therefore
+invalidates only that rule, while severity, confidence and explanation
+edits need no rescan: cached rows hold just the per-match data (line,
+snippet, message, fix, captures) and the rest is read from the live rule.
+The whole cache is dropped when :data:`EXECUTOR_VERSION` changes.
+
+Entries live in ``.attocode/cache/rule_findings.db``.  File blob OIDs are
+remembered under their ``(mtime_ns, size)`` stat so unchanged files are
+not even read.  Set ``ATTOCODE_FINDING_CACHE=0`` to disable the cache.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import enum
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from attocode.code_intel.rules.model import UnifiedRule
+
+logger = logging.getLogger(__name__)
+
+# Bump when the executor starts reporting something different for the
+# same file content and rule (matching semantics, snippet format, ...).
+EXECUTOR_VERSION = 1
+
+FINDING_CACHE_SCHEMA_VERSION = 1
+FINDING_CACHE_FILE = "rule_findings.db"
+
+_DISABLE_ENV = "ATTOCODE_FINDING_CACHE"
+
+# SQLite caps host parameters per statement; stay well below it.
+_SQL_CHUNK = 500
+
+# Rule fields that decide what the executor reports for a file.
+_MATCH_FIELDS = (
+    "languages", "pattern", "structural_pattern", "structural_context",
+    "structural_selector", "description", "fix", "scan_comments", "metavars",
+    "metavar_regex", "metavar_comparison", "composite_pattern",
+)
+
+
+@dataclass(slots=True)
+class CachedMatch:
+    """The per-match part of a finding; the rest comes from the rule."""
+
+    rule_key: str
+    seq: int  # position among the rule's matches in the file
+    line: int
+    code_snippet: str
+    description: str
+    suggested_fix: str = ""
+    captures: dict[str, str] = field(default_factory=dict)
+
+
+def _canonical(value: Any) -> Any:
+    """JSON-able form of rule fields, stable across processes.
+
+    Compiled patterns are spelled out as (pattern, flags): ``repr`` of a
+    long pattern is truncated.
+    """
+    if isinstance(value, re.Pattern):
+        return ["re", value.pattern, value.flags]
+    if isinstance(value, enum.Enum):
+        return value.value
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return [
+            type(value).__name__,
+            {f.name: _canonical(getattr(value, f.name)) for f in dataclasses.fields(value)},
+        ]
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in sorted(value.items())}
+    if isinstance(value, list | tuple):
+        return [_canonical(v) for v in value]
+    if value is None or isinstance(value, str | int | float | bool):
+        return value
+    return repr(value)
+
+
+def rule_key(rule: UnifiedRule, engine: str) -> str:
+    """Cache key of *rule* when run by *engine* (``"re"`` or ``"sg"``)."""
+    spec = {name: _canonical(getattr(rule, name)) for name in _MATCH_FIELDS}
+    digest = hashlib.sha256(
+        json.dumps(spec, sort_keys=True, ensure_ascii=False).encode("utf-8"),
+    ).hexdigest()[:16]
+    return f"{rule.qualified_id}:{engine}:{digest}"
+
+
+def _chunks(items: list[str]) -> Iterator[list[str]]:
+    for i in range(0, len(items), _SQL_CHUNK):
+        yield items[i:i + _SQL_CHUNK]
+
+
+@dataclass(slots=True)
+class FindingCache:
+    """Rule findings keyed by (blob OID, rule key).
+
+    Usage::
+
+        cache = FindingCache.open(project_dir)
+        oids = cache.blob_oids(files)
+        cached = cache.lookup({oid: keys for oid in oids.values()})
+        ...  # scan the files whose oid is not in ``cached``
+        cache.store([(oid, keys, matches), ...])
+
+    ``hits`` and ``misses`` count the files served from the cache and the
+    files scanned by the executor since the last :meth:`reset_counters`.
+    """
+
+    project_dir: str
+    db_path: str
+    hits: int = 0
+    misses: int = 0
+    _ready: bool = field(default=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @classmethod
+    def open(cls, project_dir: str) -> FindingCache | None:
+        """Cache for *project_dir*, or None when disabled by the environment."""
+        if os.environ.get(_DISABLE_ENV, "").strip().lower() in ("0", "false", "no", "off"):
+            return None
+        from attocode.integrations.context.blob_oid import BLOB_OID_CACHE_DIR
+
+        db_path = os.path.join(project_dir, BLOB_OID_CACHE_DIR, FINDING_CACHE_FILE)
+        return cls(project_dir=project_dir, db_path=db_path)
+
+    def reset_counters(self) -> None:
+        self.hits = 0
+        self.misses = 0
+
+    # ------------------------------------------------------------------
+    # Blob OIDs
+    # ------------------------------------------------------------------
+
+    def blob_oids(self, files: list[str]) -> dict[str, str]:
+        """Blob OID of each readable file in *files* (absolute paths).
+
+        Files whose ``(mtime_ns, size)`` matches the last call reuse the
+        stored OID; the rest are hashed in one batch.
+        """
+        stats: dict[str, tuple[str, int, int]] = {}
+        for fp in files:
+            try:
+                st = os.stat(fp)
+                rel = os.path.relpath(fp, self.project_dir)
+            except (OSError, ValueError):
+                continue
+            stats[fp] = (rel, st.st_mtime_ns, st.st_size)
+
+        known: dict[str, tuple[int, int, str]] = {}
+        try:
+            with self._session() as conn:
+                rels = [rel for rel, _, _ in stats.values()]
+                for chunk in _chunks(rels):
+                    marks = ",".join("?" * len(chunk))
+                    for rel, mtime_ns, size, oid in conn.execute(
+                        f"SELECT path, mtime_ns, size, blob_oid FROM files WHERE path IN ({marks})",
+                        chunk,
+                    ):
+                        known[rel] = (mtime_ns, size, oid)
+        except sqlite3.Error as exc:
+            logger.debug("Finding cache read failed for %s: %s", self.db_path, exc)
+            return {}
+
+        oids: dict[str, str] = {}
+        stale: list[str] = []
+        for fp, (rel, mtime_ns, size) in stats.items():
+            row = known.get(rel)
+            if row is not None and row[0] == mtime_ns and row[1] == size:
+                oids[fp] = row[2]
+            else:
+                stale.append(fp)
+        if not stale:
+            return oids
+
+        from attocode.integrations.context.blob_oid import compute_blob_oids_batch
+
+        fresh = {
+            fp: oid
+            for fp, oid in compute_blob_oids_batch(stale, self.project_dir).items()
+            if ":missing:" not in oid and not oid.endswith(":unreadable")
+        }
+        oids.update(fresh)
+        rows = [(stats[fp][0], stats[fp][1], stats[fp][2], oid) for fp, oid in fresh.items()]
+        replaced = {stats[fp][0]: known[stats[fp][0]][2] for fp in fresh if stats[fp][0] in known}
+        try:
+            with self._session() as conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO files (path, mtime_ns, size, blob_oid) "
+                    "VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+                self._drop_orphans(conn, set(replaced.values()) - set(fresh.values()))
+        except sqlite3.Error as exc:
+            logger.debug("Finding cache write failed for %s: %s", self.db_path, exc)
+        return oids
+
+    # ------------------------------------------------------------------
+    # Findings
+    # ------------------------------------------------------------------
+
+    def lookup(self, wanted: dict[str, frozenset[str]]) -> dict[str, list[CachedMatch]]:
+        """Cached matches for each blob whose scans cover its wanted rule keys.
+
+        *wanted* maps blob OID to the keys of the rules that apply to it.
+        Blobs missing from the result must be scanned.
+        """
+        if not wanted:
+            return {}
+        try:
+            with self._session() as conn:
+                rulesets = {
+                    digest: frozenset(json.loads(keys))
+                    for digest, keys in conn.execute("SELECT digest, keys FROM rulesets")
+                }
+                covered: dict[str, set[str]] = {}
+                oids = list(wanted)
+                for chunk in _chunks(oids):
+                    marks = ",".join("?" * len(chunk))
+                    for oid, digest in conn.execute(
+                        f"SELECT blob_oid, ruleset FROM scans WHERE blob_oid IN ({marks})",
+                        chunk,
+                    ):
+                        covered.setdefault(oid, set()).update(rulesets.get(digest, ()))
+                hits = [oid for oid, keys in wanted.items() if keys <= covered.get(oid, set())]
+                result: dict[str, list[CachedMatch]] = {oid: [] for oid in hits}
+                for chunk in _chunks(hits):
+                    marks = ",".join("?" * len(chunk))
+                    for oid, key, seq, line, snippet, description, fix, captures in conn.execute(
+                        "SELECT blob_oid, rule_key, seq, line, snippet, description, "
+                        f"suggested_fix, captures FROM findings WHERE blob_oid IN ({marks})",
+                        chunk,
+                    ):
+                        if key in wanted[oid]:
+                            result[oid].append(CachedMatch(
+                                rule_key=key,
+                                seq=seq,
+                                line=line,
+                                code_snippet=snippet,
+                                description=description,
+                                suggested_fix=fix,
+                                captures=json.loads(captures) if captures else {},
+                            ))
+        except (sqlite3.Error, ValueError) as exc:
+            logger.debug("Finding cache read failed for %s: %s", self.db_path, exc)
+            return {}
+        return result
+
+    def store(self, scanned: Iterable[tuple[str, frozenset[str], list[CachedMatch]]]) -> None:
+        """Record that each blob was scanned with a rule key set, and its matches."""
+        entries = list(scanned)
+        if not entries:
+            return
+        try:
+            with self._session() as conn:
+                for oid, keys, matches in entries:
+                    ordered = sorted(keys)
+                    digest = hashlib.sha256("\n".join(ordered).encode("utf-8")).hexdigest()[:24]
+                    conn.execute(
+                        "INSERT OR IGNORE INTO rulesets (digest, keys) VALUES (?, ?)",
+                        (digest, json.dumps(ordered)),
+                    )
+                    conn.execute(
+                        "INSERT OR IGNORE INTO scans (blob_oid, ruleset) VALUES (?, ?)",
+                        (oid, digest),
+                    )
+                    for chunk in _chunks(ordered):
+                        marks = ",".join("?" * len(chunk))
+                        conn.execute(
+                            f"DELETE FROM findings WHERE blob_oid = ? AND rule_key IN ({marks})",
+                            [oid, *chunk],
+                        )
+                    conn.executemany(
+                        "INSERT INTO findings (blob_oid, rule_key, seq, line, snippet, "
+                        "description, suggested_fix, captures) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        [
+                            (
+                                oid, m.rule_key, m.seq, m.line, m.code_snippet,
+                                m.description, m.suggested_fix,
+                                json.dumps(m.captures) if m.captures else "",
+                            )
+                            for m in matches
+                        ],
+                    )
+        except sqlite3.Error as exc:
+            logger.debug("Finding cache write failed for %s: %s", self.db_path, exc)
+
+    def clear(self) -> None:
+        try:
+            with self._session() as conn:
+                conn.execute("DELETE FROM files")
+                self._drop_all(conn)
+        except sqlite3.Error as exc:
+            logger.debug("Finding cache clear failed for %s: %s", self.db_path, exc)
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _drop_all(conn: sqlite3.Connection) -> None:
+        conn.execute("DELETE FROM findings")
+        conn.execute("DELETE FROM scans")
+        conn.execute("DELETE FROM rulesets")
+
+    @staticmethod
+    def _drop_orphans(conn: sqlite3.Connection, oids: set[str]) -> None:
+        """Forget scans of *oids* no tracked path has anymore."""
+        for oid in oids:
+            if conn.execute("SELECT 1 FROM files WHERE blob_oid = ? LIMIT 1", (oid,)).fetchone():
+                continue
+            conn.execute("DELETE FROM findings WHERE blob_oid = ?", (oid,))
+            conn.execute("DELETE FROM scans WHERE blob_oid = ?", (oid,))
+
+    @contextmanager
+    def _session(self) -> Iterator[sqlite3.Connection]:
+        """One connection and transaction, closed afterwards."""
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=5.0)
+        try:
+            with self._lock:
+                if not self._ready:
+                    self._init_schema(conn)
+                    self._ready = True
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _init_schema(conn: sqlite3.Connection) -> None:
+        conn.execute("PRAGMA journal_mode=WAL")
+        with conn:
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS files (
+                    path TEXT PRIMARY KEY,
+                    mtime_ns INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    blob_oid TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS ix_files_oid ON files(blob_oid);
+                CREATE TABLE IF NOT EXISTS rulesets (
+                    digest TEXT PRIMARY KEY,
+                    keys TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS scans (
+                    blob_oid TEXT NOT NULL,
+                    ruleset TEXT NOT NULL,
+                    PRIMARY KEY (blob_oid, ruleset)
+                );
+                CREATE TABLE IF NOT EXISTS findings (
+                    blob_oid TEXT NOT NULL,
+                    rule_key TEXT NOT NULL,
+                    seq INTEGER NOT NULL,
+                    line INTEGER NOT NULL,
+                    snippet TEXT NOT NULL,
+                    description TEXT NOT NULL,
+                    suggested_fix TEXT NOT NULL,
+                    captures TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS ix_findings_oid ON findings(blob_oid, rule_key);
+                """
+            )
+            version = f"{FINDING_CACHE_SCHEMA_VERSION}.{EXECUTOR_VERSION}"
+            row = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+            if row is None or row[0] != version:
+                FindingCache._drop_all(conn)
+                conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)",
+                    (version,),
+                )
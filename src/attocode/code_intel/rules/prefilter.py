@@ -0,0 +1,410 @@
+"""Literal prefilter for Tier-1 regex rules.
+
+``execute_rules`` used to run every applicable rule's regex against every
+line of every file.  Most rule patterns contain a literal that any match
+must include (``eval(``, ``InsecureSkipVerify``, ``unsafe``...), and most
+lines contain none of them.  :class:`RulePrefilter` extracts, per rule, a
+set of *atoms* — literals of which at least one must appear in a matching
+line — and scans each file once per distinct atom with ``str.find``.  Only
+the lines where an atom occurs are handed to the rules that own it; rules
+without extractable atoms still see every line.
+
+Case-insensitive rules are matched against the lowercased file.  ``\\d``
+and ``\\w`` are spelled out as ASCII digits and letters only for files
+whose word characters are all ASCII.
+"""
+
+from __future__ import annotations
+
+import functools
+import re
+import re._parser as sre_parse  # type: ignore[import-not-found]
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from itertools import accumulate
+from typing import TYPE_CHECKING, Literal
+
+from attocode.code_intel.rules.combinators import (
+    AllNode,
+    CompositePattern,
+    EitherNode,
+    PatternNode,
+    RegexNode,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from attocode.code_intel.rules.model import UnifiedRule
+
+# Character classes and class/literal products larger than this are not
+# expanded into atoms.
+_MAX_ALTERNATIVES = 512
+
+_REPEATS = (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT, sre_parse.POSSESSIVE_REPEAT)
+
+# An atom set: at least one member occurs in every match.
+_Atoms = frozenset[str]
+
+# Where atoms are looked up: the file itself, or the lowercased file
+# (case-insensitive rules).
+Lookup = Literal["exact", "folded"]
+
+_ASCII_CATEGORIES = {
+    sre_parse.CATEGORY_DIGIT: "0123456789",
+    sre_parse.CATEGORY_WORD: "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ_abcdefghijklmnopqrstuvwxyz",
+}
+
+_NON_ASCII = re.compile(r"[^\x00-\x7f]")
+
+# A non-ASCII character that ``\w`` (and maybe ``\d``) matches.
+_NON_ASCII_WORD = re.compile(r"[^\W\x00-\x7f]")
+
+# The non-ASCII characters ``re.IGNORECASE`` matches against ASCII letters
+# (dotted/dotless i, long s, Kelvin sign).  Without them, ``str.lower``
+# keeps every offset and turns no other character into an ASCII letter,
+# so lowercased atoms can be found in the lowercased file; files with one
+# get no folded lookup.
+_FOLD_TRAPS = re.compile("[\u0130\u0131\u017f\u212a]")
+
+
+def _cost(atoms: _Atoms) -> float:
+    """Rough price of an atom set: one scan per atom plus the lines it hits.
+
+    Each extra character is taken to make an atom twenty times rarer.
+    """
+    return sum(1.0 + 50.0 * 0.05 ** (len(atom) - 1) for atom in atoms)
+
+
+def _better(a: _Atoms | None, b: _Atoms | None) -> _Atoms | None:
+    """The cheaper of two atom sets."""
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return a if _cost(a) <= _cost(b) else b
+
+
+def _class_chars(
+    items: list[tuple[int, object]], fold: bool, ascii_classes: bool,
+) -> list[str] | None:
+    """Characters matched by a ``[...]`` class, or None if not enumerable.
+
+    ``\\d`` and ``\\w`` are only enumerated when *ascii_classes* is set.
+    """
+    chars: set[str] = set()
+    for op, av in items:
+        codes: range | tuple[int, ...] | list[int]
+        if op == sre_parse.LITERAL and isinstance(av, int):
+            codes = (av,)
+        elif op == sre_parse.RANGE and isinstance(av, tuple):
+            lo, hi = av
+            codes = range(lo, hi + 1)
+        elif op == sre_parse.CATEGORY and ascii_classes and av in _ASCII_CATEGORIES:
+            codes = [ord(c) for c in _ASCII_CATEGORIES[av]]
+        else:
+            # NEGATE, \s, \D ...
+            return None
+        if len(chars) + len(codes) > _MAX_ALTERNATIVES:
+            return None
+        for code in codes:
+            char = chr(code)
+            if fold:
+                if not char.isascii():
+                    return None
+                char = char.lower()
+            chars.add(char)
+    return sorted(chars)
+
+
+def _spell(parsed: sre_parse.SubPattern, fold: bool, ascii_classes: bool) -> list[str] | None:
+    """Every string *parsed* can match, or None if that isn't a small finite set."""
+    strings = [""]
+    for op, av in parsed:
+        if op == sre_parse.AT:
+            continue
+        if op == sre_parse.LITERAL:
+            char = chr(av)
+            if fold and not char.isascii():
+                return None
+            options: list[str] | None = [char.lower() if fold else char]
+        elif op == sre_parse.IN:
+            options = _class_chars(av, fold, ascii_classes)
+        elif op == sre_parse.SUBPATTERN and not av[1] and not av[2]:
+            options = _spell(av[3], fold, ascii_classes)
+        elif op == sre_parse.BRANCH:
+            options = []
+            for branch in av[1]:
+                spelled = _spell(branch, fold, ascii_classes)
+                if spelled is None:
+                    return None
+                options.extend(spelled)
+        else:
+            return None
+        if options is None or len(strings) * len(options) > _MAX_ALTERNATIVES:
+            return None
+        strings = [prefix + option for prefix in strings for option in options]
+    return sorted(set(strings))
+
+
+def _sequence_atoms(
+    parsed: sre_parse.SubPattern, fold: bool, ascii_classes: bool,
+) -> _Atoms | None:
+    """Cheapest atom set required by the regex sequence *parsed*.
+
+    Adjacent items that spell a small set of strings (literals, classes,
+    alternations of literals) are joined into runs.  A run starts at
+    every such item, so ``\\w+!!`` still offers ``!!``; each entry of
+    ``runs`` holds every string one run can spell.
+    """
+    best: _Atoms | None = None
+    runs: list[list[str]] = []
+
+    def offer(run: list[str]) -> None:
+        nonlocal best
+        if "" not in run:
+            best = _better(best, frozenset(run))
+
+    def flush() -> None:
+        for run in runs:
+            offer(run)
+        runs.clear()
+
+    def extend(options: list[str]) -> None:
+        grown = []
+        for run in runs:
+            if len(options) > 1:
+                # The run may be cheaper before it is multiplied out.
+                offer(run)
+            if len(run) * len(options) <= _MAX_ALTERNATIVES:
+                grown.append([prefix + option for prefix in run for option in options])
+        grown.append(list(options))
+        runs[:] = grown
+
+    for op, av in parsed:
+        if op == sre_parse.AT:
+            # Zero-width: the literals on either side stay adjacent.
+            continue
+        if op in _REPEATS:
+            min_count, max_count, sub = av
+            options = _spell(sub, fold, ascii_classes) if min_count >= 1 else None
+            if options:
+                # The first repetition follows the run, the last one
+                # starts the next.
+                extend(options)
+                if max_count != 1:
+                    flush()
+                    runs.append(options)
+                continue
+        else:
+            options = _spell([(op, av)], fold, ascii_classes)
+            if options:
+                extend(options)
+                continue
+        flush()
+        if op == sre_parse.SUBPATTERN:
+            _group, add_flags, del_flags, sub = av
+            if not add_flags and not del_flags:
+                best = _better(best, _sequence_atoms(sub, fold, ascii_classes))
+        elif op == sre_parse.ATOMIC_GROUP:
+            best = _better(best, _sequence_atoms(av, fold, ascii_classes))
+        elif op in _REPEATS:
+            min_count, _max_count, sub = av
+            if min_count >= 1:
+                best = _better(best, _sequence_atoms(sub, fold, ascii_classes))
+        elif op == sre_parse.BRANCH:
+            branches = [_sequence_atoms(b, fold, ascii_classes) for b in av[1]]
+            atom_sets = [atoms for atoms in branches if atoms]
+            if branches and len(atom_sets) == len(branches):
+                union = frozenset[str]().union(*atom_sets)
+                if len(union) <= _MAX_ALTERNATIVES:
+                    best = _better(best, union)
+    flush()
+    return best
+
+
+@functools.lru_cache(maxsize=4096)
+def _pattern_atoms(pattern: str, flags: int, ascii_words: bool) -> tuple[_Atoms | None, Lookup]:
+    fold = bool(flags & re.IGNORECASE)
+    lookup: Lookup = "folded" if fold else "exact"
+    try:
+        parsed = sre_parse.parse(pattern, flags)
+        atoms = _sequence_atoms(parsed, fold, ascii_words or bool(flags & re.ASCII))
+    except Exception:
+        return None, lookup
+    # A line never contains a line break, so such an atom can't be
+    # located line-wise; leave the rule unfiltered.
+    if atoms is not None and any(atom.splitlines() != [atom] for atom in atoms):
+        return None, lookup
+    return atoms, lookup
+
+
+def regex_atoms(
+    pattern: re.Pattern[str], *, ascii_words: bool = False,
+) -> tuple[frozenset[str] | None, Lookup]:
+    """Atoms required by every match of *pattern*.
+
+    Returns ``(atoms, lookup)``: *atoms* is None when no literal is
+    required; *lookup* says which text to find them in (see
+    :data:`Lookup`).  With *ascii_words* the atoms are only valid for
+    text without non-ASCII word characters.
+    """
+    return _pattern_atoms(pattern.pattern, pattern.flags, ascii_words)
+
+
+def _node_atoms(node: PatternNode, ascii_words: bool) -> tuple[_Atoms, Lookup] | None:
+    if isinstance(node, RegexNode):
+        atoms, lookup = regex_atoms(node.pattern, ascii_words=ascii_words)
+        return None if atoms is None else (atoms, lookup)
+    if isinstance(node, EitherNode):
+        parts = [_node_atoms(child, ascii_words) for child in node.children]
+        if not parts or any(part is None for part in parts):
+            return None
+        lookups = {lookup for _atoms, lookup in parts}  # type: ignore[misc]
+        if len(lookups) != 1:
+            return None
+        return frozenset().union(*(atoms for atoms, _lookup in parts)), lookups.pop()  # type: ignore[misc]
+    if isinstance(node, AllNode):
+        best: tuple[_Atoms, Lookup] | None = None
+        for child in node.children:
+            part = _node_atoms(child, ascii_words)
+            if part is not None and (best is None or _better(best[0], part[0]) is part[0]):
+                best = part
+        return best
+    return None
+
+
+def rule_atoms(
+    rule: UnifiedRule, *, ascii_words: bool = False,
+) -> tuple[frozenset[str] | None, Lookup]:
+    """Atoms one of which must occur on any line *rule* matches.
+
+    Composite rules are filtered by their primary pattern, which must
+    match the current line; constraints only ever remove matches.
+    """
+    if rule.composite_pattern is not None:
+        composite: CompositePattern = rule.composite_pattern
+        return _node_atoms(composite.primary, ascii_words) or (None, "exact")
+    if rule.pattern is not None:
+        return regex_atoms(rule.pattern, ascii_words=ascii_words)
+    return None, "exact"
+
+
+_Owned = list[tuple[str, list[int]]]  # (atom, rule positions)
+
+
+@dataclass(slots=True)
+class _AtomTable:
+    """Atoms of one lookup, split by whether they start with an ASCII character.
+
+    Atoms starting with a non-ASCII character are keyed by it and only
+    scanned for in files that contain it.
+    """
+
+    common: _Owned = field(default_factory=list)
+    rare: dict[str, _Owned] = field(default_factory=dict)
+
+    def owned(self, text: str) -> _Owned:
+        """Atoms that may occur in *text*."""
+        if not self.rare or text.isascii():
+            return self.common
+        present = self.rare.keys() & set(_NON_ASCII.findall(text))
+        return self.common + [item for first in present for item in self.rare[first]]
+
+    def positions(self) -> set[int]:
+        rare = [item for items in self.rare.values() for item in items]
+        return {p for _atom, ps in (*self.common, *rare) for p in ps}
+
+
+@dataclass(slots=True)
+class _AtomIndex:
+    """Atom tables per lookup, and the rules without atoms, for one kind of text."""
+
+    tables: dict[Lookup, _AtomTable] = field(default_factory=dict)
+    always: list[int] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class RulePrefilter:
+    """Rules compiled into atom indexes for one language.
+
+    Usage::
+
+        prefilter = RulePrefilter(rules)
+        for index, line_rules in prefilter.candidates(content, lines):
+            ...  # run line_rules (in rule order) on lines[index]
+    """
+
+    rules: list[UnifiedRule]
+    _indexes: dict[bool, _AtomIndex] = field(default_factory=dict, repr=False)
+
+    def index(self, ascii_words: bool) -> _AtomIndex:
+        """Atom index for text with(out) non-ASCII word characters, built on first use."""
+        index = self._indexes.get(ascii_words)
+        if index is None:
+            index = self._indexes[ascii_words] = _AtomIndex()
+            owners: dict[Lookup, dict[str, list[int]]] = {}
+            for position, rule in enumerate(self.rules):
+                atoms, lookup = rule_atoms(rule, ascii_words=ascii_words)
+                if atoms is None:
+                    index.always.append(position)
+                    continue
+                for atom in atoms:
+                    owners.setdefault(lookup, {}).setdefault(atom, []).append(position)
+            for lookup, owned in owners.items():
+                table = index.tables[lookup] = _AtomTable()
+                for atom, positions in owned.items():
+                    if atom[0].isascii():
+                        table.common.append((atom, positions))
+                    else:
+                        table.rare.setdefault(atom[0], []).append((atom, positions))
+        return index
+
+    def candidates(
+        self, content: str, lines: list[str],
+    ) -> Iterator[tuple[int, list[UnifiedRule]]]:
+        """Yield ``(line_index, rules)`` for lines some rule could match.
+
+        *lines* must be ``content.splitlines()``.  Rules are yielded in
+        their original order, so findings come out exactly as from a
+        full scan.
+        """
+        ascii_words = content.isascii() or not _NON_ASCII_WORD.search(content)
+        index = self.index(ascii_words)
+        always = index.always
+        scans: list[tuple[str, _Owned]] = []
+        for lookup, table in index.tables.items():
+            if lookup == "exact":
+                scans.append((content, table.owned(content)))
+            elif ascii_words or not _FOLD_TRAPS.search(content):
+                lowered = content.lower()
+                scans.append((lowered, table.owned(lowered)))
+            else:
+                always = sorted({*always, *table.positions()})
+
+        hits: dict[int, set[int]] = {}
+        starts: list[int] | None = None
+        for text, owned in scans:
+            for atom, positions in owned:
+                at = text.find(atom)
+                if at < 0:
+                    continue
+                if starts is None:
+                    starts = [0, *accumulate(map(len, content.splitlines(True)))]
+                while at >= 0:
+                    line = bisect_right(starts, at) - 1
+                    hits.setdefault(line, set()).update(positions)
+                    at = text.find(atom, starts[line + 1])
+
+        rules = self.rules
+        always_rules = [rules[p] for p in always]
+        if always_rules:
+            for line in range(len(lines)):
+                extra = hits.get(line)
+                if extra is None:
+                    yield line, always_rules
+                else:
+                    yield line, [rules[p] for p in sorted(extra.union(always))]
+        else:
+            for line in sorted(hits):
+                yield line, [rules[p] for p in sorted(hits[line])]
@@ -12,6 +12,10 @@ import threading
 import time
 from dataclasses import dataclass
 from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +28,7 @@ class RuleStats:
     total_time_ms: float = 0.0
     match_count: int = 0
     files_scanned: int = 0
+    cache_hits: int = 0  # files whose findings came from the finding cache
     true_positives: int = 0
     false_positives: int = 0
 
@@ -82,10 +87,15 @@ class RuleProfiler:
         with self._lock:
             self._ensure(rule_id).match_count += 1
 
-    def record_file_scanned(self, rule_id: str) -> None:
-        """Record that a rule was evaluated against a file."""
+    def record_file_scanned(self, rule_id: str, count: int = 1) -> None:
+        """Record that a rule was evaluated against *count* files."""
+        with self._lock:
+            self._ensure(rule_id).files_scanned += count
+
+    def record_cache_hit(self, rule_id: str, count: int = 1) -> None:
+        """Record that a rule's findings for *count* files were served from cache."""
         with self._lock:
-            self._ensure(rule_id).files_scanned += 1
+            self._ensure(rule_id).cache_hits += count
 
     def record_feedback(self, rule_id: str, *, is_true_positive: bool) -> None:
         """Record TP/FP feedback for confidence calibration."""
@@ -183,14 +193,19 @@ class FeedbackStore:
         matches: dict[str, int],
         *,
         files_scanned: int = 0,
+        cached_files: int = 0,
+        profile: Mapping[str, RuleStats] | None = None,
     ) -> None:
         """Record one analyze-session's scan + match counters across rules.
 
         Each rule that was applied in the session has its ``scans`` counter
         incremented by 1 (one session = one scan, irrespective of file count
         — matching the roadmap's "0 matches across 10+ scanned repos"
-        framing). Matches are added cumulatively. ``files_scanned`` is
-        recorded as a rolling total per-rule for diagnostics only.
+        framing). Matches are added cumulatively. ``files_scanned`` (files
+        the executor evaluated) and ``cached_files`` (files served from the
+        finding cache) are recorded as rolling totals per-rule for
+        diagnostics only; a rule's entry in *profile* (a
+        :class:`RuleProfiler` snapshot) replaces both with its own counts.
         """
         if not rule_ids:
             return
@@ -198,10 +213,13 @@ class FeedbackStore:
             for qid in rule_ids:
                 entry = self._ensure_locked(qid)
                 entry["scans"] = self._entry_int(entry, "scans") + 1
-                if files_scanned:
-                    entry["files_scanned"] = (
-                        self._entry_int(entry, "files_scanned") + files_scanned
-                    )
+                stats = profile.get(qid) if profile is not None else None
+                scanned = stats.files_scanned if stats is not None else files_scanned
+                cached = stats.cache_hits if stats is not None else cached_files
+                if scanned:
+                    entry["files_scanned"] = self._entry_int(entry, "files_scanned") + scanned
+                if cached:
+                    entry["cached_files"] = self._entry_int(entry, "cached_files") + cached
                 entry["matches"] = (
                     self._entry_int(entry, "matches") + int(matches.get(qid, 0))
                 )
@@ -284,8 +302,8 @@ def format_rule_stats(
     # Sort by total time descending
     sorted_stats = sorted(stats.values(), key=lambda s: s.total_time_ms, reverse=True)
 
-    lines.append("| Rule | Time (ms) | Matches | Files | TP | FP | Calibrated |")
-    lines.append("|------|-----------|---------|-------|----|----|------------|")
+    lines.append("| Rule | Time (ms) | Matches | Files | Cached | TP | FP | Calibrated |")
+    lines.append("|------|-----------|---------|-------|--------|----|----|------------|")
 
     for s in sorted_stats:
         fb = (feedback or {}).get(s.rule_id, {})
@@ -304,7 +322,7 @@ def format_rule_stats(
         cal_str = f"{cal:.2f}" if cal is not None else "—"
         lines.append(
             f"| `{s.rule_id}` | {s.total_time_ms:.1f} | {s.match_count} | "
-            f"{s.files_scanned} | {tp} | {fp} | {cal_str} |"
+            f"{s.files_scanned} | {s.cache_hits} | {tp} | {fp} | {cal_str} |"
         )
 
     # Summary
@@ -193,6 +193,25 @@ def learnings_resource() -> str:
 # ---------------------------------------------------------------------------
 
 
+def _update_trigram_index(project_dir: str, rel: str) -> None:
+    """Feed a changed file into the trigram index's delta segment.
+
+    Reads the current content so the index stays queryable; a file that no
+    longer exists is tombstoned instead.
+    """
+    from attocode.code_intel.tools.search_tools import _get_trigram_index
+
+    tri_idx = _get_trigram_index()
+    if tri_idx is None:
+        return
+    try:
+        content = Path(project_dir, rel).read_bytes()
+    except FileNotFoundError:
+        tri_idx.remove_file(rel)
+        return
+    tri_idx.update_file(rel, content)
+
+
 @mcp.tool()
 def notify_file_changed(files: list[str]) -> str:
     """Notify the server that files have been modified externally.
@@ -231,13 +250,9 @@ def notify_file_changed(files: list[str]) -> str:
                 smgr.queue_reindex(abs_path)
             except Exception:
                 pass
-            # Also invalidate trigram index
+            # Also update the trigram index's delta segment
             try:
-                from attocode.code_intel.tools.search_tools import _get_trigram_index
-                tri_idx = _get_trigram_index()
-                if tri_idx is not None:
-                    abs_path = os.path.join(project_dir, rel)
-                    tri_idx.update_file(rel, b"")
+                _update_trigram_index(project_dir, rel)
             except Exception:
                 pass
             updated += 1
@@ -325,10 +340,7 @@ def _process_notification_queue_locked() -> int:
             except Exception:
                 pass
             try:
-                from attocode.code_intel.tools.search_tools import _get_trigram_index
-                tri_idx = _get_trigram_index()
-                if tri_idx is not None:
-                    tri_idx.update_file(norm, b"")
+                _update_trigram_index(project_dir, norm)
             except Exception:
                 pass
             count += 1
@@ -439,13 +451,7 @@ def _start_file_watcher(project_dir: str, *, debounce_ms: int = 500) -> None:
                             except Exception:
                                 pass
                             try:
-                                from attocode.code_intel.tools.search_tools import (
-                                    _get_trigram_index,
-                                )
-
-                                tri_idx = _get_trigram_index()
-                                if tri_idx is not None:
-                                    tri_idx.update_file(rel, b"")
+                                _update_trigram_index(project_dir, rel)
                             except Exception:
                                 pass
                             logger.debug("File watcher: updated %s", rel)
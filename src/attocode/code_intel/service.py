@@ -1746,7 +1746,7 @@ class CodeIntelService:
             items = []
 
         # Aggregate stats
-        total_definitions = sum(len(v) for v in index.definitions.values())
+        total_definitions = index.definition_count()
         total_files = len(all_file_paths)
 
         return {
@@ -2033,6 +2033,7 @@ class CodeIntelService:
             return "No valid files provided."
 
         visited: dict[str, tuple[int, str]] = {}
+        links: dict[str, set[str]] = {}
         queue: deque[tuple[str, int, str]] = deque()
         for rel in center_rels:
             visited[rel] = (0, "center")
@@ -2043,21 +2044,31 @@ class CodeIntelService:
             if d >= depth:
                 continue
             for dep in svc.get_dependencies(current):
+                links.setdefault(current, set()).add(dep)
                 if dep not in visited:
                     relationship = "imported-by-center" if d == 0 else "transitive-import"
                     visited[dep] = (d + 1, relationship)
                     queue.append((dep, d + 1, relationship))
             for dep in svc.get_dependents(current):
+                links.setdefault(dep, set()).add(current)
                 if dep not in visited:
                     relationship = "imports-center" if d == 0 else "transitive-importer"
                     visited[dep] = (d + 1, relationship)
                     queue.append((dep, d + 1, relationship))
 
+        # Within each hop, files closest to the centers by personalized
+        # PageRank over the traversed edges come first
+        from attocode.integrations.context.graph_rank import personalized_rank
+
+        proximity = personalized_rank(
+            links, dict.fromkeys(center_rels, 1.0), undirected=True,
+        )
+
         def _sort_key(item):
             rel, (dist, _) = item
             fi = all_files.get(rel)
             importance = fi.importance if fi else 0.0
-            return (dist, -importance)
+            return (dist, -round(proximity.get(rel, 0.0), 9), -importance)
 
         sorted_files = sorted(visited.items(), key=_sort_key)
         sections: list[str] = []
@@ -186,6 +186,7 @@ def _find_dead_symbols(
 ) -> list[dict]:
     """Find symbols with 0 references, excluding entry points."""
     candidates: list[dict] = []
+    index.materialize()  # scans every definition and reference
 
     for qname, locs in index.definitions.items():
         for loc in locs:
@@ -224,10 +225,11 @@ def _find_dead_symbols(
             # For methods like "ClassName.method", check if "method" is referenced
             has_any_ref = False
             if "." in qname:
-                for ref_name, refs in index.references.items():
+                for ref_name in index.references:
                     if ref_name == base_name or ref_name.endswith(f".{base_name}"):
                         external = [
-                            r for r in refs if r.file_path != loc.file_path
+                            r for r in index.references[ref_name]
+                            if r.file_path != loc.file_path
                         ]
                         if external:
                             has_any_ref = True
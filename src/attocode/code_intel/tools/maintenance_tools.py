@@ -135,7 +135,10 @@ def cache_status_all() -> str:
     tri_base = os.path.join(project_dir, ".attocode", "index")
     tri_size = sum(
         _safe_size(os.path.join(tri_base, n))
-        for n in ("trigrams.lookup", "trigrams.postings", "trigrams.db")
+        for n in (
+            "trigrams.lookup", "trigrams.postings", "trigrams.db", "trigrams.delta",
+            "trigrams.content", "trigrams.lines",
+        )
     )
     total_bytes += tri_size
     tri_hash = _hash_for_trigrams(project_dir)
@@ -628,7 +631,9 @@ def clear_trigrams(confirm: bool = False) -> str:
     """Delete the trigram fast-search index files.
 
     The trigram index is three files (``trigrams.lookup``, ``.postings``,
-    ``.db``). Next AST service initialization will rebuild it.
+    ``.db``) plus the ``trigrams.delta`` edit log and, in positional mode,
+    the ``trigrams.content``/``.lines`` snapshot. Next AST service
+    initialization will rebuild it.
 
     Args:
         confirm: Must be True to actually delete.
@@ -637,7 +642,10 @@ def clear_trigrams(confirm: bool = False) -> str:
     base = os.path.join(project_dir, ".attocode", "index")
     files = [
         os.path.join(base, n)
-        for n in ("trigrams.lookup", "trigrams.postings", "trigrams.db")
+        for n in (
+            "trigrams.lookup", "trigrams.postings", "trigrams.db", "trigrams.delta",
+            "trigrams.content", "trigrams.lines",
+        )
     ]
     present = [f for f in files if os.path.exists(f)]
     if not present:
@@ -190,7 +190,10 @@ def _hash_for_trigrams(project_dir: str) -> str:
     """Trigram index is binary files, not a DB — hash on presence + mtime + size."""
     base = os.path.join(project_dir, ".attocode", "index")
     parts: list[tuple[str, float, int]] = []
-    for name in ("trigrams.lookup", "trigrams.postings", "trigrams.db"):
+    for name in (
+        "trigrams.lookup", "trigrams.postings", "trigrams.db", "trigrams.delta",
+        "trigrams.content", "trigrams.lines",
+    ):
         path = os.path.join(base, name)
         if not os.path.exists(path):
             continue
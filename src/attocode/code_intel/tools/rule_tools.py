@@ -141,20 +141,22 @@ def _collect_files(
         return []
 
     from attocode.code_intel.rules.executor import _EXT_LANG
+    from attocode.integrations.context.workspace import workspace_snapshot
 
     _SKIP_DIRS = frozenset({
         ".git", "node_modules", "__pycache__", ".venv", "venv",
         ".tox", "dist", "build", ".next", ".nuxt", ".attocode",
     })
 
-    result = []
-    for dirpath, dirnames, filenames in os.walk(scan_dir):
-        dirnames[:] = [d for d in dirnames if d not in _SKIP_DIRS]
-        for fname in filenames:
-            ext = os.path.splitext(fname)[1].lower()
-            if ext in _EXT_LANG:
-                result.append(os.path.join(dirpath, fname))
-    return result
+    snapshot = workspace_snapshot(project_dir)
+    listed = snapshot.files(
+        os.path.relpath(scan_dir, snapshot.root), skip_dirs=_SKIP_DIRS, skip_dot_dirs=False,
+    )
+    return [
+        f.path
+        for f in listed
+        if os.path.splitext(f.rel_path)[1].lower() in _EXT_LANG
+    ]
 
 
 def _analyze_impl(
@@ -194,9 +196,18 @@ def _analyze_impl(
     from attocode.code_intel.rules.executor import execute_rules
     from attocode.code_intel.rules.enricher import enrich_findings
     from attocode.code_intel.rules.filters.pipeline import run_pipeline
+    from attocode.code_intel.rules.finding_cache import FindingCache
     from attocode.code_intel.rules.formatter import format_findings
-
-    findings = execute_rules(file_list, rules, project_dir=project_dir)
+    from attocode.code_intel.rules.profiling import RuleProfiler
+
+    # Unchanged files are served from the finding cache. workers=None
+    # shards large scans across processes; small ones stay serial.
+    cache = FindingCache.open(project_dir) if project_dir else None
+    profiler = RuleProfiler()
+    findings = execute_rules(
+        file_list, rules, project_dir=project_dir, workers=None, cache=cache,
+        profiler=profiler,
+    )
 
     # Persist per-rule scan/match counters so the hygiene tool can
     # identify dead rules across sessions. Counts pre-filter findings —
@@ -205,13 +216,11 @@ def _analyze_impl(
     if project_dir:
         from attocode.code_intel.rules.profiling import FeedbackStore
 
-        match_counts: dict[str, int] = {}
-        for f in findings:
-            match_counts[f.rule_id] = match_counts.get(f.rule_id, 0) + 1
+        profile = profiler.get_stats()
         FeedbackStore(project_dir).record_session(
             rule_ids=[r.qualified_id for r in rules],
-            matches=match_counts,
-            files_scanned=len(file_list),
+            matches={qid: s.match_count for qid, s in profile.items()},
+            profile=profile,
         )
 
     # Pre-filter pipeline (dedup, test-file adjustment, confidence threshold)
@@ -586,6 +595,9 @@ def rule_stats(rule_id: str = "") -> str:
             continue
         s = RuleStats(
             rule_id=rid,
+            match_count=_as_int(fb.get("matches", 0)),
+            files_scanned=_as_int(fb.get("files_scanned", 0)),
+            cache_hits=_as_int(fb.get("cached_files", 0)),
             true_positives=_as_int(fb.get("tp", 0)),
             false_positives=_as_int(fb.get("fp", 0)),
         )
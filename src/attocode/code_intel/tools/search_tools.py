@@ -8,6 +8,7 @@ from __future__ import annotations
 
 import os
 import threading
+from pathlib import Path
 from typing import TYPE_CHECKING
 
 from attocode.code_intel._shared import (
@@ -22,6 +23,9 @@ from attocode.code_intel.tools.pin_tools import pin_stamped
 from attocode.integrations.context.frecency import FrecencyResult
 
 if TYPE_CHECKING:
+    import re
+    from collections.abc import Iterable
+
     from attocode.integrations.context.semantic_search import SemanticSearchManager
     from attocode.integrations.context.trigram_index import TrigramIndex
     from attocode.integrations.security.scanner import SecurityScanner
@@ -102,7 +106,9 @@ def _get_trigram_index() -> TrigramIndex | None:
                 if os.path.isdir(index_dir):
                     try:
                         from attocode.integrations.context.trigram_index import TrigramIndex
-                        idx = TrigramIndex(index_dir=index_dir)
+                        idx = TrigramIndex(
+                            index_dir=index_dir, positional=_trigram_positional(),
+                        )
                         if idx.load():
                             _trigram_index = idx
                     except Exception:
@@ -110,6 +116,57 @@ def _get_trigram_index() -> TrigramIndex | None:
     return _trigram_index
 
 
+def _trigram_positional() -> bool:
+    """Whether trigram index builds should include the content snapshot.
+
+    Enabled with ``ATTOCODE_TRIGRAM_POSITIONAL=1``; lets ``fast_search`` and
+    ``regex_search`` confirm matches without reading candidate files.
+    """
+    return os.environ.get("ATTOCODE_TRIGRAM_POSITIONAL", "") in ("1", "true", "yes")
+
+
+def _snapshot_matches(
+    trigram_idx: TrigramIndex | None,
+    regex: re.Pattern[str],
+    files: list[Path],
+    project_dir: str,
+    max_results: int,
+) -> list[str] | None:
+    """Match candidate *files* against the trigram index's content snapshot.
+
+    Returns the ``path:line: text`` hits, or None when the index has no
+    usable snapshot and the caller has to read the files itself.
+    """
+    if trigram_idx is None or not trigram_idx.has_positions():
+        return None
+    base = Path(project_dir)
+    rel_paths: list[str] = []
+    for file in files:
+        if file.name.startswith("."):
+            continue
+        try:
+            rel_paths.append(str(file.relative_to(base)))
+        except ValueError:
+            return None
+    hits = trigram_idx.search_lines(regex, rel_paths, max_results=max_results)
+    if hits is None:
+        return None
+    return [f"{rel}:{i}: {line.strip()}" for rel, i, line in hits]
+
+
+def _format_hits(hits: list[tuple[Path, int, str]], project_dir: str) -> list[str]:
+    """Render :func:`grep_files` hits as ``path:line: text``."""
+    base = Path(project_dir)
+    matches: list[str] = []
+    for file, i, line in hits:
+        try:
+            rel: Path | str = file.relative_to(base)
+        except ValueError:
+            rel = file.name
+        matches.append(f"{rel}:{i}: {line.strip()}")
+    return matches
+
+
 # ---------------------------------------------------------------------------
 # Tools
 # ---------------------------------------------------------------------------
@@ -272,14 +329,22 @@ def dataflow_scan(
         if not os.path.isdir(scan_dir):
             return f"Error: Path not found: {path}"
         # Discover files in subdirectory
+        from attocode.integrations.context.workspace import workspace_snapshot
+
         _EXTS = {".py", ".js", ".ts", ".jsx", ".tsx"}
-        files = []
-        for dirpath, _, filenames in os.walk(scan_dir):
-            for fname in filenames:
-                if os.path.splitext(fname)[1].lower() in _EXTS:
-                    files.append(os.path.relpath(
-                        os.path.join(dirpath, fname), project_dir,
-                    ))
+        snapshot = workspace_snapshot(project_dir)
+        try:
+            listed = snapshot.files(
+                os.path.relpath(os.path.realpath(scan_dir), snapshot.root),
+                skip_dirs=(),
+                skip_dot_dirs=False,
+            )
+        except ValueError:
+            return f"Error: Path not found: {path}"
+        files = [
+            f.rel_path for f in listed
+            if os.path.splitext(f.rel_path)[1].lower() in _EXTS
+        ]
 
     report = analyze_project(project_dir, paths=files or None)
     return format_report(report)
@@ -375,8 +440,9 @@ def fast_search(
         try:
             from attocode.integrations.context.trigram_index import TrigramIndex
             index_dir = os.path.join(project_dir, ".attocode", "index")
-            idx = TrigramIndex(index_dir=index_dir)
+            idx = TrigramIndex(index_dir=index_dir, positional=_trigram_positional())
             stats = idx.build(project_dir)
+            trigram_idx = idx
             global _trigram_index
             _trigram_index = idx
             if explain:
@@ -414,31 +480,27 @@ def fast_search(
                     mode="index-build-failed",
                 )
 
-    # Determine files to search
+    # Determine files to search: trigram candidates, or a gitignore-aware
+    # walk that prunes skipped dirs/extensions and streams into the scan.
+    from attocode.integrations.context.grep_scan import grep_files, iter_search_files
+
+    snapshot_hits: list[str] | None = None
+    files: Iterable[Path]
     if candidates is not None:
         files = sorted(root / c for c in candidates)
+        snapshot_hits = _snapshot_matches(
+            trigram_idx, regex, files, project_dir, max_results,
+        )
     else:
-        files = sorted(root.rglob("*"))
+        files = iter_search_files(root, Path(project_dir))
 
-    matches: list[str] = []
-    for file in files:
-        if not file.is_file() or file.name.startswith("."):
-            continue
-        try:
-            content = file.read_text(encoding="utf-8", errors="strict")
-        except (UnicodeDecodeError, OSError):
-            continue
-        for i, line in enumerate(content.splitlines(), 1):
-            if regex.search(line):
-                try:
-                    rel = file.relative_to(Path(project_dir))
-                except ValueError:
-                    rel = file.name
-                matches.append(f"{rel}:{i}: {line.strip()}")
-                if len(matches) >= max_results:
-                    break
-        if len(matches) >= max_results:
-            break
+    if snapshot_hits is not None:
+        index_status += ", matched from content snapshot"
+        matches = snapshot_hits
+    else:
+        matches = _format_hits(
+            grep_files(regex, files, max_results=max_results), project_dir,
+        )
 
     if not matches:
         result = f"No matches found ({index_status})"
@@ -526,31 +588,26 @@ def regex_search(
         if candidates is not None:
             used_index = True
 
-    # Determine files to search
+    # Determine files to search: trigram candidates, or a gitignore-aware
+    # walk that prunes skipped dirs/extensions and streams into the scan.
+    from attocode.integrations.context.grep_scan import grep_files, iter_search_files
+
+    snapshot_hits: list[str] | None = None
+    files: Iterable[Path]
     if candidates is not None:
         files = sorted(root / c for c in candidates)
+        snapshot_hits = _snapshot_matches(
+            trigram_idx, regex, files, project_dir, max_results,
+        )
     else:
-        files = sorted(root.rglob("*"))
+        files = iter_search_files(root, Path(project_dir))
 
-    matches: list[str] = []
-    for file in files:
-        if not file.is_file() or file.name.startswith("."):
-            continue
-        try:
-            content = file.read_text(encoding="utf-8", errors="strict")
-        except (UnicodeDecodeError, OSError):
-            continue
-        for i, line in enumerate(content.splitlines(), 1):
-            if regex.search(line):
-                try:
-                    rel = file.relative_to(Path(project_dir))
-                except ValueError:
-                    rel = file.name
-                matches.append(f"{rel}:{i}: {line.strip()}")
-                if len(matches) >= max_results:
-                    break
-        if len(matches) >= max_results:
-            break
+    if snapshot_hits is not None:
+        matches = snapshot_hits
+    else:
+        matches = _format_hits(
+            grep_files(regex, files, max_results=max_results), project_dir,
+        )
 
     total = len(matches)
     if not matches:
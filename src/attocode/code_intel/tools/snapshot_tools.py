@@ -62,6 +62,9 @@ _BINARY_FILES: tuple[tuple[str, str], ...] = (
     ("index/trigrams.lookup", "trigrams.lookup"),
     ("index/trigrams.postings", "trigrams.postings"),
     ("index/trigrams.db", "trigrams.db"),
+    ("index/trigrams.delta", "trigrams.delta"),
+    ("index/trigrams.content", "trigrams.content"),
+    ("index/trigrams.lines", "trigrams.lines"),
 )
 
 
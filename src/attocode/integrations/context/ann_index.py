@@ -0,0 +1,394 @@
+"""Approximate nearest-neighbour index over the ``VectorStore`` matrix.
+
+IVF-flat: spherical k-means centroids partition the matrix rows into
+inverted lists, and a copy of the vectors is kept grouped by list so each
+probed list is scored with one contiguous matmul. A query scores the
+centroids and then the rows of the ``nprobe`` closest lists exactly.
+Raising ``nprobe`` trades latency for recall; ``nprobe >= nlist`` scans
+every row.
+
+The index follows the matrix it is given rather than owning the data:
+``VectorStore`` passes its quantized copy (int8 or float16) when
+quantization is on, so candidates are scored from the quantized rows and
+the list-ordered copy is kept in that dtype. Appended
+rows are assigned to the existing centroids (no retraining) and scored
+from the matrix as an unsorted tail until the tail is large enough to
+regroup. A compaction (new matrix token, renumbered rows) reassigns every
+row, and the centroids are retrained once the live row count has grown
+well past what they were trained on. On disk, next to the database:
+
+- ``<db>.ivf.npz``: centroids, per-row list ids and the tokens below
+- ``<db>.ivf-<lists_token>.<f32|f16|i8>``: the list-ordered vectors, raw,
+  in the matrix dtype
+
+Rewrites of the vector file go to a new token, so readers that still map
+the old one are unaffected.
+"""
+
+from __future__ import annotations
+
+import glob
+import logging
+import math
+import os
+import uuid
+from dataclasses import dataclass, field
+from typing import Any
+
+try:
+    import numpy as np
+
+    _HAS_NUMPY = True
+except ImportError:
+    np = None  # type: ignore[assignment]
+    _HAS_NUMPY = False
+
+logger = logging.getLogger(__name__)
+
+ANN_BACKENDS = ("exact", "ivf")
+
+# Training sample per list and k-means iterations
+_TRAIN_PER_LIST = 32
+_KMEANS_ITERS = 10
+# Rows per chunk when assigning rows to centroids (bounds the
+# rows x nlist score matrix) and when writing the list-ordered copy
+_CHUNK_ROWS = 8192
+# Retrain once the live row count exceeds this multiple of the training size
+_RETRAIN_GROWTH = 4
+# Regroup appended rows into the lists once the unsorted tail exceeds
+# this fraction of the grouped rows
+_TAIL_FRACTION = 0.125
+# File suffix of the list-ordered vectors per matrix dtype
+_LIST_SUFFIXES = {"float32": "f32", "float16": "f16", "int8": "i8"}
+
+
+def default_nlist(n_rows: int) -> int:
+    """Number of inverted lists for *n_rows* vectors (about sqrt(N))."""
+    return max(16, min(4096, int(math.sqrt(max(n_rows, 1)))))
+
+
+def default_nprobe(nlist: int) -> int:
+    """Lists scanned per query when no explicit ``nprobe`` is configured."""
+    return max(8, nlist // 32)
+
+
+def remove_index_files(base_path: str) -> None:
+    """Delete a saved index (metadata and vector files) at *base_path*."""
+    for path in [f"{base_path}.npz", *glob.glob(glob.escape(base_path) + "-*")]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+@dataclass(slots=True)
+class IVFFlatIndex:
+    """Coarse-quantized inverted lists over matrix rows.
+
+    ``assign[r]`` is the list of matrix row ``r``. The first ``_grouped``
+    rows are stored list by list in ``_vectors`` (``_order`` maps positions
+    back to matrix rows, ``_offsets`` delimits lists); rows appended since
+    form a tail that is matched with ``np.isin`` and read from the matrix.
+    ``dtype`` is that of the matrix the lists were copied from.
+    """
+
+    base_path: str  # "<db>.ivf"
+    centroids: Any  # np.ndarray (nlist, D) float32, unit rows
+    assign: Any  # np.ndarray[int32] (rows,)
+    token: str  # matrix token the row numbers refer to
+    trained_rows: int
+    lists_token: str = ""
+    dtype: str = "float32"
+    _grouped: int = field(default=0, repr=False)
+    _vectors: Any = field(default=None, repr=False)  # np.memmap (_grouped, D)
+    _order: Any = field(default=None, repr=False)
+    _offsets: Any = field(default=None, repr=False)
+
+    @property
+    def nlist(self) -> int:
+        return len(self.centroids)
+
+    @property
+    def rows(self) -> int:
+        return len(self.assign)
+
+    @property
+    def meta_path(self) -> str:
+        return f"{self.base_path}.npz"
+
+    def _lists_path(self, token: str) -> str:
+        return f"{self.base_path}-{token}.{_LIST_SUFFIXES[self.dtype]}"
+
+    # ------------------------------------------------------------------
+    # Build
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def train(
+        cls,
+        base_path: str,
+        matrix: Any,
+        norms: Any,
+        live: Any,
+        token: str,
+        *,
+        nlist: int = 0,
+        seed: int = 0,
+    ) -> IVFFlatIndex:
+        """Train centroids on a sample of the live rows and index every row.
+
+        Rows are normalized by their own length, so a quantized *matrix*
+        needs no per-row scales here.
+        """
+        live_rows = np.flatnonzero(live & (norms > 0))
+        n_live = len(live_rows)
+        nlist = min(nlist or default_nlist(n_live), max(n_live, 1))
+        rng = np.random.default_rng(seed)
+        sample_size = min(n_live, nlist * _TRAIN_PER_LIST)
+        sample_rows = np.sort(rng.choice(live_rows, size=sample_size, replace=False))
+        sample = np.asarray(matrix[sample_rows], dtype=np.float32)
+        lengths = np.linalg.norm(sample, axis=1)
+        lengths[lengths == 0] = 1.0
+        sample /= lengths[:, None]
+
+        centroids = sample[rng.choice(sample_size, size=nlist, replace=False)].copy()
+        for _ in range(_KMEANS_ITERS):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            counts = np.bincount(labels, minlength=nlist)
+            starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+            empty = counts == 0
+            sums = np.zeros_like(centroids)
+            sums[~empty] = np.add.reduceat(
+                sample[np.argsort(labels, kind="stable")], starts[~empty], axis=0,
+            )
+            if empty.any():
+                # Reseed empty lists with random sample rows
+                sums[empty] = sample[rng.choice(sample_size, size=int(empty.sum()))]
+            lengths = np.linalg.norm(sums, axis=1)
+            lengths[lengths == 0] = 1.0
+            centroids = (sums / lengths[:, None]).astype(np.float32)
+
+        index = cls(
+            base_path=base_path,
+            centroids=centroids,
+            assign=np.empty(0, dtype=np.int32),
+            token=token,
+            trained_rows=n_live,
+        )
+        index.extend(matrix)
+        logger.debug(
+            "ann_index: trained IVF on %d/%d rows, nlist=%d", sample_size, n_live, nlist,
+        )
+        return index
+
+    def _assign_rows(self, matrix: Any, start: int, stop: int) -> Any:
+        out = np.empty(stop - start, dtype=np.int32)
+        for i in range(start, stop, _CHUNK_ROWS):
+            j = min(i + _CHUNK_ROWS, stop)
+            # argmax of the raw (or per-row scaled) dot product equals
+            # argmax of cosine per row
+            out[i - start:j - start] = np.argmax(
+                np.asarray(matrix[i:j], dtype=np.float32) @ self.centroids.T, axis=1,
+            )
+        return out
+
+    def extend(self, matrix: Any) -> bool:
+        """Assign rows appended to *matrix* since the last call.
+
+        Returns True when the lists were regrouped (the index should be
+        saved). A *matrix* of another dtype (quantization switched) is
+        always regrouped.
+        """
+        if len(matrix) > self.rows:
+            added = self._assign_rows(matrix, self.rows, len(matrix))
+            self.assign = np.concatenate([self.assign, added])
+        if (
+            self._vectors is None
+            or self.dtype != matrix.dtype.name
+            or self.rows - self._grouped > _TAIL_FRACTION * max(self._grouped, 1)
+        ):
+            self._group(matrix)
+            return True
+        return False
+
+    def reassign(self, matrix: Any, token: str) -> None:
+        """Reassign every row after the matrix was rewritten under *token*."""
+        self.token = token
+        self.assign = self._assign_rows(matrix, 0, len(matrix))
+        self._group(matrix)
+
+    def needs_retrain(self, n_live: int) -> bool:
+        return n_live > _RETRAIN_GROWTH * max(self.trained_rows, 1)
+
+    def _set_lists(self, grouped: int) -> None:
+        """Derive ``_order``/``_offsets`` for the first *grouped* rows."""
+        self._order = np.argsort(self.assign[:grouped], kind="stable")
+        counts = np.bincount(self.assign[:grouped], minlength=self.nlist)
+        self._offsets = np.concatenate([[0], np.cumsum(counts)])
+        self._grouped = grouped
+
+    def _map_lists(self, token: str, rows: int) -> Any:
+        if rows == 0:
+            return np.empty((0, self.centroids.shape[1]), dtype=self.dtype)
+        return np.memmap(
+            self._lists_path(token), dtype=self.dtype, mode="r",
+            shape=(rows, self.centroids.shape[1]),
+        )
+
+    def _group(self, matrix: Any) -> None:
+        """Write every assigned row to a new list-ordered vector file."""
+        self._set_lists(self.rows)
+        self.dtype = matrix.dtype.name
+        token = uuid.uuid4().hex
+        path = self._lists_path(token)
+        try:
+            with open(path, "wb") as f:
+                f.truncate(self.rows * self.centroids.shape[1] * matrix.dtype.itemsize)
+            if self.rows:
+                dest = np.memmap(
+                    path, dtype=self.dtype, mode="r+",
+                    shape=(self.rows, self.centroids.shape[1]),
+                )
+                # Stream the matrix in row order and scatter each chunk to
+                # its list positions: sequential reads, page-cache writes.
+                position = np.empty(self.rows, dtype=np.int64)
+                position[self._order] = np.arange(self.rows)
+                for i in range(0, self.rows, _CHUNK_ROWS):
+                    j = min(i + _CHUNK_ROWS, self.rows)
+                    dest[position[i:j]] = matrix[i:j]
+                dest.flush()
+                del dest
+        except OSError:
+            logger.warning("ann_index: failed to write %s", path, exc_info=True)
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            # Score everything as tail rows until a later regroup succeeds
+            self._set_lists(0)
+            self._vectors = self._map_lists("", 0)
+            return
+        self.lists_token = token
+        self._vectors = self._map_lists(token, self.rows)
+
+    # ------------------------------------------------------------------
+    # Query
+    # ------------------------------------------------------------------
+
+    def score(
+        self, query_unit: Any, nprobe: int, matrix: Any, scales: Any = None,
+    ) -> tuple[Any, Any]:
+        """Dot products of *query_unit* with the rows of the *nprobe* nearest lists.
+
+        Returns ``(rows, dots)``: matrix row numbers and their raw dot
+        products with the query (not yet divided by the row norms).
+        *matrix* is the one the lists were grouped from; *scales* are its
+        per-row dequantization factors (int8), applied to the dots.
+        """
+        nprobe = max(1, min(nprobe, self.nlist))
+        sims = self.centroids @ query_unit
+        if nprobe < self.nlist:
+            probe = np.argpartition(sims, -nprobe)[-nprobe:]
+        else:
+            probe = np.arange(self.nlist)
+        rows: list[Any] = []
+        dots: list[Any] = []
+        for c in probe.tolist():
+            lo, hi = int(self._offsets[c]), int(self._offsets[c + 1])
+            if lo < hi:
+                rows.append(self._order[lo:hi])
+                dots.append(np.asarray(self._vectors[lo:hi], dtype=np.float32) @ query_unit)
+        if self._grouped < self.rows:
+            tail = np.flatnonzero(np.isin(self.assign[self._grouped:], probe)) + self._grouped
+            if len(tail):
+                rows.append(tail)
+                dots.append(np.asarray(matrix[tail], dtype=np.float32) @ query_unit)
+        if not rows:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        all_rows, all_dots = np.concatenate(rows), np.concatenate(dots)
+        if scales is not None:
+            all_dots *= scales[all_rows]
+        return all_rows, all_dots
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def save(self) -> None:
+        """Write the metadata atomically and drop superseded vector files."""
+        tmp = f"{self.meta_path}.tmp-{uuid.uuid4().hex}"
+        try:
+            with open(tmp, "wb") as f:
+                np.savez(
+                    f,
+                    centroids=self.centroids,
+                    assign=self.assign,
+                    token=np.array(self.token),
+                    trained_rows=np.array(self.trained_rows),
+                    lists_token=np.array(self.lists_token),
+                    grouped=np.array(self._grouped),
+                    dtype=np.array(self.dtype),
+                )
+            os.replace(tmp, self.meta_path)
+        except OSError:
+            logger.warning("ann_index: failed to save %s", self.meta_path, exc_info=True)
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return
+        keep = self._lists_path(self.lists_token)
+        for path in glob.glob(glob.escape(self.base_path) + "-*"):
+            if path != keep:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass  # still open elsewhere on Windows
+
+    @classmethod
+    def load(cls, base_path: str, dimension: int) -> IVFFlatIndex | None:
+        """Load a saved index, or None if missing, unreadable or for another dimension.
+
+        A missing or truncated vector file leaves the lists ungrouped; the
+        next ``extend`` rewrites it.
+        """
+        try:
+            with np.load(f"{base_path}.npz", allow_pickle=False) as data:
+                centroids = data["centroids"].astype(np.float32, copy=False)
+                assign = data["assign"].astype(np.int32, copy=False)
+                token = str(data["token"])
+                trained_rows = int(data["trained_rows"])
+                lists_token = str(data["lists_token"])
+                grouped = int(data["grouped"])
+                # Indexes saved before quantized lists were float32
+                dtype = str(data["dtype"]) if "dtype" in data.files else "float32"
+        except FileNotFoundError:
+            return None
+        except (OSError, KeyError, ValueError):
+            logger.debug("ann_index: ignoring unreadable %s.npz", base_path, exc_info=True)
+            return None
+        if centroids.ndim != 2 or centroids.shape[1] != dimension or not len(centroids):
+            return None
+        if len(assign) and int(assign.max()) >= len(centroids):
+            return None
+        if dtype not in _LIST_SUFFIXES:
+            return None
+        index = cls(
+            base_path=base_path,
+            centroids=centroids,
+            assign=assign,
+            token=token,
+            trained_rows=trained_rows,
+            lists_token=lists_token,
+            dtype=dtype,
+        )
+        try:
+            ok = 0 < grouped <= len(assign) and os.path.getsize(
+                index._lists_path(lists_token),
+            ) >= grouped * dimension * np.dtype(dtype).itemsize
+        except OSError:
+            ok = False
+        if ok:
+            index._set_lists(grouped)
+            index._vectors = index._map_lists(lists_token, grouped)
+        return index
@@ -41,7 +41,10 @@ from attocode.integrations.context.cross_references import (
     SymbolLocation,
     SymbolRef,
 )
+from attocode.integrations.context.incremental_parse import shared_tree_cache
 from attocode.integrations.context.index_store import IndexStore, StoredFile
+from attocode.integrations.context.parse_cache import ParseCache
+from attocode.integrations.context.parse_pool import iter_parsed
 
 logger = logging.getLogger(__name__)
 
@@ -79,6 +82,9 @@ class ASTService:
         self._reference_indexed_files: set[str] = set()
         self._hydration_thread: threading.Thread | None = None
         self._hydration_stop: threading.Event = threading.Event()
+        # Shared content-addressed parse cache; opened on first use
+        self._parse_cache: ParseCache | None = None
+        self._parse_cache_opened = False
         # Persistent index store
         if store is not None:
             self._store = store
@@ -181,6 +187,12 @@ class ASTService:
         )
         return st.to_dict()
 
+    def _get_parse_cache(self) -> ParseCache | None:
+        if not self._parse_cache_opened:
+            self._parse_cache_opened = True
+            self._parse_cache = ParseCache.open(self._root_dir)
+        return self._parse_cache
+
     def _ensure_initialized(self) -> None:
         """Auto-initialize if not yet done.  Called by all query methods."""
         if not self._initialized:
@@ -239,16 +251,17 @@ class ASTService:
                         self._index.remove_file(d)
 
                     stale_set = set(stale)
-                    for fi in parseable:
+                    stale_files = [fi for fi in parseable if fi.relative_path in stale_set]
+                    parsed = iter_parsed(
+                        [fi.path for fi in stale_files], cache=self._get_parse_cache(),
+                    )
+                    for fi, (_, ast) in zip(stale_files, parsed, strict=False):
+                        if ast is None:
+                            continue
                         rel = fi.relative_path
-                        if rel in stale_set:
-                            try:
-                                ast = parse_file(fi.path)
-                            except Exception:
-                                continue
-                            self._index.remove_file(rel)
-                            self._ast_cache[rel] = ast
-                            self._index_definitions(rel, ast)
+                        self._index.remove_file(rel)
+                        self._ast_cache[rel] = ast
+                        self._index_definitions(rel, ast)
 
                     dep_graph = self._context_mgr.dependency_graph
                     if dep_graph:
@@ -256,11 +269,21 @@ class ASTService:
                             for tgt in targets:
                                 self._index.add_file_dependency(src, tgt)
 
-                    for rel in stale_set:
-                        ast = self._ast_cache.get(rel)
-                        if ast:
-                            self._index_references(rel, ast)
-                            self._persist_indexed_file(rel, ast, mtime_map.get(rel, 0.0))
+                    reindexed = [rel for rel in stale_set if self._ast_cache.get(rel)]
+                    for rel in reindexed:
+                        self._index_references(rel, self._ast_cache[rel])
+                    if reindexed:
+                        self._store.save_files_batch([
+                            self._build_stored_file(
+                                rel, self._ast_cache[rel], mtime_map.get(rel, 0.0),
+                            )
+                            for rel in reindexed
+                        ])
+                        self._index.persist_all(reindexed)
+                        for rel in reindexed:
+                            self._store.save_dependencies(
+                                rel, self._index.get_dependencies(rel),
+                            )
 
                     self._initialized = True
                     self._store.record_scan_time()
@@ -282,10 +305,12 @@ class ASTService:
 
         # Full scan fallback
         self._store.clear_all()
-        for fi in parseable:
-            try:
-                ast = parse_file(fi.path)
-            except Exception:
+        for fi, (_, ast) in zip(
+            parseable,
+            iter_parsed([fi.path for fi in parseable], cache=self._get_parse_cache()),
+            strict=False,
+        ):
+            if ast is None:
                 continue
             rel = fi.relative_path
             self._ast_cache[rel] = ast
@@ -313,15 +338,15 @@ class ASTService:
             stored_files.append(self._build_stored_file(rel, ast, mtime_map.get(rel, 0.0)))
         if stored_files:
             self._store.save_files_batch(stored_files)
-        for rel in self._ast_cache:
-            self._index.persist_file(rel)
+        self._index.persist_all(list(self._ast_cache))
+        self._index.compact()
 
         self._store.record_scan_time()
         self._initialized = True
         logger.debug(
             "ASTService full init: %d files, %d definitions",
             len(self._ast_cache),
-            sum(len(v) for v in self._index.definitions.values()),
+            self._index.definition_count(),
         )
 
     def force_reindex(self) -> None:
@@ -382,10 +407,12 @@ class ASTService:
 
         to_parse = parseable[:budget]
 
-        for fi in to_parse:
-            try:
-                ast = parse_file(fi.path)
-            except Exception:
+        for fi, (_, ast) in zip(
+            to_parse,
+            iter_parsed([fi.path for fi in to_parse], cache=self._get_parse_cache()),
+            strict=False,
+        ):
+            if ast is None:
                 continue
             rel = fi.relative_path
             self._ast_cache[rel] = ast
@@ -410,10 +437,10 @@ class ASTService:
                     stored_files.append(self._build_stored_file(rel, ast_item, 0.0))
                 if stored_files:
                     self._store.save_files_batch(stored_files)
-                for rel in self._ast_cache:
-                    self._index.persist_file(rel)
+                self._index.persist_all(list(self._ast_cache))
                 self._store.record_scan_time()
 
+        self._index.compact()
         self._initialized = True
         return state
 
@@ -504,25 +531,27 @@ class ASTService:
             if lang in _supported and fi.relative_path not in self._ast_cache:
                 remaining.append(fi)
 
-        # Phase 2a: Parse remaining files and index definitions
-        batch_size = 50
-        for i in range(0, len(remaining), batch_size):
-            if self._hydration_stop.is_set():
-                return
-            batch = remaining[i:i + batch_size]
-            for fi in batch:
+        # Phase 2a: Parse remaining files (in worker processes) and index
+        # definitions as results stream back in order
+        parsed = iter_parsed(
+            [fi.path for fi in remaining],
+            stop=self._hydration_stop,
+            cache=self._get_parse_cache(),
+        )
+        try:
+            for fi, (_, ast) in zip(remaining, parsed, strict=False):
                 if self._hydration_stop.is_set():
                     return
                 rel = fi.relative_path
-                if rel in self._ast_cache:
-                    continue  # on-demand already parsed this file
-                try:
-                    ast = parse_file(fi.path)
-                except Exception:
-                    continue
+                if ast is None or rel in self._ast_cache:
+                    continue  # parse failed, or on-demand already parsed this file
                 self._ast_cache[rel] = ast
                 self._index_definitions(rel, ast)
                 state.parsed_files += 1
+        finally:
+            parsed.close()
+        if self._hydration_stop.is_set():
+            return
 
         # Phase 2b: Index references for all parsed files
         # Snapshot keys to avoid dict-changed-size during concurrent on-demand
@@ -557,9 +586,9 @@ class ASTService:
     async def async_initialize(self, batch_size: int = 50) -> None:
         """Async version of initialize that parses files in batches.
 
-        Uses ``asyncio.to_thread`` to avoid blocking the event loop
-        on large repositories.  Files are parsed in batches of
-        *batch_size* concurrently.
+        Parsing runs in worker processes (see ``parse_pool``), driven from
+        ``asyncio.to_thread`` so the event loop is not blocked on large
+        repositories.  Each worker task parses *batch_size* files.
         """
         files = self._context_mgr.discover_files()
         self._index = CrossRefIndex()
@@ -575,25 +604,20 @@ class ASTService:
 
         parseable = [fi for fi in files if fi.language in _supported]
 
-        def _parse_one(fi_path: str) -> tuple[str, FileAST | None]:
-            try:
-                return fi_path, parse_file(fi_path)
-            except Exception:
-                return fi_path, None
+        def _parse_all() -> list[tuple[str, FileAST | None]]:
+            return list(iter_parsed(
+                [fi.path for fi in parseable],
+                chunk_size=batch_size,
+                cache=self._get_parse_cache(),
+            ))
 
         # Phase 1: Parse all files and index definitions
-        for i in range(0, len(parseable), batch_size):
-            batch = parseable[i:i + batch_size]
-            tasks = [
-                asyncio.to_thread(_parse_one, fi.path)
-                for fi in batch
-            ]
-            results = await asyncio.gather(*tasks)
-            for fi, (_, ast) in zip(batch, results, strict=False):
-                if ast is not None:
-                    rel = fi.relative_path
-                    self._ast_cache[rel] = ast
-                    self._index_definitions(rel, ast)
+        results = await asyncio.to_thread(_parse_all)
+        for fi, (_, ast) in zip(parseable, results, strict=False):
+            if ast is not None:
+                rel = fi.relative_path
+                self._ast_cache[rel] = ast
+                self._index_definitions(rel, ast)
 
         # Phase 2: Index references (now known_symbols is complete)
         for rel, ast in self._ast_cache.items():
@@ -605,11 +629,12 @@ class ASTService:
                 for tgt in targets:
                     self._index.add_file_dependency(src, tgt)
 
+        self._index.compact()
         self._initialized = True
         logger.debug(
             "ASTService async_initialized: %d files, %d definitions",
             len(self._ast_cache),
-            sum(len(v) for v in self._index.definitions.values()),
+            self._index.definition_count(),
         )
 
     def notify_file_changed(self, path: str) -> list[Any]:
@@ -626,6 +651,7 @@ class ASTService:
 
         # Handle deletion
         if not Path(abs_path).exists():
+            shared_tree_cache().discard(abs_path)
             self._index.remove_file(rel)
             old_ast = self._ast_cache.pop(rel, None)
             if old_ast is None:
@@ -643,9 +669,9 @@ class ASTService:
                 ))
             return changes
 
-        # Parse new content
+        # Parse new content, incrementally if the file's last tree is cached
         try:
-            new_ast = parse_file(abs_path)
+            new_ast = shared_tree_cache().parse(abs_path)
         except Exception:
             return []
 
@@ -716,11 +742,7 @@ class ASTService:
         """Return all symbols defined in *path*."""
         self._ensure_initialized()
         rel = self._to_rel(path)
-        qnames = self._index.file_symbols.get(rel, set())
-        result: list[SymbolLocation] = []
-        for qn in qnames:
-            result.extend(self._index.definitions.get(qn, []))
-        return result
+        return self._index.get_file_definitions(rel)
 
     def find_symbol(self, name: str) -> list[SymbolLocation]:
         """Find definitions for *name* (exact or suffix match)."""
@@ -1146,102 +1168,120 @@ class ASTService:
                 )
                 self._index.add_reference(ref)
 
-        # Extract call-site references from source (lightweight regex scan)
-        abs_path = os.path.join(self._root_dir, rel_path)
-        try:
-            content = Path(abs_path).read_text(encoding="utf-8", errors="replace")
-        except OSError:
+        # Only record call sites of names defined somewhere in the index
+        if not self._index.file_symbols:
             return
 
-        # Collect known symbol names for targeted scanning
-        known_symbols: set[str] = set()
-        for qname_list in self._index.definitions.values():
-            for loc in qname_list:
-                known_symbols.add(loc.name)
-
-        if not known_symbols:
+        sites = self._call_sites(rel_path, ast)
+        if sites is None:
             return
+        for name, ref_kind, line_no, caller in sites:
+            if self._index.is_defined_name(name):
+                self._index.add_reference(SymbolRef(
+                    symbol_name=name,
+                    ref_kind=ref_kind,
+                    file_path=rel_path,
+                    line=line_no,
+                    caller_qualified_name=caller,
+                ))
 
-        # Build a list of (qualified_name, start_line, end_line) for every
-        # function/method in this file so we can attribute each call site to
-        # its enclosing scope and feed the call-graph edges. Innermost wins
-        # via smallest span on tie.
-        scopes: list[tuple[str, int, int]] = []
-        for fn in ast.functions:
-            scopes.append((fn.name, fn.start_line, fn.end_line))
-        for cls in ast.classes:
-            for method in cls.methods:
-                scopes.append(
-                    (f"{cls.name}.{method.name}", method.start_line, method.end_line)
-                )
+    def _call_sites(self, rel_path: str, ast: FileAST) -> list[tuple[str, str, int, str]] | None:
+        """Candidate call sites of *rel_path*, via the parse cache when possible.
 
-        def _enclosing_qname(line_no: int) -> str:
-            best_q = ""
-            best_span = -1
-            for qname, s, e in scopes:
-                if s <= line_no <= e:
-                    span = e - s
-                    if best_span < 0 or span < best_span:
-                        best_q = qname
-                        best_span = span
-            return best_q
-
-        # Build a regex pattern for call sites: symbol_name(
-        # Only scan for symbols that are actually defined somewhere.
-        # Skip comment lines and string literals to reduce false positives.
-        in_multiline_string = False
-        for i, line in enumerate(content.split("\n"), 1):
-            stripped = line.lstrip()
-
-            # Track triple-quote multiline strings
-            triple_count = line.count('"""') + line.count("'''")
-            if in_multiline_string:
-                if triple_count % 2 == 1:
-                    in_multiline_string = False
-                continue
-            if triple_count % 2 == 1:
-                in_multiline_string = True
-                continue
+        Returns None if the file cannot be read.
+        """
+        abs_path = os.path.join(self._root_dir, rel_path)
+        cache = self._get_parse_cache()
+        oid = cache.oid_for(abs_path) if cache is not None else None
+        if oid is not None:
+            cached = cache.get(oid, "references", ast.language)
+            if cached is not None:
+                return [tuple(site) for site in cached]
+        try:
+            content = Path(abs_path).read_text(encoding="utf-8", errors="replace")
+        except OSError:
+            return None
+        sites = _extract_call_sites(content, ast)
+        if oid is not None and cache.oid_for(abs_path) == oid:
+            cache.put(oid, "references", ast.language, sites)
+        return sites
 
-            # Skip single-line comments
-            if stripped.startswith("#"):
-                continue
 
-            # Skip definition lines — the symbol's own name on its def line
-            # is not a call site even though the regex matches "name(".
-            if re.match(
-                r"^\s*(?:async\s+)?(?:def|class|function|interface|type)\s",
-                line,
-            ):
-                continue
+_DEF_LINE_RE = re.compile(r"^\s*(?:async\s+)?(?:def|class|function|interface|type)\s")
+_QUOTED_RE = re.compile(r'(["\'])(?:(?!\1).)*\1')
+_CALL_RE = re.compile(r"\b(\w+)\s*\(")
+_ATTR_CALL_RE = re.compile(r"\b\w+\.(\w+)\s*\(")
+_NOT_CALLS = frozenset(("if", "for", "while", "return", "print"))
 
-            # Strip inline comments and string literals for matching
-            # Remove quoted strings to avoid matching inside them
-            clean_line = re.sub(r'(["\'])(?:(?!\1).)*\1', '""', line)
-            caller = _enclosing_qname(i)
 
-            # Find function/method calls: name(
-            for m in re.finditer(r"\b(\w+)\s*\(", clean_line):
-                name = m.group(1)
-                if name in known_symbols and name not in ("if", "for", "while", "return", "print"):
-                    ref = SymbolRef(
-                        symbol_name=name,
-                        ref_kind="call",
-                        file_path=rel_path,
-                        line=i,
-                        caller_qualified_name=caller,
-                    )
-                    self._index.add_reference(ref)
+def _extract_call_sites(content: str, ast: FileAST) -> list[tuple[str, str, int, str]]:
+    """Lightweight regex scan for call sites in *content*.
 
-            # Find attribute access: obj.method(
-            for m in re.finditer(r"\b\w+\.(\w+)\s*\(", clean_line):
-                attr_name = m.group(1)
-                if attr_name in known_symbols:
-                    ref = SymbolRef(
-                        symbol_name=attr_name,
-                        ref_kind="attribute",
-                        file_path=rel_path,
-                        line=i,
-                        caller_qualified_name=caller,
-                    )
-                    self._index.add_reference(ref)
+    Returns ``(name, ref_kind, line, caller_qualified_name)`` for every
+    ``name(`` and ``obj.name(`` outside comments, strings and definition
+    lines.  The result depends only on the file, so it is cacheable by
+    blob; callers filter it against the symbols known project-wide.
+    """
+    # Build a list of (qualified_name, start_line, end_line) for every
+    # function/method in this file so we can attribute each call site to
+    # its enclosing scope and feed the call-graph edges. Innermost wins
+    # via smallest span on tie.
+    scopes: list[tuple[str, int, int]] = []
+    for fn in ast.functions:
+        scopes.append((fn.name, fn.start_line, fn.end_line))
+    for cls in ast.classes:
+        for method in cls.methods:
+            scopes.append(
+                (f"{cls.name}.{method.name}", method.start_line, method.end_line)
+            )
+
+    def _enclosing_qname(line_no: int) -> str:
+        best_q = ""
+        best_span = -1
+        for qname, s, e in scopes:
+            if s <= line_no <= e:
+                span = e - s
+                if best_span < 0 or span < best_span:
+                    best_q = qname
+                    best_span = span
+        return best_q
+
+    # Skip comment lines and string literals to reduce false positives.
+    sites: list[tuple[str, str, int, str]] = []
+    in_multiline_string = False
+    for i, line in enumerate(content.split("\n"), 1):
+        stripped = line.lstrip()
+
+        # Track triple-quote multiline strings
+        triple_count = line.count('"""') + line.count("'''")
+        if in_multiline_string:
+            if triple_count % 2 == 1:
+                in_multiline_string = False
+            continue
+        if triple_count % 2 == 1:
+            in_multiline_string = True
+            continue
+
+        # Skip single-line comments
+        if stripped.startswith("#"):
+            continue
+
+        # Skip definition lines — the symbol's own name on its def line
+        # is not a call site even though the regex matches "name(".
+        if _DEF_LINE_RE.match(line):
+            continue
+
+        # Remove quoted strings to avoid matching inside them
+        clean_line = _QUOTED_RE.sub('""', line)
+        caller = _enclosing_qname(i)
+
+        # Find function/method calls: name(
+        for m in _CALL_RE.finditer(clean_line):
+            name = m.group(1)
+            if name not in _NOT_CALLS:
+                sites.append((name, "call", i, caller))
+
+        # Find attribute access: obj.method(
+        for m in _ATTR_CALL_RE.finditer(clean_line):
+            sites.append((m.group(1), "attribute", i, caller))
+    return sites
@@ -11,13 +11,21 @@ Provides intelligent code understanding through:
 from __future__ import annotations
 
 import os
+import stat
+import subprocess
 import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
+from attocode.integrations.context.discovery_cache import DiscoveryCache
+from attocode.integrations.context.workspace import read_bytes, workspace_snapshot
 from attocode.integrations.utilities.token_estimate import CHARS_PER_TOKEN
 
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator, Mapping
+
 
 @dataclass(slots=True)
 class FileInfo:
@@ -55,11 +63,58 @@ class DependencyGraph:
 
     forward: dict[str, set[str]] = field(default_factory=dict)  # file -> files it imports
     reverse: dict[str, set[str]] = field(default_factory=dict)  # file -> files that import it
+    # Interned links for pagerank(), dropped whenever an edge changes
+    _matrix: Any = field(default=None, repr=False, compare=False)
+    # (matrix, raw scores) of the last global pagerank(), the next call's start
+    _last_rank: tuple[Any, Any] | None = field(default=None, repr=False, compare=False)
 
     def add_edge(self, source: str, target: str) -> None:
         """Add a dependency edge: source imports target."""
         self.forward.setdefault(source, set()).add(target)
         self.reverse.setdefault(target, set()).add(source)
+        self._matrix = None
+
+    def set_imports(self, source: str, targets: set[str]) -> bool:
+        """Replace the outgoing edges of *source* in place.
+
+        Returns:
+            True if the edges changed.
+        """
+        old = self.forward.get(source, set())
+        if old == targets:
+            return False
+        for target in old - targets:
+            importers = self.reverse.get(target)
+            if importers is not None:
+                importers.discard(source)
+                if not importers:
+                    del self.reverse[target]
+        for target in targets - old:
+            self.reverse.setdefault(target, set()).add(source)
+        if targets:
+            self.forward[source] = set(targets)
+        else:
+            self.forward.pop(source, None)
+        self._matrix = None
+        return True
+
+    def remove_file(self, file_path: str) -> bool:
+        """Drop *file_path* and every edge into or out of it.
+
+        Returns:
+            True if the graph changed.
+        """
+        changed = self.set_imports(file_path, set())
+        for importer in self.reverse.pop(file_path, set()):
+            targets = self.forward.get(importer)
+            if targets is not None:
+                targets.discard(file_path)
+                if not targets:
+                    del self.forward[importer]
+            changed = True
+        if changed:
+            self._matrix = None
+        return changed
 
     def get_importers(self, file_path: str) -> set[str]:
         """Get files that import the given file."""
@@ -79,66 +134,65 @@ class DependencyGraph:
         damping: float = 0.85,
         iterations: int = 20,
         tolerance: float = 1e-6,
+        personalization: Mapping[str, float] | None = None,
     ) -> dict[str, float]:
         """Compute PageRank scores for all files in the dependency graph.
 
         Uses the reverse (importer) graph: a file is important if important
         files import it. Returns scores normalized to 0.0-1.0 range.
 
+        Runs as a sparse matrix-vector iteration (see ``graph_rank``) over
+        links interned once per graph version; change edges through
+        ``add_edge``/``set_imports``/``remove_file`` so the cached links
+        are dropped.  The previous call's scores seed the next one, so
+        re-ranking after a few edges changed converges in a handful of
+        rounds.
+
         Args:
             damping: Damping factor (probability of following a link). Default 0.85.
             iterations: Maximum power-iteration rounds. Default 20.
             tolerance: Early-stop when max score change < tolerance.
+            personalization: Seed weights (file -> weight) for personalized
+                PageRank, ranking files by proximity to the seeds instead
+                of globally.
 
         Returns:
             Dict mapping file paths to PageRank scores (0.0-1.0 normalized).
         """
-        # Collect all nodes from both forward and reverse graphs
-        all_nodes: set[str] = set()
-        all_nodes.update(self.forward.keys())
-        all_nodes.update(self.reverse.keys())
-        for targets in self.forward.values():
-            all_nodes.update(targets)
-        for sources in self.reverse.values():
-            all_nodes.update(sources)
-
-        if not all_nodes:
+        from attocode.integrations.context.graph_rank import (
+            LinkMatrix,
+            power_iteration,
+            teleport_vector,
+        )
+
+        matrix = self._matrix
+        if matrix is None:
+            matrix = LinkMatrix.from_adjacency(self.forward, self.reverse)
+            self._matrix = matrix
+        if not len(matrix):
             return {}
 
-        n = len(all_nodes)
-        base = 1.0 / n
-        scores: dict[str, float] = {node: base for node in all_nodes}
-
-        # Pre-compute out-degree (forward edges = this file imports N others)
-        out_degree: dict[str, int] = {}
-        for node in all_nodes:
-            out_degree[node] = len(self.forward.get(node, set()))
-
-        for _ in range(iterations):
-            new_scores: dict[str, float] = {}
-            for node in all_nodes:
-                # Sum contributions from files that import this node
-                rank_sum = 0.0
-                for importer in self.reverse.get(node, set()):
-                    od = out_degree.get(importer, 0)
-                    if od > 0:
-                        rank_sum += scores[importer] / od
-                new_scores[node] = (1 - damping) / n + damping * rank_sum
-
-            # Check convergence
-            max_diff = max(
-                abs(new_scores[node] - scores[node]) for node in all_nodes
-            )
-            scores = new_scores
-            if max_diff < tolerance:
-                break
+        teleport = teleport_vector(matrix, personalization) if personalization else None
+        start = None
+        if teleport is None and self._last_rank is not None:
+            last_matrix, last = self._last_rank
+            if last_matrix is matrix:
+                start = last
+            else:
+                start = matrix.vector(last_matrix.to_dict(last), 1.0 / len(matrix))
+        scores, _ = power_iteration(
+            matrix,
+            damping=damping,
+            iterations=iterations,
+            tolerance=tolerance,
+            teleport=teleport,
+            start=start,
+        )
+        if teleport is None:
+            self._last_rank = (matrix, scores)
 
         # Normalize to 0.0-1.0
-        max_score = max(scores.values()) if scores else 1.0
-        if max_score > 0:
-            scores = {k: v / max_score for k, v in scores.items()}
-
-        return scores
+        return matrix.to_dict(scores, normalize=True)
 
     def to_import_graph(self) -> dict[str, list[str]]:
         """Convert to the dict format expected by CodeSelector.ranked_search."""
@@ -253,6 +307,71 @@ SKIP_FILENAMES = {
 }
 
 
+# Threads stat-ing files during discovery (os.stat releases the GIL)
+_DISCOVERY_WORKERS = min(8, os.cpu_count() or 1)
+_GIT_TIMEOUT_SECONDS = 10.0
+_STAT_CHUNK = 1024  # Snapshot files stat-ed per batch (discovery stops at a ceiling)
+
+# rel_path -> ((mtime_ns, size, inode) or None, FileInfo, heuristic importance)
+_KnownFiles = dict[str, tuple["tuple[int, int, int] | None", FileInfo, float]]
+# Stands in for a stat in discovery listings: reuse the previous FileInfo
+_UNCHANGED: Any = object()
+
+
+def _extension(name: str) -> str:
+    """Lowercased ``os.path.splitext`` suffix of a name not starting with '.'."""
+    i = name.rfind(".")
+    return name[i:].lower() if i > 0 else ""
+
+
+def _keep_file(name: str) -> bool:
+    if name.startswith(".") or name in SKIP_FILENAMES:
+        return False
+    return _extension(name) not in SKIP_EXTENSIONS
+
+
+def _keep_git_path(rel: str, ignore: set[str]) -> bool:
+    """Apply the walk's directory and file filters to a ``git ls-files`` path."""
+    rel_dir, name = rel.rpartition("/")[::2]
+    if rel_dir and any(part in ignore or part.startswith(".") for part in rel_dir.split("/")):
+        return False
+    return _keep_file(name)
+
+
+def _git_lines(root: str, *args: str) -> list[str] | None:
+    """NUL-separated output of ``git <args>`` in *root*, or None on failure."""
+    try:
+        result = subprocess.run(
+            ["git", *args],
+            cwd=root,
+            capture_output=True,
+            timeout=_GIT_TIMEOUT_SECONDS,
+            check=False,
+        )
+    except (FileNotFoundError, subprocess.TimeoutExpired, OSError):
+        return None
+    if result.returncode != 0:
+        return None
+    return [os.fsdecode(raw) for raw in result.stdout.split(b"\0") if raw]
+
+
+def _count_lines(path: str) -> int:
+    """Lines of *path* as text-mode iteration counts them (universal newlines)."""
+    try:
+        text = read_bytes(path).decode("utf-8", errors="ignore")
+    except OSError:
+        return 0
+    breaks = text.count("\n") + text.count("\r") - text.count("\r\n")
+    return breaks + (1 if text and text[-1] not in "\r\n" else 0)
+
+
+def _stat_or_none(path: str) -> os.stat_result | None:
+    try:
+        return os.stat(path)
+    except OSError:
+        return None
+
+
 def _detect_source_prefixes(root_dir: str) -> list[str]:
     """Detect source directory prefixes for import resolution.
 
@@ -341,6 +460,7 @@ def _detect_source_prefixes(root_dir: str) -> list[str]:
 def _build_file_index(
     files: list[FileInfo],
     root_dir: str,
+    source_prefixes: list[str] | None = None,
 ) -> dict[str, str]:
     """Build a file index mapping normalized paths to relative paths.
 
@@ -355,6 +475,8 @@ def _build_file_index(
     Args:
         files: Discovered files with relative paths.
         root_dir: Repository root directory.
+        source_prefixes: Prefixes to strip; detected from *root_dir*
+            when None.
 
     Returns:
         Mapping of normalized paths (with ``/``) to relative paths.
@@ -365,7 +487,8 @@ def _build_file_index(
         file_index[normalized] = f.relative_path
 
     # Detect source prefixes and add stripped alternate keys
-    source_prefixes = _detect_source_prefixes(root_dir)
+    if source_prefixes is None:
+        source_prefixes = _detect_source_prefixes(root_dir)
     if source_prefixes:
         extra: dict[str, str] = {}
         for normalized, rel_path in file_index.items():
@@ -724,6 +847,33 @@ def _compute_dynamic_cap(files: list[FileInfo], configured_max: int) -> int:
     return cap
 
 
+# Language-specific import resolvers; languages absent here get no edges.
+_IMPORT_RESOLVERS: dict[str, Callable[[str, str, dict[str, str]], str | None]] = {
+    "python": _resolve_python_import,
+    "javascript": _resolve_js_import,
+    "typescript": _resolve_js_import,
+    "rust": _resolve_rust_import,
+    "go": _resolve_go_import,
+    "java": _resolve_java_import,
+    "ruby": _resolve_ruby_import,
+    "c": _resolve_c_import,
+    "cpp": _resolve_c_import,
+}
+
+
+def _resolve_imports(
+    language: str, modules: Iterable[str], source_file: str, file_index: dict[str, str],
+) -> set[str]:
+    """Resolve *modules* imported by *source_file* to local file paths."""
+    resolver = _IMPORT_RESOLVERS[language]
+    targets: set[str] = set()
+    for module in modules:
+        target = resolver(module, source_file, file_index)
+        if target is not None and target != source_file:
+            targets.add(target)
+    return targets
+
+
 def build_dependency_graph(
     files: list[FileInfo],
     root_dir: str,
@@ -747,24 +897,8 @@ def build_dependency_graph(
     # Build index with prefix-stripped alternate keys for src/ layout
     file_index = _build_file_index(files, root_dir)
 
-    # Dispatch table for language-specific import resolvers
-    _resolvers: dict[str, Any] = {
-        "python": _resolve_python_import,
-        "javascript": _resolve_js_import,
-        "typescript": _resolve_js_import,
-        "rust": _resolve_rust_import,
-        "go": _resolve_go_import,
-        "java": _resolve_java_import,
-        "ruby": _resolve_ruby_import,
-        "c": _resolve_c_import,
-        "cpp": _resolve_c_import,
-    }
-
-    # Languages that have parseable imports
-    supported_langs = set(_resolvers.keys())
-
     for f in files:
-        if f.language not in supported_langs:
+        if f.language not in _IMPORT_RESOLVERS:
             continue
 
         try:
@@ -772,15 +906,131 @@ def build_dependency_graph(
         except Exception:
             continue
 
-        resolver = _resolvers[f.language]
-        for imp in ast.imports:
-            target = resolver(imp.module, f.relative_path, file_index)
-            if target is not None and target != f.relative_path:
-                graph.add_edge(f.relative_path, target)
+        modules = [imp.module for imp in ast.imports]
+        for target in _resolve_imports(f.language, modules, f.relative_path, file_index):
+            graph.add_edge(f.relative_path, target)
 
     return graph
 
 
+class _ProbeIndex(dict[str, str]):
+    """File index that records which keys a resolver looked up."""
+
+    __slots__ = ("probes", "scanned")
+
+    def __init__(self, entries: dict[str, str]) -> None:
+        super().__init__(entries)
+        self.probes: set[str] = set()
+        self.scanned = False
+
+    def __contains__(self, key: object) -> bool:
+        self.probes.add(key)  # type: ignore[arg-type]
+        return dict.__contains__(self, key)
+
+    def __getitem__(self, key: str) -> str:
+        self.probes.add(key)
+        return dict.__getitem__(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:  # type: ignore[override]
+        self.probes.add(key)
+        return dict.get(self, key, default)
+
+    def __iter__(self) -> Iterator[str]:
+        self.scanned = True
+        return dict.__iter__(self)
+
+
+@dataclass(slots=True)
+class _DependencyState:
+    """Resolution bookkeeping that lets a DependencyGraph be patched in place.
+
+    Every resolution records the file-index keys it probed.  When the set
+    of discovered files changes, only files that probed a key whose entry
+    appeared, disappeared or now points elsewhere are re-resolved, plus
+    files whose resolver scanned the whole index (Go packages).  Files
+    whose import list is unchanged are not resolved again at all.
+    """
+
+    prefixes: list[str]
+    graph: DependencyGraph = field(default_factory=DependencyGraph)
+    file_index: _ProbeIndex = field(default_factory=lambda: _ProbeIndex({}))
+    # rel_path -> (language, imported module names)
+    imports: dict[str, tuple[str, tuple[str, ...]]] = field(default_factory=dict)
+    # index key -> files whose resolution looked it up.  Entries are not
+    # pruned when a file re-resolves; a stale one only costs a redundant
+    # re-resolution.
+    probed_by: dict[str, set[str]] = field(default_factory=dict)
+    scanners: set[str] = field(default_factory=set)
+    pagerank: dict[str, float] | None = None
+
+    def sync(
+        self,
+        files: list[FileInfo],
+        root_dir: str,
+        imports: dict[str, tuple[str, tuple[str, ...]]],
+    ) -> None:
+        """Bring the graph in line with *files*.
+
+        *imports* holds the import lists of new or modified files; every
+        other file in *files* is assumed to import what it did before.
+        """
+        dirty: set[str] = set()
+        present = {f.relative_path for f in files}
+        for rel in [rel for rel in self.imports if rel not in present]:
+            del self.imports[rel]
+            self.scanners.discard(rel)
+            if self.graph.remove_file(rel):
+                self.pagerank = None
+        for rel, entry in imports.items():
+            if self.imports.get(rel) != entry:
+                self.imports[rel] = entry
+                dirty.add(rel)
+
+        index = _build_file_index(files, root_dir, self.prefixes)
+        if index != self.file_index:
+            old = self.file_index
+            changed = {k for k, v in index.items() if dict.get(old, k) != v}
+            changed.update(k for k in dict.keys(old) if k not in index)
+            for key in changed:
+                dirty.update(self.probed_by.pop(key, ()))
+            dirty.update(self.scanners)
+            self.file_index = _ProbeIndex(index)
+
+        for rel in dirty:
+            self.resolve(rel)
+
+    def set_imports(self, rel_path: str, language: str, modules: tuple[str, ...]) -> None:
+        """Re-resolve one edited file if its import list changed."""
+        if self.imports.get(rel_path) != (language, modules):
+            self.imports[rel_path] = (language, modules)
+            self.resolve(rel_path)
+
+    def remove(self, rel_path: str) -> None:
+        """Drop a deleted file's edges; the index catches up on the next sync."""
+        self.imports.pop(rel_path, None)
+        self.scanners.discard(rel_path)
+        if self.graph.remove_file(rel_path):
+            self.pagerank = None
+
+    def resolve(self, rel_path: str) -> None:
+        entry = self.imports.get(rel_path)
+        if entry is None:
+            return
+        language, modules = entry
+        index = self.file_index
+        index.probes = set()
+        index.scanned = False
+        targets = _resolve_imports(language, modules, rel_path, index)
+        for key in index.probes:
+            self.probed_by.setdefault(key, set()).add(rel_path)
+        if index.scanned:
+            self.scanners.add(rel_path)
+        else:
+            self.scanners.discard(rel_path)
+        if self.graph.set_imports(rel_path, targets):
+            self.pagerank = None
+
+
 @dataclass
 class CodebaseContextManager:
     """Manages codebase context for intelligent code understanding.
@@ -797,6 +1047,9 @@ class CodebaseContextManager:
     max_files: int = 2000
     max_context_tokens: int = 8000
     ignore_patterns: set[str] = field(default_factory=lambda: set(DEFAULT_IGNORES))
+    # List files with ``git ls-files`` (honouring .gitignore) instead of
+    # walking the tree; falls back to the walk outside a git work tree.
+    use_git_ls_files: bool = False
     _files: list[FileInfo] = field(default_factory=list, repr=False)
     _repo_map: RepoMap | None = field(default=None, repr=False)
     _dep_graph: DependencyGraph | None = field(default=None, repr=False)
@@ -805,6 +1058,13 @@ class CodebaseContextManager:
     _ast_cache: dict[str, Any] = field(default_factory=dict, repr=False)
     _last_refresh_time: float = field(default=0.0, repr=False)
     _staleness_threshold: float = field(default=300.0, repr=False)  # 5 minutes
+    _discovery_cache: DiscoveryCache | None = field(default=None, repr=False)
+    _known_files: _KnownFiles = field(default_factory=dict, repr=False)
+    # (git index stat, paths git reported modified/untracked) at last discovery
+    _git_state: tuple[Any, frozenset[str]] | None = field(default=None, repr=False)
+    _git_index_path: str | None = field(default=None, repr=False)
+    _dep_state: _DependencyState | None = field(default=None, repr=False)
+    _discovered_root: str | None = field(default=None, repr=False)
 
     @property
     def is_stale(self) -> bool:
@@ -818,6 +1078,92 @@ class CodebaseContextManager:
         if self.is_stale:
             self.discover_files()
 
+    def _listed_files(
+        self, root: str, pool: ThreadPoolExecutor,
+    ) -> Iterator[tuple[str, str, Any]]:
+        """Yield ``(rel_path, full_path, stat)`` for every discovery candidate.
+
+        The stat is None if the file could not be stat-ed, or ``_UNCHANGED``
+        when the git listing knows the file is as it was last time.
+        """
+        if self.use_git_ls_files:
+            listed = self._git_listed_files(root)
+            if listed is not None:
+                yield from listed
+                return
+        yield from self._snapshot_listed_files(root, pool)
+
+    def _snapshot_listed_files(
+        self, root: str, pool: ThreadPoolExecutor,
+    ) -> Iterator[tuple[str, str, Any]]:
+        """Discovery candidates from the shared workspace snapshot, stat-ed on *pool*."""
+        ignore = self.ignore_patterns
+        listed = [
+            (f.rel_path, os.path.join(root, f.rel_path))
+            for f in workspace_snapshot(root).files(skip_dirs=ignore)
+            if _keep_file(os.path.basename(f.rel_path))
+        ]
+        for i in range(0, len(listed), _STAT_CHUNK):
+            chunk = listed[i:i + _STAT_CHUNK]
+            stats = pool.map(_stat_or_none, [full_path for _, full_path in chunk])
+            for (rel_path, full_path), st in zip(chunk, stats, strict=True):
+                yield rel_path, full_path, st
+
+    def _git_listed_files(self, root: str) -> list[tuple[str, str, Any]] | None:
+        """Discovery candidates from git instead of a directory walk.
+
+        Lists tracked plus untracked-but-not-ignored files, so
+        ``.gitignore``d paths are skipped as well as ``ignore_patterns``.
+        When the git index is unchanged since the last discovery, only the
+        paths git reports as modified or untracked (now or last time) are
+        stat-ed; every other file is yielded as ``_UNCHANGED``.  Returns
+        None outside a git work tree.
+        """
+        if self._git_index_path is None:
+            index = _git_lines(root, "rev-parse", "--git-path", "index")
+            if not index:
+                return None
+            self._git_index_path = os.path.join(root, index[0].strip())
+        try:
+            index_st = os.stat(self._git_index_path)
+            index_sig: Any = (index_st.st_mtime_ns, index_st.st_size)
+        except OSError:
+            index_sig = None
+
+        dirty = _git_lines(root, "ls-files", "-z", "--modified", "--others", "--exclude-standard")
+        if dirty is None:
+            return None
+        previous = self._git_state
+        self._git_state = (index_sig, frozenset(dirty))
+
+        listed: list[tuple[str, str, Any]] = []
+        if previous is not None and index_sig is not None and previous[0] == index_sig:
+            changed = self._git_state[1] | previous[1]
+            listed.extend(
+                (rel, info.path, _UNCHANGED)
+                for rel, (_, info, _) in self._known_files.items()
+                if rel not in changed
+            )
+            candidates: list[str] = sorted(changed)
+        else:
+            tracked = _git_lines(root, "ls-files", "-z", "--cached", "--others", "--exclude-standard")
+            if tracked is None:
+                return None
+            candidates = tracked
+
+        ignore = self.ignore_patterns
+        for rel in candidates:
+            if not _keep_git_path(rel, ignore):
+                continue
+            full_path = os.path.join(root, rel)
+            try:
+                st = os.stat(full_path)
+            except OSError:
+                continue  # deleted in the work tree
+            if stat.S_ISREG(st.st_mode):  # skips submodule gitlinks
+                listed.append((os.path.normpath(rel), full_path, st))
+        return listed
+
     def discover_files(self) -> list[FileInfo]:
         """Discover all relevant files in the repository.
 
@@ -829,91 +1175,95 @@ class CodebaseContextManager:
         Returns:
             List of FileInfo objects for discovered files.
         """
-        root = Path(self.root_dir)
-        files: list[FileInfo] = []
+        root = str(Path(self.root_dir))
         _SAFETY_CEILING = 50_000  # noqa: N806  # OOM guard for massive repos
 
-        for dirpath, dirnames, filenames in os.walk(root):
-            # Filter ignored directories (in-place to prevent os.walk descent)
-            dirnames[:] = [
-                d for d in dirnames
-                if d not in self.ignore_patterns and not d.startswith(".")
-            ]
-
-            for filename in filenames:
-                if filename.startswith("."):
-                    continue
-                if filename in SKIP_FILENAMES:
-                    continue
-                ext = Path(filename).suffix.lower()
-                if ext in SKIP_EXTENSIONS:
-                    continue
-
-                full_path = os.path.join(dirpath, filename)
-                try:
-                    rel_path = os.path.relpath(full_path, root)
-                except ValueError:
-                    continue
-
-                lang = EXTENSION_LANGUAGES.get(ext, "")
-
-                try:
-                    size = os.path.getsize(full_path)
-                except OSError:
-                    size = 0
-
-                # Skip very large files
-                if size > 1_000_000:  # 1MB
-                    continue
-
-                is_test = any(p in rel_path.lower() for p in TEST_PATTERNS)
-                is_config = any(p in rel_path.lower() for p in CONFIG_PATTERNS)
-
-                # Estimate line count (only for source files with a recognized lang)
-                line_count = 0
-                if lang and size < 500_000:
-                    try:
-                        with open(full_path, encoding="utf-8", errors="ignore") as f:
-                            line_count = sum(1 for _ in f)
-                    except OSError:
-                        pass
-
-                files.append(FileInfo(
-                    path=full_path,
-                    relative_path=rel_path,
-                    size=size,
-                    language=lang,
-                    is_test=is_test,
-                    is_config=is_config,
-                    line_count=line_count,
-                ))
-
-                if len(files) >= _SAFETY_CEILING:
+        if self._discovered_root != root:
+            # root_dir was reassigned: nothing cached for the old root applies
+            self._discovered_root = root
+            self._discovery_cache = None
+            self._known_files = {}
+            self._git_state = None
+            self._git_index_path = None
+            self._dep_state = None
+        if self._discovery_cache is None:
+            self._discovery_cache = DiscoveryCache.open(root)
+        cache = self._discovery_cache
+        known = self._known_files
+        current: _KnownFiles = {}
+        added: list[tuple[FileInfo, tuple[int, int, int] | None]] = []
+        uncounted: list[tuple[FileInfo, os.stat_result | None]] = []
+        truncated = False
+
+        pool = ThreadPoolExecutor(max_workers=_DISCOVERY_WORKERS)
+        try:
+            for rel_path, full_path, st in self._listed_files(root, pool):
+                key = None if st is None or st is _UNCHANGED else (
+                    st.st_mtime_ns, st.st_size, st.st_ino,
+                )
+                prev = known.get(rel_path)
+                if prev is not None and (st is _UNCHANGED or (key is not None and key == prev[0])):
+                    current[rel_path] = prev
+                else:
+                    size = st.st_size if st is not None else 0
+                    # Skip very large files
+                    if size > 1_000_000:  # 1MB
+                        continue
+                    rel_lower = rel_path.lower()
+                    lang = EXTENSION_LANGUAGES.get(_extension(os.path.basename(rel_path)), "")
+                    info = FileInfo(
+                        path=full_path,
+                        relative_path=rel_path,
+                        size=size,
+                        language=lang,
+                        is_test=any(p in rel_lower for p in TEST_PATTERNS),
+                        is_config=any(p in rel_lower for p in CONFIG_PATTERNS),
+                    )
+                    # Line count (only for source files with a recognized
+                    # lang), read from disk only when the file's stat changed
+                    if lang and size < 500_000:
+                        count = cache.line_count(rel_path, st) if st is not None else None
+                        if count is None:
+                            uncounted.append((info, st))
+                        else:
+                            info.line_count = count
+                    added.append((info, key))
+                    current[rel_path] = (key, info, 0.0)
+
+                if len(current) >= _SAFETY_CEILING:
+                    truncated = True
                     break
 
-            if len(files) >= _SAFETY_CEILING:
-                break
+            counts = pool.map(_count_lines, [info.path for info, _ in uncounted])
+            for (info, st), count in zip(uncounted, counts, strict=True):
+                info.line_count = count
+                if st is not None:
+                    cache.store(info.relative_path, st, count)
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
 
-        # Score importance
+        # Score importance of new/changed files; the rest keep their score
+        for info, key in added:
+            current[info.relative_path] = (key, info, self._score_importance(info))
+        self._known_files = current
+
+        files: list[FileInfo] = []
+        for _, info, importance in current.values():
+            info.importance = importance
+            files.append(info)
+
+        # Bring the dependency graph up to date and boost hub files using
+        # PageRank.  Only files whose imports changed, or whose import
+        # targets appeared or disappeared, are resolved again.
+        pr_scores = self._refresh_dependency_graph(
+            files, {info.relative_path for info, _ in added},
+        )
         for f in files:
-            f.importance = self._score_importance(f)
-
-        # Build dependency graph and boost hub files using PageRank
-        # Skip for large repos (>5K source files) — dep graph parsing is the
-        # main bootstrap bottleneck.  Heuristic importance is good enough for
-        # skeleton init; full dep graph is built during background hydration.
-        source_count = sum(1 for f in files if f.language)
-        if source_count < 5_000:
-            self._dep_graph = build_dependency_graph(files, self.root_dir)
-            pr_scores = self._dep_graph.pagerank()
-            for f in files:
-                pr = pr_scores.get(f.relative_path, 0.0)
-                # Normalize PageRank to 0.0-0.3 boost range
-                hub_boost = pr * 0.3
-                if hub_boost > 0.01:
-                    f.importance = min(1.0, f.importance + hub_boost)
-        else:
-            self._dep_graph = DependencyGraph()  # empty placeholder
+            pr = pr_scores.get(f.relative_path, 0.0)
+            # Normalize PageRank to 0.0-0.3 boost range
+            hub_boost = pr * 0.3
+            if hub_boost > 0.01:
+                f.importance = min(1.0, f.importance + hub_boost)
 
         # Sort by importance (highest first)
         files.sort(key=lambda f: f.importance, reverse=True)
@@ -923,10 +1273,77 @@ class CodebaseContextManager:
         if len(files) > cap:
             files = files[:cap]
 
+        if added or current.keys() != known.keys():
+            cache.save(None if truncated else set(current))
+
         self._files = files
         self._last_refresh_time = time.monotonic()
         return files
 
+    def _refresh_dependency_graph(
+        self, files: list[FileInfo], modified: set[str],
+    ) -> dict[str, float]:
+        """Patch the dependency graph for *files* and return PageRank scores.
+
+        *modified* holds files added or changed since the last discovery.
+        The graph is rebuilt from scratch only on first use, when the
+        source-prefix layout changes, or when ``_dep_graph`` was replaced
+        from outside.
+        """
+        prefixes = _detect_source_prefixes(self.root_dir)
+        state = self._dep_state
+        if state is None or state.graph is not self._dep_graph or state.prefixes != prefixes:
+            state = _DependencyState(prefixes=prefixes)
+            self._dep_state = state
+            self._dep_graph = state.graph
+        needed = [
+            f for f in files
+            if f.language in _IMPORT_RESOLVERS
+            and (f.relative_path in modified or f.relative_path not in state.imports)
+        ]
+        state.sync(files, self.root_dir, self._load_imports(needed))
+        if state.pagerank is None:
+            state.pagerank = state.graph.pagerank()
+        return state.pagerank
+
+    def _load_imports(self, files: list[FileInfo]) -> dict[str, tuple[str, tuple[str, ...]]]:
+        """Imported module names for *files*, parsing only cache misses.
+
+        Lists are cached by stat in the discovery cache; misses go through
+        the shared content-addressed parse cache, so a file whose stat
+        changed but whose content did not is not parsed again either.
+        """
+        cache = self._discovery_cache
+        imports: dict[str, tuple[str, tuple[str, ...]]] = {}
+        keys: dict[str, tuple[int, int, int] | None] = {}
+        misses: list[FileInfo] = []
+        for info in files:
+            key = self._known_files.get(info.relative_path, (None,))[0]
+            modules = None
+            if cache is not None and key is not None:
+                modules = cache.imports(info.relative_path, key)
+            if modules is None:
+                keys[info.path] = key
+                misses.append(info)
+            else:
+                imports[info.relative_path] = (info.language, modules)
+        if not misses:
+            return imports
+
+        from attocode.integrations.context.parse_cache import ParseCache
+        from attocode.integrations.context.parse_pool import iter_parsed
+
+        by_path = {info.path: info for info in misses}
+        parse_cache = ParseCache.open(self.root_dir)
+        for path, ast in iter_parsed(list(by_path), cache=parse_cache):
+            info = by_path[path]
+            modules = tuple(imp.module for imp in ast.imports) if ast is not None else ()
+            imports[info.relative_path] = (info.language, modules)
+            key = keys[path]
+            if cache is not None and key is not None and ast is not None:
+                cache.store_imports(info.relative_path, key, modules)
+        return imports
+
     @property
     def dependency_graph(self) -> DependencyGraph | None:
         """Get the dependency graph (available after discover_files)."""
@@ -1293,11 +1710,15 @@ class CodebaseContextManager:
             SymbolChange,
             diff_file_ast,
             diff_imports,
-            parse_file,
         )
+        from attocode.integrations.context.incremental_parse import shared_tree_cache
 
+        trees = shared_tree_cache()
         results: list[Any] = []
-        file_index = _build_file_index(self._files, self.root_dir)
+        state = self._dep_state
+        if state is not None and state.graph is not self._dep_graph:
+            state = None
+        file_index: dict[str, str] | None = None
 
         for rel_path in list(self._dirty_files):
             # Find absolute path
@@ -1305,6 +1726,7 @@ class CodebaseContextManager:
 
             # Handle deleted files
             if not Path(abs_path).exists():
+                trees.discard(abs_path)
                 old_ast = self._ast_cache.pop(rel_path, None)
                 # Emit removal changes for all symbols in old AST
                 if old_ast is not None:
@@ -1331,25 +1753,19 @@ class CodebaseContextManager:
                             was_incremental=True,
                         ))
                 # Remove dependency edges
-                if self._dep_graph is not None:
-                    old_imports = self._dep_graph.forward.pop(rel_path, set())
-                    for target in old_imports:
-                        rev = self._dep_graph.reverse.get(target)
-                        if rev:
-                            rev.discard(rel_path)
-                            if not rev:
-                                del self._dep_graph.reverse[target]
-                    # Also remove as a reverse dep target
-                    self._dep_graph.reverse.pop(rel_path, None)
+                if state is not None:
+                    state.remove(rel_path)
+                elif self._dep_graph is not None:
+                    self._dep_graph.remove_file(rel_path)
                 self._file_mtimes.pop(rel_path, None)
                 continue
 
             # Get old AST from cache
             old_ast = self._ast_cache.get(rel_path)
 
-            # Parse new content
+            # Parse new content, incrementally if the file's last tree is cached
             try:
-                new_ast = parse_file(abs_path)
+                new_ast = trees.parse(abs_path)
             except Exception:
                 continue
 
@@ -1365,28 +1781,20 @@ class CodebaseContextManager:
             self._ast_cache[rel_path] = new_ast
 
             # Update dependency graph incrementally
-            if self._dep_graph is not None and dep_changes:
-                # Remove old edges for this file
-                old_imports = self._dep_graph.forward.pop(rel_path, set())
-                for target in old_imports:
-                    rev = self._dep_graph.reverse.get(target)
-                    if rev:
-                        rev.discard(rel_path)
-                        if not rev:
-                            del self._dep_graph.reverse[target]
-
-                # Add new edges
-                for imp in new_ast.imports:
-                    if new_ast.language == "python":
-                        target = _resolve_python_import(
-                            imp.module, rel_path, file_index
-                        )
-                    else:
-                        target = _resolve_js_import(
-                            imp.module, rel_path, file_index
-                        )
-                    if target is not None and target != rel_path:
-                        self._dep_graph.add_edge(rel_path, target)
+            known = self._known_files.get(rel_path)
+            language = known[1].language if known is not None else new_ast.language
+            if state is not None:
+                if language in _IMPORT_RESOLVERS and (old_ast is None or dep_changes):
+                    modules = tuple(imp.module for imp in new_ast.imports)
+                    state.set_imports(rel_path, language, modules)
+            elif self._dep_graph is not None and dep_changes:
+                if file_index is None:
+                    file_index = _build_file_index(self._files, self.root_dir)
+                targets = set()
+                if language in _IMPORT_RESOLVERS:
+                    modules = tuple(imp.module for imp in new_ast.imports)
+                    targets = _resolve_imports(language, modules, rel_path, file_index)
+                self._dep_graph.set_imports(rel_path, targets)
 
             # Update file mtime
             try:
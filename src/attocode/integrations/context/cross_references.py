@@ -2,21 +2,56 @@
 
 Builds a bidirectional index of symbol definitions and references,
 file-level import dependencies, and dependents from parsed AST data.
+Entries live in interned, array-backed tables and CSR graphs
+(:mod:`.symbol_columns`) rather than one object per definition/reference.
+
+A store-backed index can also run *lazily* (``load_from_store(lazy=True)``):
+only file -> symbol names, the name indexes and file dependencies are
+loaded, and definitions, references and call edges are read from the
+``IndexStore`` per query through a bounded LRU.  Files indexed after the
+load live in memory and take precedence over their stored rows.
 """
 
 from __future__ import annotations
 
 import logging
+import os
 import re
 import threading
+from array import array
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from typing import TYPE_CHECKING, Any
 
+from attocode.integrations.context.name_index import NameIndex
+from attocode.integrations.context.symbol_columns import (
+    FileKeysView,
+    Graph,
+    GraphView,
+    MultiMap,
+    RecordsView,
+    RowTable,
+    StringTable,
+)
+
 if TYPE_CHECKING:
-    from attocode.integrations.context.index_store import IndexStore
+    from collections.abc import Callable, Iterable, Mapping
+
+    from attocode.integrations.context.index_store import (
+        IndexStore,
+        StoredReference,
+        StoredSymbol,
+    )
 
 logger = logging.getLogger(__name__)
 
+_LAZY_ENV = "ATTOCODE_XREF_LAZY"
+_LAZY_MIN_SYMBOLS = 250_000  # Stores at least this big load lazily by default
+_LAZY_CACHE_SIZE = 4096      # Store query results kept in the LRU
+
+_CAMEL_RE = re.compile(r"([a-z0-9])([A-Z])")
+_ACRONYM_RE = re.compile(r"([A-Z]+)([A-Z][a-z])")
+
 
 def _split_name_tokens(name: str) -> list[str]:
     """Split a symbol name into lowercase tokens.
@@ -38,11 +73,14 @@ def _split_name_tokens(name: str) -> list[str]:
     for part in parts:
         if not part:
             continue
+        if part == part.lower():  # nothing to split or lowercase
+            tokens.append(part)
+            continue
         # Split camelCase / PascalCase: insert boundary before uppercase
         # that follows lowercase, or before uppercase followed by lowercase
         # (to handle "HTTPServer" -> "HTTP", "Server")
-        sub = re.sub(r"([a-z0-9])([A-Z])", r"\1_\2", part)
-        sub = re.sub(r"([A-Z]+)([A-Z][a-z])", r"\1_\2", sub)
+        sub = _CAMEL_RE.sub(r"\1_\2", part)
+        sub = _ACRONYM_RE.sub(r"\1_\2", sub)
         for s in sub.split("_"):
             if s:
                 tokens.append(s.lower())
@@ -77,7 +115,51 @@ class SymbolLocation:
     source: str = "tree-sitter"  # "tree-sitter" | "lsp"
 
 
-@dataclass(slots=True)
+# Column layouts: record fields in constructor order, and which are strings
+_REF_FIELDS = (
+    "symbol_name", "ref_kind", "file_path", "line", "source", "caller_qualified_name",
+)
+_REF_TEXT = (True, True, True, False, True, True)
+_LOCATION_FIELDS = (
+    "name", "qualified_name", "kind", "file_path", "start_line", "end_line", "source",
+)
+_LOCATION_TEXT = (True, True, True, True, False, False, True)
+
+
+def _location_from_stored(s: StoredSymbol) -> SymbolLocation:
+    return SymbolLocation(
+        name=s.name,
+        qualified_name=s.qualified_name,
+        kind=s.kind,
+        file_path=s.file_path,
+        start_line=s.line,
+        end_line=s.end_line,
+        source=s.source,
+    )
+
+
+def _ref_from_stored(r: StoredReference) -> SymbolRef:
+    return SymbolRef(
+        symbol_name=r.symbol_name,
+        ref_kind=r.ref_kind,
+        file_path=r.file_path,
+        line=r.line,
+        source=r.source,
+        caller_qualified_name=getattr(r, "caller_qualified_name", ""),
+    )
+
+
+def _lazy_by_default(store: IndexStore) -> bool:
+    """``ATTOCODE_XREF_LAZY`` if set, else lazy for large stores."""
+    env = os.environ.get(_LAZY_ENV, "").strip().lower()
+    if env in ("1", "true", "on", "yes"):
+        return True
+    if env in ("0", "false", "off", "no"):
+        return False
+    return store.count_symbols() >= _LAZY_MIN_SYMBOLS
+
+
+@dataclass(slots=True, init=False)
 class CrossRefIndex:
     """Bidirectional cross-reference index for a codebase.
 
@@ -85,34 +167,52 @@ class CrossRefIndex:
     and reverse dependents.  Includes an inverted name index for fast
     multi-strategy symbol search.
 
+    Entries are stored column-wise (see :mod:`.symbol_columns`);
+    ``definitions``, ``references``, ``call_edges`` and the other mapping
+    attributes are read-only views that build records per lookup.
+
     Optionally backed by an ``IndexStore`` for persistence across restarts.
+    In lazy mode the views hold only files changed since the load; use the
+    query methods (or :meth:`materialize`) rather than reading
+    ``definitions``/``references`` directly.
     """
 
-    # qualified_name -> list of definition locations
-    definitions: dict[str, list[SymbolLocation]] = field(default_factory=dict)
-    # symbol name -> list of reference sites
-    references: dict[str, list[SymbolRef]] = field(default_factory=dict)
-    # file path -> set of qualified symbol names defined in that file
-    file_symbols: dict[str, set[str]] = field(default_factory=dict)
-    # file path -> set of file paths it imports from
-    file_dependencies: dict[str, set[str]] = field(default_factory=dict)
-    # file path -> set of file paths that import it
-    file_dependents: dict[str, set[str]] = field(default_factory=dict)
-    # caller qualified name -> set of callee bare/qualified names
-    call_edges: dict[str, set[str]] = field(default_factory=dict)
-    # callee bare/qualified name -> set of caller qualified names (reverse)
-    callers_of: dict[str, set[str]] = field(default_factory=dict)
+    # Interned strings shared by the tables and graphs below
+    _strings: StringTable = field(repr=False)
+    # SymbolLocation rows keyed by qualified name (see ``definitions``)
+    _defs: RowTable = field(repr=False)
+    # SymbolRef rows keyed by referenced symbol name (see ``references``)
+    _refs: RowTable = field(repr=False)
+    # file -> imported file (see ``file_dependencies``)
+    _deps: Graph = field(repr=False)
+    # caller qualified name -> callee bare/qualified name (see ``call_edges``)
+    _calls: Graph = field(repr=False)
 
     # --- Inverted name indexes (populated by add_definition) ---
     # bare name -> set of qualified names
-    _name_to_qnames: dict[str, set[str]] = field(default_factory=dict)
+    _name_to_qnames: MultiMap
     # lowercased bare name -> set of qualified names
-    _lower_to_qnames: dict[str, set[str]] = field(default_factory=dict)
+    _lower_to_qnames: MultiMap
     # individual token -> set of qualified names
-    _tokens_to_qnames: dict[str, set[str]] = field(default_factory=dict)
+    _tokens_to_qnames: MultiMap
+    # prefix/substring index over the keys of _lower_to_qnames (built on
+    # the first search, then kept in step)
+    _name_index: NameIndex | None = field(repr=False, compare=False)
 
     # Optional persistent store (set via set_store)
-    _store: Any = field(default=None, repr=False)
+    _store: Any = field(repr=False)
+
+    # --- Lazy mode (see load_from_store) ---
+    _lazy: bool = field(repr=False, compare=False)
+    # files whose in-memory entries supersede their rows in the store
+    _overlay_files: set[str] = field(repr=False, compare=False)
+    # (query kind, key) -> results read from the store, LRU ordered
+    _query_cache: OrderedDict[tuple[str, str], list[Any]] = field(repr=False, compare=False)
+    # False while the token index has not been built (lazy loads defer it)
+    _tokens_built: bool = field(repr=False, compare=False)
+    # file id -> qualified-name ids listed in ``file_symbols`` without rows in
+    # ``_defs``: stored files not yet loaded (lazy mode), or ``file_symbols=``
+    _stored_names: dict[int, array[int]] = field(repr=False, compare=False)
 
     # Re-entrant lock guarding all mutating methods plus the iterating
     # reads that need a consistent snapshot. Reentrancy matters because
@@ -120,9 +220,115 @@ class CrossRefIndex:
     # walks every other map. Background hydration (``ASTService``'s
     # daemon thread) and LSP/MCP request threads can mutate the index
     # concurrently, so the lock prevents corrupted dicts and torn lists.
-    _lock: threading.RLock = field(
-        default_factory=threading.RLock, repr=False, compare=False,
-    )
+    _lock: threading.RLock = field(repr=False, compare=False)
+
+    def __init__(
+        self,
+        definitions: Mapping[str, list[SymbolLocation]] | None = None,
+        references: Mapping[str, list[SymbolRef]] | None = None,
+        file_symbols: Mapping[str, set[str]] | None = None,
+        file_dependencies: Mapping[str, set[str]] | None = None,
+        file_dependents: Mapping[str, set[str]] | None = None,
+        call_edges: Mapping[str, set[str]] | None = None,
+        callers_of: Mapping[str, set[str]] | None = None,
+    ) -> None:
+        """Create an index, optionally seeded as if through
+        add_definition/add_reference/add_file_dependency/add_call_edge.
+        """
+        self._strings = StringTable()
+        self._defs = RowTable(
+            self._strings, SymbolLocation, _LOCATION_FIELDS, _LOCATION_TEXT,
+            key="qualified_name", file="file_path",
+        )
+        self._refs = RowTable(
+            self._strings, SymbolRef, _REF_FIELDS, _REF_TEXT,
+            key="symbol_name", file="file_path",
+        )
+        self._deps = Graph()
+        self._calls = Graph()
+        self._name_to_qnames = MultiMap()
+        self._lower_to_qnames = MultiMap()
+        self._tokens_to_qnames = MultiMap()
+        self._name_index = None
+        self._store = None
+        self._lazy = False
+        self._overlay_files = set()
+        self._query_cache = OrderedDict()
+        self._tokens_built = True
+        self._stored_names = {}
+        self._lock = threading.RLock()
+
+        for locs in (definitions or {}).values():
+            for loc in locs:
+                self._add_definition_locked(loc)
+        for refs in (references or {}).values():
+            for ref in refs:
+                self._add_reference_locked(ref)
+        intern = self._strings.intern
+        for file_path, qnames in (file_symbols or {}).items():
+            # Names without a definition (hand-built indexes) still list
+            known = self._defs.file_keys(file_path)
+            extra = [intern(qn) for qn in qnames if qn not in known]
+            if extra:
+                self._stored_names[intern(file_path)] = array("I", extra)
+        for src, targets in (file_dependencies or {}).items():
+            for tgt in targets:
+                self.add_file_dependency(src, tgt)
+        for tgt, sources in (file_dependents or {}).items():
+            for src in sources:
+                self.add_file_dependency(src, tgt)
+        for caller, callees in (call_edges or {}).items():
+            for callee in callees:
+                self.add_call_edge(caller, callee)
+        for callee, callers in (callers_of or {}).items():
+            for caller in callers:
+                self.add_call_edge(caller, callee)
+        self.compact()
+
+    # --- Read-only mapping views over the columnar storage ---
+
+    @property
+    def definitions(self) -> Mapping[str, list[SymbolLocation]]:
+        """qualified_name -> list of definition locations."""
+        return RecordsView(self._defs)
+
+    @property
+    def references(self) -> Mapping[str, list[SymbolRef]]:
+        """symbol name -> list of reference sites."""
+        return RecordsView(self._refs)
+
+    @property
+    def file_symbols(self) -> Mapping[str, set[str]]:
+        """file path -> set of qualified symbol names defined in that file.
+
+        Unlike the other views, this covers every file in lazy mode too.
+        """
+        return FileKeysView(self._defs, self._stored_names)
+
+    @property
+    def file_refs(self) -> Mapping[str, list[SymbolRef]]:
+        """file path -> references originating in that file."""
+        return RecordsView(self._refs, by_file=True)
+
+    @property
+    def file_dependencies(self) -> Mapping[str, set[str]]:
+        """file path -> set of file paths it imports from."""
+        return GraphView(self._deps, self._strings)
+
+    @property
+    def file_dependents(self) -> Mapping[str, set[str]]:
+        """file path -> set of file paths that import it."""
+        return GraphView(self._deps, self._strings, reverse=True)
+
+    @property
+    def call_edges(self) -> Mapping[str, set[str]]:
+        """caller qualified name -> set of callee bare/qualified names."""
+        return GraphView(self._calls, self._strings)
+
+    @property
+    def callers_of(self) -> Mapping[str, set[str]]:
+        """callee bare/qualified name -> set of caller qualified names."""
+        return GraphView(self._calls, self._strings, reverse=True)
 
     def set_store(self, store: IndexStore) -> None:
         """Attach an IndexStore for write-through persistence."""
@@ -138,44 +344,84 @@ class CrossRefIndex:
     def _persist_file_locked(self, file_path: str) -> None:
         if self._store is None:
             return
-        # Collect symbols for this file
-        sym_dicts: list[dict[str, Any]] = []
-        for qname in self.file_symbols.get(file_path, set()):
-            for loc in self.definitions.get(qname, []):
-                if loc.file_path == file_path:
-                    sym_dicts.append({
-                        "name": loc.name,
-                        "qualified_name": loc.qualified_name,
-                        "kind": loc.kind,
-                        "line": loc.start_line,
-                        "end_line": loc.end_line,
-                        "source": loc.source,
-                    })
+        if self._lazy and file_path not in self._overlay_files:
+            return  # untouched since load: the stored rows are current
+        sym_dicts = [
+            {
+                "name": loc.name,
+                "qualified_name": loc.qualified_name,
+                "kind": loc.kind,
+                "line": loc.start_line,
+                "end_line": loc.end_line,
+                "source": loc.source,
+            }
+            for loc in self._file_definitions(file_path)
+        ]
         self._store.save_symbols(file_path, sym_dicts)
 
-        # Collect references originating from this file
-        ref_dicts: list[dict[str, Any]] = []
-        for ref_name, refs in self.references.items():
-            for ref in refs:
-                if ref.file_path == file_path:
-                    ref_dicts.append({
-                        "symbol_name": ref.symbol_name,
-                        "ref_kind": ref.ref_kind,
-                        "line": ref.line,
-                        "column": 0,
-                        "source": ref.source,
-                        "caller_qualified_name": ref.caller_qualified_name,
-                    })
+        ref_dicts = [
+            {
+                "symbol_name": ref.symbol_name,
+                "ref_kind": ref.ref_kind,
+                "line": ref.line,
+                "column": 0,
+                "source": ref.source,
+                "caller_qualified_name": ref.caller_qualified_name,
+            }
+            for ref in self._refs.file_records(file_path)
+        ]
         self._store.save_references(file_path, ref_dicts)
 
-    def load_from_store(self) -> int:
-        """Bulk-load symbols, references, and dependencies from the store.
+    def persist_all(self, file_paths: list[str] | None = None) -> None:
+        """Write-through for many files at once (default: every indexed file).
+
+        Equivalent to calling :meth:`persist_file` for each path, but all
+        rows go to the store in one transaction.  The files themselves must
+        already be saved (symbols and refs reference ``files(path)``).
+        """
+        if self._store is None:
+            return
+        with self._lock:
+            if file_paths is None:
+                file_paths = list(dict.fromkeys([*self._defs.files(), *self._refs.files()]))
+            if self._lazy:
+                file_paths = [p for p in file_paths if p in self._overlay_files]
+            # Rows straight from the columns, without building records
+            symbol_rows = [
+                (path, name, qname, kind, start_line, end_line, source)
+                for path in file_paths
+                for name, qname, kind, _, start_line, end_line, source
+                in self._defs.file_values(path)
+            ]
+            ref_rows = [
+                (path, symbol_name, ref_kind, line, 0, source, caller)
+                for path in file_paths
+                for symbol_name, ref_kind, _, line, source, caller
+                in self._refs.file_values(path)
+            ]
+            self._store.save_symbols_and_references_batch(file_paths, symbol_rows, ref_rows)
+
+    def _file_definitions(self, file_path: str) -> list[SymbolLocation]:
+        """In-memory definitions located in *file_path*."""
+        return self._defs.file_records(file_path)
+
+    def load_from_store(self, *, lazy: bool | None = None) -> int:
+        """Load symbols, references, and dependencies from the store.
+
+        With *lazy*, only symbol names and dependencies are loaded and
+        queries read the rest from the store on demand.  ``None`` defers to
+        ``ATTOCODE_XREF_LAZY``, else loads lazily when the store holds at
+        least ``_LAZY_MIN_SYMBOLS`` symbols.
 
         Returns the number of files loaded.
         """
         if self._store is None:
             return 0
         with self._lock:
+            if lazy is None:
+                lazy = _lazy_by_default(self._store)
+            if lazy:
+                return self._load_names_from_store_locked()
             return self._load_from_store_locked()
 
     def _load_from_store_locked(self) -> int:
@@ -189,32 +435,16 @@ class CrossRefIndex:
         files_loaded: set[str] = set()
 
         for s in stored_symbols:
-            loc = SymbolLocation(
-                name=s.name,
-                qualified_name=s.qualified_name,
-                kind=s.kind,
-                file_path=s.file_path,
-                start_line=s.line,
-                end_line=s.end_line,
-                source=s.source,
-            )
-            self.add_definition(loc)
+            self._add_definition_locked(_location_from_stored(s))
             files_loaded.add(s.file_path)
 
         for r in stored_refs:
-            ref = SymbolRef(
-                symbol_name=r.symbol_name,
-                ref_kind=r.ref_kind,
-                file_path=r.file_path,
-                line=r.line,
-                source=r.source,
-                caller_qualified_name=getattr(r, "caller_qualified_name", ""),
-            )
-            self.add_reference(ref)
+            self._add_reference_locked(_ref_from_stored(r))
 
         for src, targets in stored_deps.items():
             for tgt in targets:
                 self.add_file_dependency(src, tgt)
+        self.compact()
 
         logger.debug(
             "CrossRefIndex loaded from store: %d files, %d symbols, %d refs",
@@ -222,6 +452,74 @@ class CrossRefIndex:
         )
         return len(files_loaded)
 
+    def _load_names_from_store_locked(self) -> int:
+        if self._store is None:
+            return 0
+        self._lazy = True
+        self._tokens_built = False  # built on the first token search
+        self._overlay_files.clear()
+        self._query_cache.clear()
+
+        names = self._store.load_symbol_names()
+        intern = self._strings.intern
+        stored = self._stored_names
+        for file_path, qname in names:
+            qname_id = intern(qname)
+            ids = stored.get(intern(file_path))
+            if ids is None:
+                ids = stored[intern(file_path)] = array("I")
+            ids.append(qname_id)
+            self._index_name(self._strings[qname_id])
+
+        for src, targets in self._store.load_dependencies().items():
+            for tgt in targets:
+                self.add_file_dependency(src, tgt)
+        self.compact()
+
+        logger.debug(
+            "CrossRefIndex loaded lazily from store: %d files, %d symbols",
+            len(stored), len(names),
+        )
+        return len(stored)
+
+    @property
+    def lazy(self) -> bool:
+        """True while definitions and references are served from the store."""
+        return self._lazy
+
+    def materialize(self) -> None:
+        """Leave lazy mode by loading every stored entry into memory.
+
+        For whole-index scans (dead-code analysis) that iterate
+        ``definitions``/``references`` directly.  No-op when not lazy.
+        """
+        with self._lock:
+            if not self._lazy or self._store is None:
+                return
+            overlay = self._overlay_files
+            for s in self._store.load_symbols():
+                if s.file_path not in overlay:
+                    self._add_definition_locked(_location_from_stored(s))
+            for r in self._store.load_references():
+                if r.file_path not in overlay:
+                    self._add_reference_locked(_ref_from_stored(r))
+            self._lazy = False
+            self._overlay_files = set()
+            self._stored_names.clear()
+            self._query_cache.clear()
+            self._ensure_token_index()
+            self.compact()
+
+    def compact(self) -> None:
+        """Fold pending changes into the compact arrays.
+
+        Call after bulk indexing; the tables and graphs otherwise
+        compact themselves as changes accumulate.
+        """
+        with self._lock:
+            self._calls.compact()
+            self._deps.compact()
+
     def merge_lsp_results(
         self,
         file_path: str,
@@ -252,17 +550,16 @@ class CrossRefIndex:
                 start_line=loc.start_line, end_line=loc.end_line,
                 source="lsp",
             )
-            existing = self.definitions.get(lsp_loc.qualified_name, [])
+            self._touch_file(lsp_loc.file_path)
             # Check for duplicate at same location
-            dup = False
-            for i, ex in enumerate(existing):
-                if ex.file_path == lsp_loc.file_path and ex.start_line == lsp_loc.start_line:
-                    # LSP wins: replace tree-sitter entry
-                    existing[i] = lsp_loc
-                    dup = True
-                    break
-            if not dup:
-                self.add_definition(lsp_loc)
+            row = self._defs.find(
+                lsp_loc.qualified_name, lsp_loc.file_path, "start_line", lsp_loc.start_line,
+            )
+            if row >= 0:
+                # LSP wins: replace tree-sitter entry
+                self._defs.replace(row, lsp_loc)
+            else:
+                self._add_definition_locked(lsp_loc)
                 added += 1
 
         for ref in references:
@@ -272,6 +569,7 @@ class CrossRefIndex:
                 source="lsp",
                 caller_qualified_name=ref.caller_qualified_name,
             )
+            self._touch_file(lsp_ref.file_path)
             # LSP wins on (file, line) collision — but ONLY when the
             # incoming ref carries a resolved caller. Without one, the
             # legacy ``ingest_lsp_results`` fallback path stores the
@@ -279,16 +577,11 @@ class CrossRefIndex:
             # so replacing a tree-sitter entry would invert the edge.
             # In that case we dedupe-skip, preserving the existing
             # higher-precision tree-sitter ref.
-            existing = self.references.get(lsp_ref.symbol_name, [])
-            dup_index: int | None = None
-            for i, ex in enumerate(existing):
-                if ex.file_path == lsp_ref.file_path and ex.line == lsp_ref.line:
-                    dup_index = i
-                    break
+            row = self._refs.find(lsp_ref.symbol_name, lsp_ref.file_path, "line", lsp_ref.line)
 
-            if dup_index is not None:
+            if row >= 0:
                 if lsp_ref.caller_qualified_name:
-                    existing[dup_index] = lsp_ref
+                    self._refs.replace(row, lsp_ref)
                     if lsp_ref.ref_kind == "call":
                         self.add_call_edge(
                             lsp_ref.caller_qualified_name,
@@ -296,7 +589,7 @@ class CrossRefIndex:
                         )
                 # else: no caller info — leave the tree-sitter entry alone.
             else:
-                self.add_reference(lsp_ref)
+                self._add_reference_locked(lsp_ref)
                 added += 1
 
         # Persist if store is available
@@ -306,21 +599,63 @@ class CrossRefIndex:
     def add_definition(self, loc: SymbolLocation) -> None:
         """Register a symbol definition."""
         with self._lock:
-            self.definitions.setdefault(loc.qualified_name, []).append(loc)
-            self.file_symbols.setdefault(loc.file_path, set()).add(loc.qualified_name)
-            # Populate inverted indexes
-            bare = loc.qualified_name.rsplit(".", 1)[-1]
-            self._name_to_qnames.setdefault(bare, set()).add(loc.qualified_name)
-            self._lower_to_qnames.setdefault(bare.lower(), set()).add(loc.qualified_name)
+            self._touch_file(loc.file_path)
+            self._add_definition_locked(loc)
+
+    def _add_definition_locked(self, loc: SymbolLocation) -> None:
+        row = self._defs.append(loc)
+        self._index_name(self._defs.key_of(row))  # the interned copy
+
+    def _index_name(self, qname: str) -> None:
+        """Populate the inverted name indexes for *qname*."""
+        bare = qname.rsplit(".", 1)[-1]
+        self._name_to_qnames.add(bare, qname)
+        lower = bare.lower()
+        if self._lower_to_qnames.add(lower, qname) and self._name_index is not None:
+            self._name_index.add(lower)
+        if self._tokens_built:
+            for token in _split_name_tokens(bare):
+                self._tokens_to_qnames.add(token, qname)
+
+    def _unindex_name(self, qname: str) -> None:
+        """Drop *qname* from the inverted name indexes once fully gone."""
+        bare = qname.rsplit(".", 1)[-1]
+        self._name_to_qnames.discard(bare, qname)
+        lower = bare.lower()
+        if self._lower_to_qnames.discard(lower, qname) and self._name_index is not None:
+            self._name_index.discard(lower)
+        if not self._tokens_built:
+            return
+        for token in _split_name_tokens(bare):
+            self._tokens_to_qnames.discard(token, qname)
+
+    def _ensure_name_index(self) -> NameIndex:
+        if self._name_index is None:
+            self._name_index = NameIndex.build(self._lower_to_qnames)
+        return self._name_index
+
+    def _ensure_token_index(self) -> None:
+        if self._tokens_built:
+            return
+        for bare, qnames in self._name_to_qnames.items():
             for token in _split_name_tokens(bare):
-                self._tokens_to_qnames.setdefault(token, set()).add(loc.qualified_name)
+                self._tokens_to_qnames.update(token, qnames)
+        self._tokens_built = True
 
     def add_reference(self, ref: SymbolRef) -> None:
         """Register a symbol reference."""
         with self._lock:
-            self.references.setdefault(ref.symbol_name, []).append(ref)
-            if ref.ref_kind == "call" and ref.caller_qualified_name:
-                self.add_call_edge(ref.caller_qualified_name, ref.symbol_name)
+            self._touch_file(ref.file_path)
+            self._add_reference_locked(ref)
+
+    def _add_reference_locked(self, ref: SymbolRef) -> None:
+        row = self._refs.append(ref)
+        if ref.ref_kind == "call" and ref.caller_qualified_name and ref.symbol_name:
+            # Same edge as add_call_edge, reusing the ids interned for the row
+            self._calls.add(
+                self._refs.id_at(row, "caller_qualified_name"),
+                self._refs.id_at(row, "symbol_name"),
+            )
 
     def add_call_edge(self, caller: str, callee: str) -> None:
         """Record that ``caller`` calls ``callee``.
@@ -333,14 +668,12 @@ class CrossRefIndex:
         if not caller or not callee:
             return
         with self._lock:
-            self.call_edges.setdefault(caller, set()).add(callee)
-            self.callers_of.setdefault(callee, set()).add(caller)
+            self._calls.add(self._strings.intern(caller), self._strings.intern(callee))
 
     def add_file_dependency(self, source: str, target: str) -> None:
         """Record that *source* imports from *target*."""
         with self._lock:
-            self.file_dependencies.setdefault(source, set()).add(target)
-            self.file_dependents.setdefault(target, set()).add(source)
+            self._deps.add(self._strings.intern(source), self._strings.intern(target))
 
     def remove_file(self, file_path: str) -> None:
         """Remove all index entries for a file (in-memory and store)."""
@@ -350,67 +683,154 @@ class CrossRefIndex:
     def _remove_file_locked(self, file_path: str) -> None:
         if self._store is not None:
             self._store.remove_file(file_path)
-        # Snapshot callers defined here BEFORE we mutate file_symbols below.
-        callers_in_file = set(self.file_symbols.get(file_path, set()))
+        if self._lazy:
+            # Its stored rows are gone; nothing of it is read from the store again
+            self._overlay_files.add(file_path)
+        # Snapshot callers defined here BEFORE the definitions go.
+        callers_in_file = self._defs.file_keys(file_path)
+        file_id = self._strings.find(file_path)
+        if file_id >= 0 and file_id in self._stored_names:
+            callers_in_file.update(self._strings[i] for i in self._stored_names.pop(file_id))
         # Remove definitions and clean up inverted indexes
-        for qname in list(self.file_symbols.get(file_path, [])):
-            defs = self.definitions.get(qname, [])
-            self.definitions[qname] = [d for d in defs if d.file_path != file_path]
-            if not self.definitions[qname]:
-                del self.definitions[qname]
-                # Clean up inverted indexes — qname fully gone
-                bare = qname.rsplit(".", 1)[-1]
-                s = self._name_to_qnames.get(bare)
-                if s:
-                    s.discard(qname)
-                    if not s:
-                        del self._name_to_qnames[bare]
-                s = self._lower_to_qnames.get(bare.lower())
-                if s:
-                    s.discard(qname)
-                    if not s:
-                        del self._lower_to_qnames[bare.lower()]
-                for token in _split_name_tokens(bare):
-                    s = self._tokens_to_qnames.get(token)
-                    if s:
-                        s.discard(qname)
-                        if not s:
-                            del self._tokens_to_qnames[token]
-        self.file_symbols.pop(file_path, None)
+        gone = self._defs.remove_file(file_path)
+        if self._lazy and callers_in_file:
+            # Other files' definitions of the same names may only be in the
+            # store, and stored-only names never reached the table
+            remaining = self._definitions_for(callers_in_file)
+            gone = [qname for qname in callers_in_file if not remaining[qname]]
+        for qname in gone:
+            self._unindex_name(qname)
 
         # Remove references originating from this file
-        for name, refs in list(self.references.items()):
-            self.references[name] = [r for r in refs if r.file_path != file_path]
-            if not self.references[name]:
-                del self.references[name]
+        self._refs.remove_file(file_path)
 
         # Drop call edges whose caller was defined in this file. We can't
         # reliably attribute callees from the file path alone (callees are
         # bare names), so this is a best-effort scrub keyed on caller.
+        find = self._strings.find
         for caller in callers_in_file:
-            for callee in self.call_edges.pop(caller, set()):
-                rev = self.callers_of.get(callee)
-                if rev is not None:
-                    rev.discard(caller)
-                    if not rev:
-                        del self.callers_of[callee]
-
-        # Remove dependency edges
-        for dep in self.file_dependencies.pop(file_path, set()):
-            dependents = self.file_dependents.get(dep)
-            if dependents:
-                dependents.discard(file_path)
-                if not dependents:
-                    del self.file_dependents[dep]
-
-        # Remove as a dependent target
-        for src in list(self.file_dependents.get(file_path, [])):
-            deps = self.file_dependencies.get(src)
-            if deps:
-                deps.discard(file_path)
-                if not deps:
-                    del self.file_dependencies[src]
-        self.file_dependents.pop(file_path, None)
+            caller_id = find(caller)
+            if caller_id >= 0:
+                self._calls.pop_successors(caller_id)
+
+        # Remove dependency edges, both as importer and as import target
+        if file_id >= 0:
+            self._deps.pop_successors(file_id)
+            self._deps.pop_predecessors(file_id)
+
+    # ------------------------------------------------------------------
+    # Lazy mode: store-backed reads
+    # ------------------------------------------------------------------
+
+    def _touch_file(self, file_path: str) -> None:
+        """Bring a stored file's entries into memory before mutating it."""
+        if not self._lazy or file_path in self._overlay_files:
+            return
+        self._overlay_files.add(file_path)
+        self._stored_names.pop(self._strings.find(file_path), None)
+        if self._store is None:
+            return
+        for s in self._store.load_symbols(file_path):
+            self._add_definition_locked(_location_from_stored(s))
+        for r in self._store.load_references(file_path):
+            self._add_reference_locked(_ref_from_stored(r))
+
+    def _cached(self, kind: str, key: str, fetch: Callable[[], list[Any]]) -> list[Any]:
+        cache_key = (kind, key)
+        rows = self._query_cache.get(cache_key)
+        if rows is None:
+            rows = fetch()
+            self._query_cache[cache_key] = rows
+            if len(self._query_cache) > _LAZY_CACHE_SIZE:
+                self._query_cache.popitem(last=False)
+        else:
+            self._query_cache.move_to_end(cache_key)
+        return rows
+
+    def _stored_refs(self, kind: str, key: str, fetch: Callable[[], list[Any]]) -> list[SymbolRef]:
+        """Stored refs for a query, minus files superseded in memory."""
+        refs = self._cached(kind, key, lambda: [_ref_from_stored(r) for r in fetch()])
+        overlay = self._overlay_files
+        return [r for r in refs if r.file_path not in overlay]
+
+    def _definitions_for(self, qnames: Iterable[str]) -> dict[str, list[SymbolLocation]]:
+        """Definitions per qualified name, from memory and (lazily) the store."""
+        qnames = list(qnames)
+        if not self._lazy:
+            return {qn: self._defs.records(qn) for qn in qnames}
+        result: dict[str, list[SymbolLocation]] = {}
+        missing: list[str] = []
+        for qn in qnames:
+            cached = self._query_cache.get(("def", qn))
+            if cached is None:
+                missing.append(qn)
+            else:
+                self._query_cache.move_to_end(("def", qn))
+                result[qn] = cached
+        if missing and self._store is not None:
+            fetched: dict[str, list[SymbolLocation]] = {qn: [] for qn in missing}
+            for s in self._store.load_symbols_by_qname(missing):
+                fetched[s.qualified_name].append(_location_from_stored(s))
+            for qn, locs in fetched.items():
+                self._cached("def", qn, locs.copy)
+            result.update(fetched)
+        overlay = self._overlay_files
+        return {
+            qn: [
+                loc for loc in result.get(qn, ()) if loc.file_path not in overlay
+            ] + self._defs.records(qn)
+            for qn in qnames
+        }
+
+    def _has_qname(self, qname: str) -> bool:
+        if not self._lazy:
+            return self._defs.has_key(qname)
+        return qname in self._name_to_qnames.get(qname.rsplit(".", 1)[-1], ())
+
+    def _refs_named(self, symbol_name: str) -> list[SymbolRef]:
+        if not self._lazy:
+            return self._refs.records(symbol_name)
+        stored = self._stored_refs(
+            "refs", symbol_name,
+            lambda: self._store.load_references_by_name(symbol_name),
+        )
+        return stored + self._refs.records(symbol_name)
+
+    def _callees(self, caller: str) -> set[str]:
+        stored = self._stored_refs(
+            "callees", caller,
+            lambda: self._store.load_references_by_caller(caller),
+        )
+        callees = {r.symbol_name for r in stored if r.ref_kind == "call"}
+        return callees | self.call_edges.get(caller, set())
+
+    def _callers(self, callee: str) -> set[str]:
+        callers = {
+            r.caller_qualified_name for r in self._refs_named(callee)
+            if r.ref_kind == "call" and r.caller_qualified_name
+        }
+        return callers | self.callers_of.get(callee, set())
+
+    def is_defined_name(self, name: str) -> bool:
+        """True if some definition's bare name is *name*."""
+        return name in self._name_to_qnames
+
+    def get_file_definitions(self, file_path: str) -> list[SymbolLocation]:
+        """All definitions located in *file_path*."""
+        with self._lock:
+            if not self._lazy or file_path in self._overlay_files or self._store is None:
+                return self._file_definitions(file_path)
+            return [_location_from_stored(s) for s in self._store.load_symbols(file_path)]
+
+    def definition_count(self) -> int:
+        """Total number of definitions, including ones only in the store."""
+        with self._lock:
+            in_memory = len(self._defs)
+            if not self._lazy or self._store is None:
+                return in_memory
+            overlay = list(self._overlay_files)
+            stored: int = self._store.count_symbols() - self._store.count_symbols(overlay)
+            return stored + in_memory
 
     # ------------------------------------------------------------------
     # Search
@@ -418,15 +838,22 @@ class CrossRefIndex:
 
     def get_definitions(self, symbol_name: str) -> list[SymbolLocation]:
         """Look up definitions for a symbol (exact or suffix match)."""
-        # Try exact qualified name first
-        if symbol_name in self.definitions:
-            return self.definitions[symbol_name]
-        # Try suffix match (e.g. "discover_files" matches "CodebaseContextManager.discover_files")
-        results: list[SymbolLocation] = []
-        for qname, locs in self.definitions.items():
-            if qname == symbol_name or qname.endswith(f".{symbol_name}"):
-                results.extend(locs)
-        return results
+        with self._lock:
+            if not self._lazy:
+                exact = self._defs.records(symbol_name)
+                if exact:
+                    return exact
+            # Suffix matches ("discover_files" -> "CodebaseContextManager.
+            # discover_files") share the query's last component as bare name
+            suffix = f".{symbol_name}"
+            qnames = sorted(
+                qn for qn in self._name_to_qnames.get(symbol_name.rsplit(".", 1)[-1], ())
+                if qn == symbol_name or qn.endswith(suffix)
+            )
+            if symbol_name in qnames:
+                qnames = [symbol_name]
+            found = self._definitions_for(qnames)
+            return [loc for qn in qnames for loc in found[qn]]
 
     def search_definitions(
         self,
@@ -445,83 +872,102 @@ class CrossRefIndex:
         5. Substring match on bare name (score 0.60)
         6. Token overlap (camelCase/snake_case) (score 0.50)
         """
+        with self._lock:
+            return self._search_definitions_locked(symbol_name, limit, kind_filter)
+
+    def _search_definitions_locked(
+        self, symbol_name: str, limit: int, kind_filter: str,
+    ) -> list[tuple[SymbolLocation, float]]:
         # Collect candidates as {qualified_name: best_match_score}
         candidates: dict[str, float] = {}
+        pending: list[str] = []
+        scored: list[tuple[SymbolLocation, float]] = []
+
+        def add(qnames: Iterable[str], match_score: float) -> None:
+            for qn in qnames:
+                if qn not in candidates:
+                    candidates[qn] = match_score
+                    pending.append(qn)
+
+        def enough(next_band: float) -> bool:
+            # Score the new candidates.  Every later strategy scores below
+            # next_band + _MAX_IMPORTANCE, so once `limit` results reach that
+            # the remaining (most expensive) strategies cannot change the top.
+            found = self._definitions_for(pending)
+            for qn in pending:
+                match_score = candidates[qn]
+                for loc in found[qn]:
+                    if kind_filter and loc.kind != kind_filter:
+                        continue
+                    scored.append((loc, _rank_score(loc, match_score)))
+            pending.clear()
+            ceiling = next_band + _MAX_IMPORTANCE + 1e-9
+            return sum(1 for _, score in scored if score >= ceiling) >= limit
 
         # 1. Exact qualified name
-        if symbol_name in self.definitions:
-            candidates[symbol_name] = 1.0
+        if self._has_qname(symbol_name):
+            add((symbol_name,), 1.0)
 
         # 2. Exact bare name via inverted index — O(1)
-        bare_qnames = self._name_to_qnames.get(symbol_name, set())
-        for qn in bare_qnames:
-            if qn not in candidates:
-                candidates[qn] = 0.95
+        add(self._name_to_qnames.get(symbol_name, ()), 0.95)
 
         # 3. Case-insensitive bare name — O(1)
-        lower_qnames = self._lower_to_qnames.get(symbol_name.lower(), set())
-        for qn in lower_qnames:
-            if qn not in candidates:
-                candidates[qn] = 0.85
-
         name_lower = symbol_name.lower()
+        add(self._lower_to_qnames.get(name_lower, ()), 0.85)
 
-        # 4. Prefix match on bare names — scan index keys
-        for bare, qnames in self._name_to_qnames.items():
-            if bare.lower().startswith(name_lower) and len(bare) > len(symbol_name):
-                for qn in qnames:
-                    if qn not in candidates:
-                        candidates[qn] = 0.75
+        names = self._ensure_name_index()
+
+        # 4. Prefix match on bare names — bisect over the sorted names
+        if not enough(0.75):
+            for lower in names.with_prefix(name_lower):
+                if len(lower) > len(symbol_name):
+                    add(self._lower_to_qnames[lower], 0.75)
 
-        # 5. Substring match on bare names
-        if len(symbol_name) >= 2:
-            for bare, qnames in self._name_to_qnames.items():
-                if name_lower in bare.lower() and bare.lower() != name_lower:
-                    for qn in qnames:
-                        if qn not in candidates:
-                            candidates[qn] = 0.60
+        # 5. Substring match on bare names — trigram postings
+        if len(symbol_name) >= 2 and not enough(0.60):
+            for lower in names.containing(name_lower):
+                if lower != name_lower:
+                    add(self._lower_to_qnames[lower], 0.60)
 
         # 6. Token overlap (camelCase/snake_case)
         query_tokens = set(_split_name_tokens(symbol_name))
-        if query_tokens:
+        if query_tokens and not enough(0.50):
+            self._ensure_token_index()
             token_hits: dict[str, int] = {}
             for token in query_tokens:
-                for qn in self._tokens_to_qnames.get(token, set()):
+                for qn in self._tokens_to_qnames.get(token):
                     if qn not in candidates:
                         token_hits[qn] = token_hits.get(qn, 0) + 1
             for qn, hit_count in token_hits.items():
                 # Score proportional to fraction of query tokens matched
                 score = 0.50 * (hit_count / len(query_tokens))
                 if score >= 0.25:  # at least half the tokens must match
-                    candidates[qn] = score
-
-        if not candidates:
-            return []
-
-        # Resolve candidates to SymbolLocations and compute composite scores
-        scored: list[tuple[SymbolLocation, float]] = []
-        for qname, match_score in candidates.items():
-            locs = self.definitions.get(qname, [])
-            for loc in locs:
-                if kind_filter and loc.kind != kind_filter:
-                    continue
-                score = _rank_score(loc, match_score)
-                scored.append((loc, score))
+                    add((qn,), score)
 
+        # Resolve remaining candidates to SymbolLocations with composite scores
+        enough(0.0)
         scored.sort(key=lambda x: -x[1])
         return scored[:limit]
 
     def get_references(self, symbol_name: str) -> list[SymbolRef]:
         """Look up all call sites / references for a symbol (exact or suffix match)."""
-        # Exact match first
-        if symbol_name in self.references:
-            return self.references[symbol_name]
-        # Suffix match (e.g. "clear" matches refs keyed as "MCPMetaTools.clear")
-        results: list[SymbolRef] = []
-        for ref_name, refs in self.references.items():
-            if ref_name == symbol_name or ref_name.endswith(f".{symbol_name}"):
-                results.extend(refs)
-        return results
+        with self._lock:
+            # Exact match first
+            exact = self._refs_named(symbol_name)
+            if exact:
+                return exact
+            # Suffix match (e.g. "clear" matches refs keyed as "MCPMetaTools.clear")
+            results: list[SymbolRef] = []
+            if self._lazy:
+                results.extend(self._stored_refs(
+                    "refs_suffix", symbol_name,
+                    lambda: self._store.load_references_by_name(symbol_name, suffix=True),
+                ))
+            suffix = f".{symbol_name}"
+            for ref_name in self.references:
+                if ref_name == symbol_name or ref_name.endswith(suffix):
+                    results.extend(self._refs.records(ref_name))
+            return results
 
     def get_dependents(self, file_path: str) -> set[str]:
         """Files that import from *file_path*."""
@@ -539,12 +985,14 @@ class CrossRefIndex:
         """Return symbols called by ``caller`` up to ``depth`` hops.
 
         depth=1 returns direct callees only; depth=N follows up to N hops
-        through the in-memory ``call_edges`` map. Cycles are handled by
+        through ``call_edges`` (or the store, when lazy). Cycles are handled by
         an internal visited set so the traversal always terminates.
         """
         if depth < 1:
             return set()
         with self._lock:
+            if not self._lazy:
+                return self._reach(caller, depth, reverse=False)
             visited: set[str] = set()
             frontier: set[str] = {caller}
             result: set[str] = set()
@@ -554,7 +1002,7 @@ class CrossRefIndex:
                     if node in visited:
                         continue
                     visited.add(node)
-                    callees = self.call_edges.get(node, set())
+                    callees = self._callees(node)
                     result.update(callees)
                     next_frontier.update(callees - visited)
                 if not next_frontier:
@@ -567,6 +1015,8 @@ class CrossRefIndex:
         if depth < 1:
             return set()
         with self._lock:
+            if not self._lazy:
+                return self._reach(callee, depth, reverse=True)
             visited: set[str] = set()
             frontier: set[str] = {callee}
             result: set[str] = set()
@@ -576,7 +1026,7 @@ class CrossRefIndex:
                     if node in visited:
                         continue
                     visited.add(node)
-                    callers = self.callers_of.get(node, set())
+                    callers = self._callers(node)
                     result.update(callers)
                     next_frontier.update(callers - visited)
                 if not next_frontier:
@@ -584,6 +1034,18 @@ class CrossRefIndex:
                 frontier = next_frontier
             return result
 
+    def _reach(self, start: str, depth: int, *, reverse: bool) -> set[str]:
+        """In-memory traversal over interned ids, decoding only the result."""
+        start_id = self._strings.find(start)
+        if start_id < 0:
+            return set()
+        strings = self._strings
+        return {strings[i] for i in self._calls.reach(start_id, depth, reverse=reverse)}
+
+
+# Largest bonus _rank_score adds on top of a match score
+_MAX_IMPORTANCE = 0.02 + 0.03 + 0.05
+
 
 def _rank_score(loc: SymbolLocation, match_score: float) -> float:
     """Composite ranking combining match quality and symbol importance."""
@@ -0,0 +1,203 @@
+"""Stat-keyed cache of per-file discovery results.
+
+``CodebaseContextManager.discover_files`` used to open every recognized
+source file to count its lines on each refresh.  :class:`DiscoveryCache`
+remembers the line count of each file under its ``(mtime_ns, size,
+inode)`` stat key, so a refresh only reads files whose stat changed.  It
+also keeps each source file's imported module names under the same key,
+so the dependency graph can be brought up to date without re-parsing
+unchanged files.
+
+When the project already has a ``.attocode`` directory the entries are
+persisted in a ``discovery`` table of ``.attocode/index/symbols.db`` (the
+database ``IndexStore`` uses), so a new process starts warm.  Otherwise
+the cache lives in memory for the manager's lifetime.
+
+Set ``ATTOCODE_DISCOVERY_CACHE=0`` to disable persistence.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+
+logger = logging.getLogger(__name__)
+
+_DISABLE_ENV = "ATTOCODE_DISCOVERY_CACHE"
+
+# rel_path -> (mtime_ns, size, inode, line_count)
+_Row = tuple[int, int, int, int]
+# rel_path -> ((mtime_ns, size, inode), imported module names)
+_ImportRow = tuple[tuple[int, int, int], tuple[str, ...]]
+
+
+def _db_path_for(root_dir: str) -> str | None:
+    if os.environ.get(_DISABLE_ENV, "").strip().lower() in ("0", "false", "no", "off"):
+        return None
+    attocode_dir = os.path.join(root_dir, ".attocode")
+    if not os.path.isdir(attocode_dir):
+        return None
+    return os.path.join(attocode_dir, "index", "symbols.db")
+
+
+@dataclass(slots=True)
+class DiscoveryCache:
+    """Line counts and import lists keyed by relative path and stat signature.
+
+    Usage::
+
+        cache = DiscoveryCache.open(root_dir)
+        count = cache.line_count(rel, st)
+        if count is None:
+            count = ...  # read the file
+            cache.store(rel, st, count)
+        cache.save(seen_paths)
+    """
+
+    db_path: str | None = None
+    _rows: dict[str, _Row] = field(default_factory=dict, repr=False)
+    _changed: dict[str, _Row] = field(default_factory=dict, repr=False)
+    _imports: dict[str, _ImportRow] = field(default_factory=dict, repr=False)
+    _changed_imports: dict[str, _ImportRow] = field(default_factory=dict, repr=False)
+    _loaded: bool = field(default=False, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @classmethod
+    def open(cls, root_dir: str) -> DiscoveryCache:
+        return cls(db_path=_db_path_for(root_dir))
+
+    def __len__(self) -> int:
+        self._load()
+        return len(self._rows)
+
+    def line_count(self, rel_path: str, st: os.stat_result) -> int | None:
+        """Cached line count for *rel_path*, or None if its stat changed."""
+        self._load()
+        row = self._rows.get(rel_path)
+        if row is None:
+            return None
+        if row[0] != st.st_mtime_ns or row[1] != st.st_size or row[2] != st.st_ino:
+            return None
+        return row[3]
+
+    def store(self, rel_path: str, st: os.stat_result, line_count: int) -> None:
+        row = (st.st_mtime_ns, st.st_size, st.st_ino, line_count)
+        with self._lock:
+            self._rows[rel_path] = row
+            self._changed[rel_path] = row
+
+    def imports(self, rel_path: str, key: tuple[int, int, int]) -> tuple[str, ...] | None:
+        """Cached imported module names for *rel_path* at stat *key*, or None."""
+        self._load()
+        row = self._imports.get(rel_path)
+        if row is None or row[0] != key:
+            return None
+        return row[1]
+
+    def store_imports(
+        self, rel_path: str, key: tuple[int, int, int], modules: tuple[str, ...],
+    ) -> None:
+        row = (key, modules)
+        with self._lock:
+            self._imports[rel_path] = row
+            self._changed_imports[rel_path] = row
+
+    def save(self, seen: set[str] | None = None) -> None:
+        """Persist stored entries; drop entries not in *seen* when given."""
+        self._load()
+        with self._lock:
+            gone = [p for p in self._rows if p not in seen] if seen is not None else []
+            for path in gone:
+                del self._rows[path]
+            gone_imports = (
+                [p for p in self._imports if p not in seen] if seen is not None else []
+            )
+            for path in gone_imports:
+                del self._imports[path]
+            changed = self._changed
+            self._changed = {}
+            changed_imports = self._changed_imports
+            self._changed_imports = {}
+        if self.db_path is None or not (changed or gone or changed_imports or gone_imports):
+            return
+        try:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO discovery "
+                        "(path, mtime_ns, size, inode, line_count) VALUES (?, ?, ?, ?, ?)",
+                        [(p, *row) for p, row in changed.items()],
+                    )
+                    conn.executemany(
+                        "DELETE FROM discovery WHERE path = ?", [(p,) for p in gone],
+                    )
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO discovery_imports "
+                        "(path, mtime_ns, size, inode, modules) VALUES (?, ?, ?, ?, ?)",
+                        [
+                            (p, *key, json.dumps(modules))
+                            for p, (key, modules) in changed_imports.items()
+                        ],
+                    )
+                    conn.executemany(
+                        "DELETE FROM discovery_imports WHERE path = ?",
+                        [(p,) for p in gone_imports],
+                    )
+            finally:
+                conn.close()
+        except sqlite3.Error as exc:
+            logger.debug("Discovery cache write failed for %s: %s", self.db_path, exc)
+
+    def _connect(self) -> sqlite3.Connection:
+        assert self.db_path is not None
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=5.0)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS discovery ("
+            "path TEXT PRIMARY KEY, mtime_ns INTEGER NOT NULL, size INTEGER NOT NULL, "
+            "inode INTEGER NOT NULL, line_count INTEGER NOT NULL)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS discovery_imports ("
+            "path TEXT PRIMARY KEY, mtime_ns INTEGER NOT NULL, size INTEGER NOT NULL, "
+            "inode INTEGER NOT NULL, modules TEXT NOT NULL)"
+        )
+        return conn
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            if self.db_path is None or not os.path.exists(self.db_path):
+                return
+            try:
+                conn = self._connect()
+                try:
+                    rows = conn.execute(
+                        "SELECT path, mtime_ns, size, inode, line_count FROM discovery"
+                    ).fetchall()
+                    import_rows = conn.execute(
+                        "SELECT path, mtime_ns, size, inode, modules FROM discovery_imports"
+                    ).fetchall()
+                finally:
+                    conn.close()
+            except sqlite3.Error as exc:
+                logger.debug("Discovery cache read failed for %s: %s", self.db_path, exc)
+                return
+            for path, *row in rows:
+                self._rows.setdefault(path, tuple(row))  # type: ignore[arg-type]
+            for path, mtime_ns, size, inode, modules in import_rows:
+                try:
+                    names = tuple(json.loads(modules))
+                except ValueError:
+                    continue
+                self._imports.setdefault(path, ((mtime_ns, size, inode), names))
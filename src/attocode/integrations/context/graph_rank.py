@@ -0,0 +1,243 @@
+"""Sparse PageRank for file dependency graphs.
+
+``DependencyGraph.pagerank`` and ``repo_ranker.pagerank`` used to run
+power iteration over dicts of sets, visiting every importer of every node
+in Python on each round.  :class:`LinkMatrix` interns node names to dense
+ids once and keeps the links as parallel ``src``/``dst`` id arrays, so a
+round is one weighted ``np.bincount`` over the edge list: a sparse
+matrix-vector product that costs a few milliseconds on 100k-node graphs.
+
+:func:`power_iteration` also takes
+
+* a *start* vector (e.g. the previous scores remapped with
+  :meth:`LinkMatrix.vector`), so re-ranking after a few edge changes
+  converges in a handful of rounds instead of from uniform, and
+* a *teleport* distribution for personalized PageRank, which ranks nodes
+  by proximity to a seed set (the files a task is about).
+
+Without numpy the same iteration runs over Python lists.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Literal
+
+try:
+    import numpy as np
+
+    _HAS_NUMPY = True
+except ImportError:
+    np = None  # type: ignore[assignment]
+    _HAS_NUMPY = False
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping
+
+
+@dataclass(slots=True)
+class LinkMatrix:
+    """Directed links between interned node ids.
+
+    ``src[k] -> dst[k]`` is the k-th link; ``out_degree[i]`` counts the
+    links leaving node ``i`` (duplicates included).
+    """
+
+    nodes: list[str]
+    index: dict[str, int]
+    src: Any
+    dst: Any
+    out_degree: Any
+
+    @classmethod
+    def from_adjacency(
+        cls,
+        adjacency: Mapping[str, Iterable[str]],
+        nodes: Iterable[str] = (),
+        *,
+        undirected: bool = False,
+    ) -> LinkMatrix:
+        """Intern *adjacency* (node -> linked nodes).
+
+        *nodes* adds nodes that may have no links; *undirected* adds the
+        reverse of every link.
+        """
+        index: dict[str, int] = {}
+        intern = index.setdefault
+        for node in nodes:
+            intern(node, len(index))
+        src: list[int] = []
+        dst: list[int] = []
+        for source, targets in adjacency.items():
+            s = intern(source, len(index))
+            ids = [intern(t, len(index)) for t in targets]
+            dst.extend(ids)
+            src.extend([s] * len(ids))
+        if undirected:
+            src, dst = src + dst, dst + src
+        n = len(index)
+        if _HAS_NUMPY:
+            src_ids: Any = np.asarray(src, dtype=np.int64)
+            dst_ids: Any = np.asarray(dst, dtype=np.int64)
+            out_degree: Any = np.bincount(src_ids, minlength=n).astype(np.float64)
+        else:
+            src_ids, dst_ids = src, dst
+            out_degree = [0.0] * n
+            for s in src:
+                out_degree[s] += 1.0
+        return cls(nodes=list(index), index=index, src=src_ids, dst=dst_ids, out_degree=out_degree)
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def vector(self, values: Mapping[str, float], default: float = 0.0) -> Any:
+        """Per-node vector of *values*, *default* for nodes not in it."""
+        if _HAS_NUMPY:
+            return np.fromiter(
+                (values.get(node, default) for node in self.nodes),
+                dtype=np.float64,
+                count=len(self.nodes),
+            )
+        return [values.get(node, default) for node in self.nodes]
+
+    def to_dict(self, vector: Any, *, normalize: bool = False) -> dict[str, float]:
+        """Map *vector* back to node names, scaled to a max of 1.0 if *normalize*."""
+        if normalize:
+            top = float(max(vector)) if not _HAS_NUMPY else float(vector.max())
+            if top > 0:
+                vector = vector / top if _HAS_NUMPY else [v / top for v in vector]
+        values = vector.tolist() if _HAS_NUMPY else vector
+        return dict(zip(self.nodes, values, strict=True))
+
+
+def power_iteration(
+    matrix: LinkMatrix,
+    *,
+    damping: float = 0.85,
+    iterations: int = 20,
+    tolerance: float = 1e-6,
+    teleport: Any = None,
+    start: Any = None,
+    redistribute_dangling: bool = False,
+    metric: Literal["max", "l1"] = "max",
+) -> tuple[Any, int]:
+    """Run PageRank power iteration on *matrix*.
+
+    Args:
+        matrix: Interned links.
+        damping: Probability of following a link.
+        iterations: Maximum rounds.
+        tolerance: Stop once the change between rounds (max-abs or L1,
+            per *metric*) drops below this.
+        teleport: Per-node jump distribution summing to 1 (personalized
+            PageRank); uniform when None.
+        start: Initial scores; the teleport distribution when None.
+        redistribute_dangling: Spread the rank of nodes without outgoing
+            links over *teleport* instead of dropping it.
+        metric: Convergence measure.
+
+    Returns:
+        ``(scores, rounds)`` where *scores* is a per-node vector.
+    """
+    n = len(matrix)
+    if not _HAS_NUMPY:
+        return _power_iteration_py(
+            matrix, damping, iterations, tolerance, teleport, start,
+            redistribute_dangling, metric,
+        )
+    jump = np.full(n, 1.0 / n) if teleport is None else np.asarray(teleport, dtype=np.float64)
+    scores = jump.copy() if start is None else np.array(start, dtype=np.float64)
+    out = matrix.out_degree
+    linked = out > 0
+    weight = np.zeros(n)
+    weight[linked] = damping / out[linked]
+    dangling = ~linked
+    base = (1.0 - damping) * jump
+    src, dst = matrix.src, matrix.dst
+
+    rounds = 0
+    while rounds < iterations:
+        rounds += 1
+        new = base + np.bincount(dst, weights=(scores * weight)[src], minlength=n)
+        if redistribute_dangling:
+            new += (damping * scores[dangling].sum()) * jump
+        delta = np.abs(new - scores)
+        diff = delta.max() if metric == "max" else delta.sum()
+        scores = new
+        if diff < tolerance:
+            break
+    return scores, rounds
+
+
+def _power_iteration_py(
+    matrix: LinkMatrix,
+    damping: float,
+    iterations: int,
+    tolerance: float,
+    teleport: Any,
+    start: Any,
+    redistribute_dangling: bool,
+    metric: str,
+) -> tuple[list[float], int]:
+    n = len(matrix)
+    jump = [1.0 / n] * n if teleport is None else list(teleport)
+    scores = list(jump) if start is None else list(start)
+    out = matrix.out_degree
+    weight = [damping / d if d else 0.0 for d in out]
+    dangling = [i for i in range(n) if not out[i]]
+    pairs = list(zip(matrix.src, matrix.dst, strict=True))
+
+    rounds = 0
+    while rounds < iterations:
+        rounds += 1
+        leaked = damping * sum(scores[i] for i in dangling) if redistribute_dangling else 0.0
+        new = [(1.0 - damping + leaked) * j for j in jump]
+        for s, d in pairs:
+            new[d] += scores[s] * weight[s]
+        deltas = [abs(a - b) for a, b in zip(new, scores, strict=True)]
+        diff = max(deltas) if metric == "max" else sum(deltas)
+        scores = new
+        if diff < tolerance:
+            break
+    return scores, rounds
+
+
+def teleport_vector(matrix: LinkMatrix, seeds: Mapping[str, float]) -> Any:
+    """Normalized jump distribution over the *seeds* present in *matrix*.
+
+    Returns None when no seed is a node of the graph.
+    """
+    weights = {node: w for node, w in seeds.items() if w > 0 and node in matrix.index}
+    total = sum(weights.values())
+    if not total:
+        return None
+    return matrix.vector({node: w / total for node, w in weights.items()})
+
+
+def personalized_rank(
+    adjacency: Mapping[str, Iterable[str]],
+    seeds: Mapping[str, float],
+    *,
+    damping: float = 0.85,
+    iterations: int = 50,
+    tolerance: float = 1e-9,
+    undirected: bool = False,
+) -> dict[str, float]:
+    """PageRank of *adjacency* restarted at *seeds* (node -> weight).
+
+    Scores sum to 1; nodes unreachable from the seeds score 0.  Falls back
+    to ordinary PageRank when no seed is in the graph.
+    """
+    matrix = LinkMatrix.from_adjacency(adjacency, undirected=undirected)
+    if not len(matrix):
+        return {}
+    scores, _ = power_iteration(
+        matrix,
+        damping=damping,
+        iterations=iterations,
+        tolerance=tolerance,
+        teleport=teleport_vector(matrix, seeds),
+        redistribute_dangling=True,
+        metric="l1",
+    )
+    return matrix.to_dict(scores)
@@ -0,0 +1,185 @@
+"""Brute-force line search used when the trigram index cannot narrow the search.
+
+Two halves:
+
+- :func:`iter_search_files` lists a directory in ``sorted(root.rglob("*"))``
+  order from the shared workspace snapshot, minus what the trigram index
+  never indexes (``_SKIP_DIRS``, dot-directories, ``_SKIP_EXTENSIONS``,
+  dot-files) and anything matched by the project's ``.gitignore``.
+- :func:`grep_files` reads and matches files on a thread pool, consumes the
+  results strictly in input order, and stops submitting work as soon as
+  *max_results* matching lines are collected.
+"""
+
+from __future__ import annotations
+
+import itertools
+import logging
+import os
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from attocode.integrations.context.trigram_index import _SKIP_DIRS, _SKIP_EXTENSIONS
+from attocode.integrations.context.workspace import read_text, workspace_snapshot
+
+if TYPE_CHECKING:
+    import re
+    from collections.abc import Iterable, Iterator
+
+    from attocode.integrations.utilities.ignore import IgnoreManager
+
+logger = logging.getLogger(__name__)
+
+_MAX_WORKERS: int = 8      # Reads release the GIL; matching does not, so more threads stop helping
+_QUEUE_PER_WORKER: int = 4  # In-flight files per worker; bounds read-ahead past max_results
+
+
+# ---------------------------------------------------------------------------
+# File enumeration
+# ---------------------------------------------------------------------------
+
+
+def _load_ignore(project_dir: Path) -> IgnoreManager | None:
+    try:
+        from attocode.integrations.utilities.ignore import IgnoreManager
+
+        return IgnoreManager(root=project_dir)
+    except Exception:
+        logger.debug("grep_scan: .gitignore unavailable", exc_info=True)
+        return None
+
+
+def iter_search_files(root: Path, project_dir: Path | None = None) -> Iterator[Path]:
+    """Yield the searchable files under *root* in sorted path order.
+
+    Files come from the shared workspace snapshot of *project_dir*, in
+    ``sorted(root.rglob("*"))`` order, minus ``_SKIP_EXTENSIONS``,
+    dot-files and paths inside ``_SKIP_DIRS`` or matched by the project's
+    ``.gitignore``.
+
+    Args:
+        root: Directory to walk.
+        project_dir: Project root whose ``.gitignore`` applies; paths are
+            matched relative to it.  Defaults to *root*.
+    """
+    base = project_dir if project_dir is not None else root
+    ignore = _load_ignore(base)
+    snapshot = workspace_snapshot(str(base))
+    try:
+        root_rel = os.path.relpath(os.path.realpath(root), snapshot.root)
+        listed = snapshot.files(root_rel, skip_dirs=_SKIP_DIRS)
+    except ValueError:
+        ignore = None  # .gitignore of another tree does not apply
+        snapshot = workspace_snapshot(str(root))
+        root_rel = "."
+        listed = snapshot.files(skip_dirs=_SKIP_DIRS)
+    prefix = "" if root_rel == "." else root_rel + os.sep
+    skipped: dict[str, bool] = {}
+
+    def skipped_dir(rel_dir: str) -> bool:
+        """Whether *rel_dir* (below *root*) or a parent is ``.gitignore``d."""
+        if not rel_dir:
+            return False
+        hit = skipped.get(rel_dir)
+        if hit is None:
+            parent = os.path.dirname(rel_dir)
+            hit = skipped_dir(parent) or (
+                ignore is not None
+                and ignore.is_ignored(Path(prefix + rel_dir).as_posix() + "/")
+            )
+            skipped[rel_dir] = hit
+        return hit
+
+    for entry in listed:
+        rel = entry.rel_path[len(prefix):]
+        rel_dir, name = os.path.split(rel)
+        if name.startswith(".") or os.path.splitext(name)[1].lower() in _SKIP_EXTENSIONS:
+            continue
+        if skipped_dir(rel_dir):
+            continue
+        if ignore is not None and ignore.is_ignored(Path(entry.rel_path).as_posix()):
+            continue
+        yield root / rel
+
+
+# ---------------------------------------------------------------------------
+# Parallel matching
+# ---------------------------------------------------------------------------
+
+
+def _grep_file(path: Path, regex: re.Pattern[str], limit: int) -> list[tuple[int, str]]:
+    """Return up to *limit* ``(line_no, line)`` matches of *regex* in *path*."""
+    if not path.is_file() or path.name.startswith("."):
+        return []
+    try:
+        content = read_text(str(path), errors="strict")
+    except (UnicodeDecodeError, OSError):
+        return []
+    hits: list[tuple[int, str]] = []
+    for i, line in enumerate(content.splitlines(), 1):
+        if regex.search(line):
+            hits.append((i, line))
+            if len(hits) >= limit:
+                break
+    return hits
+
+
+def grep_files(
+    regex: re.Pattern[str],
+    files: Iterable[Path],
+    *,
+    max_results: int,
+    workers: int | None = None,
+) -> list[tuple[Path, int, str]]:
+    """Match *regex* line by line across *files*, in parallel.
+
+    Results come back in the order of *files* (and line order within a
+    file), exactly as a serial loop would produce them.  At most
+    ``workers * _QUEUE_PER_WORKER`` files are in flight; once
+    *max_results* lines are collected, queued reads are cancelled and the
+    rest of *files* is never pulled.
+
+    Args:
+        regex: Compiled pattern, matched against single lines.
+        files: Files to search (may be a lazy iterator).
+        max_results: Stop after this many matching lines.
+        workers: Thread count; defaults to ``min(8, cpu_count)``.
+
+    Returns:
+        ``[(path, line_no, line)]`` with 1-based line numbers.
+    """
+    matches: list[tuple[Path, int, str]] = []
+    if max_results <= 0:
+        return matches
+    if workers is None:
+        workers = min(_MAX_WORKERS, os.cpu_count() or 1)
+    file_iter = iter(files)
+
+    if workers <= 1:
+        for path in file_iter:
+            for line_no, line in _grep_file(path, regex, max_results - len(matches)):
+                matches.append((path, line_no, line))
+            if len(matches) >= max_results:
+                break
+        return matches
+
+    window = workers * _QUEUE_PER_WORKER
+    pending: deque[tuple[Path, Future[list[tuple[int, str]]]]] = deque()
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="grep-scan")
+    try:
+        for path in itertools.islice(file_iter, window):
+            pending.append((path, pool.submit(_grep_file, path, regex, max_results)))
+        while pending:
+            path, future = pending.popleft()
+            nxt = next(file_iter, None)
+            if nxt is not None:
+                pending.append((nxt, pool.submit(_grep_file, nxt, regex, max_results)))
+            for line_no, line in future.result():
+                matches.append((path, line_no, line))
+                if len(matches) >= max_results:
+                    return matches
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    return matches
@@ -0,0 +1,140 @@
+"""Bounded cache of tree-sitter trees for incremental re-parsing.
+
+After an edit, ``ASTService.notify_file_changed`` and
+``CodebaseContextManager.update_dirty_files`` used to re-parse the whole
+file.  :class:`TreeCache` keeps the last :class:`TSParseState` (tree,
+source bytes and per-node symbols) for recently edited files, so the next
+parse of the same file goes through :func:`ts_reparse_file`: the edit is
+applied to the old tree, tree-sitter reparses only what it touched, and
+symbols are re-extracted only for the top-level nodes that changed.
+
+Entries are evicted least-recently-used once the cache holds more than
+``max_files`` files or ``max_bytes`` of source.  Languages without a
+tree-sitter grammar fall through to :func:`parse_file`.
+
+``ATTOCODE_TREE_CACHE`` sets the file limit; ``0`` disables the cache.
+"""
+
+from __future__ import annotations
+
+import functools
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from attocode.integrations.context.codebase_ast import (
+    FileAST,
+    _ts_result_to_file_ast,
+    detect_language,
+    parse_file,
+)
+
+if TYPE_CHECKING:
+    from attocode.integrations.context.ts_parser import TSParseState
+
+logger = logging.getLogger(__name__)
+
+_SIZE_ENV = "ATTOCODE_TREE_CACHE"
+_DEFAULT_MAX_FILES = 32
+_DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+
+class TreeCache:
+    """LRU of the last tree-sitter parse per file, keyed by absolute path."""
+
+    def __init__(
+        self,
+        max_files: int = _DEFAULT_MAX_FILES,
+        max_bytes: int = _DEFAULT_MAX_BYTES,
+    ) -> None:
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        self._states: OrderedDict[str, TSParseState] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def __contains__(self, file_path: object) -> bool:
+        return isinstance(file_path, str) and os.path.abspath(file_path) in self._states
+
+    def parse(self, file_path: str, content: str | None = None) -> FileAST:
+        """Parse *file_path*, reusing its cached tree when there is one.
+
+        Drop-in replacement for :func:`parse_file`.
+        """
+        if content is None:
+            try:
+                content = Path(file_path).read_text(encoding="utf-8", errors="replace")
+            except OSError:
+                self.discard(file_path)
+                return FileAST(path=file_path, language="unknown")
+        if self.max_files <= 0:
+            return parse_file(file_path, content)
+
+        from attocode.integrations.context.ts_parser import LANGUAGE_CONFIGS
+
+        key = os.path.abspath(file_path)
+        language = detect_language(file_path)
+        previous = self._pop(key)
+        if language not in LANGUAGE_CONFIGS:
+            return parse_file(file_path, content)
+        try:
+            from attocode.integrations.context.ts_parser import ts_reparse_file
+
+            state = ts_reparse_file(file_path, content, language, previous)
+        except ImportError:
+            state = None
+        if state is None:
+            return parse_file(file_path, content)
+
+        self._put(key, state)
+        result = _ts_result_to_file_ast(state.result, file_path)
+        result.parsing_tier = "tree_sitter"
+        return result
+
+    def discard(self, file_path: str) -> None:
+        """Forget the cached tree for *file_path* (deleted or renamed)."""
+        self._pop(os.path.abspath(file_path))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._states.clear()
+            self._bytes = 0
+
+    def _pop(self, key: str) -> TSParseState | None:
+        with self._lock:
+            state = self._states.pop(key, None)
+            if state is not None:
+                self._bytes -= len(state.source)
+            return state
+
+    def _put(self, key: str, state: TSParseState) -> None:
+        size = len(state.source)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._states.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old.source)
+            self._states[key] = state
+            self._bytes += size
+            while len(self._states) > self.max_files or self._bytes > self.max_bytes:
+                _, evicted = self._states.popitem(last=False)
+                self._bytes -= len(evicted.source)
+
+
+@functools.lru_cache(maxsize=1)
+def shared_tree_cache() -> TreeCache:
+    """Process-wide :class:`TreeCache` used by the edit-notification paths."""
+    raw = os.environ.get(_SIZE_ENV, "").strip()
+    try:
+        max_files = int(raw) if raw else _DEFAULT_MAX_FILES
+    except ValueError:
+        logger.warning("Ignoring invalid %s=%r", _SIZE_ENV, raw)
+        max_files = _DEFAULT_MAX_FILES
+    return TreeCache(max_files=max_files)
@@ -20,6 +20,14 @@ logger = logging.getLogger(__name__)
 
 SCHEMA_VERSION = "3"
 
+# Bound variables per ``IN (...)`` query; SQLite's default limit is 999
+_IN_CHUNK = 500
+
+_SYMBOL_COLUMNS = "id, file_path, name, qualified_name, kind, line, end_line, source"
+_REF_COLUMNS = (
+    "id, file_path, symbol_name, ref_kind, line, col, source, caller_qualified_name"
+)
+
 
 @dataclass(slots=True)
 class StoredFile:
@@ -365,22 +373,48 @@ class IndexStore:
         with self._lock:
             if file_path:
                 rows = conn.execute(
-                    "SELECT id, file_path, name, qualified_name, kind, line, end_line, source "
-                    "FROM symbols WHERE file_path = ?",
+                    f"SELECT {_SYMBOL_COLUMNS} FROM symbols WHERE file_path = ?",
                     (file_path,),
                 ).fetchall()
             else:
-                rows = conn.execute(
-                    "SELECT id, file_path, name, qualified_name, kind, line, end_line, source "
-                    "FROM symbols"
-                ).fetchall()
-        return [
-            StoredSymbol(
-                id=r[0], file_path=r[1], name=r[2], qualified_name=r[3],
-                kind=r[4], line=r[5], end_line=r[6], source=r[7],
-            )
-            for r in rows
-        ]
+                rows = conn.execute(f"SELECT {_SYMBOL_COLUMNS} FROM symbols").fetchall()
+        return [StoredSymbol(*r) for r in rows]
+
+    def load_symbols_by_qname(self, qualified_names: list[str]) -> list[StoredSymbol]:
+        """Load symbols whose qualified name is in *qualified_names*."""
+        conn = self._get_conn()
+        rows: list[tuple[Any, ...]] = []
+        with self._lock:
+            for i in range(0, len(qualified_names), _IN_CHUNK):
+                chunk = qualified_names[i:i + _IN_CHUNK]
+                rows.extend(conn.execute(
+                    f"SELECT {_SYMBOL_COLUMNS} FROM symbols "
+                    f"WHERE qualified_name IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall())
+        return [StoredSymbol(*r) for r in rows]
+
+    def load_symbol_names(self) -> list[tuple[str, str]]:
+        """All ``(file_path, qualified_name)`` pairs, without the other columns."""
+        conn = self._get_conn()
+        with self._lock:
+            return conn.execute("SELECT file_path, qualified_name FROM symbols").fetchall()
+
+    def count_symbols(self, file_paths: list[str] | None = None) -> int:
+        """Number of stored symbols, optionally only those in *file_paths*."""
+        conn = self._get_conn()
+        with self._lock:
+            if file_paths is None:
+                return conn.execute("SELECT COUNT(*) FROM symbols").fetchone()[0]
+            total = 0
+            for i in range(0, len(file_paths), _IN_CHUNK):
+                chunk = file_paths[i:i + _IN_CHUNK]
+                total += conn.execute(
+                    "SELECT COUNT(*) FROM symbols "
+                    f"WHERE file_path IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchone()[0]
+            return total
 
     # ------------------------------------------------------------------
     # References
@@ -418,23 +452,53 @@ class IndexStore:
         with self._lock:
             if file_path:
                 rows = conn.execute(
-                    "SELECT id, file_path, symbol_name, ref_kind, line, col, "
-                    "source, caller_qualified_name FROM refs WHERE file_path = ?",
+                    f"SELECT {_REF_COLUMNS} FROM refs WHERE file_path = ?",
                     (file_path,),
                 ).fetchall()
             else:
+                rows = conn.execute(f"SELECT {_REF_COLUMNS} FROM refs").fetchall()
+        return [StoredReference(*r) for r in rows]
+
+    def load_references_by_name(
+        self, symbol_name: str, *, suffix: bool = False,
+    ) -> list[StoredReference]:
+        """Load references to *symbol_name*.
+
+        With *suffix*, match names ending in ``.<symbol_name>`` instead
+        (``clear`` finds refs keyed ``MCPMetaTools.clear``).  That form
+        cannot use ``ix_refs_symbol`` and scans the table.
+        """
+        conn = self._get_conn()
+        with self._lock:
+            if not suffix:
                 rows = conn.execute(
-                    "SELECT id, file_path, symbol_name, ref_kind, line, col, "
-                    "source, caller_qualified_name FROM refs"
+                    f"SELECT {_REF_COLUMNS} FROM refs WHERE symbol_name = ?",
+                    (symbol_name,),
                 ).fetchall()
+            else:
+                escaped = (
+                    symbol_name.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+                )
+                rows = conn.execute(
+                    f"SELECT {_REF_COLUMNS} FROM refs WHERE symbol_name LIKE ? ESCAPE '\\'",
+                    (f"%.{escaped}",),
+                ).fetchall()
+        tail = f".{symbol_name}"
         return [
-            StoredReference(
-                id=r[0], file_path=r[1], symbol_name=r[2], ref_kind=r[3],
-                line=r[4], column=r[5], source=r[6], caller_qualified_name=r[7],
-            )
-            for r in rows
+            StoredReference(*r) for r in rows
+            if not suffix or r[2].endswith(tail)  # LIKE is case-insensitive
         ]
 
+    def load_references_by_caller(self, caller_qualified_name: str) -> list[StoredReference]:
+        """Load references made from inside *caller_qualified_name*."""
+        conn = self._get_conn()
+        with self._lock:
+            rows = conn.execute(
+                f"SELECT {_REF_COLUMNS} FROM refs WHERE caller_qualified_name = ?",
+                (caller_qualified_name,),
+            ).fetchall()
+        return [StoredReference(*r) for r in rows]
+
     # ------------------------------------------------------------------
     # Dependencies
     # ------------------------------------------------------------------
@@ -485,6 +549,45 @@ class IndexStore:
     # Bulk operations
     # ------------------------------------------------------------------
 
+    def save_symbols_and_references_batch(
+        self,
+        file_paths: list[str],
+        symbol_rows: list[tuple[str, str, str, str, int, int, str]],
+        ref_rows: list[tuple[str, str, str, int, int, str, str]],
+    ) -> None:
+        """Replace symbols and refs for *file_paths* in one transaction.
+
+        Rows are tuples in column order: ``(file_path, name, qualified_name,
+        kind, line, end_line, source)`` for symbols and ``(file_path,
+        symbol_name, ref_kind, line, col, source, caller_qualified_name)``
+        for refs.  Used for full-index persistence, where per-file
+        ``save_symbols``/``save_references`` calls would commit twice per
+        file.
+        """
+        conn = self._get_conn()
+        paths = [(p,) for p in file_paths]
+        with self._lock:
+            try:
+                conn.executemany("DELETE FROM symbols WHERE file_path = ?", paths)
+                conn.executemany("DELETE FROM refs WHERE file_path = ?", paths)
+                conn.executemany(
+                    """INSERT INTO symbols
+                       (file_path, name, qualified_name, kind, line, end_line, source)
+                       VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                    symbol_rows,
+                )
+                conn.executemany(
+                    """INSERT INTO refs
+                       (file_path, symbol_name, ref_kind, line, col, source,
+                        caller_qualified_name)
+                       VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                    ref_rows,
+                )
+            except sqlite3.Error:
+                conn.rollback()
+                raise
+            conn.commit()
+
     def clear_all(self) -> None:
         """Drop all data (keeps schema)."""
         conn = self._get_conn()
@@ -0,0 +1,178 @@
+"""Inverted postings for the BM25 keyword index.
+
+:class:`KeywordPostings` maps every term to two parallel arrays -- the ids
+of the documents that contain it (ascending) and the term's frequency in
+each -- plus one length per document.  Scoring walks only the postings of
+the query terms (term-at-a-time), so a query costs in proportion to how
+many documents contain its terms, not to the size of the corpus.
+
+Arrays are ``array.array`` so they round-trip through the kw-cache SQLite
+as raw little-endian blobs.  Scoring views them through NumPy when it is
+installed and falls back to plain loops otherwise.
+"""
+
+from __future__ import annotations
+
+import math
+import sys
+from array import array
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+try:
+    import numpy as np
+
+    _HAS_NUMPY = True
+except ImportError:
+    np = None  # type: ignore[assignment]
+    _HAS_NUMPY = False
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+_BIG_ENDIAN = sys.byteorder == "big"
+
+
+def _int_array(values: Iterable[int] = ()) -> array[int]:
+    return array("i", values)
+
+
+def _to_blob(values: array[int]) -> bytes:
+    if _BIG_ENDIAN:
+        values = array("i", values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_blob(blob: bytes) -> array[int]:
+    values = array("i")
+    values.frombytes(blob)
+    if _BIG_ENDIAN:
+        values.byteswap()
+    return values
+
+
+@dataclass(slots=True)
+class KeywordPostings:
+    """Term -> (doc ids, term frequencies) over a fixed, ordered doc list.
+
+    Document ids are positions in the doc list the postings were built
+    from; the owner keeps that list in the same order.
+    """
+
+    doc_lens: array[int] = field(default_factory=_int_array)
+    postings: dict[str, tuple[array[int], array[int]]] = field(default_factory=dict)
+    _norm_key: tuple[float, float, float] = field(default=(0.0, 0.0, 0.0), repr=False)
+    _norm: Any = field(default=None, repr=False)
+
+    @classmethod
+    def from_term_freqs(
+        cls,
+        term_freqs: Iterable[dict[str, int]],
+        doc_lens: Iterable[int],
+    ) -> KeywordPostings:
+        """Invert per-document term frequencies (doc id = iteration order)."""
+        postings: dict[str, tuple[array[int], array[int]]] = {}
+        for doc_id, tf_map in enumerate(term_freqs):
+            for term, tf in tf_map.items():
+                entry = postings.get(term)
+                if entry is None:
+                    entry = postings[term] = (_int_array(), _int_array())
+                entry[0].append(doc_id)
+                entry[1].append(tf)
+        return cls(doc_lens=_int_array(doc_lens), postings=postings)
+
+    @classmethod
+    def from_rows(
+        cls,
+        rows: Iterable[tuple[str, bytes, bytes]],
+        doc_lens: Iterable[int],
+    ) -> KeywordPostings:
+        """Rebuild from ``(term, doc_ids_blob, tfs_blob)`` rows (see :meth:`to_rows`)."""
+        postings = {
+            term: (_from_blob(ids_blob), _from_blob(tfs_blob))
+            for term, ids_blob, tfs_blob in rows
+        }
+        return cls(doc_lens=_int_array(doc_lens), postings=postings)
+
+    def to_rows(self) -> Iterator[tuple[str, bytes, bytes]]:
+        """Yield ``(term, doc_ids_blob, tfs_blob)`` rows for persistence."""
+        for term, (ids, tfs) in self.postings.items():
+            yield term, _to_blob(ids), _to_blob(tfs)
+
+    @property
+    def n_docs(self) -> int:
+        return len(self.doc_lens)
+
+    @property
+    def n_terms(self) -> int:
+        return len(self.postings)
+
+    def df(self, term: str) -> int:
+        """Number of documents containing *term*."""
+        entry = self.postings.get(term)
+        return len(entry[0]) if entry is not None else 0
+
+    def _length_norm(self, k1: float, b: float, avg_dl: float) -> Any:
+        """Per-doc ``k1 * (1 - b + b * dl / avg_dl)``, cached per parameter set."""
+        key = (k1, b, avg_dl)
+        if self._norm is None or self._norm_key != key:
+            dls = np.frombuffer(self.doc_lens, dtype=np.intc).astype(np.float64)
+            dls[dls == 0] = 1.0
+            self._norm = k1 * (1 - b + b * dls / avg_dl)
+            self._norm_key = key
+        return self._norm
+
+    def score(
+        self,
+        terms: list[str],
+        k1: float,
+        b: float,
+        avg_dl: float,
+    ) -> tuple[Any, Any, Any]:
+        """BM25-score every document containing at least one of *terms*.
+
+        Repeated query terms count once per occurrence, matching a
+        term-by-term loop over the query.
+
+        Returns:
+            ``(doc_ids, scores, hits)`` for documents with a positive score,
+            in ascending doc id order.  ``hits`` counts how many of *terms*
+            (with repetition) each document contains.  NumPy arrays when
+            NumPy is available, otherwise lists.
+        """
+        n = self.n_docs
+        if _HAS_NUMPY:
+            acc = np.zeros(n, dtype=np.float64)
+            hits = np.zeros(n, dtype=np.int32)
+            norm = self._length_norm(k1, b, avg_dl)
+            for term in terms:
+                entry = self.postings.get(term)
+                if entry is None or not entry[0]:
+                    continue
+                ids = np.frombuffer(entry[0], dtype=np.intc)
+                tfs = np.frombuffer(entry[1], dtype=np.intc).astype(np.float64)
+                df = len(ids)
+                idf = math.log((n - df + 0.5) / (df + 0.5) + 1.0)
+                # doc ids within one posting list are unique, so plain
+                # fancy-index accumulation is safe (no np.add.at needed).
+                acc[ids] += idf * (tfs * (k1 + 1)) / (tfs + norm[ids])
+                hits[ids] += 1
+            matched = np.flatnonzero(acc > 0)
+            return matched, acc[matched], hits[matched]
+
+        scores: dict[int, float] = {}
+        hit_counts: dict[int, int] = {}
+        for term in terms:
+            entry = self.postings.get(term)
+            if entry is None or not entry[0]:
+                continue
+            df = len(entry[0])
+            idf = math.log((n - df + 0.5) / (df + 0.5) + 1.0)
+            for doc_id, tf in zip(entry[0], entry[1], strict=True):
+                dl = self.doc_lens[doc_id] or 1
+                tf_norm = (tf * (k1 + 1)) / (tf + k1 * (1 - b + b * dl / avg_dl))
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf_norm
+                hit_counts[doc_id] = hit_counts.get(doc_id, 0) + 1
+        doc_ids = sorted(d for d, s in scores.items() if s > 0)
+        return doc_ids, [scores[d] for d in doc_ids], [hit_counts[d] for d in doc_ids]
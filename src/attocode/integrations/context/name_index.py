@@ -0,0 +1,150 @@
+"""Prefix and substring lookup over a changing set of symbol names.
+
+``CrossRefIndex.search_definitions`` matches the query against every bare
+symbol name as a prefix and as a substring.  Scanning all names per query
+is O(#symbols) of Python work per keystroke; :class:`NameIndex` answers
+both in time proportional to the matches instead:
+
+* **Prefix** -- a sorted array of names searched with ``bisect``.  Names
+  added or removed since the last sort sit in small side sets, and the
+  array is re-sorted once they grow past a fraction of its size.
+* **Substring** -- a trigram index: trigram -> ``array('I')`` of name
+  ids.  A query of three or more characters verifies only the names in
+  its rarest trigram's posting list.  Shorter queries scan the names.
+
+Names are stored as given; callers pass lowercase names for
+case-insensitive search.  Removal tombstones the id, and the trigram
+postings are rebuilt once more than half the ids are dead.
+"""
+
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+_MIN_RESORT = 256     # Side-set size that always triggers a re-sort
+_RESORT_FRACTION = 64  # ... or 1/N of the sorted array, whichever is larger
+_MIN_COMPACT = 1024   # Dead ids before trigram postings are rebuilt
+
+
+def _trigrams(name: str) -> set[str]:
+    return {name[i:i + 3] for i in range(len(name) - 2)}
+
+
+@dataclass(slots=True)
+class NameIndex:
+    """Incrementally maintained prefix + trigram index over names."""
+
+    _ids: dict[str, int] = field(default_factory=dict)
+    # id -> name, None once removed
+    _names: list[str | None] = field(default_factory=list)
+    _grams: dict[str, array] = field(default_factory=dict)
+    _dead: int = 0
+    # Sorted snapshot of the names plus the changes made since it was taken
+    _sorted: list[str] = field(default_factory=list)
+    _added: set[str] = field(default_factory=set)
+    _removed: set[str] = field(default_factory=set)
+
+    @classmethod
+    def build(cls, names: Iterable[str]) -> NameIndex:
+        index = cls()
+        for name in names:
+            index._insert(name)
+        index._sorted = sorted(index._ids)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._ids
+
+    def add(self, name: str) -> None:
+        if name in self._ids:
+            return
+        self._insert(name)
+        if name in self._removed:
+            self._removed.discard(name)  # still in the sorted snapshot
+        else:
+            self._added.add(name)
+
+    def discard(self, name: str) -> None:
+        name_id = self._ids.pop(name, None)
+        if name_id is None:
+            return
+        self._names[name_id] = None
+        self._dead += 1
+        if name in self._added:
+            self._added.discard(name)
+        else:
+            self._removed.add(name)
+        if self._dead > _MIN_COMPACT and self._dead * 2 > len(self._names):
+            self._compact()
+
+    def with_prefix(self, prefix: str) -> list[str]:
+        """Names starting with *prefix*."""
+        if len(self._added) + len(self._removed) > max(
+            _MIN_RESORT, len(self._sorted) // _RESORT_FRACTION,
+        ):
+            self._resort()
+        names = self._sorted
+        removed = self._removed
+        out: list[str] = []
+        for i in range(bisect_left(names, prefix), len(names)):
+            name = names[i]
+            if not name.startswith(prefix):
+                break
+            if name not in removed:
+                out.append(name)
+        out.extend(name for name in self._added if name.startswith(prefix))
+        return out
+
+    def containing(self, needle: str) -> list[str]:
+        """Names that contain *needle*."""
+        if len(needle) < 3:
+            return [name for name in self._ids if needle in name]
+        postings = []
+        for gram in _trigrams(needle):
+            ids = self._grams.get(gram)
+            if ids is None:
+                return []
+            postings.append(ids)
+        names = self._names
+        out: list[str] = []
+        for name_id in min(postings, key=len):
+            name = names[name_id]
+            if name is not None and needle in name:
+                out.append(name)
+        return out
+
+    def _insert(self, name: str) -> None:
+        name_id = len(self._names)
+        self._names.append(name)
+        self._ids[name] = name_id
+        grams = self._grams
+        for gram in _trigrams(name):
+            ids = grams.get(gram)
+            if ids is None:
+                grams[gram] = array("I", (name_id,))
+            else:
+                ids.append(name_id)
+
+    def _resort(self) -> None:
+        self._sorted = sorted(self._ids)
+        self._added.clear()
+        self._removed.clear()
+
+    def _compact(self) -> None:
+        live = [name for name in self._names if name is not None]
+        self._ids.clear()
+        self._names.clear()
+        self._grams.clear()
+        self._dead = 0
+        for name in live:
+            self._insert(name)
+        self._resort()
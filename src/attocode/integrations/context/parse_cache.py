@@ -0,0 +1,325 @@
+"""Content-addressed cache for parse results, shared across checkouts.
+
+Parsing is a pure function of (file bytes, language, parser build), so its
+output can live in the shared :class:`ContentAddressedCache` keyed by the
+file's blob OID.  Every swarm worktree, branch switch and fresh
+``.attocode/index`` of the same content then reuses one parse instead of
+repeating it.
+
+Entries are keyed by :func:`compute_action_hash` over:
+
+* the blob OID (``git:<sha1>`` or ``sha256:<hex>``),
+* the language and the parser tier available for it on this host
+  (tree-sitter, regex, ctags...), and
+* a parser version fingerprint: a hash of the parser modules' source plus
+  the installed tree-sitter version, so editing a parser invalidates its
+  entries without a manual bump.
+
+Payloads are compact JSON (``pack_ast`` tuples for ``FileAST``), never
+pickle, because the store is shared between projects.
+
+Callers resolve OIDs for a whole file list up front with :meth:`resolve`,
+which uses ``compute_blob_oids_batch`` (one ``git hash-object
+--stdin-paths`` call).  Lookups for a path whose size or mtime has changed
+since then miss rather than return a stale parse.
+
+Set ``ATTOCODE_PARSE_CACHE=0`` to disable; ``ATTOCODE_CAS_DIR`` moves the
+store.
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+from attocode.code_intel.artifacts import compute_action_hash
+from attocode.integrations.context.blob_oid import BlobOidCache, compute_blob_oids_batch
+from attocode.integrations.context.cas import ContentAddressedCache
+from attocode.integrations.context.codebase_ast import FileAST, detect_language, parse_file
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+logger = logging.getLogger(__name__)
+
+# Bump to invalidate every cached parse regardless of source fingerprints.
+PARSE_CACHE_VERSION = "1"
+
+AST_INDEXER = "attocode.codebase_ast"
+AST_PARSER_MODULES = (
+    "attocode.integrations.context.codebase_ast",
+    "attocode.integrations.context.ts_parser",
+)
+
+_REGEX_LANGUAGES = frozenset({"python", "javascript", "typescript", "rust", "go"})
+_DISABLE_ENV = "ATTOCODE_PARSE_CACHE"
+
+
+def parse_cache_enabled() -> bool:
+    """False when ``ATTOCODE_PARSE_CACHE`` is set to ``0``/``false``/``off``."""
+    return os.environ.get(_DISABLE_ENV, "1").strip().lower() not in ("0", "false", "off", "no")
+
+
+@functools.lru_cache(maxsize=8)
+def parser_fingerprint(*modules: str) -> str:
+    """Hash of *modules*' source files plus the tree-sitter version."""
+    import importlib.util
+
+    h = hashlib.sha256(PARSE_CACHE_VERSION.encode())
+    for name in modules:
+        try:
+            spec = importlib.util.find_spec(name)
+            origin = spec.origin if spec is not None else None
+            if origin:
+                with open(origin, "rb") as f:
+                    h.update(f.read())
+        except (ImportError, OSError, ValueError):
+            h.update(name.encode())
+    try:
+        from importlib.metadata import version
+
+        h.update(version("tree-sitter").encode())
+    except Exception:
+        h.update(b"no-tree-sitter")
+    return h.hexdigest()[:16]
+
+
+def _stat_key(path: str) -> tuple[int, int] | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+@dataclass(slots=True)
+class ParseCache:
+    """Blob-OID keyed parse-result cache on top of :class:`ContentAddressedCache`.
+
+    One instance serves one parser (``indexer_name`` + ``parser_modules``).
+    ``ASTService`` and ``SemanticSearchManager`` share the default
+    ``FileAST`` parser; the server ``FullIndexer`` uses its own.
+    """
+
+    project_dir: str = ""
+    cas: ContentAddressedCache | None = None
+    indexer_name: str = AST_INDEXER
+    parser_modules: tuple[str, ...] = AST_PARSER_MODULES
+    hits: int = 0
+    misses: int = 0
+    _oid_cache: BlobOidCache | None = field(default=None, repr=False)
+    _oids: dict[str, tuple[tuple[int, int], str]] = field(default_factory=dict, repr=False)
+    _kinds: dict[str, str] = field(default_factory=dict, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @classmethod
+    def open(
+        cls,
+        project_dir: str = "",
+        *,
+        indexer_name: str = AST_INDEXER,
+        parser_modules: tuple[str, ...] = AST_PARSER_MODULES,
+    ) -> ParseCache | None:
+        """Open the shared cache, or return None if disabled or unavailable."""
+        if not parse_cache_enabled():
+            return None
+        try:
+            cas = ContentAddressedCache()
+        except (OSError, sqlite3.Error) as exc:
+            logger.debug("parse_cache: CAS unavailable (%s), caching disabled", exc)
+            return None
+        return cls(
+            project_dir=project_dir,
+            cas=cas,
+            indexer_name=indexer_name,
+            parser_modules=parser_modules,
+        )
+
+    @property
+    def parser_version(self) -> str:
+        return parser_fingerprint(*self.parser_modules)
+
+    # ------------------------------------------------------------------
+    # Blob OIDs
+    # ------------------------------------------------------------------
+
+    def resolve(self, paths: list[str]) -> dict[str, str]:
+        """Resolve blob OIDs for absolute *paths* in bulk and remember them."""
+        if not paths or not self.project_dir:
+            return {}
+        if self._oid_cache is None:
+            try:
+                self._oid_cache = BlobOidCache(project_dir=self.project_dir)
+            except (OSError, sqlite3.Error) as exc:
+                logger.debug("parse_cache: blob OID cache unavailable: %s", exc)
+        stats = {p: _stat_key(p) for p in paths}
+        live = [p for p, st in stats.items() if st is not None]
+        try:
+            oids = compute_blob_oids_batch(live, self.project_dir, cache=self._oid_cache)
+        except (OSError, sqlite3.Error) as exc:
+            logger.debug("parse_cache: blob OID resolution failed: %s", exc)
+            return {}
+        resolved: dict[str, str] = {}
+        with self._lock:
+            for path, oid in oids.items():
+                st = stats.get(path)
+                if st is None or ":missing:" in oid or oid.endswith(":unreadable"):
+                    continue
+                self._oids[path] = (st, oid)
+                resolved[path] = oid
+        return resolved
+
+    def oid_for(self, path: str) -> str | None:
+        """Resolved OID for *path*, or None if unknown or the file changed since."""
+        entry = self._oids.get(path)
+        if entry is None:
+            return None
+        if _stat_key(path) != entry[0]:
+            with self._lock:
+                self._oids.pop(path, None)
+            return None
+        return entry[1]
+
+    # ------------------------------------------------------------------
+    # Generic artifacts
+    # ------------------------------------------------------------------
+
+    def _parser_kind(self, language: str) -> str:
+        kind = self._kinds.get(language)
+        if kind is None:
+            kind = "ctags" if shutil.which("ctags") else "minimal"
+            if language in _REGEX_LANGUAGES:
+                kind = "regex"
+            try:
+                from attocode.integrations.context.ts_parser import is_available
+
+                if language and is_available(language):
+                    kind = "tree_sitter"
+            except ImportError:
+                pass
+            self._kinds[language] = kind
+        return kind
+
+    def key(self, blob_oid: str, artifact_type: str, language: str) -> str:
+        """CAS key for one (blob, artifact, language) under this parser build."""
+        digest = compute_action_hash(
+            artifact_type,
+            indexer_name=self.indexer_name,
+            indexer_version=self.parser_version,
+            input_blob_oid=blob_oid,
+            config={
+                "language": language,
+                "parser_kind": self._parser_kind(language),
+                "parser_version": self.parser_version,
+            },
+        )
+        return f"sha256:{digest}"
+
+    def get(self, blob_oid: str, artifact_type: str, language: str) -> Any | None:
+        """Decoded JSON payload, or None on a miss."""
+        if self.cas is None:
+            return None
+        try:
+            data = self.cas.get(self.key(blob_oid, artifact_type, language), artifact_type)
+            value = json.loads(data) if data is not None else None
+        except (OSError, ValueError, sqlite3.Error) as exc:
+            logger.debug("parse_cache: read failed for %s: %s", blob_oid, exc)
+            value = None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def put(self, blob_oid: str, artifact_type: str, language: str, value: Any) -> None:
+        """Store *value* as compact JSON; failures are logged and ignored."""
+        if self.cas is None:
+            return
+        key = self.key(blob_oid, artifact_type, language)
+        try:
+            self.cas.put(
+                key,
+                json.dumps(value, separators=(",", ":")).encode("utf-8"),
+                artifact_type=artifact_type,
+                action_hash=key.partition(":")[2],
+            )
+        except (OSError, TypeError, ValueError, sqlite3.Error) as exc:
+            logger.debug("parse_cache: write failed for %s: %s", blob_oid, exc)
+
+    def get_or_compute(
+        self, blob_oid: str, artifact_type: str, language: str, compute: Callable[[], Any],
+    ) -> Any:
+        """Cached payload for *blob_oid*, computing and storing it on a miss."""
+        value = self.get(blob_oid, artifact_type, language)
+        if value is None:
+            value = compute()
+            self.put(blob_oid, artifact_type, language, value)
+        return value
+
+    # ------------------------------------------------------------------
+    # FileAST
+    # ------------------------------------------------------------------
+
+    def get_ast(self, blob_oid: str, path: str) -> FileAST | None:
+        """Cached ``FileAST`` for *blob_oid*, re-pointed at *path*."""
+        from attocode.integrations.context.parse_pool import unpack_ast
+
+        packed = self.get(blob_oid, "ast", detect_language(path))
+        if packed is None:
+            return None
+        try:
+            ast = unpack_ast(packed)
+        except (TypeError, ValueError, IndexError):
+            return None
+        ast.path = path
+        return ast
+
+    def has_ast(self, blob_oid: str, path: str) -> bool:
+        """Whether a ``FileAST`` for *blob_oid* is stored, without loading it.
+
+        A miss is counted here; a hit is counted when :meth:`get_ast` reads it.
+        """
+        found = False
+        if self.cas is not None:
+            try:
+                found = self.cas.exists(self.key(blob_oid, "ast", detect_language(path)), "ast")
+            except (OSError, sqlite3.Error) as exc:
+                logger.debug("parse_cache: lookup failed for %s: %s", blob_oid, exc)
+        if not found:
+            self.misses += 1
+        return found
+
+    def put_ast(self, blob_oid: str, ast: FileAST) -> None:
+        from attocode.integrations.context.parse_pool import pack_ast
+
+        packed = list(pack_ast(ast))
+        packed[0] = ""  # path-independent: the same blob may live anywhere
+        self.put(blob_oid, "ast", detect_language(ast.path), packed)
+
+    def parse(self, path: str) -> FileAST:
+        """``parse_file(path)`` through the cache, when *path*'s OID is known."""
+        oid = self.oid_for(path)
+        if oid is not None:
+            cached = self.get_ast(oid, path)
+            if cached is not None:
+                return cached
+        ast = parse_file(path)
+        if oid is not None and self.oid_for(path) == oid:
+            self.put_ast(oid, ast)
+        return ast
+
+    def close(self) -> None:
+        if self._oid_cache is not None:
+            self._oid_cache.close()
+            self._oid_cache = None
+        if self.cas is not None:
+            self.cas.close()
+            self.cas = None
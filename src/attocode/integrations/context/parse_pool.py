@@ -0,0 +1,338 @@
+"""Process-pool parsing of many source files into ``FileAST`` results.
+
+``parse_file`` is CPU-bound Python (tree-sitter tree walking, regex
+fallbacks), so threads serialize on the GIL.  :func:`iter_parsed` fans the
+work out over a ``ProcessPoolExecutor`` instead:
+
+* Files are sent in chunks so per-task IPC is amortized.
+* Each worker loads the tree-sitter grammars for the languages in the
+  workload once, in its initializer, rather than on its first file.
+* Results come back as nested tuples (:func:`pack_ast`), which pickle
+  smaller and faster than the slotted dataclasses, and are rebuilt in the
+  parent.
+* At most ``workers * _INFLIGHT_PER_WORKER`` chunks are outstanding, so a
+  slow consumer (indexing, SQLite writes) bounds memory instead of
+  letting parsed results pile up.
+
+Results are yielded in input order so indexing stays deterministic.  Small
+workloads, single-CPU hosts, and environments where a pool cannot start
+parse inline with identical results.  An optional :class:`ParseCache`
+short-circuits files whose blob was already parsed, here or in another
+checkout.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import TYPE_CHECKING, Any
+
+from attocode.integrations.context.codebase_ast import (
+    ClassDef,
+    FileAST,
+    FunctionDef,
+    ImportDef,
+    ParamDef,
+    PropertyDef,
+    detect_language,
+    parse_file,
+)
+
+if TYPE_CHECKING:
+    import threading
+    from collections.abc import Generator
+
+    from attocode.integrations.context.parse_cache import ParseCache
+
+logger = logging.getLogger(__name__)
+
+_PARALLEL_MIN_FILES: int = 200  # Below this, pool startup costs more than it saves
+_CHUNK_FILES: int = 32          # Files per worker task
+_INFLIGHT_PER_WORKER: int = 4   # Outstanding chunks per worker
+_WORKERS_ENV = "ATTOCODE_PARSE_WORKERS"
+
+PackedAST = tuple[Any, ...]
+
+
+# ---------------------------------------------------------------------------
+# Compact payloads
+# ---------------------------------------------------------------------------
+
+
+def _pack_function(fn: FunctionDef) -> tuple[Any, ...]:
+    return (
+        fn.name, fn.start_line, fn.end_line, fn.params, fn.return_type,
+        fn.decorators, fn.is_async, fn.is_method, fn.docstring,
+        [(p.name, p.type_annotation, p.default_value, p.is_rest, p.is_kwonly, p.is_kwargs)
+         for p in fn.parameters],
+        fn.visibility, fn.is_generator, fn.is_staticmethod, fn.is_classmethod,
+        fn.is_property, fn.type_params,
+    )
+
+
+def _unpack_function(t: tuple[Any, ...]) -> FunctionDef:
+    return FunctionDef(
+        t[0], t[1], t[2], t[3], t[4], t[5], t[6], t[7], t[8],
+        [ParamDef(*p) for p in t[9]],
+        t[10], t[11], t[12], t[13], t[14], t[15],
+    )
+
+
+def pack_ast(ast: FileAST) -> PackedAST:
+    """Flatten *ast* into nested tuples for cheap pickling."""
+    return (
+        ast.path,
+        ast.language,
+        [_pack_function(f) for f in ast.functions],
+        [
+            (
+                c.name, c.start_line, c.end_line, c.bases,
+                [_pack_function(m) for m in c.methods],
+                c.decorators, c.docstring,
+                [(p.name, p.start_line, p.type_annotation, p.has_default, p.visibility)
+                 for p in c.properties],
+                c.is_abstract, c.metaclass,
+            )
+            for c in ast.classes
+        ],
+        [(i.module, i.names, i.alias, i.is_from, i.line) for i in ast.imports],
+        ast.top_level_vars,
+        ast.line_count,
+        ast.parsing_tier,
+    )
+
+
+def unpack_ast(packed: PackedAST) -> FileAST:
+    """Inverse of :func:`pack_ast`."""
+    path, language, functions, classes, imports, top_level_vars, line_count, tier = packed
+    return FileAST(
+        path=path,
+        language=language,
+        functions=[_unpack_function(f) for f in functions],
+        classes=[
+            ClassDef(
+                c[0], c[1], c[2], c[3],
+                [_unpack_function(m) for m in c[4]],
+                c[5], c[6],
+                [PropertyDef(*p) for p in c[7]],
+                c[8], c[9],
+            )
+            for c in classes
+        ],
+        imports=[ImportDef(*i) for i in imports],
+        top_level_vars=top_level_vars,
+        line_count=line_count,
+        parsing_tier=tier,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Worker side
+# ---------------------------------------------------------------------------
+
+
+def _warm_worker(languages: tuple[str, ...]) -> None:
+    """Pool initializer: load the grammars this workload needs once per process."""
+    try:
+        from attocode.integrations.context.ts_parser import _get_parser
+    except ImportError:
+        return
+    for lang in languages:
+        try:
+            _get_parser(lang)
+        except Exception:
+            pass
+
+
+def _parse_one(path: str) -> FileAST | None:
+    try:
+        return parse_file(path)
+    except Exception:
+        return None
+
+
+def _parse_chunk(paths: list[str]) -> list[PackedAST | None]:
+    """Worker task: parse *paths* and return packed results in the same order."""
+    out: list[PackedAST | None] = []
+    for path in paths:
+        ast = _parse_one(path)
+        out.append(pack_ast(ast) if ast is not None else None)
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Driver
+# ---------------------------------------------------------------------------
+
+
+def resolve_workers(workers: int | None, n_files: int) -> int:
+    """Pick the parse process count for *n_files* files.
+
+    An explicit *workers* wins, then ``ATTOCODE_PARSE_WORKERS``; otherwise
+    one process per CPU once the workload is large enough to pay for the
+    pool.
+    """
+    if workers is None:
+        env = os.environ.get(_WORKERS_ENV, "").strip()
+        if env:
+            try:
+                workers = int(env)
+            except ValueError:
+                logger.debug("parse_pool: ignoring invalid %s=%r", _WORKERS_ENV, env)
+    if workers is not None:
+        return max(1, workers)
+    if n_files < _PARALLEL_MIN_FILES:
+        return 1
+    return max(1, min(os.cpu_count() or 1, -(-n_files // _CHUNK_FILES)))
+
+
+def _iter_inline(
+    chunks: list[list[str]], stop: threading.Event | None,
+) -> Generator[tuple[str, FileAST | None], None, None]:
+    for chunk in chunks:
+        for path in chunk:
+            if stop is not None and stop.is_set():
+                return
+            yield path, _parse_one(path)
+
+
+def iter_parsed(
+    paths: list[str],
+    *,
+    workers: int | None = None,
+    chunk_size: int = _CHUNK_FILES,
+    stop: threading.Event | None = None,
+    cache: ParseCache | None = None,
+) -> Generator[tuple[str, FileAST | None], None, None]:
+    """Parse *paths*, yielding ``(path, ast)`` in input order.
+
+    *ast* is ``None`` for files whose parse raised.  When *stop* is set the
+    iterator returns early and outstanding chunks are cancelled.  Closing
+    the iterator early also shuts the pool down.
+
+    With a *cache*, blob OIDs are resolved in bulk first and each file is
+    checked for a cached AST without loading it; files sharing a blob are
+    parsed once, and only the misses reach the pool.  Cached ASTs are read
+    one at a time as their turn comes.  Fresh results are written back.
+    """
+    if cache is None:
+        yield from _iter_uncached(paths, workers, chunk_size, stop)
+        return
+
+    oids = cache.resolve(paths)
+    cached: set[str] = set()
+    misses: list[str] = []
+    first: dict[tuple[str, str], str] = {}  # (oid, language) -> first miss path
+    dupes: dict[str, tuple[str, str]] = {}  # path -> key of an earlier miss
+    for path in paths:
+        oid = oids.get(path)
+        if oid is None:
+            misses.append(path)
+            continue
+        key = (oid, detect_language(path))
+        if key in first:
+            dupes[path] = key
+            continue
+        if cache.has_ast(oid, path):
+            cached.add(path)
+        else:
+            first[key] = path
+            misses.append(path)
+    shared = set(dupes.values())
+    memo: dict[tuple[str, str], FileAST | None] = {}
+
+    parsed = _iter_uncached(misses, workers, chunk_size, stop)
+    try:
+        for path in paths:
+            if stop is not None and stop.is_set():
+                return
+            if path in cached:
+                oid = oids[path]
+                ast = cache.get_ast(oid, path)
+                if ast is None:
+                    # Evicted or unreadable since the check: parse it here.
+                    ast = _parse_one(path)
+                    if ast is not None and cache.oid_for(path) == oid:
+                        cache.put_ast(oid, ast)
+                yield path, ast
+                continue
+            if path in dupes:
+                source = memo.get(dupes[path])
+                if source is None:
+                    yield path, None
+                    continue
+                copy = unpack_ast(pack_ast(source))
+                copy.path = path
+                yield path, copy
+                continue
+            item = next(parsed, None)
+            if item is None:
+                return  # stopped
+            ast = item[1]
+            oid = oids.get(path)
+            if oid is not None:
+                key = (oid, detect_language(path))
+                if key in shared:
+                    memo[key] = ast
+                if ast is not None and cache.oid_for(path) == oid:
+                    cache.put_ast(oid, ast)
+            yield path, ast
+    finally:
+        parsed.close()
+
+
+def _iter_uncached(
+    paths: list[str],
+    workers: int | None,
+    chunk_size: int,
+    stop: threading.Event | None,
+) -> Generator[tuple[str, FileAST | None], None, None]:
+    chunk_size = max(1, chunk_size)
+    chunks = [paths[i:i + chunk_size] for i in range(0, len(paths), chunk_size)]
+    n_workers = resolve_workers(workers, len(paths))
+    if n_workers <= 1 or len(chunks) <= 1:
+        yield from _iter_inline(chunks, stop)
+        return
+
+    import multiprocessing
+
+    languages = tuple(sorted({detect_language(p) for p in paths} - {"unknown", ""}))
+    done = 0
+    try:
+        # spawn: the MCP server is multi-threaded, so forking it is unsafe.
+        pool = ProcessPoolExecutor(
+            max_workers=n_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_warm_worker,
+            initargs=(languages,),
+        )
+    except (OSError, RuntimeError) as exc:
+        logger.debug("parse_pool: process pool unavailable (%s), parsing inline", exc)
+        yield from _iter_inline(chunks, stop)
+        return
+
+    pending: deque[Future[list[PackedAST | None]]] = deque()
+    limit = n_workers * _INFLIGHT_PER_WORKER
+    try:
+        while done < len(chunks):
+            if stop is not None and stop.is_set():
+                return
+            while done + len(pending) < len(chunks) and len(pending) < limit:
+                pending.append(pool.submit(_parse_chunk, chunks[done + len(pending)]))
+            try:
+                packed = pending.popleft().result()
+            except (OSError, RuntimeError) as exc:
+                # BrokenProcessPool is a RuntimeError: finish what is left inline
+                logger.debug("parse_pool: worker failed (%s), parsing rest inline", exc)
+                break
+            chunk = chunks[done]
+            done += 1
+            for path, item in zip(chunk, packed, strict=True):
+                if stop is not None and stop.is_set():
+                    return
+                yield path, unpack_ast(item) if item is not None else None
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+    yield from _iter_inline(chunks[done:], stop)
@@ -7,9 +7,9 @@ embedding provider is available.
 
 from __future__ import annotations
 
+import heapq
 import json
 import logging
-import math
 import os
 import queue
 import re
@@ -18,6 +18,16 @@ import threading
 from dataclasses import dataclass, field
 from typing import Any
 
+from attocode.integrations.context.keyword_index import KeywordPostings
+
+try:
+    import numpy as np
+
+    _HAS_NUMPY = True
+except ImportError:
+    np = None  # type: ignore[assignment]
+    _HAS_NUMPY = False
+
 logger = logging.getLogger(__name__)
 
 # ---------------------------------------------------------------------------
@@ -32,6 +42,18 @@ _STOP_WORDS = frozenset({
     "dict", "set", "tuple", "any", "type", "optional",
 })
 
+# Path relevance: first directories that mark source code
+_KW_SRC_DIRS = frozenset({"src", "lib", "pkg", "core", "internal", "app", "main"})
+
+# Non-code file extensions (markdown, text, config formats)
+_KW_NON_CODE_EXTS = frozenset({
+    ".md", ".txt", ".rst", ".cfg", ".ini", ".yml", ".yaml", ".json", ".toml",
+    ".xml", ".csv",
+})
+
+# kw_index.db layout version; v2 added kw_docs.ord and the kw_postings table
+_KW_CACHE_SCHEMA_VERSION = "2"
+
 _CAMEL_RE = re.compile(r"(?<=[a-z])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])")
 
 # Mapping from common query terms to code construct types for query expansion
@@ -133,6 +155,53 @@ class _KeywordDoc:
     doc_len: int = 0
 
 
+@dataclass(slots=True)
+class _FileCappedTopK:
+    """Running top-k of scored docs, at most ``cap`` per file.
+
+    Entries are ``(score, -doc_id)`` so that heap order is worst-first with
+    ties going to the higher doc id.  Each file keeps its best ``cap``
+    entries; ``_best`` holds the best ``k`` entries seen among those, with
+    entries a file has since dropped removed lazily.  Its minimum is thus a
+    lower bound on the final k-th score, maintained without re-sorting.
+    """
+
+    k: int
+    cap: int
+    _files: dict[str, list[tuple[float, int]]] = field(default_factory=dict)
+    _best: list[tuple[float, int]] = field(default_factory=list)
+    _in_best: set[tuple[float, int]] = field(default_factory=set)
+
+    def add(self, file_path: str, score: float, doc_id: int) -> None:
+        entry = (score, -doc_id)
+        kept = self._files.setdefault(file_path, [])
+        if len(kept) < self.cap:
+            heapq.heappush(kept, entry)
+        elif kept and entry > kept[0]:
+            dropped = heapq.heapreplace(kept, entry)
+            self._in_best.discard(dropped)
+        else:
+            return  # the file already has cap better entries
+        heapq.heappush(self._best, entry)
+        self._in_best.add(entry)
+        while len(self._in_best) > self.k:
+            self._in_best.discard(heapq.heappop(self._best))
+        while self._best and self._best[0] not in self._in_best:
+            heapq.heappop(self._best)
+
+    def threshold(self) -> float | None:
+        """Score every final top-k entry is at least, once k are known."""
+        if len(self._in_best) < self.k:
+            return None
+        return self._best[0][0]
+
+    def top(self) -> list[tuple[float, int]]:
+        """The final ``(score, doc_id)`` list, best first."""
+        entries = [e for kept in self._files.values() for e in kept]
+        best = heapq.nlargest(self.k, entries)
+        return [(score, -neg_id) for score, neg_id in best]
+
+
 @dataclass(slots=True)
 class IndexProgress:
     """Progress of background embedding indexing."""
@@ -300,12 +369,13 @@ class SemanticSearchManager:
     _reindex_lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
     _reindex_worker_started: bool = field(default=False, repr=False)
     _kw_docs: list[_KeywordDoc] = field(default_factory=list, repr=False)
-    _kw_df: dict[str, int] = field(default_factory=dict, repr=False)
+    _kw_postings: KeywordPostings | None = field(default=None, repr=False)
+    _kw_boosts: Any = field(default=None, repr=False)
+    _kw_boosts_key: tuple[float, ...] = field(default=(), repr=False)
     _kw_avg_dl: float = field(default=0.0, repr=False)
     _kw_index_built: bool = field(default=False, repr=False)
     _kw_cache_db_path: str = field(default="", repr=False)
     _kw_cache_lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
-    _trigram_index: Any = field(default=None, repr=False)
     _bg_indexer: Any = field(default=None, repr=False)
     _bg_thread: Any = field(default=None, repr=False)
     _index_progress: IndexProgress = field(default_factory=IndexProgress, repr=False)
@@ -313,6 +383,8 @@ class SemanticSearchManager:
     _importance_scores: dict[str, float] = field(default_factory=dict, repr=False)
     _frecency_tracker: Any = field(default=None, repr=False)
     _dep_graph: Any = field(default=None, repr=False)
+    _parse_cache: Any = field(default=None, repr=False)
+    _parse_cache_opened: bool = field(default=False, repr=False)
 
     def __post_init__(self) -> None:
         # Defer provider creation to first use (_ensure_provider) to avoid
@@ -325,6 +397,15 @@ class SemanticSearchManager:
         if not self.nl_mode:
             self.nl_mode = os.environ.get("ATTOCODE_NL_EMBEDDING_MODE", "heuristic")
 
+    def _get_parse_cache(self) -> Any:
+        """Shared blob-keyed parse cache (see ``parse_cache``), or None."""
+        if not self._parse_cache_opened:
+            self._parse_cache_opened = True
+            from attocode.integrations.context.parse_cache import ParseCache
+
+            self._parse_cache = ParseCache.open(self.root_dir)
+        return self._parse_cache
+
     def _get_importance(self, file_path: str) -> float:
         """Get file importance score (0.0-1.0), lazily loaded."""
         if not self._importance_scores:
@@ -600,9 +681,11 @@ class SemanticSearchManager:
 
         chunks: list[tuple[str, str, str, str]] = []
 
-        for f in ctx._files:
-            if f.language not in _supported:
-                continue
+        indexable = [f for f in ctx._files if f.language in _supported]
+        cache = self._get_parse_cache()
+        if cache is not None:
+            cache.resolve([f.path for f in indexable])
+        for f in indexable:
             file_chunks = self._chunk_single_file(f.relative_path, f.path)
             chunks.extend(file_chunks)
 
@@ -968,61 +1051,105 @@ class SemanticSearchManager:
         return [(cid, score) for cid, _text, score in reranked]
 
     # ------------------------------------------------------------------
-    # Trigram pre-filtering for keyword search
+    # BM25 keyword search
     # ------------------------------------------------------------------
 
-    def _get_trigram_index(self) -> Any | None:
-        """Get a loaded TrigramIndex instance, or None if unavailable."""
-        if self._trigram_index is not None:
-            return self._trigram_index
-        try:
-            from attocode.integrations.context.trigram_index import TrigramIndex
-
-            index_dir = os.path.join(self.root_dir, ".attocode", "index")
-            if not os.path.isdir(index_dir):
-                return None
-            idx = TrigramIndex(index_dir=index_dir)
-            if idx.load():
-                self._trigram_index = idx
-                return idx
-        except Exception:
-            logger.debug("Failed to load trigram index for kw pre-filter", exc_info=True)
-        return None
-
-    def _trigram_prefilter(self, query_tokens: list[str]) -> set[str] | None:
-        """Use trigram index to find candidate files containing query terms.
+    def _kw_static_boosts(self) -> Any:
+        """Per-doc multiplier for the query-independent boosts and penalties.
 
-        Returns set of candidate file paths, or None to fall back to full scan.
-        Uses UNION semantics: a file matching ANY query term is included.
+        Folds the definition-type, source-dir, non-code, config, test and
+        file-importance factors into one array aligned with ``_kw_docs``.
+        Rebuilt only when the index or one of those scoring knobs changes.
         """
-        idx = self._get_trigram_index()
-        if idx is None or not idx.is_ready():
-            return None
-
-        filterable = [t for t in query_tokens if len(t) >= 3]
-        if not filterable:
-            return None
-
-        candidates: set[str] = set()
-        any_definitive = False
-
-        for token in filterable:
-            escaped = re.escape(token)
-            try:
-                result = idx.query(escaped, selectivity_threshold=0.5)
-            except Exception:
-                logger.debug("Trigram query failed for '%s'", token, exc_info=True)
-                return None
+        cfg = self.scoring_config
+        key = (
+            cfg.class_boost, cfg.function_boost, cfg.method_boost,
+            cfg.src_dir_boost, cfg.non_code_penalty, cfg.config_penalty,
+            cfg.test_penalty, cfg.importance_weight,
+        )
+        if self._kw_boosts is not None and self._kw_boosts_key == key:
+            return self._kw_boosts
+
+        type_boosts = {
+            "class": cfg.class_boost,
+            "function": cfg.function_boost,
+            "method": cfg.method_boost,
+        }
+        importance: dict[str, float] = {}
+        if cfg.importance_weight > 0:
+            self._get_importance("")  # one lazy load, not one attempt per doc
+            importance = self._importance_scores
+
+        boosts: list[float] = []
+        for doc in self._kw_docs:
+            mult = type_boosts.get(doc.chunk_type, 1.0)
+            first_dir = doc.file_path.split("/")[0] if "/" in doc.file_path else ""
+            if first_dir.lower() in _KW_SRC_DIRS:
+                mult *= cfg.src_dir_boost
+            if os.path.splitext(doc.file_path)[1].lower() in _KW_NON_CODE_EXTS:
+                mult *= cfg.non_code_penalty
+            if doc.is_config:
+                mult *= cfg.config_penalty
+            if doc.is_test:
+                mult *= cfg.test_penalty
+            if cfg.importance_weight > 0:
+                mult *= 1.0 + importance.get(doc.file_path, 0.0) * cfg.importance_weight
+            boosts.append(mult)
 
-            if result is None:
-                continue  # too common or no trigrams — skip this token
-            any_definitive = True
-            candidates.update(result)
+        self._kw_boosts = np.asarray(boosts, dtype=np.float64) if _HAS_NUMPY else boosts
+        self._kw_boosts_key = key
+        return self._kw_boosts
 
-        if not any_definitive:
-            return None  # no token could be filtered, full scan needed
+    def _kw_ranked_candidates(
+        self,
+        query_tokens: list[str],
+    ) -> tuple[list[int], list[float]]:
+        """Docs matching any query term, ordered by their query-independent score.
 
-        return candidates
+        The score is BM25 times the static boosts times the multi-term
+        coverage bonus. Ties are broken by doc id so the final order matches
+        a stable sort over ``_kw_docs``.
+        """
+        postings = self._kw_postings
+        if postings is None:
+            return [], []
+        cfg = self.scoring_config
+        doc_ids, bm25, hits = postings.score(
+            query_tokens, cfg.bm25_k1, cfg.bm25_b, self._kw_avg_dl or 1.0,
+        )
+        if not len(doc_ids):
+            return [], []
+        boosts = self._kw_static_boosts()
+        n_terms = len(query_tokens)
+
+        if _HAS_NUMPY:
+            base = bm25 * boosts[doc_ids]
+            if n_terms > 1:
+                coverage = hits / n_terms
+                base *= np.where(
+                    coverage >= cfg.multi_term_high_threshold,
+                    cfg.multi_term_high_bonus,
+                    np.where(
+                        coverage >= cfg.multi_term_med_threshold,
+                        cfg.multi_term_med_bonus,
+                        1.0,
+                    ),
+                )
+            order = np.lexsort((doc_ids, -base))
+            return doc_ids[order].tolist(), base[order].tolist()
+
+        ranked: list[tuple[float, int]] = []
+        for doc_id, score, hit in zip(doc_ids, bm25, hits, strict=True):
+            score *= boosts[doc_id]
+            if n_terms > 1:
+                coverage = hit / n_terms
+                if coverage >= cfg.multi_term_high_threshold:
+                    score *= cfg.multi_term_high_bonus
+                elif coverage >= cfg.multi_term_med_threshold:
+                    score *= cfg.multi_term_med_bonus
+            ranked.append((score, doc_id))
+        ranked.sort(key=lambda x: (-x[0], x[1]))
+        return [d for _, d in ranked], [s for s, _ in ranked]
 
     def _keyword_search(
         self,
@@ -1030,11 +1157,17 @@ class SemanticSearchManager:
         top_k: int,
         file_filter: str,
     ) -> list[SemanticSearchResult]:
-        """BM25 content-aware keyword search using AST-extracted data."""
+        """BM25 content-aware keyword search using AST-extracted data.
+
+        Scores term-at-a-time over the inverted postings, then applies the
+        query-dependent boosts (symbol name match, exact phrase) to the
+        candidates in descending order of their upper bound, stopping once
+        no remaining candidate can enter the deduplicated top-k.
+        """
         if not self._kw_index_built:
             self._build_keyword_index()
 
-        if not self._kw_docs:
+        if not self._kw_docs or self._kw_postings is None or top_k <= 0:
             return []
 
         import fnmatch
@@ -1043,55 +1176,35 @@ class SemanticSearchManager:
         if not query_tokens:
             return []
 
-        # Trigram pre-filter: narrow to files containing query terms
-        candidate_files = self._trigram_prefilter(query_tokens)
-        if candidate_files is not None:
-            docs_to_score = [
-                d for d in self._kw_docs if d.file_path in candidate_files
-            ]
-            logger.debug(
-                "Trigram pre-filter: %d/%d docs from %d candidate files",
-                len(docs_to_score), len(self._kw_docs), len(candidate_files),
-            )
-        else:
-            docs_to_score = self._kw_docs
+        ranked_ids, ranked_base = self._kw_ranked_candidates(query_tokens)
+        if not ranked_ids:
+            return []
 
         query_lower = query.lower()
         cfg = self.scoring_config
+        multi_term = len(query_tokens) > 1
+        # Largest factor the per-query boosts below can still apply
+        bound_mult = max(cfg.name_exact_boost, cfg.name_substring_boost, cfg.name_token_boost, 1.0)
+        if multi_term:
+            bound_mult *= max(cfg.exact_phrase_bonus, 1.0)
+
+        filter_hits: dict[str, bool] = {}
+        running = _FileCappedTopK(top_k, cfg.max_chunks_per_file)
+        for doc_id, score in zip(ranked_ids, ranked_base, strict=True):
+            floor = running.threshold()
+            if floor is not None and score * bound_mult < floor:
+                break
 
-        # BM25 parameters — N and avg_dl use FULL corpus for correct IDF
-        k1 = cfg.bm25_k1
-        b = cfg.bm25_b
-        N = len(self._kw_docs)  # noqa: N806
-        avg_dl = self._kw_avg_dl or 1.0
-
-        scored: list[tuple[float, _KeywordDoc]] = []
-        for doc in docs_to_score:
-            if file_filter and not fnmatch.fnmatch(doc.file_path, file_filter):
-                continue
-
-            # BM25 score
-            score = 0.0
-            for term in query_tokens:
-                tf = doc.term_freqs.get(term, 0)
-                if tf == 0:
+            doc = self._kw_docs[doc_id]
+            if file_filter:
+                ok = filter_hits.get(doc.file_path)
+                if ok is None:
+                    ok = filter_hits[doc.file_path] = fnmatch.fnmatch(doc.file_path, file_filter)
+                if not ok:
                     continue
-                df = self._kw_df.get(term, 0)
-                if df == 0:
-                    continue
-                idf = math.log((N - df + 0.5) / (df + 0.5) + 1.0)
-                dl = doc.doc_len or 1
-                tf_norm = (tf * (k1 + 1)) / (tf + k1 * (1 - b + b * dl / avg_dl))
-                score += idf * tf_norm
-
-            if score <= 0:
-                continue
-
-            # Post-hoc boosts
-            _name_lower = doc.name.lower()
-            name_tokens = _tokenize(doc.name)
 
             # Graduated symbol name match boost
+            _name_lower = doc.name.lower()
             _name_boost_applied = False
             for term in query_tokens:
                 if term == _name_lower:
@@ -1103,76 +1216,30 @@ class SemanticSearchManager:
                     _name_boost_applied = True
                     break
             if not _name_boost_applied:
+                name_tokens = _tokenize(doc.name)
                 for term in query_tokens:
                     if term in name_tokens:
                         score *= cfg.name_token_boost
                         break
 
-            # Definition-type boost: classes and functions rank above file-level
-            if doc.chunk_type == "class":
-                score *= cfg.class_boost
-            elif doc.chunk_type == "function":
-                score *= cfg.function_boost
-            elif doc.chunk_type == "method":
-                score *= cfg.method_boost
-
-            # Path relevance boost: source directories rank higher
-            _SRC_DIRS = {"src", "lib", "pkg", "core", "internal", "app", "main"}  # noqa: N806
-            _first_dir = doc.file_path.split("/")[0] if "/" in doc.file_path else ""
-            if _first_dir.lower() in _SRC_DIRS:
-                score *= cfg.src_dir_boost
-
-            # Multi-term coverage bonus
-            if len(query_tokens) > 1:
-                _matched_terms = sum(1 for t in query_tokens if doc.term_freqs.get(t, 0) > 0)
-                _coverage = _matched_terms / len(query_tokens)
-                if _coverage >= cfg.multi_term_high_threshold:
-                    score *= cfg.multi_term_high_bonus
-                elif _coverage >= cfg.multi_term_med_threshold:
-                    score *= cfg.multi_term_med_bonus
-
-            # Non-code file penalty (markdown, text, config formats)
-            _NON_CODE_EXTS = {".md", ".txt", ".rst", ".cfg", ".ini", ".yml", ".yaml", ".json", ".toml", ".xml", ".csv"}  # noqa: N806
-            _ext = os.path.splitext(doc.file_path)[1].lower()
-            if _ext in _NON_CODE_EXTS:
-                score *= cfg.non_code_penalty
-
-            # Config/doc file penalty (stacks with non-code ext penalty)
-            if doc.is_config:
-                score *= cfg.config_penalty
-
-            # Test file mild penalty
-            if doc.is_test:
-                score *= cfg.test_penalty
-
             # Exact phrase bonus: multi-word query substring match in text
-            if len(query_tokens) > 1 and query_lower in doc.text.lower():
+            if multi_term and query_lower in doc.text.lower():
                 score *= cfg.exact_phrase_bonus
 
-            # File importance boost (PageRank + hub score from dependency graph)
-            if cfg.importance_weight > 0:
-                imp = self._get_importance(doc.file_path)
-                score *= (1.0 + imp * cfg.importance_weight)
-
-            scored.append((score, doc))
+            running.add(doc.file_path, score, doc_id)
 
-        if not scored:
+        top = running.top()
+        if not top:
             return []
 
-        scored.sort(key=lambda x: x[0], reverse=True)
-
         # Normalize to 0-1
-        max_score = scored[0][0] if scored else 1.0
+        max_score = top[0][0]
         if max_score <= 0:
             max_score = 1.0
 
-        # Deduplicate: max N chunks per file
-        file_counts: dict[str, int] = {}
         results: list[SemanticSearchResult] = []
-        for raw_score, doc in scored:
-            if file_counts.get(doc.file_path, 0) >= cfg.max_chunks_per_file:
-                continue
-            file_counts[doc.file_path] = file_counts.get(doc.file_path, 0) + 1
+        for raw_score, doc_id in top:
+            doc = self._kw_docs[doc_id]
             results.append(SemanticSearchResult(
                 file_path=doc.file_path,
                 chunk_type=doc.chunk_type,
@@ -1180,9 +1247,6 @@ class SemanticSearchManager:
                 text=doc.text,
                 score=round(raw_score / max_score, 4),
             ))
-            if len(results) >= top_k:
-                break
-
         return results
 
     # ------------------------------------------------------------------
@@ -1209,21 +1273,28 @@ class SemanticSearchManager:
                     text TEXT NOT NULL,
                     is_config INTEGER NOT NULL DEFAULT 0,
                     is_test INTEGER NOT NULL DEFAULT 0,
-                    term_freqs TEXT NOT NULL, doc_len INTEGER NOT NULL DEFAULT 0
+                    term_freqs TEXT NOT NULL, doc_len INTEGER NOT NULL DEFAULT 0,
+                    ord INTEGER NOT NULL DEFAULT 0
                 );
                 CREATE INDEX IF NOT EXISTS ix_kw_docs_file ON kw_docs(file_path);
+                CREATE TABLE IF NOT EXISTS kw_postings (
+                    term TEXT PRIMARY KEY, doc_ids BLOB NOT NULL,
+                    tfs BLOB NOT NULL
+                );
             """)
             row = conn.execute(
                 "SELECT value FROM metadata WHERE key='schema_version'",
             ).fetchone()
             if row is None:
                 conn.execute(
-                    "INSERT INTO metadata (key, value) VALUES ('schema_version', '1')",
+                    "INSERT INTO metadata (key, value) VALUES ('schema_version', ?)",
+                    (_KW_CACHE_SCHEMA_VERSION,),
                 )
                 conn.commit()
-            elif row[0] != "1":
+            elif row[0] != _KW_CACHE_SCHEMA_VERSION:
                 conn.executescript(
-                    "DROP TABLE IF EXISTS kw_files; DROP TABLE IF EXISTS kw_docs;"
+                    "DROP TABLE IF EXISTS kw_files; DROP TABLE IF EXISTS kw_docs; "
+                    "DROP TABLE IF EXISTS kw_postings;"
                 )
                 conn.executescript("""
                     CREATE TABLE kw_files (
@@ -1235,13 +1306,19 @@ class SemanticSearchManager:
                         text TEXT NOT NULL,
                         is_config INTEGER NOT NULL DEFAULT 0,
                         is_test INTEGER NOT NULL DEFAULT 0,
-                        term_freqs TEXT NOT NULL, doc_len INTEGER NOT NULL DEFAULT 0
+                        term_freqs TEXT NOT NULL, doc_len INTEGER NOT NULL DEFAULT 0,
+                        ord INTEGER NOT NULL DEFAULT 0
                     );
                     CREATE INDEX IF NOT EXISTS ix_kw_docs_file ON kw_docs(file_path);
+                    CREATE TABLE kw_postings (
+                        term TEXT PRIMARY KEY, doc_ids BLOB NOT NULL,
+                        tfs BLOB NOT NULL
+                    );
                 """)
                 conn.execute(
                     "INSERT OR REPLACE INTO metadata (key, value) "
-                    "VALUES ('schema_version', '1')",
+                    "VALUES ('schema_version', ?)",
+                    (_KW_CACHE_SCHEMA_VERSION,),
                 )
                 conn.commit()
             return conn
@@ -1253,8 +1330,9 @@ class SemanticSearchManager:
         self,
         docs: list[_KeywordDoc],
         file_mtimes: dict[str, float],
+        postings: KeywordPostings,
     ) -> None:
-        """Persist keyword index docs to disk cache."""
+        """Persist keyword index docs and their postings to disk cache."""
         conn = self._open_kw_cache_db()
         if conn is None:
             return
@@ -1262,23 +1340,29 @@ class SemanticSearchManager:
             with self._kw_cache_lock:
                 conn.execute("DELETE FROM kw_files")
                 conn.execute("DELETE FROM kw_docs")
-                for fpath, mtime in file_mtimes.items():
-                    conn.execute(
-                        "INSERT INTO kw_files (file_path, mtime) VALUES (?, ?)",
-                        (fpath, mtime),
-                    )
-                for doc in docs:
-                    conn.execute(
-                        "INSERT OR REPLACE INTO kw_docs "
-                        "(id, file_path, chunk_type, name, text, is_config, "
-                        "is_test, term_freqs, doc_len) "
-                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                conn.execute("DELETE FROM kw_postings")
+                conn.executemany(
+                    "INSERT INTO kw_files (file_path, mtime) VALUES (?, ?)",
+                    file_mtimes.items(),
+                )
+                conn.executemany(
+                    "INSERT OR REPLACE INTO kw_docs "
+                    "(id, file_path, chunk_type, name, text, is_config, "
+                    "is_test, term_freqs, doc_len, ord) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
                         (
                             doc.id, doc.file_path, doc.chunk_type, doc.name,
                             doc.text, int(doc.is_config), int(doc.is_test),
-                            json.dumps(doc.term_freqs), doc.doc_len,
-                        ),
-                    )
+                            json.dumps(doc.term_freqs), doc.doc_len, ord_,
+                        )
+                        for ord_, doc in enumerate(docs)
+                    ),
+                )
+                conn.executemany(
+                    "INSERT INTO kw_postings (term, doc_ids, tfs) VALUES (?, ?, ?)",
+                    postings.to_rows(),
+                )
                 conn.commit()
         except Exception:
             logger.debug("Failed to save kw cache", exc_info=True)
@@ -1288,14 +1372,19 @@ class SemanticSearchManager:
     def _load_kw_cache(
         self,
         current_files: dict[str, tuple[str, float]],
-    ) -> tuple[list[_KeywordDoc], set[str]] | None:
+    ) -> tuple[list[_KeywordDoc], set[str], KeywordPostings | None] | None:
         """Load cached keyword docs, identify files that need re-parsing.
 
+        When no file changed or disappeared the persisted postings are
+        still valid for the cached doc order, so they are returned as-is
+        and the per-doc ``term_freqs`` JSON is not decoded at all.
+
         Args:
             current_files: dict of rel_path -> (abs_path, mtime)
 
         Returns:
-            (cached_docs, files_to_parse) or None if cache unavailable.
+            (cached_docs, files_to_parse, postings) or None if cache
+            unavailable. ``postings`` is None when it must be rebuilt.
         """
         conn = self._open_kw_cache_db()
         if conn is None:
@@ -1319,11 +1408,14 @@ class SemanticSearchManager:
                         stale.add(fpath)
                 deleted = set(cached_mtimes.keys()) - set(current_files.keys())
                 exclude = stale | deleted
+                reuse_postings = not exclude and conn.execute(
+                    "SELECT 1 FROM kw_postings LIMIT 1",
+                ).fetchone() is not None
 
                 # Load docs for unchanged files
                 doc_rows = conn.execute(
-                    "SELECT id, file_path, chunk_type, name, text, "
-                    "is_config, is_test, term_freqs, doc_len FROM kw_docs",
+                    "SELECT id, file_path, chunk_type, name, text, is_config, "
+                    "is_test, doc_len, term_freqs FROM kw_docs ORDER BY ord",
                 ).fetchall()
 
                 docs: list[_KeywordDoc] = []
@@ -1333,12 +1425,19 @@ class SemanticSearchManager:
                     docs.append(_KeywordDoc(
                         id=row[0], file_path=row[1], chunk_type=row[2],
                         name=row[3], text=row[4], is_config=bool(row[5]),
-                        is_test=bool(row[6]),
-                        term_freqs=json.loads(row[7]), doc_len=row[8],
+                        is_test=bool(row[6]), doc_len=row[7],
+                        term_freqs={} if reuse_postings else json.loads(row[8]),
                     ))
 
+                postings: KeywordPostings | None = None
+                if reuse_postings:
+                    postings = KeywordPostings.from_rows(
+                        conn.execute("SELECT term, doc_ids, tfs FROM kw_postings"),
+                        (doc.doc_len for doc in docs),
+                    )
+
             conn.close()
-            return (docs, stale)
+            return (docs, stale, postings)
         except Exception:
             logger.debug("Failed to load kw cache", exc_info=True)
             try:
@@ -1387,8 +1486,9 @@ class SemanticSearchManager:
         # Try incremental update from cache
         cache_result = self._load_kw_cache(current_files)
 
+        postings: KeywordPostings | None = None
         if cache_result is not None:
-            docs, files_to_parse = cache_result
+            docs, files_to_parse, postings = cache_result
             logger.debug(
                 "kw_index incremental: %d cached docs, %d files to parse",
                 len(docs), len(files_to_parse),
@@ -1542,27 +1642,38 @@ class SemanticSearchManager:
                         doc_len=len(m_tokens),
                     ))
 
-        # Build document frequencies (always recomputed from full doc list)
-        df: dict[str, int] = {}
-        for doc in docs:
-            for term in doc.term_freqs:
-                df[term] = df.get(term, 0) + 1
+        # Postings are reused only when the cache was complete and fresh;
+        # otherwise they are re-inverted from the full doc list.
+        reused = postings is not None
+        if postings is None:
+            # kw_docs is keyed by id, so the cache keeps only the last doc
+            # per id (e.g. overloads); drop earlier duplicates here too so
+            # postings doc ids line up with the stored row order.
+            last_pos = {doc.id: i for i, doc in enumerate(docs)}
+            if len(last_pos) != len(docs):
+                docs = [doc for i, doc in enumerate(docs) if last_pos[doc.id] == i]
+            postings = KeywordPostings.from_term_freqs(
+                (doc.term_freqs for doc in docs),
+                (doc.doc_len for doc in docs),
+            )
 
         total_len = sum(doc.doc_len for doc in docs)
         avg_dl = total_len / len(docs) if docs else 1.0
 
         self._kw_docs = docs
-        self._kw_df = df
+        self._kw_postings = postings
+        self._kw_boosts = None
         self._kw_avg_dl = avg_dl
         self._kw_index_built = True
 
         # Persist to cache
-        file_mtimes = {rel: mt for rel, (_, mt) in current_files.items()}
-        self._save_kw_cache(docs, file_mtimes)
+        if not reused:
+            file_mtimes = {rel: mt for rel, (_, mt) in current_files.items()}
+            self._save_kw_cache(docs, file_mtimes, postings)
 
         logger.debug(
             "BM25 keyword index built: %d docs, %d terms (%d files parsed)",
-            len(docs), len(df), len(files_to_parse),
+            len(docs), postings.n_terms, len(files_to_parse),
         )
 
     def _slice_body(
@@ -1614,8 +1725,9 @@ class SemanticSearchManager:
         """
         from attocode.integrations.context.codebase_ast import parse_file
 
+        cache = self._get_parse_cache()
         try:
-            ast = parse_file(abs_path)
+            ast = cache.parse(abs_path) if cache is not None else parse_file(abs_path)
         except Exception:
             return []
 
@@ -1839,7 +1951,6 @@ class SemanticSearchManager:
     def invalidate_file(self, file_path: str) -> None:
         """Remove embeddings for a changed file."""
         self._kw_index_built = False  # Force rebuild on next keyword search
-        self._trigram_index = None  # Reload on next use
         try:
             rel = os.path.relpath(file_path, self.root_dir)
         except ValueError:
@@ -2053,6 +2164,9 @@ class SemanticSearchManager:
         to_index = [f for f in indexable if f.relative_path in stale or f.relative_path not in all_indexed]
 
         self._index_progress.indexed_files = len(indexable) - len(to_index)
+        cache = self._get_parse_cache()
+        if cache is not None:
+            cache.resolve([f.path for f in to_index])
         batch_size = 50
 
         for i in range(0, len(to_index), batch_size):
@@ -2153,6 +2267,9 @@ class SemanticSearchManager:
                 logger.warning("Background indexer thread did not stop within 5s")
         if self._store:
             self._store.close()
+        if self._parse_cache is not None:
+            self._parse_cache.close()
+            self._parse_cache = None
 
     def format_results(self, results: list[SemanticSearchResult]) -> str:
         """Format search results as human-readable text."""
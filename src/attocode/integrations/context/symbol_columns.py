@@ -0,0 +1,648 @@
+"""Compact columnar storage behind ``CrossRefIndex``.
+
+One ``SymbolLocation``/``SymbolRef`` object per definition and reference,
+each holding its own path and name strings inside dicts of lists and sets,
+costs a few hundred bytes per entry -- several GB for a large monorepo.
+The classes here keep the same data in flat arrays instead:
+
+* :class:`StringTable` -- interns paths, names and kinds to ``int`` ids.
+* :class:`MultiMap` -- ``str -> set of str`` with single values unboxed,
+  for the inverted name indexes.
+* :class:`RowTable` -- one ``array`` column per record field, with rows
+  grouped by a key column (qualified name, symbol name) and by file.
+  Records are only materialized for rows a query returns.
+* :class:`Graph` -- a directed graph over string ids stored as CSR
+  arrays (one ``indptr``/``indices`` pair per direction), plus a small
+  overlay for edges added or removed since the arrays were last built.
+
+:class:`RecordsView`, :class:`FileKeysView` and :class:`GraphView` expose
+them as read-only mappings, so readers of ``index.definitions`` or
+``index.call_edges`` keep working.  Values are built per lookup; mutating
+them does not change the index.
+"""
+
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from itertools import accumulate
+from operator import attrgetter
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+
+_MIN_COMPACT = 4096  # Dead rows before a RowTable drops them
+_MIN_OVERLAY = 4096  # Overlay edges before a Graph rebuilds its CSR arrays
+_MASK = (1 << 32) - 1
+
+
+@dataclass(slots=True)
+class StringTable:
+    """Interned strings with dense ``int`` ids.
+
+    Ids are never reused, so a string stays in the table after the last
+    row using it is removed.
+    """
+
+    _ids: dict[str, int] = field(default_factory=dict)
+    _strings: list[str] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self._strings)
+
+    def __getitem__(self, string_id: int) -> str:
+        return self._strings[string_id]
+
+    def intern(self, s: str) -> int:
+        string_id = self._ids.get(s)
+        if string_id is None:
+            string_id = self._ids[s] = len(self._strings)
+            self._strings.append(s)
+        return string_id
+
+    def find(self, s: str) -> int:
+        """Id of *s*, or -1 if it was never interned."""
+        return self._ids.get(s, -1)
+
+
+class MultiMap(Mapping[str, "set[str] | tuple[str]"]):
+    """``str -> set of str`` that stores single-value entries unboxed.
+
+    Most symbol names map to exactly one qualified name, and an empty
+    ``set`` alone costs ~200 bytes.  Lookups return a one-tuple for those
+    entries and the live ``set`` otherwise; treat both as read-only.
+    """
+
+    __slots__ = ("_data",)
+
+    def __init__(self) -> None:
+        self._data: dict[str, str | set[str]] = {}
+
+    def __getitem__(self, key: str) -> set[str] | tuple[str]:
+        values = self._data[key]
+        return (values,) if isinstance(values, str) else values
+
+    def get(self, key: str, default: Any = ()) -> Any:
+        values = self._data.get(key)
+        if values is None:
+            return default
+        return (values,) if isinstance(values, str) else values
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._data
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def add(self, key: str, value: str) -> bool:
+        """Add *value* under *key*; True if *key* is new."""
+        values = self._data.get(key)
+        if values is None:
+            self._data[key] = value
+            return True
+        if isinstance(values, str):
+            if values != value:
+                self._data[key] = {values, value}
+        else:
+            values.add(value)
+        return False
+
+    def update(self, key: str, values: Iterable[str]) -> None:
+        for value in values:
+            self.add(key, value)
+
+    def discard(self, key: str, value: str) -> bool:
+        """Remove *value* from *key*; True if that left *key* empty."""
+        values = self._data.get(key)
+        if values is None:
+            return False
+        if isinstance(values, str):
+            if values != value:
+                return False
+            del self._data[key]
+            return True
+        values.discard(value)
+        if len(values) == 1:
+            self._data[key] = next(iter(values))
+        return False
+
+
+# ---------------------------------------------------------------------------
+# Records
+# ---------------------------------------------------------------------------
+
+
+# Row groups map a key id to its row ids: a bare int for a single row
+# (most qualified names have one definition), else an ``array('I')``.
+_Groups = dict[int, "int | array[int]"]
+
+
+def _group(groups: _Groups, key: int, row: int) -> None:
+    rows = groups.get(key)
+    if rows is None:
+        groups[key] = row
+    elif isinstance(rows, int):
+        groups[key] = array("I", (rows, row))
+    else:
+        rows.append(row)
+
+
+def _members(groups: _Groups, key: int) -> array[int] | tuple[int, ...]:
+    rows = groups.get(key, ())
+    return (rows,) if isinstance(rows, int) else rows
+
+
+def _set_group(groups: _Groups, key: int, rows: list[int]) -> None:
+    if not rows:
+        del groups[key]
+    elif len(rows) == 1:
+        groups[key] = rows[0]
+    else:
+        groups[key] = array("I", rows)
+
+
+def _ungroup(groups: _Groups, key: int, row: int) -> None:
+    _set_group(groups, key, [r for r in _members(groups, key) if r != row])
+
+
+@dataclass(slots=True)
+class RowTable:
+    """Records of one type stored column-wise.
+
+    *fields* are the record's attributes in the order *record* takes them
+    positionally; *text* marks the string columns, which hold
+    :class:`StringTable` ids.  The other columns hold ints.  Rows are
+    grouped by the *key* field and by the *file* field, in insertion
+    order.  Removed rows are tombstoned and dropped in bulk later, so row
+    ids are only stable until the next :meth:`remove_file`.
+    """
+
+    strings: StringTable
+    record: Callable[..., Any]
+    fields: tuple[str, ...]
+    text: tuple[bool, ...]
+    key: str
+    file: str
+    _get: Callable[[Any], tuple[Any, ...]] = field(init=False, repr=False)
+    _key: int = field(init=False, repr=False)
+    _file: int = field(init=False, repr=False)
+    _cols: list[array[int]] = field(init=False, repr=False)
+    _live: bytearray = field(default_factory=bytearray, repr=False)
+    _dead: int = 0
+    _by_key: _Groups = field(default_factory=dict, repr=False)
+    _by_file: _Groups = field(default_factory=dict, repr=False)
+
+    def __post_init__(self) -> None:
+        self._get = attrgetter(*self.fields)
+        self._key = self.fields.index(self.key)
+        self._file = self.fields.index(self.file)
+        self._cols = [array("I" if t else "i") for t in self.text]
+
+    def __len__(self) -> int:
+        return len(self._live) - self._dead
+
+    # -- writes --------------------------------------------------------
+
+    def append(self, rec: Any) -> int:
+        """Store *rec* and return its row id."""
+        row = len(self._live)
+        ids = self.strings._ids
+        intern = self.strings.intern
+        for col, value, is_text in zip(self._cols, self._get(rec), self.text, strict=True):
+            if is_text:
+                string_id = ids.get(value)
+                col.append(intern(value) if string_id is None else string_id)
+            else:
+                col.append(value)
+        self._live.append(1)
+        _group(self._by_key, self._cols[self._key][row], row)
+        _group(self._by_file, self._cols[self._file][row], row)
+        return row
+
+    def id_at(self, row: int, name: str) -> int:
+        """String id held in the *name* column of *row*."""
+        return self._cols[self.fields.index(name)][row]
+
+    def replace(self, row: int, rec: Any) -> None:
+        """Overwrite *row* with *rec*, keeping its position in its groups."""
+        old_key = self._cols[self._key][row]
+        old_file = self._cols[self._file][row]
+        intern = self.strings.intern
+        for col, value, is_text in zip(self._cols, self._get(rec), self.text, strict=True):
+            col[row] = intern(value) if is_text else value
+        if self._cols[self._key][row] != old_key:
+            _ungroup(self._by_key, old_key, row)
+            _group(self._by_key, self._cols[self._key][row], row)
+        if self._cols[self._file][row] != old_file:
+            _ungroup(self._by_file, old_file, row)
+            _group(self._by_file, self._cols[self._file][row], row)
+
+    def remove_file(self, file_path: str) -> list[str]:
+        """Drop every row of *file_path*; return the keys left without rows."""
+        file_id = self.strings.find(file_path)
+        rows = _members(self._by_file, file_id)
+        if not rows:
+            return []
+        del self._by_file[file_id]
+        live = self._live
+        keys = self._cols[self._key]
+        dropped: dict[int, set[int]] = {}
+        for row in rows:
+            live[row] = 0
+            dropped.setdefault(keys[row], set()).add(row)
+        self._dead += len(rows)
+        emptied: list[str] = []
+        for key, gone in dropped.items():
+            _set_group(self._by_key, key, [r for r in _members(self._by_key, key) if r not in gone])
+            if key not in self._by_key:
+                emptied.append(self.strings[key])
+        if self._dead >= _MIN_COMPACT and self._dead * 2 > len(live):
+            self._compact()
+        return emptied
+
+    def _compact(self) -> None:
+        keep = [row for row, alive in enumerate(self._live) if alive]
+        new_id = dict(zip(keep, range(len(keep)), strict=True))
+        self._cols = [array(col.typecode, [col[row] for row in keep]) for col in self._cols]
+        self._live = bytearray(b"\x01") * len(keep)
+        self._dead = 0
+        for groups in (self._by_key, self._by_file):
+            for key in groups:
+                _set_group(groups, key, [new_id[row] for row in _members(groups, key)])
+
+    # -- reads ---------------------------------------------------------
+
+    def values(self, row: int) -> tuple[Any, ...]:
+        """Field values of *row*, in ``fields`` order."""
+        strings = self.strings._strings
+        return tuple(
+            strings[col[row]] if is_text else col[row]
+            for col, is_text in zip(self._cols, self.text, strict=True)
+        )
+
+    def get(self, row: int) -> Any:
+        return self.record(*self.values(row))
+
+    def key_of(self, row: int) -> str:
+        return self.strings[self._cols[self._key][row]]
+
+    def rows(self, key: str) -> array[int] | tuple[int, ...]:
+        return _members(self._by_key, self.strings.find(key))
+
+    def file_rows(self, file_path: str) -> array[int] | tuple[int, ...]:
+        return _members(self._by_file, self.strings.find(file_path))
+
+    def records(self, key: str) -> list[Any]:
+        return [self.get(row) for row in self.rows(key)]
+
+    def file_records(self, file_path: str) -> list[Any]:
+        return [self.get(row) for row in self.file_rows(file_path)]
+
+    def file_values(self, file_path: str) -> list[tuple[Any, ...]]:
+        return [self.values(row) for row in self.file_rows(file_path)]
+
+    def file_keys(self, file_path: str) -> set[str]:
+        strings = self.strings._strings
+        keys = self._cols[self._key]
+        return {strings[keys[row]] for row in self.file_rows(file_path)}
+
+    def find(self, key: str, file_path: str, name: str, value: Any) -> int:
+        """First row of *key* in *file_path* whose *name* field is *value*, or -1."""
+        file_id = self.strings.find(file_path)
+        files = self._cols[self._file]
+        col = self._cols[self.fields.index(name)]
+        for row in self.rows(key):
+            if files[row] == file_id and col[row] == value:
+                return row
+        return -1
+
+    def has_key(self, key: str) -> bool:
+        return self.strings.find(key) in self._by_key
+
+    def has_file(self, file_path: str) -> bool:
+        return self.strings.find(file_path) in self._by_file
+
+    def keys(self) -> Iterator[str]:
+        strings = self.strings._strings
+        return (strings[key] for key in self._by_key)
+
+    def files(self) -> Iterator[str]:
+        strings = self.strings._strings
+        return (strings[file_id] for file_id in self._by_file)
+
+    def key_count(self) -> int:
+        return len(self._by_key)
+
+    def file_count(self) -> int:
+        return len(self._by_file)
+
+
+# ---------------------------------------------------------------------------
+# Graphs
+# ---------------------------------------------------------------------------
+
+
+def _csr(pairs: list[int], nodes: int) -> tuple[array[int], array[int]]:
+    """``(indptr, indices)`` for sorted ``src << 32 | dst`` *pairs*."""
+    counts = [0] * (nodes + 1)
+    for pair in pairs:
+        counts[(pair >> 32) + 1] += 1
+    return array("L", accumulate(counts)), array("I", [pair & _MASK for pair in pairs])
+
+
+@dataclass(slots=True)
+class Graph:
+    """Directed graph over ``int`` node ids, without duplicate edges.
+
+    The edges present at the last rebuild are held as two CSR structures
+    (successors and predecessors, each list sorted).  Edges added since
+    live in per-node sets, base edges removed since in ``_removed``, and
+    the overlay is folded into fresh arrays once it outgrows the base --
+    so bulk loads cost a logarithmic number of rebuilds.  Callers compact
+    explicitly after a bulk load.
+    """
+
+    _fwd_ptr: array[int] = field(default_factory=lambda: array("L", (0,)))
+    _fwd: array[int] = field(default_factory=lambda: array("I"))
+    _rev_ptr: array[int] = field(default_factory=lambda: array("L", (0,)))
+    _rev: array[int] = field(default_factory=lambda: array("I"))
+    _out_added: dict[int, set[int]] = field(default_factory=dict)
+    _in_added: dict[int, set[int]] = field(default_factory=dict)
+    _added: int = 0
+    # src << 32 | dst of base edges removed since the last rebuild
+    _removed: set[int] = field(default_factory=set)
+
+    def __len__(self) -> int:
+        """Number of edges."""
+        return len(self._fwd) - len(self._removed) + self._added
+
+    def _in_base(self, src: int, dst: int) -> bool:
+        ptr = self._fwd_ptr
+        if src + 1 >= len(ptr):
+            return False
+        lo, hi = ptr[src], ptr[src + 1]
+        i = bisect_left(self._fwd, dst, lo, hi)
+        return i < hi and self._fwd[i] == dst
+
+    def add(self, src: int, dst: int) -> None:
+        if self._removed and src << 32 | dst in self._removed:
+            self._removed.discard(src << 32 | dst)
+            return
+        out = self._out_added.get(src)
+        if out is None:
+            if self._in_base(src, dst):
+                return
+            self._out_added[src] = {dst}
+        elif dst in out or self._in_base(src, dst):
+            return
+        else:
+            out.add(dst)
+        into = self._in_added.get(dst)
+        if into is None:
+            self._in_added[dst] = {src}
+        else:
+            into.add(src)
+        self._added += 1
+        if self._added > _MIN_OVERLAY:
+            self._maybe_rebuild()
+
+    def discard(self, src: int, dst: int) -> None:
+        out = self._out_added.get(src)
+        if out is not None and dst in out:
+            out.discard(dst)
+            if not out:
+                del self._out_added[src]
+            into = self._in_added[dst]
+            into.discard(src)
+            if not into:
+                del self._in_added[dst]
+            self._added -= 1
+        elif self._in_base(src, dst):
+            self._removed.add(src << 32 | dst)
+            self._maybe_rebuild()
+
+    def pop_successors(self, node: int) -> list[int]:
+        """Remove and return every edge out of *node* (as successor ids)."""
+        succ = self.successors(node)
+        for dst in succ:
+            self.discard(node, dst)
+        return succ
+
+    def pop_predecessors(self, node: int) -> list[int]:
+        """Remove and return every edge into *node* (as predecessor ids)."""
+        pred = self.predecessors(node)
+        for src in pred:
+            self.discard(src, node)
+        return pred
+
+    def successors(self, node: int) -> list[int]:
+        out: list[int] = []
+        ptr = self._fwd_ptr
+        if node + 1 < len(ptr):
+            lo, hi = ptr[node], ptr[node + 1]
+            if lo != hi:
+                removed = self._removed
+                base = node << 32
+                out = [d for d in self._fwd[lo:hi] if base | d not in removed]
+        added = self._out_added.get(node)
+        if added:
+            out.extend(added)
+        return out
+
+    def predecessors(self, node: int) -> list[int]:
+        out: list[int] = []
+        ptr = self._rev_ptr
+        if node + 1 < len(ptr):
+            lo, hi = ptr[node], ptr[node + 1]
+            if lo != hi:
+                removed = self._removed
+                out = [s for s in self._rev[lo:hi] if s << 32 | node not in removed]
+        added = self._in_added.get(node)
+        if added:
+            out.extend(added)
+        return out
+
+    def sources(self) -> Iterator[int]:
+        """Nodes with at least one outgoing edge."""
+        return self._nodes(self._fwd_ptr, self._out_added, self.successors)
+
+    def targets(self) -> Iterator[int]:
+        """Nodes with at least one incoming edge."""
+        return self._nodes(self._rev_ptr, self._in_added, self.predecessors)
+
+    def _nodes(
+        self, ptr: array[int], added: dict[int, set[int]], edges: Callable[[int], list[int]],
+    ) -> Iterator[int]:
+        removed = bool(self._removed)
+        for node in range(len(ptr) - 1):
+            if node in added or (
+                ptr[node] != ptr[node + 1] and (not removed or edges(node))
+            ):
+                yield node
+        for node in added:
+            if node >= len(ptr) - 1:
+                yield node
+
+    def reach(self, start: int, depth: int, *, reverse: bool = False) -> set[int]:
+        """Nodes reachable from *start* in 1..*depth* hops (against edges if *reverse*)."""
+        step = self.predecessors if reverse else self.successors
+        visited: set[int] = set()
+        frontier = {start}
+        result: set[int] = set()
+        for _ in range(depth):
+            next_frontier: set[int] = set()
+            for node in frontier:
+                visited.add(node)
+                found = step(node)
+                result.update(found)
+                next_frontier.update(found)
+            next_frontier -= visited
+            if not next_frontier:
+                break
+            frontier = next_frontier
+        return result
+
+    def compact(self) -> None:
+        """Fold the overlay into the CSR arrays."""
+        if not self._added and not self._removed:
+            return
+        pairs = [src << 32 | dst for src in self.sources() for dst in self.successors(src)]
+        pairs.sort()
+        rev = sorted((pair & _MASK) << 32 | pair >> 32 for pair in pairs)
+        nodes = 1 + max(pairs[-1] >> 32, rev[-1] >> 32) if pairs else 0
+        self._fwd_ptr, self._fwd = _csr(pairs, nodes)
+        self._rev_ptr, self._rev = _csr(rev, nodes)
+        self._out_added.clear()
+        self._in_added.clear()
+        self._added = 0
+        self._removed.clear()
+
+    def _maybe_rebuild(self) -> None:
+        if self._added + len(self._removed) > max(_MIN_OVERLAY, len(self._fwd)):
+            self.compact()
+
+
+# ---------------------------------------------------------------------------
+# Mapping views
+# ---------------------------------------------------------------------------
+
+
+class RecordsView(Mapping[str, list[Any]]):
+    """``key -> [record, ...]`` over a :class:`RowTable` (or ``file -> ...``)."""
+
+    __slots__ = ("_table", "_by_file")
+
+    def __init__(self, table: RowTable, *, by_file: bool = False) -> None:
+        self._table = table
+        self._by_file = by_file
+
+    def __getitem__(self, key: str) -> list[Any]:
+        table = self._table
+        records = table.file_records(key) if self._by_file else table.records(key)
+        if not records:
+            raise KeyError(key)
+        return records
+
+    def __contains__(self, key: object) -> bool:
+        if not isinstance(key, str):
+            return False
+        return self._table.has_file(key) if self._by_file else self._table.has_key(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return self._table.files() if self._by_file else self._table.keys()
+
+    def __len__(self) -> int:
+        return self._table.file_count() if self._by_file else self._table.key_count()
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({len(self)} keys)"
+
+
+class FileKeysView(Mapping[str, set[str]]):
+    """``file -> {key, ...}`` over a :class:`RowTable`.
+
+    *extra* adds ``file id -> key ids`` for files kept outside the table
+    (the lazily loaded ones); a file is expected in one or the other.
+    """
+
+    __slots__ = ("_table", "_extra")
+
+    def __init__(self, table: RowTable, extra: dict[int, array[int]] | None = None) -> None:
+        self._table = table
+        self._extra = extra or {}
+
+    def __getitem__(self, file_path: str) -> set[str]:
+        keys = self._table.file_keys(file_path)
+        ids = self._extra.get(self._table.strings.find(file_path))
+        if ids:
+            strings = self._table.strings
+            keys.update(strings[i] for i in ids)
+        if not keys:
+            raise KeyError(file_path)
+        return keys
+
+    def __contains__(self, file_path: object) -> bool:
+        if not isinstance(file_path, str):
+            return False
+        return self._table.has_file(file_path) or (
+            self._table.strings.find(file_path) in self._extra
+        )
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._table.files()
+        strings = self._table.strings
+        for file_id in self._extra:
+            if not self._table.has_file(strings[file_id]):
+                yield strings[file_id]
+
+    def __len__(self) -> int:
+        if not self._extra:
+            return self._table.file_count()
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({len(self)} files)"
+
+
+class GraphView(Mapping[str, set[str]]):
+    """``node -> {successor, ...}`` (or predecessors) over a :class:`Graph`."""
+
+    __slots__ = ("_graph", "_strings", "_reverse")
+
+    def __init__(self, graph: Graph, strings: StringTable, *, reverse: bool = False) -> None:
+        self._graph = graph
+        self._strings = strings
+        self._reverse = reverse
+
+    def _ids(self, key: object) -> list[int]:
+        node = self._strings.find(key) if isinstance(key, str) else -1
+        if node < 0:
+            return []
+        return self._graph.predecessors(node) if self._reverse else self._graph.successors(node)
+
+    def __getitem__(self, key: str) -> set[str]:
+        ids = self._ids(key)
+        if not ids:
+            raise KeyError(key)
+        strings = self._strings
+        return {strings[i] for i in ids}
+
+    def __contains__(self, key: object) -> bool:
+        return bool(self._ids(key))
+
+    def __iter__(self) -> Iterator[str]:
+        strings = self._strings
+        nodes = self._graph.targets() if self._reverse else self._graph.sources()
+        return (strings[node] for node in nodes)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({len(self._graph)} edges)"
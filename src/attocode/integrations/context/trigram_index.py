@@ -8,27 +8,73 @@ Lookup file  (.attocode/index/trigrams.lookup):
              postings_length:u32] = 16 bytes each
 
 Postings file (.attocode/index/trigrams.postings):
-    Per posting list: [count:u32] + [file_id:u32] * count
+    v2 (written): [count:u32] + varint(file_id delta) * count
+        File-IDs are sorted ascending; the first varint is the first ID,
+        every later one the gap to its predecessor (LEB128, 7 bits/byte).
+    v1 (read-only): [count:u32] + [file_id:u32] * count
 
 File-ID mapping: SQLite table in .attocode/index/trigrams.db
     trigram_files(file_id INTEGER PRIMARY KEY, path TEXT UNIQUE,
                   content_hash TEXT, mtime REAL)
+    trigram_meta(key TEXT PRIMARY KEY, value TEXT) -- holds ``base_id``
+
+Delta log (.attocode/index/trigrams.delta):
+    Header : magic(u32) + version(u16) + base_id(u64) = 14 bytes
+    Records: [op:u8, file_id:u32, content_crc:u32, mtime:f64, path_len:u16,
+              count:u32] + path(utf-8) + [trigram_hash:u32] * count
+              + content_len(u32) + content   (v2; 0xFFFFFFFF = not captured)
+
+Positional mode (optional, ``TrigramIndex(positional=True)``):
+    .attocode/index/trigrams.content -- raw bytes of every UTF-8 file of
+        the base segment, concatenated
+    .attocode/index/trigrams.lines   -- header magic(u32) + version(u16) +
+        base_id(u64) + file_count(u32), then per file [file_id:u32,
+        content_offset:u64, content_length:u32, lines_offset:u64,
+        line_count:u32, plain_lines:u8], then the line-start offsets
+        (u32, relative to the file's content) of all files
+    ``search_lines()`` confirms candidates against this snapshot: the
+    pattern's longest required literal is located with ``bytes.find`` and
+    mapped to its line through the line-start table, so only lines that
+    contain the literal are decoded and matched.  No source file is read.
+
+The lookup/postings pair is an immutable *base segment*.  Edits land in a
+small mutable *delta segment* (in memory, mirrored to the append-only delta
+log): an upsert gives the file a fresh file-ID and tombstones its previous
+ID, a removal only tombstones.  Queries merge base postings (minus
+tombstones) with the delta postings, and ``compact()`` -- triggered in the
+background once the delta grows past ``compact_threshold`` -- folds both
+into a new base segment without re-reading any source files.  The log
+header carries the ``base_id`` it was written against, so a log left over
+from a different base (e.g. after a snapshot restore) is discarded.
 """
 
 from __future__ import annotations
 
+import bisect
 import logging
 import mmap
 import os
+import re
 import sqlite3
 import struct
 import threading
 import time
 import zlib
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any, Literal, overload
 
+from attocode.integrations.context.workspace import read_bytes, workspace_snapshot
+
+try:
+    import numpy as np
+
+    _HAS_NUMPY = True
+except ImportError:
+    np = None  # type: ignore[assignment]
+    _HAS_NUMPY = False
+
 logger = logging.getLogger(__name__)
 
 # ---------------------------------------------------------------------------
@@ -56,10 +102,36 @@ class QueryResult:
 # ---------------------------------------------------------------------------
 
 _MAGIC: int = 0x54524933        # "TRI3" as little-endian u32
-_VERSION: int = 1
+_VERSION: int = 2               # postings format written by build()/compact()
+_SUPPORTED_VERSIONS: frozenset[int] = frozenset({1, 2})
 _HEADER_SIZE: int = 12          # magic(4) + version(2) + entry_count(4) + pad(2)
 _ENTRY_SIZE: int = 16           # hash(4) + offset(8) + length(4)
+_DELTA_MAGIC: int = 0x54524431  # "TRD1" as little-endian u32
+_DELTA_VERSION: int = 2
+_SUPPORTED_DELTA_VERSIONS: frozenset[int] = frozenset({1, 2})
+_DELTA_HEADER_FMT: str = "<IHQ"  # magic(4) + version(2) + base_id(8)
+_DELTA_HEADER_SIZE: int = struct.calcsize(_DELTA_HEADER_FMT)
+_DELTA_RECORD_FMT: str = "<BIIdHI"  # op, file_id, crc, mtime, path_len, count
+_DELTA_RECORD_SIZE: int = struct.calcsize(_DELTA_RECORD_FMT)
+_OP_UPSERT: int = 1
+_OP_REMOVE: int = 2
+_NO_CONTENT: int = 0xFFFFFFFF    # delta record content_len: content not captured
+_SNAPSHOT_MAGIC: int = 0x54525031  # "TRP1" as little-endian u32
+_SNAPSHOT_VERSION: int = 1
+_SNAPSHOT_HEADER_FMT: str = "<IHQI"  # magic(4) + version(2) + base_id(8) + file_count(4)
+_SNAPSHOT_HEADER_SIZE: int = struct.calcsize(_SNAPSHOT_HEADER_FMT)
+_SNAPSHOT_ENTRY_FMT: str = "<IQIQIB"  # file_id, content off/len, lines off/count, plain
+_SNAPSHOT_ENTRY_SIZE: int = struct.calcsize(_SNAPSHOT_ENTRY_FMT)
+# Separators str.splitlines() honours besides "\n"; a file containing any
+# of them cannot use the "\n"-based line-start table.
+_EXTRA_LINE_BREAKS: tuple[bytes, ...] = (
+    b"\r", b"\x0b", b"\x0c", b"\x1c", b"\x1d", b"\x1e",
+    "\x85".encode(), "\u2028".encode(), "\u2029".encode(),
+)
+_COMPACT_THRESHOLD: int = 256    # delta files + tombstones before compaction
 _MAX_FILE_SIZE: int = 1_000_000  # Skip files larger than 1 MB
+_PARALLEL_MIN_FILES: int = 2_000  # Below this, a process pool costs more than it saves
+_BATCH_SIZE: int = 256           # Files per worker task
 _SKIP_EXTENSIONS: frozenset[str] = frozenset({
     ".png", ".jpg", ".jpeg", ".gif", ".bmp", ".ico", ".svg",
     ".woff", ".woff2", ".ttf", ".eot",
@@ -108,6 +180,73 @@ def _extract_trigrams_from_bytes(content: bytes) -> set[int]:
     return hashes
 
 
+def _crc32_table() -> Any:
+    """Byte-wise lookup table for the reflected CRC-32 used by ``zlib.crc32``."""
+    table = np.arange(256, dtype=np.uint32)
+    for _ in range(8):
+        table = np.where(table & 1, (table >> 1) ^ np.uint32(0xEDB88320), table >> 1)
+    return table.astype(np.uint32)
+
+
+_CRC32_TABLE: Any = _crc32_table() if _HAS_NUMPY else None
+
+
+def _sorted_unique(values: Any) -> Any:
+    """``np.unique`` for flat integer arrays via sort + adjacent compare.
+
+    Several times faster than ``np.unique``'s hash-based path on the
+    small-to-medium arrays a single source file produces.
+    """
+    values = np.sort(values)
+    if values.size < 2:
+        return values
+    keep = np.empty(values.size, dtype=bool)
+    keep[0] = True
+    np.not_equal(values[1:], values[:-1], out=keep[1:])
+    return values[keep]
+
+
+def _trigram_hashes_array(content: bytes) -> Any:
+    """Vectorized :func:`_extract_trigrams_from_bytes`.
+
+    Packs every 3-byte window into a 24-bit key, drops windows containing
+    control characters, de-duplicates the keys and only then
+    applies the CRC32 (table-driven, three byte steps) to the unique keys.
+    Returns a sorted ``uint32`` array of the same hashes the scalar
+    version produces.
+    """
+    data = np.frombuffer(content, dtype=np.uint8)
+    if data.size < 3:
+        return np.empty(0, dtype=np.uint32)
+    control = (data < 0x09) | ((data >= 0x0E) & (data <= 0x1F))
+    valid = ~(control[:-2] | control[1:-1] | control[2:])
+    wide = data.astype(np.uint32)
+    keys = _sorted_unique(((wide[:-2] << 16) | (wide[1:-1] << 8) | wide[2:])[valid])
+    crc = np.full(keys.shape, 0xFFFFFFFF, dtype=np.uint32)
+    for shift in (16, 8, 0):
+        crc = _CRC32_TABLE[(crc ^ (keys >> shift)) & 0xFF] ^ (crc >> 8)
+    return _sorted_unique(crc ^ np.uint32(0xFFFFFFFF))
+
+
+def _extract_trigrams(content: bytes) -> set[int]:
+    """Return trigram hashes of *content*, vectorized when NumPy is present."""
+    if _HAS_NUMPY:
+        return set(_trigram_hashes_array(content).tolist())
+    return _extract_trigrams_from_bytes(content)
+
+
+def _skipped_path(rel_path: str) -> bool:
+    """Return True if *rel_path* is outside what ``build()`` indexes.
+
+    Mirrors the enumeration: no ``_SKIP_DIRS`` or dot-directory component,
+    no dot-file, no ``_SKIP_EXTENSIONS`` suffix (size is checked separately).
+    """
+    *dirs, fname = rel_path.replace(os.sep, "/").split("/")
+    if any(d in _SKIP_DIRS or (d.startswith(".") and d != ".") for d in dirs):
+        return True
+    return fname.startswith(".") or os.path.splitext(fname)[1].lower() in _SKIP_EXTENSIONS
+
+
 def _is_likely_binary(data: bytes, sample_size: int = 8192) -> bool:
     """Return True if *data* looks like binary content.
 
@@ -117,6 +256,10 @@ def _is_likely_binary(data: bytes, sample_size: int = 8192) -> bool:
     sample = data[:sample_size]
     if not sample:
         return False
+    if _HAS_NUMPY:
+        arr = np.frombuffer(sample, dtype=np.uint8)
+        control = (arr < 0x09) | ((arr >= 0x0E) & (arr <= 0x1F)) | (arr == 0x7F)
+        return int(np.count_nonzero(control)) / len(sample) > 0.10
     control_count = sum(
         1 for b in sample
         if b < 0x09 or (0x0E <= b <= 0x1F) or b == 0x7F
@@ -124,6 +267,563 @@ def _is_likely_binary(data: bytes, sample_size: int = 8192) -> bool:
     return control_count / len(sample) > 0.10
 
 
+def _encode_varints(values: list[int]) -> bytes:
+    """LEB128-encode non-negative *values* (7 payload bits per byte)."""
+    out = bytearray()
+    for value in values:
+        while value >= 0x80:
+            out.append((value & 0x7F) | 0x80)
+            value >>= 7
+        out.append(value)
+    return bytes(out)
+
+
+def _decode_varints(buf: bytes, count: int) -> list[int]:
+    """Decode up to *count* LEB128 values from *buf*."""
+    values: list[int] = []
+    value = shift = 0
+    for byte in buf:
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            values.append(value)
+            if len(values) == count:
+                break
+            value = shift = 0
+        else:
+            shift += 7
+    return values
+
+
+def _decode_varint_array(buf: Any) -> Any:
+    """Vectorized LEB128 decode of a ``uint8`` array into ``uint64`` values."""
+    ends = np.flatnonzero(buf < 0x80)
+    if ends.size == 0:
+        return np.empty(0, dtype=np.uint64)
+    buf = buf[: ends[-1] + 1]
+    starts = np.empty_like(ends)
+    starts[0] = 0
+    starts[1:] = ends[:-1] + 1
+    group = np.repeat(np.arange(ends.size), ends - starts + 1)
+    shifts = ((np.arange(buf.size) - starts[group]) * 7).astype(np.uint64)
+    payload = (buf & 0x7F).astype(np.uint64) << shifts
+    return np.add.reduceat(payload, starts)
+
+
+def _decode_posting_list(
+    mm: mmap.mmap | bytes, offset: int, length: int, version: int = _VERSION,
+) -> list[int]:
+    """Decode the posting list at *offset* into a sorted list of file-IDs."""
+    try:
+        raw = mm[offset : offset + length]
+        if len(raw) < 4:
+            return []
+        (count,) = struct.unpack_from("<I", raw, 0)
+        if version == 1:
+            expected = 4 + count * 4
+            if len(raw) < expected:
+                return []
+            return list(struct.unpack_from(f"<{count}I", raw, 4))
+        ids: list[int] = []
+        current = 0
+        for gap in _decode_varints(raw[4:], count):
+            current += gap
+            ids.append(current)
+        return ids
+    except (struct.error, ValueError):
+        return []
+
+
+def _decode_posting_array(
+    mm: mmap.mmap | bytes, offset: int, length: int, version: int = _VERSION,
+) -> Any:
+    """NumPy variant of :func:`_decode_posting_list` (sorted ``uint32`` array).
+
+    The slice copies out of the mmap, so the result never pins the map open.
+    """
+    raw = mm[offset : offset + length]
+    if len(raw) < 4:
+        return np.empty(0, dtype=np.uint32)
+    (count,) = struct.unpack_from("<I", raw, 0)
+    if version == 1:
+        if len(raw) < 4 + count * 4:
+            return np.empty(0, dtype=np.uint32)
+        return np.frombuffer(raw, dtype="<u4", count=count, offset=4).astype(np.uint32)
+    gaps = _decode_varint_array(np.frombuffer(raw, dtype=np.uint8, offset=4))[:count]
+    return np.cumsum(gaps, dtype=np.uint64).astype(np.uint32)
+
+
+@dataclass(slots=True)
+class _DeltaRecord:
+    """One entry of the delta log: an upsert or a removal of *path*."""
+
+    op: int
+    file_id: int
+    path: str
+    content_crc: int = 0
+    mtime: float = 0.0
+    trigrams: frozenset[int] = frozenset()
+    content: bytes | None = None  # kept only for positional indexes
+
+    def encode(self) -> bytes:
+        path_bytes = self.path.encode("utf-8")
+        hashes = sorted(self.trigrams)
+        content = self.content or b""
+        return b"".join((
+            struct.pack(
+                _DELTA_RECORD_FMT, self.op, self.file_id, self.content_crc,
+                self.mtime, len(path_bytes), len(hashes),
+            ),
+            path_bytes,
+            struct.pack(f"<{len(hashes)}I", *hashes),
+            struct.pack("<I", _NO_CONTENT if self.content is None else len(content)),
+            content,
+        ))
+
+
+def _parse_delta_log(data: bytes) -> tuple[int | None, list[_DeltaRecord], int]:
+    """Parse a delta log blob.
+
+    Returns ``(base_id, records, valid_end)``.  *base_id* is None when the
+    header is missing or foreign.  Parsing stops at the first truncated or
+    malformed record (a torn append); *valid_end* is the byte offset just
+    past the last good record.
+    """
+    if len(data) < _DELTA_HEADER_SIZE:
+        return None, [], 0
+    magic, version, base_id = struct.unpack_from(_DELTA_HEADER_FMT, data, 0)
+    if magic != _DELTA_MAGIC or version not in _SUPPORTED_DELTA_VERSIONS:
+        return None, [], 0
+
+    records: list[_DeltaRecord] = []
+    pos = _DELTA_HEADER_SIZE
+    total = len(data)
+    while pos + _DELTA_RECORD_SIZE <= total:
+        op, fid, crc, mtime, path_len, count = struct.unpack_from(
+            _DELTA_RECORD_FMT, data, pos,
+        )
+        end = pos + _DELTA_RECORD_SIZE + path_len + count * 4
+        if op not in (_OP_UPSERT, _OP_REMOVE) or end > total:
+            break
+        path_start = pos + _DELTA_RECORD_SIZE
+        try:
+            path = data[path_start : path_start + path_len].decode("utf-8")
+        except UnicodeDecodeError:
+            break
+        hashes = struct.unpack_from(f"<{count}I", data, path_start + path_len)
+        content: bytes | None = None
+        if version >= 2:
+            if end + 4 > total:
+                break
+            (content_len,) = struct.unpack_from("<I", data, end)
+            end += 4
+            if content_len != _NO_CONTENT:
+                if end + content_len > total:
+                    break
+                content = data[end : end + content_len]
+                end += content_len
+        records.append(_DeltaRecord(
+            op=op, file_id=fid, path=path, content_crc=crc, mtime=mtime,
+            trigrams=frozenset(hashes), content=content,
+        ))
+        pos = end
+    return base_id, records, pos
+
+
+# ---------------------------------------------------------------------------
+# Content snapshot (positional mode)
+# ---------------------------------------------------------------------------
+
+
+def _line_starts(content: bytes) -> bytes:
+    """Return the offsets (u32) at which the ``\\n``-separated lines of *content* start."""
+    size = len(content)
+    if _HAS_NUMPY:
+        starts = np.flatnonzero(np.frombuffer(content, dtype=np.uint8) == 0x0A) + 1
+        starts = starts[starts < size]
+        return np.concatenate(([0], starts)).astype("<u4").tobytes()
+    offsets = [0]
+    pos = content.find(b"\n")
+    while pos != -1 and pos + 1 < size:
+        offsets.append(pos + 1)
+        pos = content.find(b"\n", pos + 1)
+    return struct.pack(f"<{len(offsets)}I", *offsets)
+
+
+def _snapshot_lines(content: bytes) -> tuple[bytes, bool] | None:
+    """Return ``(line_starts, plain_lines)`` for *content*, or None if it is not UTF-8.
+
+    *plain_lines* is False when the content contains a separator other than
+    ``\\n`` that ``str.splitlines()`` would break on.
+    """
+    try:
+        content.decode("utf-8")
+    except UnicodeDecodeError:
+        return None
+    plain = not any(sep in content for sep in _EXTRA_LINE_BREAKS)
+    return _line_starts(content), plain
+
+
+@dataclass(slots=True)
+class _SnapshotBuilder:
+    """Accumulates a content snapshot: file bytes plus their line-start tables.
+
+    *entries* holds ``(file_id, content_offset, content_length,
+    lines_offset, line_count, plain_lines)``; *lines_offset* counts u32
+    slots, not bytes.
+    """
+
+    content_parts: list[bytes] = field(default_factory=list)
+    lines_parts: list[bytes] = field(default_factory=list)
+    entries: list[tuple[int, int, int, int, int, bool]] = field(default_factory=list)
+    content_size: int = 0
+    line_count: int = 0
+
+    def add(self, file_id: int, content: bytes, line_starts: bytes, plain: bool) -> None:
+        n_lines = len(line_starts) // 4
+        self.entries.append(
+            (file_id, self.content_size, len(content), self.line_count, n_lines, plain),
+        )
+        self.content_parts.append(content)
+        self.lines_parts.append(line_starts)
+        self.content_size += len(content)
+        self.line_count += n_lines
+
+    def extend(self, other: _SnapshotBuilder) -> None:
+        """Append *other* (e.g. one worker batch), rebasing its offsets."""
+        for fid, c_off, c_len, l_off, l_count, plain in other.entries:
+            self.entries.append(
+                (fid, c_off + self.content_size, c_len, l_off + self.line_count, l_count, plain),
+            )
+        self.content_parts.extend(other.content_parts)
+        self.lines_parts.extend(other.lines_parts)
+        self.content_size += other.content_size
+        self.line_count += other.line_count
+
+
+def _scan_content(
+    regex: re.Pattern[str],
+    content: bytes,
+    line_starts: Any,
+    plain: bool,
+    needle: bytes,
+    limit: int,
+) -> list[tuple[int, str]]:
+    """Return up to *limit* ``(line_no, line)`` hits of *regex* in *content*.
+
+    Mirrors ``enumerate(text.splitlines(), 1)`` + ``regex.search(line)``.
+    With a *needle* (a literal every match must contain) on a plain file,
+    only lines containing the needle are decoded, located through the
+    line-start table instead of splitting the whole file.
+    """
+    hits: list[tuple[int, str]] = []
+    if limit <= 0:
+        return hits
+    if not needle or not plain:
+        for i, line in enumerate(content.decode("utf-8").splitlines(), 1):
+            if regex.search(line):
+                hits.append((i, line))
+                if len(hits) >= limit:
+                    break
+        return hits
+
+    pos = content.find(needle)
+    while pos != -1:
+        idx = bisect.bisect_right(line_starts, pos) - 1
+        end = content.find(b"\n", pos)
+        if end == -1:
+            end = len(content)
+        line = content[line_starts[idx] : end].decode("utf-8")
+        if regex.search(line):
+            hits.append((idx + 1, line))
+            if len(hits) >= limit:
+                break
+        pos = content.find(needle, end + 1)
+    return hits
+
+
+# ---------------------------------------------------------------------------
+# Build pipeline
+# ---------------------------------------------------------------------------
+
+
+@dataclass(slots=True)
+class _BatchResult:
+    """Output of one extraction task.
+
+    *files* holds ``(file_id, rel_path, content_hash, mtime)`` for every
+    indexable file of the batch.  With NumPy the batch's postings travel as
+    two parallel ``uint32`` buffers (*file_ids*, *hashes*) so they pickle
+    cheaply; the pure-Python fallback fills *postings* instead.  Positional
+    builds also return the batch's content *snapshot*.
+    """
+
+    files: list[tuple[int, str, str, float]]
+    file_ids: bytes = b""
+    hashes: bytes = b""
+    postings: dict[int, list[int]] = field(default_factory=dict)
+    snapshot: _SnapshotBuilder | None = None
+
+
+def _read_indexable(abs_path: Path) -> tuple[bytes, float] | None:
+    """Read *abs_path*, returning ``(content, mtime)`` or None if unusable."""
+    try:
+        raw = read_bytes(str(abs_path))
+    except OSError:
+        return None
+    if _is_likely_binary(raw):
+        return None
+    try:
+        mtime = abs_path.stat().st_mtime
+    except OSError:
+        mtime = 0.0
+    return raw, mtime
+
+
+def _snapshot_add(snapshot: _SnapshotBuilder | None, file_id: int, raw: bytes) -> None:
+    """Add *raw* to *snapshot* (if any) unless it is not valid UTF-8."""
+    if snapshot is None:
+        return
+    lines = _snapshot_lines(raw)
+    if lines is not None:
+        snapshot.add(file_id, raw, *lines)
+
+
+def _extract_batch(
+    project_dir: str, batch: list[tuple[int, str]], positional: bool = False,
+) -> _BatchResult:
+    """Worker task: read a batch of files and extract their trigram postings."""
+    root = Path(project_dir)
+    files: list[tuple[int, str, str, float]] = []
+    id_parts: list[Any] = []
+    hash_parts: list[Any] = []
+    snapshot = _SnapshotBuilder() if positional else None
+    for file_id, rel_path in batch:
+        loaded = _read_indexable(root / rel_path)
+        if loaded is None:
+            continue
+        raw, mtime = loaded
+        files.append((file_id, rel_path, format(zlib.crc32(raw) & 0xFFFFFFFF, "08x"), mtime))
+        hashes = _trigram_hashes_array(raw)
+        hash_parts.append(hashes)
+        id_parts.append(np.full(hashes.size, file_id, dtype=np.uint32))
+        _snapshot_add(snapshot, file_id, raw)
+    if not hash_parts:
+        return _BatchResult(files=files, snapshot=snapshot)
+    return _BatchResult(
+        files=files,
+        file_ids=np.concatenate(id_parts).tobytes(),
+        hashes=np.concatenate(hash_parts).tobytes(),
+        snapshot=snapshot,
+    )
+
+
+def _extract_batch_python(
+    project_dir: str, batch: list[tuple[int, str]], positional: bool = False,
+) -> _BatchResult:
+    """Scalar fallback of :func:`_extract_batch` used when NumPy is missing."""
+    root = Path(project_dir)
+    result = _BatchResult(files=[], snapshot=_SnapshotBuilder() if positional else None)
+    for file_id, rel_path in batch:
+        loaded = _read_indexable(root / rel_path)
+        if loaded is None:
+            continue
+        raw, mtime = loaded
+        result.files.append(
+            (file_id, rel_path, format(zlib.crc32(raw) & 0xFFFFFFFF, "08x"), mtime),
+        )
+        _snapshot_add(result.snapshot, file_id, raw)
+        for h in _extract_trigrams_from_bytes(raw):
+            if h not in result.postings:
+                result.postings[h] = []
+            result.postings[h].append(file_id)
+    return result
+
+
+def _resolve_workers(workers: int | None, n_files: int) -> int:
+    """Pick the extraction process count for *n_files* files."""
+    if workers is not None:
+        return max(1, workers)
+    if n_files < _PARALLEL_MIN_FILES:
+        return 1
+    return max(1, min(os.cpu_count() or 1, -(-n_files // _BATCH_SIZE)))
+
+
+def _extract_all(
+    project_dir: str, file_paths: list[str], workers: int, positional: bool = False,
+) -> list[_BatchResult]:
+    """Run :func:`_extract_batch` over *file_paths*, in a process pool if *workers* > 1."""
+    indexed = list(enumerate(file_paths))
+    batches = [indexed[i : i + _BATCH_SIZE] for i in range(0, len(indexed), _BATCH_SIZE)]
+    if workers <= 1 or len(batches) <= 1:
+        return [_extract_batch(project_dir, batch, positional) for batch in batches]
+
+    import multiprocessing
+
+    # spawn: the MCP server is multi-threaded, so forking it is unsafe.
+    ctx = multiprocessing.get_context("spawn")
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+            return list(pool.map(
+                _extract_batch,
+                [project_dir] * len(batches),
+                batches,
+                [positional] * len(batches),
+            ))
+    except (OSError, RuntimeError) as exc:
+        logger.debug("trigram_index: process pool unavailable (%s), extracting inline", exc)
+        return [_extract_batch(project_dir, batch, positional) for batch in batches]
+
+
+def _merge_batches(batches: list[_BatchResult]) -> tuple[bytes, bytes, int]:
+    """Merge per-batch postings into ``(lookup_blob, postings_blob, n_trigrams)``."""
+    id_parts = [np.frombuffer(b.file_ids, dtype=np.uint32) for b in batches if b.hashes]
+    hash_parts = [np.frombuffer(b.hashes, dtype=np.uint32) for b in batches if b.hashes]
+    if not hash_parts:
+        return _encode_pairs(np.empty(0, np.uint32), np.empty(0, np.uint32))
+    return _encode_pairs(np.concatenate(hash_parts), np.concatenate(id_parts))
+
+
+def _encode_pairs(hashes: Any, file_ids: Any) -> tuple[bytes, bytes, int]:
+    """Encode parallel (hash, file_id) arrays as v2 ``(lookup, postings, n_trigrams)``.
+
+    One ``lexsort`` groups every posting list.  Gaps between consecutive
+    file-IDs of a list are varint-encoded fully vectorized: each value's
+    byte width is computed up front, so every output byte (and every
+    list's count word) is scattered to its final position in one pass per
+    byte lane.
+    """
+    header = struct.pack("<IHIh", _MAGIC, _VERSION, 0, 0)
+    if hashes.size == 0:
+        return header, b"", 0
+
+    order = np.lexsort((file_ids, hashes))
+    hashes = hashes[order]
+    ids = file_ids[order].astype(np.int64)
+
+    boundary = np.empty(hashes.size, dtype=bool)
+    boundary[0] = True
+    np.not_equal(hashes[1:], hashes[:-1], out=boundary[1:])
+    starts = np.flatnonzero(boundary)
+    n_lists = starts.size
+    counts = np.diff(np.append(starts, hashes.size))
+
+    gaps = np.empty_like(ids)
+    gaps[0] = ids[0]
+    gaps[1:] = ids[1:] - ids[:-1]
+    gaps[starts] = ids[starts]
+    widths = 1 + sum((gaps >= (1 << (7 * k))).astype(np.int64) for k in range(1, 5))
+
+    list_lengths = 4 + np.add.reduceat(widths, starts)
+    list_offsets = np.concatenate(([0], np.cumsum(list_lengths)[:-1]))
+    out = np.zeros(int(list_lengths.sum()), dtype=np.uint8)
+    for k in range(4):
+        out[list_offsets + k] = (counts >> (8 * k)) & 0xFF
+
+    before = np.cumsum(widths) - widths
+    owner = np.repeat(np.arange(n_lists), counts)
+    positions = list_offsets[owner] + 4 + (before - before[starts][owner])
+    for k in range(5):
+        lane = widths > k
+        if not lane.any():
+            break
+        byte = (gaps[lane] >> (7 * k)) & 0x7F
+        byte |= np.where(widths[lane] > k + 1, 0x80, 0)
+        out[positions[lane] + k] = byte
+
+    entries = np.empty(
+        n_lists, dtype=np.dtype([("hash", "<u4"), ("offset", "<u8"), ("length", "<u4")]),
+    )
+    entries["hash"] = hashes[starts]
+    entries["offset"] = list_offsets
+    entries["length"] = list_lengths
+    header = struct.pack("<IHIh", _MAGIC, _VERSION, n_lists, 0)
+    return header + entries.tobytes(), out.tobytes(), int(n_lists)
+
+
+def _merge_segments(
+    lookup_mm: mmap.mmap,
+    postings_mm: mmap.mmap | None,
+    entry_count: int,
+    version: int,
+    tombstones: set[int],
+    delta_postings: dict[int, set[int]],
+) -> tuple[bytes, bytes, int]:
+    """Fold a base segment, its tombstones and a delta segment into new blobs."""
+    table = lookup_mm[_HEADER_SIZE : _HEADER_SIZE + entry_count * _ENTRY_SIZE]
+    if not _HAS_NUMPY:
+        merged: dict[int, list[int]] = {}
+        for h, offset, length in struct.iter_unpack("<IQI", table):
+            ids = (
+                _decode_posting_list(postings_mm, offset, length, version)
+                if postings_mm is not None else []
+            )
+            if tombstones:
+                ids = [fid for fid in ids if fid not in tombstones]
+            extra = delta_postings.get(h)
+            if extra:
+                ids = sorted(extra.union(ids))
+            if ids:
+                merged[h] = ids
+        for h, fids in delta_postings.items():
+            merged.setdefault(h, sorted(fids))
+        lookup_blob, postings_blob = _encode_postings(merged)
+        return lookup_blob, postings_blob, len(merged)
+
+    hash_parts: list[Any] = []
+    id_parts: list[Any] = []
+    if postings_mm is not None:
+        for h, offset, length in struct.iter_unpack("<IQI", table):
+            ids = _decode_posting_array(postings_mm, offset, length, version)
+            hash_parts.append(np.full(ids.size, h, dtype=np.uint32))
+            id_parts.append(ids)
+    for h, fids in delta_postings.items():
+        hash_parts.append(np.full(len(fids), h, dtype=np.uint32))
+        id_parts.append(np.fromiter(fids, dtype=np.uint32, count=len(fids)))
+    if not hash_parts:
+        return _encode_pairs(np.empty(0, np.uint32), np.empty(0, np.uint32))
+    hashes = np.concatenate(hash_parts)
+    file_ids = np.concatenate(id_parts)
+    if tombstones:
+        keep = ~np.isin(file_ids, np.fromiter(tombstones, dtype=np.uint32))
+        hashes, file_ids = hashes[keep], file_ids[keep]
+    return _encode_pairs(hashes, file_ids)
+
+
+def _encode_postings(postings: dict[int, list[int]]) -> tuple[bytes, bytes]:
+    """Encode a ``{trigram_hash: [file_ids]}`` map as v2 ``(lookup_blob, postings_blob)``."""
+    sorted_hashes = sorted(postings.keys())
+    n_entries = len(sorted_hashes)
+
+    # Build postings blob -- one posting list per unique trigram hash
+    postings_parts: list[bytes] = []
+    postings_offsets: dict[int, tuple[int, int]] = {}
+    current_offset = 0
+
+    for h in sorted_hashes:
+        file_ids = sorted(postings[h])
+        gaps = [b - a for a, b in zip([0, *file_ids], file_ids, strict=False)]
+        part = struct.pack("<I", len(file_ids)) + _encode_varints(gaps)
+        postings_offsets[h] = (current_offset, len(part))
+        postings_parts.append(part)
+        current_offset += len(part)
+
+    postings_blob = b"".join(postings_parts)
+
+    # Build lookup blob
+    # Header: magic(u32) + version(u16) + entry_count(u32) + padding(u16)
+    header = struct.pack("<IHIh", _MAGIC, _VERSION, n_entries, 0)
+    assert len(header) == _HEADER_SIZE
+
+    lookup_parts: list[bytes] = [header]
+    for h in sorted_hashes:
+        off, length = postings_offsets[h]
+        entry = struct.pack("<IQI", h, off, length)
+        assert len(entry) == _ENTRY_SIZE
+        lookup_parts.append(entry)
+
+    return b"".join(lookup_parts), postings_blob
+
+
 # ---------------------------------------------------------------------------
 # TrigramIndex
 # ---------------------------------------------------------------------------
@@ -141,23 +841,64 @@ class TrigramIndex:
         # None  -> caller falls back to full scan
         # []    -> no files match (definitive fast exit)
         # [str] -> relative paths of candidate files
+
+        idx.update_file("a.py", new_bytes)  # cheap delta update, stays ready
+
+    With ``positional=True`` the build also writes a content snapshot and
+    :meth:`search_lines` answers line-level matches without file I/O.
     """
 
     index_dir: str
+    compact_threshold: int = _COMPACT_THRESHOLD
+    positional: bool = False
 
     _db_path: str = field(default="", init=False, repr=False)
     _lookup_path: str = field(default="", init=False, repr=False)
     _postings_path: str = field(default="", init=False, repr=False)
+    _delta_path: str = field(default="", init=False, repr=False)
+    _content_path: str = field(default="", init=False, repr=False)
+    _lines_path: str = field(default="", init=False, repr=False)
 
     _lookup_fd: int = field(default=-1, init=False, repr=False)
     _postings_fd: int = field(default=-1, init=False, repr=False)
     _lookup_mmap: mmap.mmap | None = field(default=None, init=False, repr=False)
     _postings_mmap: mmap.mmap | None = field(default=None, init=False, repr=False)
 
+    # Content snapshot (positional mode); None when the base has none
+    _content_fd: int = field(default=-1, init=False, repr=False)
+    _lines_fd: int = field(default=-1, init=False, repr=False)
+    _content_mmap: mmap.mmap | None = field(default=None, init=False, repr=False)
+    _lines_mmap: mmap.mmap | None = field(default=None, init=False, repr=False)
+    _positions: dict[int, tuple[int, int, int, int, bool]] | None = field(
+        default=None, init=False, repr=False,
+    )
+    _lines_base: int = field(default=0, init=False, repr=False)
+
     _entry_count: int = field(default=0, init=False, repr=False)
+    _format_version: int = field(default=_VERSION, init=False, repr=False)
     _file_id_to_path: dict[int, str] = field(default_factory=dict, init=False, repr=False)
     _path_to_file_id: dict[str, int] = field(default_factory=dict, init=False, repr=False)
 
+    # Delta segment (see module docstring)
+    _base_id: int = field(default=0, init=False, repr=False)
+    _next_file_id: int = field(default=0, init=False, repr=False)
+    _delta_postings: dict[int, set[int]] = field(default_factory=dict, init=False, repr=False)
+    _delta_file_trigrams: dict[int, frozenset[int]] = field(
+        default_factory=dict, init=False, repr=False,
+    )
+    _delta_file_meta: dict[int, tuple[str, float]] = field(
+        default_factory=dict, init=False, repr=False,
+    )
+    _delta_content: dict[int, tuple[bytes, bytes, bool] | None] = field(
+        default_factory=dict, init=False, repr=False,
+    )
+    _snapshot_complete: bool = field(default=True, init=False, repr=False)
+    _tombstones: set[int] = field(default_factory=set, init=False, repr=False)
+    _tombstone_array: Any = field(default=None, init=False, repr=False)
+    _delta_records: int = field(default=0, init=False, repr=False)
+    _generation: int = field(default=0, init=False, repr=False)
+    _compacting: bool = field(default=False, init=False, repr=False)
+
     _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
     _ready: bool = field(default=False, init=False, repr=False)
 
@@ -166,66 +907,124 @@ class TrigramIndex:
         self._db_path = os.path.join(self.index_dir, "trigrams.db")
         self._lookup_path = os.path.join(self.index_dir, "trigrams.lookup")
         self._postings_path = os.path.join(self.index_dir, "trigrams.postings")
+        self._delta_path = os.path.join(self.index_dir, "trigrams.delta")
+        self._content_path = os.path.join(self.index_dir, "trigrams.content")
+        self._lines_path = os.path.join(self.index_dir, "trigrams.lines")
 
     # ------------------------------------------------------------------
     # Public API
     # ------------------------------------------------------------------
 
-    def build(self, project_dir: str) -> dict[str, Any]:
+    def build(self, project_dir: str, *, workers: int | None = None) -> dict[str, Any]:
         """Build the trigram index by walking *project_dir*.
 
+        File reading and trigram extraction fan out to a process pool for
+        large trees (see :func:`_extract_batch`); per-batch posting arrays
+        are merged with a single NumPy sort.  Only the final write/swap
+        holds the lock, so queries keep hitting the previous index (and its
+        delta segment) while a rebuild runs.  Edits recorded while the
+        build was running are replayed on top of the new base.
+
         Writes lookup and postings files atomically (write .tmp, os.replace).
-        Stores the file-ID mapping in SQLite.
+        Stores the file-ID mapping in SQLite.  In positional mode the content
+        snapshot is written alongside; otherwise any stale one is removed.
+
+        Args:
+            project_dir: Root directory to index.
+            workers: Process count for extraction.  ``None`` picks
+                ``os.cpu_count()`` for large trees and runs in-process for
+                small ones; ``1`` always runs in-process.
 
         Returns:
             dict with keys: files_indexed, trigrams_count,
-            build_time_ms, index_size_bytes, loaded (bool).
+            build_time_ms, index_size_bytes, loaded (bool), workers,
+            phase_ms (per-phase timings: enumerate, extract, merge,
+            write, load), positional (bool), snapshot_bytes.
         """
         t0 = time.monotonic()
         project_path = Path(project_dir).resolve()
+        phase_ms: dict[str, int] = {}
 
         with self._lock:
-            # Phase 1: enumerate candidate files
-            file_paths = self._enumerate_files(project_path)
-
-            # Phase 2: build inverted index
-            file_map: dict[str, int] = {}           # rel_path -> file_id
-            postings: dict[int, list[int]] = {}      # trigram_hash -> [file_ids]
-            content_hashes: dict[str, str] = {}
-            mtimes: dict[str, float] = {}
-
-            for file_id, rel_path in enumerate(file_paths):
-                abs_path = project_path / rel_path
-                try:
-                    raw = abs_path.read_bytes()
-                except OSError:
-                    continue
-                if _is_likely_binary(raw):
-                    continue
-
+            start_base_id = self._base_id if self._ready else None
+            start_seq = self._delta_records
+
+        # Phase 1: enumerate candidate files
+        t_phase = time.monotonic()
+        file_paths = self._enumerate_files(project_path)
+        phase_ms["enumerate"] = int((time.monotonic() - t_phase) * 1000)
+
+        # Phase 2: read files and extract trigrams (parallel when large)
+        t_phase = time.monotonic()
+        n_workers = _resolve_workers(workers, len(file_paths))
+        if _HAS_NUMPY:
+            batches = _extract_all(str(project_path), file_paths, n_workers, self.positional)
+        else:
+            n_workers = 1
+            batches = [_extract_batch_python(
+                str(project_path), list(enumerate(file_paths)), self.positional,
+            )]
+        phase_ms["extract"] = int((time.monotonic() - t_phase) * 1000)
+
+        # Phase 3: merge per-batch postings into the on-disk layout
+        t_phase = time.monotonic()
+        file_map: dict[str, int] = {}           # rel_path -> file_id
+        content_hashes: dict[str, str] = {}
+        mtimes: dict[str, float] = {}
+        for batch in batches:
+            for file_id, rel_path, content_hash, mtime in batch.files:
                 file_map[rel_path] = file_id
-                try:
-                    mtimes[rel_path] = abs_path.stat().st_mtime
-                except OSError:
-                    mtimes[rel_path] = 0.0
-                content_hashes[rel_path] = format(zlib.crc32(raw) & 0xFFFFFFFF, "08x")
-
-                for h in _extract_trigrams_from_bytes(raw):
-                    if h not in postings:
-                        postings[h] = []
-                    postings[h].append(file_id)
-
-            # Phase 3: write index files atomically
-            self._write_index(postings, file_map)
+                content_hashes[rel_path] = content_hash
+                mtimes[rel_path] = mtime
+        if _HAS_NUMPY:
+            lookup_blob, postings_blob, trigrams_count = _merge_batches(batches)
+        else:
+            postings: dict[int, list[int]] = batches[0].postings
+            lookup_blob, postings_blob = _encode_postings(postings)
+            trigrams_count = len(postings)
+        snapshot: _SnapshotBuilder | None = None
+        if self.positional:
+            snapshot = _SnapshotBuilder()
+            for batch in batches:
+                if batch.snapshot is not None:
+                    snapshot.extend(batch.snapshot)
+        phase_ms["merge"] = int((time.monotonic() - t_phase) * 1000)
 
-            # Phase 4: persist file map to SQLite
+        with self._lock:
+            # Edits that arrived mid-build belong after the new base.
+            if start_base_id is not None and self._ready:
+                pending = self._read_delta_log()
+                if self._base_id == start_base_id:
+                    pending = pending[start_seq:]
+            else:
+                pending = []
+
+            # Phase 4: write index files atomically, persist the file map;
+            # the old delta log belongs to the previous base and is dropped.
+            t_phase = time.monotonic()
+            self._generation += 1
+            base_id = time.time_ns()
+            self._write_blobs(lookup_blob, postings_blob)
+            self._write_snapshot(snapshot, base_id)
             self._init_db()
-            self._save_file_map(file_map, content_hashes, mtimes)
+            self._save_file_map(file_map, content_hashes, mtimes, base_id)
+            self._remove_delta_log()
+            phase_ms["write"] = int((time.monotonic() - t_phase) * 1000)
 
             # Phase 5: load the freshly built index into mmap
+            t_phase = time.monotonic()
             self._ready = False
             self._close_mmap()
             success = self._load_unlocked()
+            if success:
+                for record in pending:
+                    if record.op == _OP_UPSERT:
+                        record.file_id = self._next_file_id
+                    elif record.path not in self._path_to_file_id:
+                        continue
+                    self._append_delta_record(record)
+                    self._apply_delta_record(record)
+            phase_ms["load"] = int((time.monotonic() - t_phase) * 1000)
 
         elapsed_ms = int((time.monotonic() - t0) * 1000)
         lookup_size = (
@@ -238,12 +1037,20 @@ class TrigramIndex:
             if os.path.exists(self._postings_path)
             else 0
         )
+        logger.debug(
+            "trigram_index: built %d files with %d worker(s) in %dms %r",
+            len(file_map), n_workers, elapsed_ms, phase_ms,
+        )
         return {
             "files_indexed": len(file_map),
-            "trigrams_count": len(postings),
+            "trigrams_count": trigrams_count,
             "build_time_ms": elapsed_ms,
             "index_size_bytes": lookup_size + postings_size,
             "loaded": success,
+            "workers": n_workers,
+            "phase_ms": phase_ms,
+            "positional": snapshot is not None,
+            "snapshot_bytes": snapshot.content_size if snapshot is not None else 0,
         }
 
     def load(self) -> bool:
@@ -319,14 +1126,15 @@ class TrigramIndex:
 
         from attocode.integrations.context.trigram_regex import extract_required_trigrams
 
-        if explain:
-            result = extract_required_trigrams(
-                pattern, case_insensitive=case_insensitive, include_literals=True,
-            )
-            required, literals = result  # type: ignore[misc]
+        required: list[int]
+        literals: list[str]
+        extracted = extract_required_trigrams(
+            pattern, case_insensitive=case_insensitive, include_literals=explain,
+        )
+        if isinstance(extracted, tuple):
+            required, literals = extracted
         else:
-            required = extract_required_trigrams(pattern, case_insensitive=case_insensitive)
-            literals = []
+            required, literals = extracted, []
 
         if not required:
             if explain:
@@ -350,12 +1158,14 @@ class TrigramIndex:
                     )
                 return None
 
+            candidates: list[str] | None
+            posting_sizes: list[int]
             if explain:
-                raw, posting_sizes = self._intersect_postings(
+                candidates, posting_sizes = self._intersect_postings(
                     required, collect_sizes=True,
                 )
             else:
-                raw = self._intersect_postings(required)
+                candidates = self._intersect_postings(required)
                 posting_sizes = []
 
             # Apply selectivity threshold.
@@ -363,7 +1173,6 @@ class TrigramIndex:
             # searching all candidates is trivially fast.
             _MIN_FILES_FOR_THRESHOLD = 100
             total_files = len(self._file_id_to_path)
-            candidates: list[str] | None = raw  # type: ignore[assignment]
             candidate_count = len(candidates) if candidates else 0
             selectivity = (
                 candidate_count / total_files if total_files > 0 else 0.0
@@ -399,24 +1208,250 @@ class TrigramIndex:
 
             return candidates
 
-    def update_file(self, rel_path: str, content: bytes) -> None:
-        """Invalidate the index for *rel_path*.
+    def has_positions(self) -> bool:
+        """Return True if :meth:`search_lines` can answer from the content snapshot."""
+        return self._ready and self._positions is not None and self._snapshot_complete
 
-        Marks the index not-ready so callers fall back to brute force until
-        the next ``build()`` call rebuilds it.
+    def search_lines(
+        self,
+        regex: re.Pattern[str],
+        paths: list[str],
+        *,
+        max_results: int = 50,
+    ) -> list[tuple[str, int, str]] | None:
+        """Match *regex* line by line in *paths* using the content snapshot.
+
+        Equivalent to reading each file as UTF-8 and running
+        ``regex.search`` over ``splitlines()``, but served from the mmap'd
+        snapshot (base files) and the in-memory delta content (edited
+        files).  For literal and near-literal patterns the longest required
+        literal is located with ``bytes.find`` and only the lines holding it
+        are decoded.  Files that are not live or not UTF-8 yield nothing.
+
+        Args:
+            regex: Compiled pattern, matched against single lines.
+            paths: Relative file paths to search, in output order (usually
+                the candidates returned by :meth:`query`).
+            max_results: Stop after this many matching lines.
+
+        Returns:
+            ``[(path, line_no, line)]`` with 1-based line numbers, or None
+            when no complete snapshot is loaded (caller reads the files).
         """
+        from attocode.integrations.context.trigram_regex import longest_literal_run
+
+        needle = b""
+        if not regex.flags & re.IGNORECASE and "(?" not in regex.pattern:
+            needle = longest_literal_run(regex.pattern).encode("utf-8")
+            if b"\n" in needle or any(sep in needle for sep in _EXTRA_LINE_BREAKS):
+                needle = b""
+
+        matches: list[tuple[str, int, str]] = []
         with self._lock:
-            self._ready = False
+            if not self.has_positions():
+                return None
+            for path in paths:
+                if len(matches) >= max_results:
+                    break
+                source = self._snapshot_source(path)
+                if source is None:
+                    continue
+                content, line_starts, plain = source
+                for line_no, line in _scan_content(
+                    regex, content, line_starts, plain, needle, max_results - len(matches),
+                ):
+                    matches.append((path, line_no, line))
+        return matches
+
+    def update_file(self, rel_path: str, content: bytes) -> None:
+        """Record the new *content* of *rel_path* in the delta segment.
+
+        The file gets a fresh file-ID in the delta segment and its previous
+        ID (base or delta) is tombstoned, so the index stays ready and later
+        queries see the edit immediately.  Files the builder would skip
+        (skipped directories, dot-files, skipped extensions, binary or
+        oversized content) are treated as removals.  No-op when no base
+        index is loaded.
+        """
+        if (
+            _skipped_path(rel_path)
+            or len(content) > _MAX_FILE_SIZE
+            or _is_likely_binary(content)
+        ):
+            self.remove_file(rel_path)
+            return
+
+        # Extract outside the lock so concurrent queries are not blocked.
+        record = _DeltaRecord(
+            op=_OP_UPSERT,
+            file_id=0,
+            path=rel_path,
+            content_crc=zlib.crc32(content) & 0xFFFFFFFF,
+            mtime=time.time(),
+            trigrams=frozenset(_extract_trigrams(content)),
+        )
+        with self._lock:
+            if not self._ready:
+                return
+            record.file_id = self._next_file_id
+            if self._positions is not None:
+                record.content = content
+            self._append_delta_record(record)
+            self._apply_delta_record(record)
+            needs_compaction = self._delta_size() >= self.compact_threshold
+        if needs_compaction:
+            self._schedule_compaction()
 
     def remove_file(self, rel_path: str) -> None:
-        """Remove *rel_path* from the in-memory ID mapping.
+        """Tombstone *rel_path* so it no longer appears in query results.
 
-        The mmap files are not modified; call ``build()`` for a full refresh.
+        The removal is recorded in the delta log and folded into the base
+        segment on the next compaction.
         """
         with self._lock:
-            fid = self._path_to_file_id.pop(rel_path, None)
-            if fid is not None:
-                self._file_id_to_path.pop(fid, None)
+            fid = self._path_to_file_id.get(rel_path)
+            if fid is None:
+                return
+            if not self._ready:
+                self._drop_live_entry(rel_path)
+                return
+            record = _DeltaRecord(op=_OP_REMOVE, file_id=fid, path=rel_path)
+            self._append_delta_record(record)
+            self._apply_delta_record(record)
+            needs_compaction = self._delta_size() >= self.compact_threshold
+        if needs_compaction:
+            self._schedule_compaction()
+
+    def compact(self) -> dict[str, Any]:
+        """Merge the delta segment into a new base segment.
+
+        Base postings (minus tombstones) and delta postings are merged
+        straight from the mmap -- no source file is re-read.  The new base
+        is always written in the current postings format, so compaction
+        also upgrades v1 indexes.  The expensive
+        merge runs outside the lock against private mmap handles; only the
+        final swap is serialized with queries.  Edits that arrive during the
+        merge stay in the delta log and are replayed on top of the new base.
+        A content snapshot is carried over the same way (base slices plus
+        delta content); it is dropped if some delta content is unknown.
+
+        Returns:
+            dict with keys: compacted (bool), files_merged, tombstones_dropped,
+            trigrams_count, compact_time_ms.
+        """
+        t0 = time.monotonic()
+        result: dict[str, Any] = {
+            "compacted": False,
+            "files_merged": 0,
+            "tombstones_dropped": 0,
+            "trigrams_count": 0,
+            "compact_time_ms": 0,
+        }
+
+        with self._lock:
+            if not self._ready or self._delta_size() == 0:
+                return result
+            generation = self._generation
+            seq = self._delta_records
+            delta_postings = {h: set(fids) for h, fids in self._delta_postings.items()}
+            delta_meta = dict(self._delta_file_meta)
+            tombstones = set(self._tombstones)
+            file_map = dict(self._path_to_file_id)
+            entry_count = self._entry_count
+            version = self._format_version
+            base = self._open_base_snapshot()
+            positions = (
+                dict(self._positions)
+                if self._positions is not None and self._snapshot_complete
+                else None
+            )
+            delta_content = dict(self._delta_content)
+            lines_base = self._lines_base
+            snapshot_files = self._open_snapshot_files() if positions is not None else None
+        if base is None:
+            if snapshot_files is not None:
+                self._close_snapshot_files(snapshot_files)
+            return result
+
+        # Merge outside the lock (private mmap handles survive os.replace).
+        lookup_mm, postings_mm, fds = base
+        try:
+            lookup_blob, postings_blob, trigrams_count = _merge_segments(
+                lookup_mm, postings_mm, entry_count, version, tombstones, delta_postings,
+            )
+        finally:
+            lookup_mm.close()
+            if postings_mm is not None:
+                postings_mm.close()
+            for fd in fds:
+                os.close(fd)
+
+        snapshot: _SnapshotBuilder | None = None
+        if snapshot_files is not None and positions is not None:
+            content_mm, lines_mm, _snap_fds = snapshot_files
+            try:
+                snapshot = _SnapshotBuilder()
+                for fid in sorted(file_map.values()):
+                    if fid in delta_content:
+                        entry = delta_content[fid]
+                        if entry is not None:
+                            snapshot.add(fid, *entry)
+                    elif fid in positions:
+                        c_off, c_len, l_off, l_count, plain = positions[fid]
+                        snapshot.add(
+                            fid,
+                            content_mm[c_off : c_off + c_len] if content_mm is not None else b"",
+                            lines_mm[lines_base + l_off * 4 : lines_base + (l_off + l_count) * 4],
+                            plain,
+                        )
+            finally:
+                self._close_snapshot_files(snapshot_files)
+
+        content_hashes, mtimes = self._load_file_meta()
+        id_to_path = {fid: path for path, fid in file_map.items()}
+        for fid, (content_hash, mtime) in delta_meta.items():
+            path = id_to_path.get(fid)
+            if path is not None:
+                content_hashes[path] = content_hash
+                mtimes[path] = mtime
+
+        with self._lock:
+            if self._generation != generation or not self._ready:
+                return result  # a full build() superseded this compaction
+            self._generation += 1
+            remaining = self._read_delta_log()[seq:]
+            base_id = time.time_ns()
+            self._write_blobs(lookup_blob, postings_blob)
+            self._write_snapshot(snapshot, base_id)
+            self._init_db()
+            self._save_file_map(file_map, content_hashes, mtimes, base_id)
+            self._rewrite_delta_log(base_id, remaining)
+            self._ready = False
+            self._close_mmap()
+            loaded = self._load_unlocked()
+
+        result.update(
+            compacted=loaded,
+            files_merged=len(delta_meta),
+            tombstones_dropped=len(tombstones),
+            trigrams_count=trigrams_count,
+            compact_time_ms=int((time.monotonic() - t0) * 1000),
+        )
+        logger.debug(
+            "trigram_index: compacted %d delta files, %d tombstones in %dms",
+            len(delta_meta), len(tombstones), result["compact_time_ms"],
+        )
+        return result
+
+    def delta_stats(self) -> dict[str, int]:
+        """Return the size of the mutable delta segment."""
+        with self._lock:
+            return {
+                "delta_files": len(self._delta_file_trigrams),
+                "tombstones": len(self._tombstones),
+                "delta_trigrams": len(self._delta_postings),
+                "log_records": self._delta_records,
+            }
 
     def is_ready(self) -> bool:
         """Return True if the index is loaded and ready for queries."""
@@ -434,74 +1469,30 @@ class TrigramIndex:
 
     @staticmethod
     def _enumerate_files(project_path: Path) -> list[str]:
-        """Walk *project_path* and return relative paths of indexable files."""
+        """Relative paths of the indexable files of *project_path*.
+
+        Files come from the shared workspace snapshot, in sorted path
+        order, minus ``_SKIP_DIRS``, ``_SKIP_EXTENSIONS``, dot-files and
+        files over ``_MAX_FILE_SIZE``.
+        """
         result: list[str] = []
-        for root, dirs, files in os.walk(project_path):
-            dirs[:] = [
-                d for d in dirs
-                if d not in _SKIP_DIRS and not d.startswith(".")
-            ]
-            for fname in sorted(files):
-                fpath = Path(root) / fname
-                if fpath.suffix.lower() in _SKIP_EXTENSIONS:
-                    continue
-                if fname.startswith("."):
-                    continue
-                try:
-                    if fpath.stat().st_size > _MAX_FILE_SIZE:
-                        continue
-                except OSError:
+        for entry in workspace_snapshot(str(project_path)).files(skip_dirs=_SKIP_DIRS):
+            if _skipped_path(entry.rel_path):
+                continue
+            try:
+                if os.stat(entry.path).st_size > _MAX_FILE_SIZE:
                     continue
-                try:
-                    rel = str(fpath.relative_to(project_path))
-                except ValueError:
-                    rel = str(fpath)
-                result.append(rel)
+            except OSError:
+                continue
+            result.append(entry.rel_path)
         return result
 
     # ------------------------------------------------------------------
     # Internal: index writing
     # ------------------------------------------------------------------
 
-    def _write_index(
-        self,
-        postings: dict[int, list[int]],
-        file_map: dict[str, int],
-    ) -> None:
-        """Atomically write lookup and postings binary files."""
-        sorted_hashes = sorted(postings.keys())
-        n_entries = len(sorted_hashes)
-
-        # Build postings blob -- one posting list per unique trigram hash
-        postings_parts: list[bytes] = []
-        postings_offsets: dict[int, tuple[int, int]] = {}
-        current_offset = 0
-
-        for h in sorted_hashes:
-            file_ids = sorted(postings[h])
-            count = len(file_ids)
-            part = struct.pack(f"<I{count}I", count, *file_ids)
-            postings_offsets[h] = (current_offset, len(part))
-            postings_parts.append(part)
-            current_offset += len(part)
-
-        postings_blob = b"".join(postings_parts)
-
-        # Build lookup blob
-        # Header: magic(u32) + version(u16) + entry_count(u32) + padding(u16)
-        header = struct.pack("<IHIh", _MAGIC, _VERSION, n_entries, 0)
-        assert len(header) == _HEADER_SIZE
-
-        lookup_parts: list[bytes] = [header]
-        for h in sorted_hashes:
-            off, length = postings_offsets[h]
-            entry = struct.pack("<IQI", h, off, length)
-            assert len(entry) == _ENTRY_SIZE
-            lookup_parts.append(entry)
-
-        lookup_blob = b"".join(lookup_parts)
-
-        # Atomic write: write to .tmp, then os.replace
+    def _write_blobs(self, lookup_blob: bytes, postings_blob: bytes) -> None:
+        """Atomic write: write to .tmp, then os.replace."""
         lookup_tmp = self._lookup_path + ".tmp"
         postings_tmp = self._postings_path + ".tmp"
         try:
@@ -543,6 +1534,8 @@ class TrigramIndex:
             logger.debug("trigram_index: DB read failed: %s", exc)
             return False
 
+        base_id = self._read_base_id()
+
         id_to_path: dict[int, str] = {}
         path_to_id: dict[str, int] = {}
         for fid, fpath in rows:
@@ -577,7 +1570,7 @@ class TrigramIndex:
             logger.debug("trigram_index: corrupt header: %s", exc)
             return False
 
-        if magic != _MAGIC or version != _VERSION:
+        if magic != _MAGIC or version not in _SUPPORTED_VERSIONS:
             lookup_mm.close()
             os.close(lookup_fd)
             return False
@@ -610,13 +1603,19 @@ class TrigramIndex:
         self._lookup_mmap = lookup_mm
         self._postings_mmap = postings_mm
         self._entry_count = entry_count
+        self._format_version = version
         self._file_id_to_path = id_to_path
         self._path_to_file_id = path_to_id
+        self._base_id = base_id
+        self._next_file_id = max(id_to_path, default=-1) + 1
+        self._load_snapshot_unlocked()
+        self._reset_delta()
+        self._replay_delta_log()
         self._ready = True
 
         logger.debug(
-            "trigram_index: loaded -- %d entries, %d files",
-            entry_count, len(id_to_path),
+            "trigram_index: loaded -- %d entries, %d files, %d delta records",
+            entry_count, len(id_to_path), self._delta_records,
         )
         return True
 
@@ -652,12 +1651,12 @@ class TrigramIndex:
         where *posting_sizes[i]* is the length of the posting list for
         *required_hashes[i]*.
         """
-        candidate_ids: set[int] | None = None
-        posting_sizes: list[int] = [] if collect_sizes else []
+        posting_sizes: list[int] = []
+        live: list[Any] = []
 
         for h in required_hashes:
-            result = self._binary_search(h)
-            if result is None:
+            file_ids = self._live_postings(h)
+            if not len(file_ids):
                 if collect_sizes:
                     posting_sizes.append(0)
                     # Fill remaining sizes for hashes not yet looked up
@@ -665,31 +1664,37 @@ class TrigramIndex:
                     posting_sizes.extend([0] * remaining)
                     return ([], posting_sizes)
                 return []
-            offset, length = result
-            file_ids = self._read_posting_list(offset, length)
-            if collect_sizes:
-                posting_sizes.append(len(file_ids))
-            if candidate_ids is None:
-                candidate_ids = set(file_ids)
-            else:
-                candidate_ids &= set(file_ids)
-            if not candidate_ids:
-                if collect_sizes:
-                    # Fill remaining sizes with 0 for hashes not yet looked up
-                    remaining = len(required_hashes) - len(posting_sizes)
-                    posting_sizes.extend([0] * remaining)
-                    return ([], posting_sizes)
-                return []
+            posting_sizes.append(len(file_ids))
+            live.append(file_ids)
 
-        if candidate_ids is None:
+        if not live:
             return (None, posting_sizes) if collect_sizes else None
 
+        # Smallest list first keeps every intermediate result small.
+        live.sort(key=len)
+        if _HAS_NUMPY:
+            candidates = live[0]
+            for file_ids in live[1:]:
+                candidates = np.intersect1d(candidates, file_ids, assume_unique=True)
+                if not candidates.size:
+                    break
+            candidate_ids: list[int] = candidates.tolist()
+        else:
+            candidate_set = set(live[0])
+            for file_ids in live[1:]:
+                candidate_set &= file_ids
+                if not candidate_set:
+                    break
+            candidate_ids = sorted(candidate_set)
+
         paths: list[str] = []
         for fid in candidate_ids:
             path = self._file_id_to_path.get(fid)
             if path is not None:
                 paths.append(path)
-        return (paths, posting_sizes) if collect_sizes else paths
+        if collect_sizes:
+            return (paths, posting_sizes)
+        return paths
 
     def _binary_search(self, trigram_hash: int) -> tuple[int, int] | None:
         """Binary search the lookup mmap for *trigram_hash*.
@@ -719,18 +1724,372 @@ class TrigramIndex:
         """Read and decode a posting list from the postings mmap."""
         if self._postings_mmap is None:
             return []
-        mm = self._postings_mmap
+        return _decode_posting_list(
+            self._postings_mmap, offset, length, self._format_version,
+        )
+
+    def _live_postings(self, trigram_hash: int) -> Any:
+        """Merge base postings (minus tombstones) with the delta segment.
+
+        Returns a sorted ``uint32`` array with NumPy, else a ``set[int]``.
+        """
+        result = self._binary_search(trigram_hash)
+        delta = self._delta_postings.get(trigram_hash)
+        if not _HAS_NUMPY:
+            file_ids: set[int] = set()
+            if result is not None:
+                file_ids.update(self._read_posting_list(*result))
+                if self._tombstones:
+                    file_ids -= self._tombstones
+            if delta:
+                file_ids |= delta
+            return file_ids
+
+        if result is not None and self._postings_mmap is not None:
+            ids = _decode_posting_array(
+                self._postings_mmap, result[0], result[1], self._format_version,
+            )
+            if self._tombstones:
+                ids = ids[~np.isin(ids, self._tombstone_ids())]
+        else:
+            ids = np.empty(0, dtype=np.uint32)
+        if delta:
+            ids = np.union1d(ids, np.fromiter(delta, dtype=np.uint32, count=len(delta)))
+        return ids
+
+    def _tombstone_ids(self) -> Any:
+        """Sorted array of tombstoned file-IDs, cached until the next change."""
+        if self._tombstone_array is None:
+            self._tombstone_array = np.fromiter(
+                sorted(self._tombstones), dtype=np.uint32, count=len(self._tombstones),
+            )
+        return self._tombstone_array
+
+    # ------------------------------------------------------------------
+    # Internal: delta segment
+    # ------------------------------------------------------------------
+
+    def _reset_delta(self) -> None:
+        """Drop all in-memory delta state. Caller must hold _lock."""
+        self._delta_postings = {}
+        self._delta_file_trigrams = {}
+        self._delta_file_meta = {}
+        self._delta_content = {}
+        self._snapshot_complete = True
+        self._tombstones = set()
+        self._tombstone_array = None
+        self._delta_records = 0
+
+    def _delta_size(self) -> int:
+        return len(self._delta_file_trigrams) + len(self._tombstones)
+
+    def _apply_delta_record(self, record: _DeltaRecord) -> None:
+        """Apply an upsert/removal to the in-memory maps. Caller must hold _lock."""
+        self._drop_live_entry(record.path)
+        if record.op == _OP_UPSERT:
+            fid = record.file_id
+            self._delta_file_trigrams[fid] = record.trigrams
+            self._delta_file_meta[fid] = (
+                format(record.content_crc, "08x"), record.mtime,
+            )
+            for h in record.trigrams:
+                bucket = self._delta_postings.get(h)
+                if bucket is None:
+                    self._delta_postings[h] = {fid}
+                else:
+                    bucket.add(fid)
+            if self._positions is not None:
+                if record.content is None:
+                    self._snapshot_complete = False
+                else:
+                    lines = _snapshot_lines(record.content)
+                    self._delta_content[fid] = (
+                        None if lines is None else (record.content, *lines)
+                    )
+            self._file_id_to_path[fid] = record.path
+            self._path_to_file_id[record.path] = fid
+            self._next_file_id = max(self._next_file_id, fid + 1)
+        self._delta_records += 1
+
+    def _drop_live_entry(self, rel_path: str) -> None:
+        """Unmap *rel_path*: tombstone a base ID, or unlink a delta ID."""
+        fid = self._path_to_file_id.pop(rel_path, None)
+        if fid is None:
+            return
+        self._file_id_to_path.pop(fid, None)
+        self._delta_file_meta.pop(fid, None)
+        self._delta_content.pop(fid, None)
+        trigrams = self._delta_file_trigrams.pop(fid, None)
+        if trigrams is None:
+            self._tombstones.add(fid)
+            self._tombstone_array = None
+            return
+        for h in trigrams:
+            bucket = self._delta_postings.get(h)
+            if bucket is not None:
+                bucket.discard(fid)
+                if not bucket:
+                    del self._delta_postings[h]
+
+    def _append_delta_record(self, record: _DeltaRecord) -> None:
+        """Append *record* to the delta log. Caller must hold _lock.
+
+        A failed write only costs durability: the in-memory delta still
+        serves queries until the next compaction or build.
+        """
         try:
-            raw = mm[offset : offset + length]
-            if len(raw) < 4:
-                return []
-            (count,) = struct.unpack_from("<I", raw, 0)
-            expected = 4 + count * 4
-            if len(raw) < expected:
-                return []
-            return list(struct.unpack_from(f"<{count}I", raw, 4))
-        except (struct.error, ValueError):
+            with open(self._delta_path, "ab") as f:
+                if f.tell() == 0:
+                    f.write(struct.pack(
+                        _DELTA_HEADER_FMT, _DELTA_MAGIC, _DELTA_VERSION, self._base_id,
+                    ))
+                f.write(record.encode())
+        except OSError as exc:
+            logger.debug("trigram_index: delta log append failed: %s", exc)
+
+    def _read_delta_log(self) -> list[_DeltaRecord]:
+        """Return the records of the delta log that match the loaded base."""
+        try:
+            with open(self._delta_path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return []
+        base_id, records, _end = _parse_delta_log(data)
+        if base_id != self._base_id:
             return []
+        return records
+
+    def _replay_delta_log(self) -> None:
+        """Rebuild the delta segment from the log. Caller must hold _lock."""
+        try:
+            with open(self._delta_path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return
+        base_id, records, valid_end = _parse_delta_log(data)
+        if base_id != self._base_id:
+            logger.debug("trigram_index: discarding delta log for a different base")
+            self._remove_delta_log()
+            return
+        for record in records:
+            self._apply_delta_record(record)
+        if struct.unpack_from("<H", data, 4)[0] != _DELTA_VERSION:
+            # Older record layout -- rewrite so new appends stay parseable.
+            self._rewrite_delta_log(base_id, records)
+        elif valid_end < len(data):
+            # Torn trailing append -- cut it off so later appends stay parseable.
+            try:
+                os.truncate(self._delta_path, valid_end)
+            except OSError as exc:
+                logger.debug("trigram_index: cannot truncate delta log: %s", exc)
+
+    def _rewrite_delta_log(self, base_id: int, records: list[_DeltaRecord]) -> None:
+        """Atomically replace the delta log with *records* against *base_id*."""
+        if not records:
+            self._remove_delta_log()
+            return
+        tmp = self._delta_path + ".tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(struct.pack(_DELTA_HEADER_FMT, _DELTA_MAGIC, _DELTA_VERSION, base_id))
+                for record in records:
+                    f.write(record.encode())
+            os.replace(tmp, self._delta_path)
+        except OSError as exc:
+            logger.debug("trigram_index: delta log rewrite failed: %s", exc)
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+
+    def _remove_delta_log(self) -> None:
+        try:
+            os.unlink(self._delta_path)
+        except OSError:
+            pass
+
+    def _schedule_compaction(self) -> None:
+        """Start a background compaction unless one is already running."""
+        with self._lock:
+            if self._compacting:
+                return
+            self._compacting = True
+        threading.Thread(
+            target=self._background_compact, daemon=True, name="trigram-compactor",
+        ).start()
+
+    def _background_compact(self) -> None:
+        try:
+            self.compact()
+        except Exception:
+            logger.debug("trigram_index: background compaction failed", exc_info=True)
+        finally:
+            with self._lock:
+                self._compacting = False
+
+    def _open_base_snapshot(
+        self,
+    ) -> tuple[mmap.mmap, mmap.mmap | None, list[int]] | None:
+        """Open private read-only mmaps of the current base segment.
+
+        Caller must hold _lock.  The handles keep the old inodes alive even
+        if the base files are replaced, so they can be read without the lock.
+        """
+        fds: list[int] = []
+        try:
+            fd = os.open(self._lookup_path, os.O_RDONLY)
+            fds.append(fd)
+            lookup_mm = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+            postings_mm: mmap.mmap | None = None
+            if os.path.getsize(self._postings_path) > 0:
+                fd = os.open(self._postings_path, os.O_RDONLY)
+                fds.append(fd)
+                postings_mm = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as exc:
+            for fd in fds:
+                os.close(fd)
+            logger.debug("trigram_index: cannot snapshot base: %s", exc)
+            return None
+        return lookup_mm, postings_mm, fds
+
+    # ------------------------------------------------------------------
+    # Internal: content snapshot (positional mode)
+    # ------------------------------------------------------------------
+
+    def _snapshot_source(self, rel_path: str) -> tuple[bytes, Any, bool] | None:
+        """Return ``(content, line_starts, plain_lines)`` of a live file. Caller must hold _lock."""
+        fid = self._path_to_file_id.get(rel_path)
+        if fid is None:
+            return None
+        if fid in self._delta_content:
+            entry = self._delta_content[fid]
+            if entry is None:
+                return None
+            content, line_starts, plain = entry
+            return content, memoryview(line_starts).cast("I"), plain
+        lines_mmap = self._lines_mmap
+        if self._positions is None or lines_mmap is None or fid in self._delta_file_trigrams:
+            return None
+        position = self._positions.get(fid)
+        if position is None:
+            return None
+        c_off, c_len, l_off, l_count, plain = position
+        start = self._lines_base + l_off * 4
+        content = (
+            self._content_mmap[c_off : c_off + c_len] if self._content_mmap is not None else b""
+        )
+        return content, memoryview(lines_mmap[start : start + l_count * 4]).cast("I"), plain
+
+    def _write_snapshot(self, snapshot: _SnapshotBuilder | None, base_id: int) -> None:
+        """Atomically write *snapshot* for *base_id*, or remove a stale one if None."""
+        if snapshot is None:
+            self._remove_snapshot()
+            return
+        content_tmp = self._content_path + ".tmp"
+        lines_tmp = self._lines_path + ".tmp"
+        try:
+            with open(content_tmp, "wb") as f:
+                f.writelines(snapshot.content_parts)
+            with open(lines_tmp, "wb") as f:
+                f.write(struct.pack(
+                    _SNAPSHOT_HEADER_FMT, _SNAPSHOT_MAGIC, _SNAPSHOT_VERSION,
+                    base_id, len(snapshot.entries),
+                ))
+                f.writelines(
+                    struct.pack(_SNAPSHOT_ENTRY_FMT, *entry) for entry in snapshot.entries
+                )
+                f.writelines(snapshot.lines_parts)
+            os.replace(content_tmp, self._content_path)
+            os.replace(lines_tmp, self._lines_path)
+        except OSError as exc:
+            # The postings are still valid; searches just fall back to file reads.
+            logger.debug("trigram_index: snapshot write failed: %s", exc)
+            for path in (content_tmp, lines_tmp, self._lines_path):
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+
+    def _remove_snapshot(self) -> None:
+        for path in (self._lines_path, self._content_path):
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+    def _open_snapshot_files(
+        self,
+    ) -> tuple[mmap.mmap | None, mmap.mmap, list[int]] | None:
+        """Open private read-only mmaps of the content snapshot. Caller must hold _lock."""
+        fds: list[int] = []
+        try:
+            fd = os.open(self._lines_path, os.O_RDONLY)
+            fds.append(fd)
+            lines_mm = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+            content_mm: mmap.mmap | None = None
+            if os.path.getsize(self._content_path) > 0:
+                fd = os.open(self._content_path, os.O_RDONLY)
+                fds.append(fd)
+                content_mm = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as exc:
+            for fd in fds:
+                os.close(fd)
+            logger.debug("trigram_index: cannot open snapshot: %s", exc)
+            return None
+        return content_mm, lines_mm, fds
+
+    @staticmethod
+    def _close_snapshot_files(files: tuple[mmap.mmap | None, mmap.mmap, list[int]]) -> None:
+        content_mm, lines_mm, fds = files
+        lines_mm.close()
+        if content_mm is not None:
+            content_mm.close()
+        for fd in fds:
+            os.close(fd)
+
+    def _load_snapshot_unlocked(self) -> None:
+        """Map the content snapshot if it belongs to the loaded base. Caller must hold _lock."""
+        if not os.path.exists(self._lines_path) or not os.path.exists(self._content_path):
+            return
+        files = self._open_snapshot_files()
+        if files is None:
+            return
+        content_mm, lines_mm, fds = files
+        try:
+            magic, version, base_id, n_files = struct.unpack_from(
+                _SNAPSHOT_HEADER_FMT, lines_mm, 0,
+            )
+        except struct.error:
+            magic = version = base_id = n_files = 0
+        lines_base = _SNAPSHOT_HEADER_SIZE + n_files * _SNAPSHOT_ENTRY_SIZE
+        if (
+            magic != _SNAPSHOT_MAGIC
+            or version != _SNAPSHOT_VERSION
+            or base_id != self._base_id
+            or len(lines_mm) < lines_base
+        ):
+            logger.debug("trigram_index: ignoring snapshot for a different base")
+            self._close_snapshot_files(files)
+            return
+
+        content_size = len(content_mm) if content_mm is not None else 0
+        line_slots = (len(lines_mm) - lines_base) // 4
+        positions: dict[int, tuple[int, int, int, int, bool]] = {}
+        for fid, c_off, c_len, l_off, l_count, plain in struct.iter_unpack(
+            _SNAPSHOT_ENTRY_FMT, lines_mm[_SNAPSHOT_HEADER_SIZE:lines_base],
+        ):
+            if c_off + c_len > content_size or l_off + l_count > line_slots:
+                logger.debug("trigram_index: truncated snapshot, ignoring it")
+                self._close_snapshot_files(files)
+                return
+            positions[fid] = (c_off, c_len, l_off, l_count, bool(plain))
+
+        self._content_mmap = content_mm
+        self._lines_mmap = lines_mm
+        self._content_fd = fds[1] if len(fds) > 1 else -1
+        self._lines_fd = fds[0]
+        self._positions = positions
+        self._lines_base = lines_base
 
     # ------------------------------------------------------------------
     # Internal: SQLite
@@ -754,6 +2113,12 @@ class TrigramIndex:
                 "CREATE INDEX IF NOT EXISTS ix_trigram_files_path "
                 "ON trigram_files(path)"
             )
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS trigram_meta (
+                    key   TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                )
+            """)
             conn.commit()
         finally:
             conn.close()
@@ -763,6 +2128,7 @@ class TrigramIndex:
         file_map: dict[str, int],
         content_hashes: dict[str, str],
         mtimes: dict[str, float],
+        base_id: int,
     ) -> None:
         """Persist the file-ID map to SQLite, replacing all previous rows."""
         conn = sqlite3.connect(self._db_path, check_same_thread=False)
@@ -778,10 +2144,51 @@ class TrigramIndex:
                     for rp, fid in file_map.items()
                 ],
             )
+            conn.execute(
+                "INSERT OR REPLACE INTO trigram_meta (key, value) VALUES ('base_id', ?)",
+                (str(base_id),),
+            )
             conn.commit()
         finally:
             conn.close()
 
+    def _read_base_id(self) -> int:
+        """Return the ``base_id`` of the on-disk base (0 for older indexes)."""
+        try:
+            conn = sqlite3.connect(self._db_path, check_same_thread=False)
+            try:
+                row = conn.execute(
+                    "SELECT value FROM trigram_meta WHERE key = 'base_id'"
+                ).fetchone()
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            return 0
+        try:
+            return int(row[0]) if row else 0
+        except (TypeError, ValueError):
+            return 0
+
+    def _load_file_meta(self) -> tuple[dict[str, str], dict[str, float]]:
+        """Return ``(content_hashes, mtimes)`` of the base file map."""
+        content_hashes: dict[str, str] = {}
+        mtimes: dict[str, float] = {}
+        try:
+            conn = sqlite3.connect(self._db_path, check_same_thread=False)
+            try:
+                rows = conn.execute(
+                    "SELECT path, content_hash, mtime FROM trigram_files"
+                ).fetchall()
+            finally:
+                conn.close()
+        except sqlite3.Error as exc:
+            logger.debug("trigram_index: file meta read failed: %s", exc)
+            return content_hashes, mtimes
+        for path, content_hash, mtime in rows:
+            content_hashes[path] = content_hash
+            mtimes[path] = mtime
+        return content_hashes, mtimes
+
     # ------------------------------------------------------------------
     # Internal: mmap lifecycle
     # ------------------------------------------------------------------
@@ -812,6 +2219,23 @@ class TrigramIndex:
             except OSError:
                 pass
             self._postings_fd = -1
+        for mm in (self._content_mmap, self._lines_mmap):
+            if mm is not None:
+                try:
+                    mm.close()
+                except Exception:
+                    pass
+        for fd in (self._content_fd, self._lines_fd):
+            if fd >= 0:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+        self._content_mmap = None
+        self._lines_mmap = None
+        self._content_fd = -1
+        self._lines_fd = -1
+        self._positions = None
 
     def __del__(self) -> None:
         try:
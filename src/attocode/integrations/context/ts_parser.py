@@ -12,6 +12,8 @@ extending coverage to 50+ languages without per-language config.
 
 The main entry point is ``ts_parse_file()`` which returns a ``FileAST``
 (the same dataclass used by the regex parsers in ``codebase_ast.py``).
+``ts_reparse_file()`` re-parses an edited file incrementally from its
+previous tree and re-extracts only the top-level nodes the edit touched.
 """
 
 from __future__ import annotations
@@ -19,6 +21,7 @@ from __future__ import annotations
 import logging
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Any
 
 logger = logging.getLogger(__name__)
 
@@ -1157,13 +1160,74 @@ def ts_parse_file(file_path: str, content: str | None = None, language: str = ""
         logger.debug("tree-sitter parse error for %s: %s", file_path, e)
         return None
 
+    return _extract_symbols(tree.root_node, source_bytes, language)[0]
+
+
+# Languages whose extraction looks across top-level nodes (whole-file
+# passes, shared helper state), so their symbols are never reused per node.
+_WHOLE_FILE_LANGUAGES = frozenset({
+    "yaml", "toml", "json", "html", "css", "scss",
+    "hcl", "terraform", "elixir", "clojure", "r",
+})
+
+
+@dataclass(slots=True)
+class _Chunk:
+    """Symbols extracted from one top-level node."""
+
+    start_byte: int
+    end_byte: int
+    functions: list[dict]
+    classes: list[dict]
+    imports: list[dict]
+    top_level_vars: list[str]
+
+
+def _context_start(node) -> int:
+    """Start of *node* including the decorators/comments read with it."""
+    start = node.start_byte
+    prev = node.prev_named_sibling
+    while prev is not None and (prev.type == "decorator" or "comment" in prev.type):
+        start = prev.start_byte
+        prev = prev.prev_named_sibling
+    return start
+
+
+def _extract_symbols(
+    root,
+    source_bytes: bytes,
+    language: str,
+    reuse: dict[int, tuple[_Chunk, int]] | None = None,
+    dirty: list[tuple[int, int]] | None = None,
+) -> tuple[dict, list[_Chunk] | None]:
+    """Walk *root* and return ``(ts_parse_file result, per-node chunks)``.
+
+    *reuse* maps a top-level node's start byte in this source to a chunk
+    from an earlier parse and the number of lines it moved by; a node
+    whose span matches and whose context lies outside every *dirty* byte
+    range takes that chunk instead of being walked again.  Chunks are
+    ``None`` when a node's extraction touched symbols of another node
+    (e.g. a Go method attached to a type declared elsewhere in the file).
+    Reused chunks are only valid while the file's class names are those of
+    the parse they came from; :func:`ts_reparse_file` checks that.
+    """
     config = LANGUAGE_CONFIGS[language]
-    root = tree.root_node
 
     functions: list[dict] = []
     classes: list[dict] = []
     imports: list[dict] = []
     top_level_vars: list[str] = []
+    chunk_classes = 0  # index of the first class from the current top-level node
+    crossed = False
+
+    def _class_named(name: str) -> dict | None:
+        nonlocal crossed
+        for i, cls in enumerate(classes):
+            if cls["name"] == name:
+                if i < chunk_classes:
+                    crossed = True
+                return cls
+        return None
 
     def _process_node(node, parent_class: str = "") -> None:
         """Recursively process tree-sitter nodes."""
@@ -1209,10 +1273,9 @@ def ts_parse_file(file_path: str, content: str | None = None, language: str = ""
 
             if effective_parent:
                 # Will be added as method to the class
-                for cls in classes:
-                    if cls["name"] == effective_parent:
-                        cls["methods"].append(fn_data)
-                        break
+                cls = _class_named(effective_parent)
+                if cls is not None:
+                    cls["methods"].append(fn_data)
                 else:
                     # Go: receiver type may not have a matching type_declaration
                     # in the same file; record as a standalone function with parent_class set
@@ -1242,10 +1305,9 @@ def ts_parse_file(file_path: str, content: str | None = None, language: str = ""
                     "visibility": visibility,
                     "parent_class": parent_class,
                 }
-                for cls in classes:
-                    if cls["name"] == parent_class:
-                        cls["methods"].append(method_data)
-                        break
+                cls = _class_named(parent_class)
+                if cls is not None:
+                    cls["methods"].append(method_data)
             return
 
         # Classes
@@ -1423,9 +1485,32 @@ def ts_parse_file(file_path: str, content: str | None = None, language: str = ""
         for child in node.children:
             _process_node(child, parent_class=parent_class)
 
-    # Process top-level nodes
+    # Process top-level nodes, reusing unchanged ones from the last parse
+    chunks: list[_Chunk] | None = None if language in _WHOLE_FILE_LANGUAGES else []
     for child in root.children:
+        start, end = child.start_byte, child.end_byte
+        hit = reuse.get(start) if reuse else None
+        if hit is not None and hit[0].end_byte - hit[0].start_byte == end - start and not any(
+            lo <= end and hi >= _context_start(child) for lo, hi in dirty or ()
+        ):
+            old = _shift_chunk(hit[0], start - hit[0].start_byte, hit[1])
+            functions.extend(old.functions)
+            classes.extend(old.classes)
+            imports.extend(old.imports)
+            top_level_vars.extend(old.top_level_vars)
+            chunks.append(old)  # type: ignore[union-attr]
+            continue
+        marks = (len(functions), len(classes), len(imports), len(top_level_vars))
+        chunk_classes = marks[1]
         _process_node(child)
+        if chunks is not None:
+            chunks.append(_Chunk(
+                start, end,
+                functions[marks[0]:], classes[marks[1]:],
+                imports[marks[2]:], top_level_vars[marks[3]:],
+            ))
+    if crossed:
+        chunks = None
 
     # Data/config language extraction: extract top-level keys as vars
     if language in ("yaml", "toml", "json"):
@@ -1444,9 +1529,163 @@ def ts_parse_file(file_path: str, content: str | None = None, language: str = ""
         "classes": classes,
         "imports": imports,
         "top_level_vars": top_level_vars,
-        "line_count": content.count("\n") + 1,
+        "line_count": source_bytes.count(b"\n") + 1,
         "language": language,
-    }
+    }, chunks
+
+
+@dataclass(slots=True)
+class TSParseState:
+    """A file's last tree-sitter parse, the input to :func:`ts_reparse_file`."""
+
+    language: str
+    source: bytes
+    tree: Any
+    result: dict
+    chunks: list[_Chunk] | None
+
+
+def _common_prefix(a: bytes, b: bytes, limit: int) -> int:
+    """Length of the common prefix of *a* and *b*, at most *limit*."""
+    i = 0
+    step = 1 << 12
+    while step:
+        while i + step <= limit and a[i:i + step] == b[i:i + step]:
+            i += step
+        step >>= 1
+    return i
+
+
+def _common_suffix(a: bytes, b: bytes, limit: int) -> int:
+    """Length of the common suffix of *a* and *b*, at most *limit*."""
+    la, lb = len(a), len(b)
+    j = 0
+    step = 1 << 12
+    while step:
+        while j + step <= limit and a[la - j - step:la - j] == b[lb - j - step:lb - j]:
+            j += step
+        step >>= 1
+    return j
+
+
+def _point(source: bytes, offset: int) -> tuple[int, int]:
+    row = source.count(b"\n", 0, offset)
+    return row, offset - (source.rfind(b"\n", 0, offset) + 1)
+
+
+def _shift_chunk(chunk: _Chunk, delta_bytes: int, delta_rows: int) -> _Chunk:
+    """Copy *chunk* moved by the given byte/row offsets."""
+
+    def _moved(d: dict) -> dict:
+        d = dict(d)
+        if "start_line" in d:
+            d["start_line"] += delta_rows
+        if "end_line" in d:
+            d["end_line"] += delta_rows
+        return d
+
+    classes = []
+    for cls in chunk.classes:
+        moved = _moved(cls)
+        moved["methods"] = [_moved(m) for m in cls["methods"]]
+        classes.append(moved)
+    return _Chunk(
+        chunk.start_byte + delta_bytes,
+        chunk.end_byte + delta_bytes,
+        [_moved(f) for f in chunk.functions],
+        classes,
+        [_moved(i) for i in chunk.imports],
+        list(chunk.top_level_vars),
+    )
+
+
+def ts_reparse_file(
+    file_path: str,
+    content: str,
+    language: str,
+    previous: TSParseState | None = None,
+) -> TSParseState | None:
+    """Parse *content*, incrementally from *previous* when possible.
+
+    The edit between ``previous.source`` and *content* is found by
+    comparing their common prefix and suffix, applied to the old tree with
+    ``Tree.edit`` and handed back to tree-sitter, which reuses every
+    unchanged subtree.  Symbol extraction then re-walks only the top-level
+    nodes that overlap the edit or ``Tree.changed_ranges``; the rest keep
+    their previous symbols, shifted to their new lines.  Source with syntax
+    errors is parsed from scratch, and symbols are extracted from scratch
+    when the file's class names change.
+
+    *previous* is consumed: its tree is edited in place.  Returns None if
+    tree-sitter cannot parse *language*.
+    """
+    if language not in LANGUAGE_CONFIGS:
+        return None
+    parser = _get_parser(language)
+    if parser is None:
+        return None
+
+    source = content.encode("utf-8")
+    if previous is not None and previous.language != language:
+        previous = None
+    if previous is not None and previous.source == source:
+        return previous
+
+    reuse: dict[int, tuple[_Chunk, int]] | None = None
+    dirty: list[tuple[int, int]] = []
+    try:
+        if previous is None:
+            tree = parser.parse(source)
+        else:
+            old = previous.source
+            limit = min(len(old), len(source))
+            start = _common_prefix(old, source, limit)
+            tail = _common_suffix(old, source, limit - start)
+            old_end, new_end = len(old) - tail, len(source) - tail
+            start_point = _point(old, start)
+            old_end_point = _point(old, old_end)
+            new_end_point = _point(source, new_end)
+            previous.tree.edit(
+                start_byte=start,
+                old_end_byte=old_end,
+                new_end_byte=new_end,
+                start_point=start_point,
+                old_end_point=old_end_point,
+                new_end_point=new_end_point,
+            )
+            tree = parser.parse(source, previous.tree)
+            if tree.root_node.has_error:
+                # Error recovery depends on the old tree: only a fresh parse
+                # is guaranteed to match ts_parse_file on broken source.
+                tree = parser.parse(source)
+            else:
+                dirty.append((start, new_end))
+                dirty.extend(
+                    (r.start_byte, r.end_byte) for r in previous.tree.changed_ranges(tree)
+                )
+            if dirty and previous.chunks is not None:
+                delta_bytes = new_end - old_end
+                delta_rows = new_end_point[0] - old_end_point[0]
+                reuse = {}
+                for chunk in previous.chunks:
+                    if chunk.end_byte < start:
+                        reuse[chunk.start_byte] = (chunk, 0)
+                    elif chunk.start_byte > old_end:
+                        reuse[chunk.start_byte + delta_bytes] = (chunk, delta_rows)
+    except Exception as e:
+        logger.debug("tree-sitter parse error for %s: %s", file_path, e)
+        return None
+
+    result, chunks = _extract_symbols(tree.root_node, source, language, reuse, dirty)
+    if reuse and _class_names(result) != _class_names(previous.result):  # type: ignore[union-attr]
+        # Reused chunks resolved their methods against the old classes: a
+        # renamed, added or removed class may now claim (or drop) them.
+        result, chunks = _extract_symbols(tree.root_node, source, language)
+    return TSParseState(language, source, tree, result, chunks)
+
+
+def _class_names(result: dict) -> list[str]:
+    return [cls["name"] for cls in result["classes"]]
 
 
 # ---------------------------------------------------------------------------
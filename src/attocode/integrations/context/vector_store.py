@@ -1,21 +1,51 @@
 """SQLite-backed vector store for semantic search.
 
 Stores embeddings as packed float32 BLOBs in SQLite. Uses numpy-accelerated
-batch cosine similarity with in-memory caching for fast retrieval.
+batch cosine similarity over a memory-mapped float32 matrix for fast
+retrieval.
+
+The matrix lives next to the database as ``<db>.matrix-<token>.f32`` (raw
+row-major float32, no header). The ``vector_matrix`` table maps each vector
+id to its row, so writes append rows and leave replaced/deleted ones as
+tombstones until a compaction rewrites the file under a new token. SQLite
+stays the source of truth: a map entry only counts while its
+``produced_at`` matches the ``vectors`` row, so writes that bypass this
+class (rotation cutover, restored snapshots) are detected and re-appended.
+
+With ``quantization`` set to ``int8`` (per-row scaled) or ``float16``, a
+quantized copy of the matrix is kept beside it (``.i8`` + ``.i8scale``, or
+``.f16``) and scanned (or probed through the IVF lists, which are grouped
+from it) instead of the float32 rows, shrinking the resident
+working set 4x/2x. The best candidates are then rescored exactly against
+the float32 matrix, which stays on disk. The copy is derived: missing rows
+are quantized from the float32 matrix whenever the cache syncs, so stores
+created before quantization was enabled are backfilled on first search.
 """
 
 from __future__ import annotations
 
+import contextlib
+import fnmatch
+import glob
 import logging
 import math
 import os
+import re
 import sqlite3
 import struct
 import threading
 import time
+import uuid
 from dataclasses import dataclass, field
 from typing import Any
 
+from attocode.integrations.context.ann_index import (
+    ANN_BACKENDS,
+    IVFFlatIndex,
+    default_nprobe,
+    remove_index_files,
+)
+
 try:
     import numpy as np
 
@@ -31,6 +61,25 @@ logger = logging.getLogger(__name__)
 # scripts at startup.
 VECTOR_STORE_SCHEMA_VERSION = "2"
 
+# Matrix compaction: rewrite the matrix file once tombstoned rows exceed
+# both this floor and the number of live rows.
+_COMPACT_MIN_DEAD = 4096
+# Rows per chunk when streaming the matrix (norms, compaction, re-append)
+_MATRIX_CHUNK_ROWS = 65536
+# Quantized storage modes for the scanned matrix
+QUANTIZATION_MODES = ("none", "int8", "float16")
+# Quantized scans rescore this many candidates per requested result exactly
+# (at least _RESCORE_POOL_MIN) against the float32 matrix.
+_RESCORE_POOL_FACTOR = 8
+_RESCORE_POOL_MIN = 64
+# Rows per chunk when a quantized matrix is widened to float32 for a scan
+_SCAN_CHUNK_ROWS = 16384
+# Sidecar file suffixes per quantization mode (data first)
+_QUANT_SUFFIXES = {"int8": (".i8", ".i8scale"), "float16": (".f16",)}
+# Below this many live rows the ANN backend is bypassed: an exact matmul
+# is already a few milliseconds.
+_ANN_MIN_ROWS = 50_000
+
 
 class VectorStoreDimensionMismatchError(RuntimeError):
     """Raised when the running embedding provider's dimension does not match
@@ -131,27 +180,6 @@ def _cosine_similarity(a: list[float], b: list[float]) -> float:
     return dot / (norm_a * norm_b)
 
 
-def _batch_cosine_similarity(
-    query: np.ndarray,
-    matrix: np.ndarray,
-) -> np.ndarray:
-    """Vectorized cosine similarity: query (D,) vs matrix (N, D) → scores (N,).
-
-    Uses numpy BLAS for a single matrix-vector multiply instead of N Python loops.
-    """
-    query_norm = np.linalg.norm(query)
-    if query_norm == 0.0 or len(matrix) == 0:
-        return np.zeros(len(matrix), dtype=np.float32)
-
-    query_normed = query / query_norm
-    norms = np.linalg.norm(matrix, axis=1)
-
-    scores = np.zeros(len(matrix), dtype=np.float32)
-    mask = norms > 0
-    scores[mask] = (matrix[mask] @ query_normed) / norms[mask]
-    return scores
-
-
 @dataclass(slots=True)
 class VectorStore:
     """SQLite-backed vector store with numpy-accelerated search.
@@ -174,30 +202,80 @@ class VectorStore:
     # mode instead of raising. Used by callers that want to show a nice
     # error in the UI rather than crash on import.
     strict_dimension: bool = True
+    # Search backend, one of ``ANN_BACKENDS``: "exact" (full matmul) or
+    # "ivf" (approximate, see ann_index). "" reads ATTOCODE_VECTOR_INDEX.
+    ann_backend: str = ""
+    # IVF lists scanned per query, the recall-vs-latency knob. 0 reads
+    # ATTOCODE_VECTOR_ANN_NPROBE, falling back to a default scaled to
+    # the number of lists.
+    ann_nprobe: int = 0
+    # Scanned-matrix storage, one of ``QUANTIZATION_MODES``. "" keeps the
+    # mode recorded in store_metadata, else reads
+    # ATTOCODE_VECTOR_QUANTIZATION; a different explicit mode migrates the
+    # store (see _migrate_quantization).
+    quantization: str = ""
     # Set by _validate_dimension on mismatch so callers can detect degraded
     # mode without catching the exception.
     degraded: bool = False
     degraded_reason: str = ""
     _conn: sqlite3.Connection | None = field(default=None, repr=False)
     _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
-    # In-memory vector cache for numpy batch search
-    _vec_matrix: Any = field(default=None, repr=False)  # np.ndarray (N, D)
-    _vec_meta: list[tuple] | None = field(default=None, repr=False)
+    # In-memory vector cache for numpy batch search. Per-row arrays are
+    # indexed by matrix row and include tombstoned rows (``_vec_live`` False).
+    _vec_matrix: Any = field(default=None, repr=False)  # np.memmap (rows, D)
+    _vec_norms: Any = field(default=None, repr=False)  # np.ndarray (rows,)
+    _vec_live: Any = field(default=None, repr=False)  # np.ndarray[bool] (rows,)
+    _vec_row_ids: list[str] = field(default_factory=list, repr=False)
+    _vec_row_fids: Any = field(default=None, repr=False)  # np.ndarray[int32] (rows,)
+    _vec_id_rows: dict[str, int] = field(default_factory=dict, repr=False)
+    # Path dictionary behind ``_vec_row_fids``. Append-only for the life of
+    # the store (id 0 is "", used by tombstoned rows), so per-file filter
+    # masks stay valid across cache syncs and only grow.
+    _vec_file_paths: list[str] = field(default_factory=lambda: [""], repr=False)
+    _vec_file_ids: dict[str, int] = field(default_factory=lambda: {"": 0}, repr=False)
+    # file_filter pattern -> bool mask over ``_vec_file_paths``
+    _vec_glob_masks: dict[str, Any] = field(default_factory=dict, repr=False)
+    _vec_token: str = field(default="", repr=False)
+    # Quantized copy of the matrix (np.memmap int8/float16) and, for int8,
+    # the per-row dequantization scales; None when quantization is "none".
+    _vec_quant: Any = field(default=None, repr=False)
+    _vec_scales: Any = field(default=None, repr=False)
     _vec_cache_version: int = field(default=0, repr=False)
     _vec_loaded_version: int = field(default=-1, repr=False)
+    # PRAGMA data_version at the last cache sync; changes when another
+    # connection commits, so writes from other processes trigger a resync.
+    _vec_data_version: int = field(default=-1, repr=False)
     # Codex M5: last observed value of store_metadata._rotator_cache_ver.
     # Checked before each search so a cutover in another process
     # correctly invalidates this open store's in-memory cache.
     _last_external_cache_ver: int = field(default=0, repr=False)
+    # IVF index over the matrix rows; built lazily on the first search
+    # that needs it and kept in step with the matrix token/row count.
+    _ann: IVFFlatIndex | None = field(default=None, repr=False)
+    _ann_lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
 
     def __post_init__(self) -> None:
         # Ensure directory exists
         os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
         self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
         self._conn.execute("PRAGMA journal_mode=WAL")
+        if not self.ann_backend:
+            self.ann_backend = os.environ.get("ATTOCODE_VECTOR_INDEX", "exact")
+        if self.ann_backend not in ANN_BACKENDS:
+            logger.warning(
+                "vector_store: unknown search backend %r, using exact search",
+                self.ann_backend,
+            )
+            self.ann_backend = "exact"
+        if not self.ann_nprobe:
+            try:
+                self.ann_nprobe = int(os.environ.get("ATTOCODE_VECTOR_ANN_NPROBE", "0"))
+            except ValueError:
+                self.ann_nprobe = 0
         self._create_tables()
         self._migrate_schema()
         self._validate_dimension()
+        self._migrate_quantization()
 
     def _get_conn(self) -> sqlite3.Connection:
         """Return the active connection or raise if closed."""
@@ -247,6 +325,16 @@ class VectorStore:
                 value TEXT NOT NULL
             )
         """)
+        # Row map for the memory-mapped matrix file. An entry is valid only
+        # while produced_at matches the vectors row. Standalone table, so no
+        # schema-version bump: older stores simply start with an empty map.
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS vector_matrix (
+                id TEXT PRIMARY KEY,
+                row INTEGER NOT NULL,
+                produced_at REAL NOT NULL
+            )
+        """)
         conn.commit()
 
     def _migrate_schema(self) -> None:
@@ -361,6 +449,43 @@ class VectorStore:
             )
             conn.commit()
 
+    def _migrate_quantization(self) -> None:
+        """Record the quantized storage mode, switching modes when asked.
+
+        The mode is a store property kept in ``store_metadata`` (absent on
+        stores that predate quantization, which read as ``"none"``). An
+        explicit mode that differs from the stored one is recorded and the
+        old mode's sidecar files are dropped; the new quantized matrix is
+        backfilled from the float32 matrix on the next cache sync. Degraded
+        stores keep whatever mode is stored.
+        """
+        conn = self._get_conn()
+        row = conn.execute(
+            "SELECT value FROM store_metadata WHERE key = 'quantization'"
+        ).fetchone()
+        stored = row[0] if row and row[0] in QUANTIZATION_MODES else "none"
+        requested = self.quantization or os.environ.get("ATTOCODE_VECTOR_QUANTIZATION", "")
+        if requested and requested not in QUANTIZATION_MODES:
+            logger.warning(
+                "vector_store: unknown quantization %r, keeping %r", requested, stored,
+            )
+            requested = ""
+        if not requested or requested == stored or self.degraded:
+            self.quantization = stored
+            return
+
+        conn.execute(
+            "INSERT OR REPLACE INTO store_metadata (key, value) VALUES ('quantization', ?)",
+            (requested,),
+        )
+        conn.commit()
+        self._remove_quant_files("*", stored)
+        logger.info(
+            "vector_store: quantization %s -> %s (quantized matrix rebuilt on next search)",
+            stored, requested,
+        )
+        self.quantization = requested
+
     def _guard_writes(self) -> None:
         """Refuse writes when the store is in degraded mode."""
         if self.degraded:
@@ -431,29 +556,15 @@ class VectorStore:
 
     def upsert(self, entry: VectorEntry) -> None:
         """Insert or update a vector entry."""
-        self._guard_writes()
-        conn = self._get_conn()
-        packed = _pack_vector(entry.vector)
-        now = time.time()
-        with self._lock:
-            conn.execute(
-                """INSERT OR REPLACE INTO vectors
-                   (id, file_path, chunk_type, name, text, vector,
-                    model_name, model_version, dimension, produced_at,
-                    blob_oid, action_hash)
-                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-                (
-                    entry.id, entry.file_path, entry.chunk_type, entry.name,
-                    entry.text, packed,
-                    self.model_name, self.model_version, self.dimension,
-                    now, entry.blob_oid, entry.action_hash,
-                ),
-            )
-            conn.commit()
-            self._vec_cache_version += 1
+        self.upsert_batch([entry])
 
     def upsert_batch(self, entries: list[VectorEntry]) -> None:
-        """Batch insert/update vector entries."""
+        """Batch insert/update vector entries.
+
+        In the same transaction the vectors are appended to the matrix
+        file, so an in-sync search cache is patched in place instead of
+        being reloaded.
+        """
         self._guard_writes()
         conn = self._get_conn()
         now = time.time()
@@ -475,19 +586,47 @@ class VectorStore:
                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
                 rows,
             )
+            patch: tuple[str, int, list[VectorEntry]] | None = None
+            if _HAS_NUMPY:
+                kept = [e for e in entries if len(e.vector) == self.dimension]
+                if kept:
+                    vecs = np.asarray([e.vector for e in kept], dtype=np.float32)
+                    appended = self._append_matrix_rows(
+                        conn, [e.id for e in kept], vecs, [now] * len(kept),
+                    )
+                    if appended is not None:
+                        patch = (*appended, kept)
             conn.commit()
             self._vec_cache_version += 1
+            if patch is not None:
+                token, start, kept = patch
+                self._patch_vector_cache(
+                    token, start, [e.id for e in kept], [e.file_path for e in kept],
+                )
 
     def delete_by_file(self, file_path: str) -> int:
         """Delete all entries for a file. Returns count deleted."""
         self._guard_writes()
         conn = self._get_conn()
         with self._lock:
+            ids = [
+                r[0] for r in conn.execute(
+                    "SELECT id FROM vectors WHERE file_path = ?", (file_path,),
+                )
+            ]
             cursor = conn.execute(
                 "DELETE FROM vectors WHERE file_path = ?", (file_path,),
             )
             conn.commit()
             self._vec_cache_version += 1
+            # Tombstone the rows; the stale vector_matrix entries no longer
+            # join to a vectors row and are dropped by the next compaction.
+            if self._vec_loaded_version == self._vec_cache_version - 1:
+                for vid in ids:
+                    row = self._vec_id_rows.pop(vid, None)
+                    if row is not None:
+                        self._vec_live[row] = False
+                self._vec_loaded_version = self._vec_cache_version
             return cursor.rowcount
 
     def clear_all(self) -> int:
@@ -505,9 +644,14 @@ class VectorStore:
         with self._lock:
             cursor = conn.execute("DELETE FROM vectors")
             conn.execute("DELETE FROM file_metadata")
+            self._reset_matrix(conn)
             conn.commit()
             self._vec_cache_version += 1
-            return cursor.rowcount
+        # Centroids trained on the old corpus would skew the next index
+        with self._ann_lock:
+            self._ann = None
+            remove_index_files(self._ann_path())
+        return cursor.rowcount
 
     def clear_by_model(self, model_name: str, model_version: str = "") -> int:
         """Delete only vectors for a given model (+ optional version).
@@ -534,45 +678,460 @@ class VectorStore:
             self._vec_cache_version += 1
             return cursor.rowcount
 
+    # ------------------------------------------------------------------
+    # Memory-mapped matrix file
+    # ------------------------------------------------------------------
+    #
+    # Callers hold ``self._lock``. Methods that write expect to run inside
+    # a write transaction (after a DML statement or ``BEGIN IMMEDIATE``) so
+    # concurrent appenders in other processes are serialized by SQLite.
+
+    def _matrix_path(self, token: str) -> str:
+        return f"{self.db_path}.matrix-{token}.f32"
+
+    def _matrix_meta(self, conn: sqlite3.Connection) -> tuple[str, int, int]:
+        """Return ``(token, rows, dim)`` of the current matrix file."""
+        meta = dict(conn.execute(
+            "SELECT key, value FROM store_metadata "
+            "WHERE key IN ('matrix_token', 'matrix_rows', 'matrix_dim')"
+        ).fetchall())
+        try:
+            return (
+                meta.get("matrix_token", ""),
+                int(meta.get("matrix_rows", "0")),
+                int(meta.get("matrix_dim", "0")),
+            )
+        except ValueError:
+            return "", 0, 0
+
+    def _matrix_file_ok(self, token: str, rows: int, dim: int) -> bool:
+        if not token or dim != self.dimension:
+            return False
+        try:
+            return os.path.getsize(self._matrix_path(token)) >= rows * dim * 4
+        except OSError:
+            return False
+
+    def _set_matrix_meta(self, conn: sqlite3.Connection, token: str, rows: int) -> None:
+        conn.executemany(
+            "INSERT OR REPLACE INTO store_metadata (key, value) VALUES (?, ?)",
+            [
+                ("matrix_token", token),
+                ("matrix_rows", str(rows)),
+                ("matrix_dim", str(self.dimension)),
+            ],
+        )
+
+    def _remove_matrix_file(self, token: str) -> None:
+        if not token:
+            return
+        try:
+            os.remove(self._matrix_path(token))
+        except OSError:
+            pass  # already gone, or still open elsewhere on Windows
+        for mode in QUANTIZATION_MODES:
+            self._remove_quant_files(token, mode)
+
+    def _reset_matrix(self, conn: sqlite3.Connection) -> tuple[str, int]:
+        """Start an empty matrix file under a fresh token and drop the row map."""
+        old_token = self._matrix_meta(conn)[0]
+        token = uuid.uuid4().hex
+        with open(self._matrix_path(token), "wb"):
+            pass
+        conn.execute("DELETE FROM vector_matrix")
+        self._set_matrix_meta(conn, token, 0)
+        if old_token != token:
+            self._remove_matrix_file(old_token)
+        return token, 0
+
+    def _append_matrix_rows(
+        self,
+        conn: sqlite3.Connection,
+        ids: list[str],
+        vecs: Any,
+        produced_at: list[float],
+    ) -> tuple[str, int] | None:
+        """Append *vecs* to the matrix file and map *ids* to the new rows.
+
+        Returns ``(token, first_row)``, or None when the file could not be
+        written (the rows are then re-appended by the next cache sync).
+        """
+        token, used, dim = self._matrix_meta(conn)
+        try:
+            if not self._matrix_file_ok(token, used, dim):
+                token, used = self._reset_matrix(conn)
+            with open(self._matrix_path(token), "r+b") as f:
+                f.seek(used * self.dimension * 4)
+                f.write(np.ascontiguousarray(vecs, dtype=np.float32).tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+        except OSError:
+            logger.warning("vector_store: matrix append failed", exc_info=True)
+            return None
+        conn.executemany(
+            "INSERT OR REPLACE INTO vector_matrix (id, row, produced_at) VALUES (?, ?, ?)",
+            [(vid, used + i, ts) for i, (vid, ts) in enumerate(zip(ids, produced_at, strict=True))],
+        )
+        self._set_matrix_meta(conn, token, used + len(ids))
+        return token, used
+
+    def _map_matrix(self, token: str, rows: int) -> Any:
+        if rows == 0:
+            return np.empty((0, self.dimension), dtype=np.float32)
+        return np.memmap(
+            self._matrix_path(token), dtype=np.float32, mode="r",
+            shape=(rows, self.dimension),
+        )
+
+    @staticmethod
+    def _row_norms(matrix: Any) -> Any:
+        """L2 norm of every row, streamed so a memmap is never copied whole."""
+        norms = np.empty(len(matrix), dtype=np.float32)
+        for i in range(0, len(matrix), _MATRIX_CHUNK_ROWS):
+            chunk = np.asarray(matrix[i:i + _MATRIX_CHUNK_ROWS], dtype=np.float32)
+            norms[i:i + len(chunk)] = np.sqrt(np.einsum("ij,ij->i", chunk, chunk))
+        return norms
+
+    # Quantized copy -----------------------------------------------------
+
+    def _quant_paths(self, token: str) -> tuple[str, ...]:
+        base = f"{self.db_path}.matrix-{token}"
+        return tuple(base + suffix for suffix in _QUANT_SUFFIXES.get(self.quantization, ()))
+
+    def _remove_quant_files(self, token: str, mode: str) -> None:
+        """Delete the *mode* sidecars of matrix *token* (``"*"``: every token)."""
+        for suffix in _QUANT_SUFFIXES.get(mode, ()):
+            if token == "*":
+                paths = glob.glob(glob.escape(f"{self.db_path}.matrix-") + "*" + suffix)
+            else:
+                paths = [f"{self.db_path}.matrix-{token}{suffix}"]
+            for path in paths:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def _write_quant_rows(self, paths: tuple[str, ...], matrix: Any, start: int) -> None:
+        """Quantize rows ``start:`` of *matrix* into the sidecar *paths*."""
+        for path in paths:
+            if not os.path.exists(path):
+                with open(path, "wb"):
+                    pass
+        int8 = self.quantization == "int8"
+        row_bytes = self.dimension * (1 if int8 else 2)
+        with contextlib.ExitStack() as stack:
+            files = [stack.enter_context(open(path, "r+b")) for path in paths]
+            files[0].seek(start * row_bytes)
+            if int8:
+                files[1].seek(start * 4)
+            for i in range(start, len(matrix), _MATRIX_CHUNK_ROWS):
+                chunk = np.asarray(matrix[i:i + _MATRIX_CHUNK_ROWS], dtype=np.float32)
+                if int8:
+                    # Symmetric per-row scale: row = scale * int8 values
+                    scales = np.abs(chunk).max(axis=1) / 127.0
+                    scales[scales == 0] = 1.0
+                    files[0].write(np.rint(chunk / scales[:, None]).astype(np.int8).tobytes())
+                    files[1].write(scales.astype(np.float32).tobytes())
+                else:
+                    files[0].write(np.clip(chunk, -65504.0, 65504.0).astype(np.float16).tobytes())
+            for f in files:
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _sync_quantized(self, token: str, matrix: Any) -> None:
+        """Map the quantized copy of *matrix*, quantizing the rows it lacks.
+
+        Rows come from the float32 matrix, so the copy catches up with
+        appends by any writer and backfills stores that predate the mode.
+        Writers quantizing the same rows write identical bytes, so racing
+        appends are harmless. If the copy cannot be written, searches scan
+        the float32 matrix instead.
+        """
+        self._vec_quant = self._vec_scales = None
+        if self.quantization == "none" or not token:
+            return
+        paths = self._quant_paths(token)
+        int8 = self.quantization == "int8"
+        dtype = np.int8 if int8 else np.float16
+        rows = len(matrix)
+        try:
+            have = os.path.getsize(paths[0]) // (self.dimension * np.dtype(dtype).itemsize)
+            if int8:
+                have = min(have, os.path.getsize(paths[1]) // 4)
+        except OSError:
+            have = 0
+        if have < rows:
+            if self.degraded:
+                return
+            try:
+                self._write_quant_rows(paths, matrix, have)
+            except OSError:
+                logger.warning("vector_store: quantized matrix write failed", exc_info=True)
+                return
+        if rows == 0:
+            self._vec_quant = np.empty((0, self.dimension), dtype=dtype)
+        else:
+            self._vec_quant = np.memmap(
+                paths[0], dtype=dtype, mode="r", shape=(rows, self.dimension),
+            )
+        if int8:
+            self._vec_scales = np.fromfile(paths[1], dtype=np.float32, count=rows)
+
+    def _scan_norms(self, start: int, stop: int) -> Any:
+        """Norms of rows ``start:stop`` as seen by the scan (quantized when enabled)."""
+        if self._vec_quant is None:
+            return self._row_norms(self._vec_matrix[start:stop])
+        norms = self._row_norms(self._vec_quant[start:stop])
+        if self._vec_scales is not None:
+            norms *= self._vec_scales[start:stop]
+        return norms
+
+    def _patch_vector_cache(
+        self,
+        token: str,
+        start: int,
+        ids: list[str],
+        file_paths: list[str],
+    ) -> None:
+        """Apply rows this process just appended to an in-sync cache.
+
+        Leaves the cache stale (so the next search resyncs) when it was
+        already stale, another writer moved the matrix, or enough rows are
+        tombstoned that a compaction is due.
+        """
+        if (
+            self._vec_loaded_version != self._vec_cache_version - 1
+            or token != self._vec_token
+            or start != len(self._vec_row_ids)
+        ):
+            return
+        live = np.ones(len(ids), dtype=bool)
+        for i, vid in enumerate(ids):
+            old = self._vec_id_rows.get(vid)
+            if old is not None:
+                if old >= start:
+                    live[old - start] = False  # repeated id within this batch
+                else:
+                    self._vec_live[old] = False
+            self._vec_id_rows[vid] = start + i
+        self._vec_row_ids.extend(ids)
+        self._vec_row_fids = np.concatenate([
+            self._vec_row_fids,
+            np.fromiter(map(self._file_id, file_paths), dtype=np.int32, count=len(file_paths)),
+        ])
+        self._vec_live = np.concatenate([self._vec_live, live])
+        self._vec_matrix = self._map_matrix(token, len(self._vec_row_ids))
+        self._sync_quantized(token, self._vec_matrix)
+        self._vec_norms = np.concatenate([
+            self._vec_norms, self._scan_norms(start, len(self._vec_row_ids)),
+        ])
+
+        dead = len(self._vec_row_ids) - len(self._vec_id_rows)
+        if dead <= max(_COMPACT_MIN_DEAD, len(self._vec_id_rows)):
+            self._vec_loaded_version = self._vec_cache_version
+
+    def _compact_matrix(
+        self,
+        conn: sqlite3.Connection,
+        token: str,
+        used: int,
+        live: list[tuple[str, str, int, float]],
+    ) -> bool:
+        """Rewrite the matrix with only *live* rows under a new token.
+
+        *live* holds ``(id, file_path, row, produced_at)``. Returns False
+        (leaving everything as it was) if another writer changed the
+        matrix meanwhile.
+        """
+        new_token = uuid.uuid4().hex
+        src = self._map_matrix(token, used)
+        rows = np.fromiter((r[2] for r in live), dtype=np.int64, count=len(live))
+        try:
+            with open(self._matrix_path(new_token), "wb") as f:
+                for i in range(0, len(rows), _MATRIX_CHUNK_ROWS):
+                    f.write(np.ascontiguousarray(src[rows[i:i + _MATRIX_CHUNK_ROWS]]).tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+        except OSError:
+            logger.warning("vector_store: matrix compaction failed", exc_info=True)
+            self._remove_matrix_file(new_token)
+            return False
+        del src
+
+        conn.execute("BEGIN IMMEDIATE")
+        if self._matrix_meta(conn)[:2] != (token, used):
+            conn.rollback()
+            self._remove_matrix_file(new_token)
+            return False
+        conn.execute("DELETE FROM vector_matrix")
+        conn.executemany(
+            "INSERT INTO vector_matrix (id, row, produced_at) VALUES (?, ?, ?)",
+            [(vid, i, ts) for i, (vid, _fp, _row, ts) in enumerate(live)],
+        )
+        self._set_matrix_meta(conn, new_token, len(live))
+        conn.commit()
+        self._remove_matrix_file(token)
+        logger.debug(
+            "vector_store: compacted matrix %d -> %d rows", used, len(live),
+        )
+        return True
+
     # ------------------------------------------------------------------
     # In-memory vector cache for numpy batch search
     # ------------------------------------------------------------------
 
     def _load_vector_cache(self) -> None:
-        """Load all vectors from SQLite into a numpy matrix."""
+        """Bring the in-memory search cache in line with the ``vectors`` table.
+
+        Only ids, file paths and matrix rows are read from SQLite; vectors
+        come from the memory-mapped matrix and chunk text is fetched for
+        the top-k hits at search time. Rows with no valid map entry (new
+        store, writes from other tools, rotation cutover) have their BLOBs
+        read and appended, and the matrix is compacted once tombstones
+        outnumber live rows.
+        """
         conn = self._get_conn()
         with self._lock:
-            rows = conn.execute(
-                "SELECT id, file_path, chunk_type, name, text, vector FROM vectors",
-            ).fetchall()
-
-        if not rows:
-            self._vec_matrix = np.empty((0, self.dimension), dtype=np.float32)
-            self._vec_meta = []
+            self._vec_data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+            for _attempt in range(3):
+                if self._sync_vector_cache(conn):
+                    break
             self._vec_loaded_version = self._vec_cache_version
-            return
+        logger.debug(
+            "Vector cache loaded: %d vectors (%d dim, %d matrix rows)",
+            len(self._vec_id_rows), self.dimension, len(self._vec_row_ids),
+        )
 
-        meta: list[tuple] = []
-        vecs: list[np.ndarray] = []
-        for row in rows:
-            try:
-                v = np.frombuffer(row[5], dtype=np.float32)
-                if len(v) == self.dimension:
+    def _sync_vector_cache(self, conn: sqlite3.Connection) -> bool:
+        """One sync pass; False when another writer moved the matrix mid-pass."""
+        token, used, dim = self._matrix_meta(conn)
+        writable = not self.degraded
+        if not self._matrix_file_ok(token, used, dim):
+            if writable:
+                token, used = self._reset_matrix(conn)
+                conn.commit()
+            else:
+                token, used = "", 0
+
+        live: list[tuple[str, str, int, float]] = []
+        missing: list[str] = []
+        for vid, fpath, row, produced_at in conn.execute(
+            "SELECT v.id, v.file_path, m.row, v.produced_at FROM vectors v "
+            "LEFT JOIN vector_matrix m ON m.id = v.id AND m.produced_at = v.produced_at"
+        ):
+            if row is not None and row < used:
+                live.append((vid, fpath, row, produced_at))
+            else:
+                missing.append(vid)
+
+        if missing and writable:
+            for i in range(0, len(missing), 500):
+                chunk = missing[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                fetched: list[tuple[str, str, float]] = []
+                vecs: list[Any] = []
+                for vid, fpath, blob, produced_at in conn.execute(
+                    "SELECT id, file_path, vector, produced_at FROM vectors "
+                    f"WHERE id IN ({placeholders})",
+                    chunk,
+                ):
+                    try:
+                        v = np.frombuffer(blob, dtype=np.float32)
+                    except ValueError:
+                        v = None
+                    if v is None or len(v) != self.dimension:
+                        logger.warning("Skipping corrupt vector row id=%s", vid)
+                        continue
+                    fetched.append((vid, fpath, produced_at))
                     vecs.append(v)
-                    meta.append((row[0], row[1], row[2], row[3], row[4]))
-            except (ValueError, struct.error):
-                logger.warning("Skipping corrupt vector row id=%s", row[0])
+                if not fetched:
+                    continue
+                conn.execute("BEGIN IMMEDIATE")
+                appended = self._append_matrix_rows(
+                    conn, [f[0] for f in fetched], np.vstack(vecs), [f[2] for f in fetched],
+                )
+                conn.commit()
+                if appended is None:
+                    break
+                if appended[0] != token:
+                    return False  # matrix reset or compacted under us
+                start = appended[1]
+                live.extend(
+                    (vid, fpath, start + j, ts) for j, (vid, fpath, ts) in enumerate(fetched)
+                )
+            current_token, used, _ = self._matrix_meta(conn)
+            if current_token != token:
+                return False
+
+        dead = used - len(live)
+        if writable and dead > max(_COMPACT_MIN_DEAD, len(live)):
+            if not self._compact_matrix(conn, token, used, live):
+                return False
+            token, used = self._matrix_meta(conn)[:2]
+            live = [(vid, fpath, i, ts) for i, (vid, fpath, _row, ts) in enumerate(live)]
+
+        is_live = np.zeros(used, dtype=bool)
+        row_ids = [""] * used
+        row_fids = np.zeros(used, dtype=np.int32)
+        id_rows: dict[str, int] = {}
+        for vid, fpath, row, _ts in live:
+            is_live[row] = True
+            row_ids[row] = vid
+            row_fids[row] = self._file_id(fpath)
+            id_rows[vid] = row
+
+        self._vec_token = token
+        self._vec_matrix = self._map_matrix(token, used)
+        self._sync_quantized(token, self._vec_matrix)
+        self._vec_norms = self._scan_norms(0, used)
+        self._vec_live = is_live
+        self._vec_row_ids = row_ids
+        self._vec_row_fids = row_fids
+        self._vec_id_rows = id_rows
+        return True
+
+    def _file_id(self, file_path: str) -> int:
+        fid = self._vec_file_ids.get(file_path)
+        if fid is None:
+            fid = self._vec_file_ids[file_path] = len(self._vec_file_paths)
+            self._vec_file_paths.append(file_path)
+        return fid
 
-        if vecs:
-            self._vec_matrix = np.vstack(vecs)
-        else:
-            self._vec_matrix = np.empty((0, self.dimension), dtype=np.float32)
-        self._vec_meta = meta
-        self._vec_loaded_version = self._vec_cache_version
-        logger.debug(
-            "Vector cache loaded: %d vectors (%d dim)",
-            len(meta), self.dimension,
-        )
+    # ------------------------------------------------------------------
+    # File filter masks
+    # ------------------------------------------------------------------
+
+    def _file_mask(self, file_filter: str, existing_files: set[str] | None) -> Any:
+        """Bool mask over file ids for the search filters (None = no filter).
+
+        Both masks are computed per unique path. Glob masks are cached per
+        pattern and only extended for paths added since; the
+        ``existing_files`` mask is rebuilt on every call, as callers pass a
+        fresh (or edited) set each time.
+        """
+        if not file_filter and existing_files is None:
+            return None
+        paths = self._vec_file_paths
+        n = len(paths)
+        mask = np.ones(n, dtype=bool)
+        if file_filter:
+            glob_mask = self._vec_glob_masks.get(file_filter)
+            have = 0 if glob_mask is None else len(glob_mask)
+            if glob_mask is None or have < n:
+                # What fnmatch.fnmatch does per call, compiled once
+                match = re.compile(fnmatch.translate(os.path.normcase(file_filter))).match
+                added = np.fromiter(
+                    (match(os.path.normcase(p)) is not None for p in paths[have:n]),
+                    dtype=bool, count=n - have,
+                )
+                glob_mask = added if glob_mask is None else np.concatenate([glob_mask, added])
+                if len(self._vec_glob_masks) >= 64:
+                    self._vec_glob_masks.clear()
+                self._vec_glob_masks[file_filter] = glob_mask
+            mask &= glob_mask[:n]
+        if existing_files is not None:
+            mask &= np.fromiter((p in existing_files for p in paths), dtype=bool, count=n)
+        return mask
 
     # ------------------------------------------------------------------
     # Search
@@ -621,29 +1180,151 @@ class VectorStore:
         file_filter: str,
         existing_files: set[str] | None,
     ) -> list[SearchResult]:
-        """Numpy-accelerated vector search with in-memory cache."""
+        """Numpy-accelerated vector search over the memory-mapped matrix.
+
+        With ``ann_backend="ivf"`` only the rows in the probed IVF lists
+        are scored. Chunk type, name and text are read from SQLite for the
+        top-k hits only.
+        """
+        # Writes committed by other connections (other processes) since the
+        # last sync invalidate the cache; our own writes patch it in place.
+        conn = self._get_conn()
+        with self._lock:
+            data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+        if data_version != self._vec_data_version:
+            self._vec_cache_version += 1
+
         # Ensure cache is current
         if self._vec_loaded_version != self._vec_cache_version or self._vec_matrix is None:
             self._load_vector_cache()
 
-        if self._vec_matrix is None or len(self._vec_matrix) == 0:
+        # Snapshot references: writers swap these arrays rather than resize them
+        matrix = self._vec_matrix
+        norms = self._vec_norms
+        live = self._vec_live
+        row_ids = self._vec_row_ids
+        row_fids = self._vec_row_fids
+        file_paths = self._vec_file_paths
+        token = self._vec_token
+        quant = self._vec_quant
+        scales = self._vec_scales
+        if matrix is None or len(matrix) == 0:
             return []
 
         query_np = np.array(query_vector, dtype=np.float32)
+        query_norm = np.linalg.norm(query_np)
+        if query_norm == 0.0:
+            return []
+        query_unit = query_np / query_norm
+
+        # Built after the snapshot, so it covers every id in row_fids
+        file_mask = self._file_mask(file_filter, existing_files)
+        # A quantized scan ranks a wider pool that is rescored exactly below
+        pool_k = top_k if quant is None else max(top_k * _RESCORE_POOL_FACTOR, _RESCORE_POOL_MIN)
+        probed = None
+        if self.ann_backend == "ivf":
+            # Quantized stores probe the quantized rows; the pool is rescored below
+            probed = self._ann_score(
+                matrix if quant is None else quant, scales, norms, live, token, query_unit,
+            )
+        if probed is not None:
+            top = self._rank_rows(
+                norms, live, row_fids, file_mask, probed[0], probed[1], pool_k,
+            )
+        if probed is None or (len(top) < top_k and file_mask is not None):
+            # Full scan: one BLAS matmul against the mmap (or the quantized
+            # copy). After an IVF probe this catches a selective filter
+            # leaving the probed lists short of top_k matches.
+            dots = matrix @ query_unit if quant is None else self._scan_dots(quant, scales, query_unit)
+            top = self._rank_rows(
+                norms, live, row_fids, file_mask, None, dots, pool_k,
+            )
+        if quant is not None:
+            top = self._rescore(matrix, top, query_unit, top_k)
+        hits = [(row_ids[row], file_paths[row_fids[row]], s) for row, s in top]
+        if not hits:
+            return []
 
-        # Batch cosine similarity — single BLAS matmul
-        scores = _batch_cosine_similarity(query_np, self._vec_matrix)
+        placeholders = ",".join("?" * len(hits))
+        with self._lock:
+            details = {
+                r[0]: r[1:] for r in conn.execute(
+                    "SELECT id, chunk_type, name, text FROM vectors "
+                    f"WHERE id IN ({placeholders})",
+                    [h[0] for h in hits],
+                )
+            }
+
+        results: list[SearchResult] = []
+        for vid, fp, s in hits:
+            detail = details.get(vid)
+            if detail is None:
+                continue  # deleted since the cache was synced
+            results.append(SearchResult(
+                id=vid, file_path=fp, chunk_type=detail[0],
+                name=detail[1], text=detail[2], score=round(s, 4),
+            ))
+        return results
+
+    @staticmethod
+    def _scan_dots(quant: Any, scales: Any, query_unit: Any) -> Any:
+        """Query dot products against a quantized matrix, widened chunk by chunk."""
+        dots = np.empty(len(quant), dtype=np.float32)
+        for i in range(0, len(quant), _SCAN_CHUNK_ROWS):
+            chunk = np.asarray(quant[i:i + _SCAN_CHUNK_ROWS], dtype=np.float32)
+            dots[i:i + len(chunk)] = chunk @ query_unit
+        if scales is not None:
+            dots *= scales
+        return dots
+
+    @staticmethod
+    def _rescore(
+        matrix: Any,
+        pool: list[tuple[int, float]],
+        query_unit: Any,
+        top_k: int,
+    ) -> list[tuple[int, float]]:
+        """Exact top-k cosine of the *pool* rows against the float32 matrix."""
+        if not pool:
+            return []
+        rows = np.array(sorted(row for row, _ in pool), dtype=np.int64)
+        vecs = np.asarray(matrix[rows], dtype=np.float32)
+        lengths = np.linalg.norm(vecs, axis=1)
+        scores = np.zeros(len(rows), dtype=np.float32)
+        np.divide(vecs @ query_unit, lengths, out=scores, where=lengths > 0)
+        order = np.argsort(-scores, kind="stable")[:top_k]
+        return [(int(rows[i]), float(scores[i])) for i in order.tolist() if scores[i] > 0]
+
+    @staticmethod
+    def _rank_rows(
+        norms: Any,
+        live: Any,
+        row_fids: Any,
+        file_mask: Any,
+        rows: Any,
+        dots: Any,
+        top_k: int,
+    ) -> list[tuple[int, float]]:
+        """Top-k ``(row, cosine)`` from raw query dot products.
 
-        # Apply filters by zeroing out excluded entries
-        if file_filter or existing_files is not None:
-            import fnmatch
+        *dots* holds the dot product of the unit query with each of *rows*
+        (None = every matrix row, in order). *file_mask* (per file id, see
+        ``_file_mask``) drops rows of filtered-out files.
+        """
+        if rows is None:
+            row_norms, keep = norms, live
+            if file_mask is not None:
+                keep = live & file_mask[row_fids]
+        else:
+            row_norms, keep = norms[rows], live[rows]
+            if file_mask is not None:
+                keep &= file_mask[row_fids[rows]]
 
-            for i, meta in enumerate(self._vec_meta):
-                fp = meta[1]  # file_path
-                if existing_files is not None and fp not in existing_files:  # noqa: SIM114 — clearer as two branches than one combined or
-                    scores[i] = -1.0
-                elif file_filter and not fnmatch.fnmatch(fp, file_filter):
-                    scores[i] = -1.0
+        # Cosine similarity from the precomputed row norms; tombstoned and
+        # filtered-out rows are masked out.
+        scores = np.zeros(len(dots), dtype=np.float32)
+        np.divide(dots, row_norms, out=scores, where=row_norms > 0)
+        scores[~keep] = -1.0
 
         # Top-k selection: argpartition is O(N) vs O(N log N) for full sort
         n = len(scores)
@@ -653,17 +1334,60 @@ class VectorStore:
             top_indices = np.argpartition(scores, -top_k)[-top_k:]
             top_indices = top_indices[np.argsort(scores[top_indices])[::-1]]
 
-        results: list[SearchResult] = []
-        for idx in top_indices:
+        top: list[tuple[int, float]] = []
+        for idx in top_indices.tolist():
             s = float(scores[idx])
             if s <= 0:
                 break
-            m = self._vec_meta[idx]
-            results.append(SearchResult(
-                id=m[0], file_path=m[1], chunk_type=m[2],
-                name=m[3], text=m[4], score=round(s, 4),
-            ))
-        return results
+            top.append((idx if rows is None else int(rows[idx]), s))
+        return top
+
+    # ------------------------------------------------------------------
+    # Approximate search (IVF)
+    # ------------------------------------------------------------------
+
+    def _ann_path(self) -> str:
+        return f"{self.db_path}.ivf"
+
+    def _ann_score(
+        self,
+        matrix: Any,
+        scales: Any,
+        norms: Any,
+        live: Any,
+        token: str,
+        query_unit: Any,
+    ) -> tuple[Any, Any] | None:
+        """``(rows, dots)`` for the IVF lists nearest the query, or None for an exact scan.
+
+        *matrix* is the one searches scan (the quantized copy, with its int8
+        *scales*, when quantization is on); the index groups its lists from it.
+
+        Brings the index in step with the matrix first: appended rows are
+        assigned, a compacted matrix is reassigned, and the centroids are
+        (re)trained when missing or outgrown. Degraded stores and stores
+        below ``_ANN_MIN_ROWS`` live rows always scan exactly.
+        """
+        n_live = int(np.count_nonzero(live))
+        if n_live < _ANN_MIN_ROWS or self.degraded:
+            return None
+        with self._ann_lock:
+            index = self._ann
+            if index is None:
+                index = IVFFlatIndex.load(self._ann_path(), self.dimension)
+            if index is None or index.needs_retrain(n_live):
+                index = IVFFlatIndex.train(self._ann_path(), matrix, norms, live, token)
+                dirty = True
+            elif index.token != token or index.rows > len(matrix):
+                index.reassign(matrix, token)
+                dirty = True
+            else:
+                dirty = index.extend(matrix)
+            if dirty:
+                index.save()
+            self._ann = index
+            nprobe = self.ann_nprobe or default_nprobe(index.nlist)
+            return index.score(query_unit, nprobe, matrix, scales)
 
     def _search_python(
         self,
@@ -675,14 +1399,6 @@ class VectorStore:
         """Pure Python fallback when numpy is unavailable."""
         conn = self._get_conn()
 
-        if file_filter:
-            import fnmatch
-
-            def _file_filter_fn(fp: str) -> bool:
-                return fnmatch.fnmatch(fp, file_filter)
-        else:
-            _file_filter_fn = None
-
         with self._lock:
             rows = conn.execute(
                 "SELECT id, file_path, chunk_type, name, text, vector FROM vectors",
@@ -692,7 +1408,7 @@ class VectorStore:
         for row in rows:
             if existing_files is not None and row[1] not in existing_files:
                 continue
-            if _file_filter_fn and not _file_filter_fn(row[1]):
+            if file_filter and not fnmatch.fnmatch(row[1], file_filter):
                 continue
             try:
                 vec = _unpack_vector(row[5], self.dimension)
@@ -787,6 +1503,9 @@ class VectorStore:
 
     def close(self) -> None:
         """Close the database connection."""
+        self._vec_matrix = None  # release the mmaps
+        self._vec_quant = None
+        self._ann = None
         if self._conn:
             self._conn.close()
             self._conn = None
@@ -0,0 +1,413 @@
+"""Shared view of a project's files for whole-repo scanners.
+
+The security scanner, data-flow analysis, file discovery, the trigram
+index, the rules runner and the grep fallback each used to walk the tree
+with their own ``os.walk`` and skip list and read every file again, so a
+``bootstrap`` -> ``security_scan`` -> ``analyze`` sequence listed and read
+the repository four or five times.  This module gives them one source:
+
+- :class:`WorkspaceSnapshot` keeps one set of directory listings per
+  project.  Each consumer passes its own directory skip set (the default
+  is ``DEFAULT_IGNORES`` plus dot-directories; symlinked directories are
+  never followed), so sharing the listing does not change which files a
+  scanner sees.  Each listing is kept under the directory's
+  ``(mtime_ns, inode)``, so a later call costs one ``stat`` per directory
+  and only re-lists directories whose entries changed.  Consumers apply
+  their own file filters on top.
+- :func:`read_bytes` / :func:`read_text` go through a process-wide content
+  cache keyed by path and validated by ``(mtime_ns, size)``, bounded in
+  bytes and evicted least-recently-used.
+- :func:`read_many` reads a batch of files on a thread pool and yields
+  them in input order; :func:`decode_text` turns them into the same text
+  ``Path.read_text`` would return.
+
+Set ``ATTOCODE_WORKSPACE_CACHE_MB`` to change the content budget (default
+64); ``0`` disables content caching.
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Collection, Iterable, Iterator
+
+logger = logging.getLogger(__name__)
+
+_CACHE_ENV = "ATTOCODE_WORKSPACE_CACHE_MB"
+_DEFAULT_CACHE_MB = 64
+_MAX_SNAPSHOTS = 8
+_READ_WORKERS = 8        # Reads release the GIL
+_QUEUE_PER_WORKER = 4    # In-flight reads per worker in read_many
+_WALK_WORKERS = min(8, os.cpu_count() or 1)
+# A listing or content read this soon after the directory or file changed
+# is not trusted: a second change within the same timestamp tick (and, for
+# contents, of the same size) would go unnoticed.
+_RACY_NS = 2_000_000_000
+
+
+@dataclass(slots=True)
+class WorkspaceFile:
+    """One listed file: *rel_path* relative to the snapshot root."""
+
+    rel_path: str
+    path: str
+
+
+@dataclass(slots=True)
+class _DirListing:
+    """Sorted ``(name, is_dir)`` entries of one directory at stat *key*."""
+
+    key: tuple[int, int]
+    listed_ns: int
+    entries: tuple[tuple[str, bool], ...]
+
+
+def _ignored_dirs() -> frozenset[str]:
+    from attocode.integrations.context.codebase_context import DEFAULT_IGNORES
+
+    return frozenset(DEFAULT_IGNORES)
+
+
+def _list_dir(path: str, previous: _DirListing | None) -> _DirListing | None:
+    """Listing of *path*, reusing *previous* when the directory is unchanged."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    key = (st.st_mtime_ns, st.st_ino)
+    if previous is not None and previous.key == key and previous.listed_ns - key[0] > _RACY_NS:
+        return previous
+    listed_ns = time.time_ns()
+    entries: list[tuple[str, bool]] = []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                # Like os.walk: symlinked dirs are not followed
+                if not is_dir or not entry.is_symlink():
+                    entries.append((entry.name, is_dir))
+    except OSError:
+        return None
+    entries.sort()
+    return _DirListing(key=key, listed_ns=listed_ns, entries=tuple(entries))
+
+
+@dataclass(slots=True)
+class WorkspaceSnapshot:
+    """File listing of one project root, kept current by directory stats.
+
+    Listings are shared by every consumer; each one passes its own
+    directory skip set, and only the directories some consumer descends
+    into are ever listed.
+
+    Usage::
+
+        snapshot = workspace_snapshot(project_dir)
+        for f in snapshot.files("src", skip_dirs=_SKIP_DIRS):
+            text = read_text(f.path)
+    """
+
+    root: str
+    ignore: frozenset[str] = field(default_factory=_ignored_dirs)
+    _dirs: dict[str, _DirListing] = field(default_factory=dict, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def files(
+        self,
+        subdir: str = "",
+        *,
+        skip_dirs: Collection[str] | None = None,
+        skip_dot_dirs: bool = True,
+    ) -> list[WorkspaceFile]:
+        """Files under *subdir* (relative to the root) in sorted path order.
+
+        Entries of each directory are sorted by name and directories are
+        descended in place, so the order matches ``sorted(Path.rglob("*"))``.
+        Directories below *subdir* named in *skip_dirs* (default
+        ``DEFAULT_IGNORES``), or starting with ``.`` when *skip_dot_dirs*,
+        are pruned; *subdir* itself is always listed.
+
+        Raises:
+            ValueError: If *subdir* is outside the root.
+        """
+        start = os.path.normpath(subdir) if subdir else "."
+        if start == os.pardir or start.startswith(os.pardir + os.sep) or os.path.isabs(start):
+            raise ValueError(f"{subdir!r} is outside {self.root}")
+        start = "" if start == "." else start
+        skip = self.ignore if skip_dirs is None else skip_dirs
+
+        def descend(name: str) -> bool:
+            return name not in skip and not (skip_dot_dirs and name.startswith("."))
+
+        with self._lock:
+            listings = self._refresh(start, descend)
+        return self._flatten(start, listings, descend)
+
+    def _refresh(
+        self, start: str, descend: Callable[[str], bool],
+    ) -> dict[str, _DirListing]:
+        """Re-validate the listings under *start*, level by level."""
+        previous = self._dirs
+        listings: dict[str, _DirListing] = {}
+        level = [start]
+        with ThreadPoolExecutor(max_workers=_WALK_WORKERS) as pool:
+            while level:
+                results = pool.map(
+                    lambda rel: _list_dir(os.path.join(self.root, rel), previous.get(rel)),
+                    level,
+                )
+                next_level: list[str] = []
+                for rel, listing in zip(level, results, strict=True):
+                    if listing is None:
+                        continue
+                    listings[rel] = listing
+                    next_level.extend(
+                        os.path.join(rel, name) if rel else name
+                        for name, is_dir in listing.entries if is_dir and descend(name)
+                    )
+                level = next_level
+
+        # Keep listings other consumers descended into, minus directories
+        # that no longer exist under a re-listed parent.
+        gone: set[str] = set()
+        for rel, listing in listings.items():
+            old = previous.get(rel)
+            if old is not None and old is not listing:
+                now = {name for name, is_dir in listing.entries if is_dir}
+                gone.update(
+                    os.path.join(rel, name) if rel else name
+                    for name, is_dir in old.entries if is_dir and name not in now
+                )
+        if start not in listings:
+            gone.add(start)
+        kept = {rel: listing for rel, listing in previous.items() if not _under_any(rel, gone)}
+        kept.update(listings)
+        self._dirs = kept
+        return listings
+
+    def _flatten(
+        self, start: str, listings: dict[str, _DirListing], descend: Callable[[str], bool],
+    ) -> list[WorkspaceFile]:
+        out: list[WorkspaceFile] = []
+        root = self.root
+
+        def walk(rel_dir: str) -> None:
+            listing = listings.get(rel_dir)
+            if listing is None:
+                return
+            for name, is_dir in listing.entries:
+                rel = os.path.join(rel_dir, name) if rel_dir else name
+                if not is_dir:
+                    out.append(WorkspaceFile(rel_path=rel, path=os.path.join(root, rel)))
+                elif descend(name):
+                    walk(rel)
+
+        walk(start)
+        return out
+
+
+def _under_any(rel: str, dirs: set[str]) -> bool:
+    """Whether *rel* is one of *dirs* or inside one of them."""
+    if not dirs:
+        return False
+    while True:
+        if rel in dirs:
+            return True
+        parent = os.path.dirname(rel)
+        if parent == rel:
+            return False
+        rel = parent
+
+
+_snapshots: OrderedDict[str, WorkspaceSnapshot] = OrderedDict()
+_snapshots_lock = threading.Lock()
+
+
+def workspace_snapshot(root: str) -> WorkspaceSnapshot:
+    """The shared snapshot of *root* (one per resolved path)."""
+    real = os.path.realpath(root)
+    with _snapshots_lock:
+        snapshot = _snapshots.get(real)
+        if snapshot is None:
+            snapshot = _snapshots[real] = WorkspaceSnapshot(root=real)
+            while len(_snapshots) > _MAX_SNAPSHOTS:
+                _snapshots.popitem(last=False)
+        else:
+            _snapshots.move_to_end(real)
+        return snapshot
+
+
+# ---------------------------------------------------------------------------
+# Content cache
+# ---------------------------------------------------------------------------
+
+
+def _cache_budget() -> int:
+    raw = os.environ.get(_CACHE_ENV, "").strip()
+    try:
+        megabytes = float(raw) if raw else _DEFAULT_CACHE_MB
+    except ValueError:
+        megabytes = _DEFAULT_CACHE_MB
+    return max(0, int(megabytes * 1024 * 1024))
+
+
+@dataclass(slots=True)
+class ContentCache:
+    """File contents keyed by path, valid while ``(mtime_ns, size)`` holds.
+
+    Holds at most *max_bytes* of content; a single file larger than a
+    sixteenth of that, or modified within the last ``_RACY_NS``, is read
+    but not kept.
+    """
+
+    max_bytes: int
+    hits: int = 0
+    misses: int = 0
+    _entries: OrderedDict[str, tuple[int, int, bytes]] = field(
+        default_factory=OrderedDict, repr=False,
+    )
+    _size: int = field(default=0, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def read(self, path: str) -> bytes:
+        """Contents of *path*, from the cache when its stat is unchanged.
+
+        Raises:
+            OSError: If the file cannot be read.
+        """
+        if not self.max_bytes:
+            with open(path, "rb") as f:
+                return f.read()
+        st = os.stat(path)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+        with open(path, "rb") as f:
+            data = f.read()
+            after = os.fstat(f.fileno())
+        # Keep it only if the file did not change while being read and was
+        # not modified within the racy window, and not from worker
+        # processes, whose cache dies with them.
+        if (
+            (after.st_mtime_ns, after.st_size) == (st.st_mtime_ns, st.st_size)
+            and len(data) == st.st_size
+            and time.time_ns() - st.st_mtime_ns > _RACY_NS
+            and st.st_size <= self.max_bytes // 16
+            and multiprocessing.parent_process() is None
+        ):
+            self._store(path, (st.st_mtime_ns, st.st_size, data))
+        return data
+
+    def _store(self, path: str, entry: tuple[int, int, bytes]) -> None:
+        with self._lock:
+            old = self._entries.pop(path, None)
+            if old is not None:
+                self._size -= len(old[2])
+            self._entries[path] = entry
+            self._size += len(entry[2])
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted[2])
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self.hits = self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_content_cache: ContentCache | None = None
+
+
+def content_cache() -> ContentCache:
+    """The process-wide content cache, sized from the environment on first use."""
+    global _content_cache
+    if _content_cache is None:
+        _content_cache = ContentCache(max_bytes=_cache_budget())
+    return _content_cache
+
+
+def read_bytes(path: str) -> bytes:
+    """Contents of *path* through the shared cache.
+
+    Raises:
+        OSError: If the file cannot be read.
+    """
+    return content_cache().read(path)
+
+
+def read_text(path: str, errors: str = "replace") -> str:
+    """UTF-8 text of *path*, with newlines translated like ``Path.read_text``.
+
+    Raises:
+        OSError: If the file cannot be read.
+        UnicodeDecodeError: If *errors* is ``"strict"`` and the file is not
+            valid UTF-8.
+    """
+    return decode_text(read_bytes(path), errors)
+
+
+def decode_text(data: bytes, errors: str = "replace") -> str:
+    """Decode UTF-8 *data* with universal newlines, as text-mode ``open`` does."""
+    text = data.decode("utf-8", errors)
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+def read_many(
+    paths: Iterable[str], *, workers: int | None = None,
+) -> Iterator[tuple[str, bytes | None]]:
+    """Yield ``(path, contents)`` for *paths* in order, read in parallel.
+
+    Contents are None for files that could not be read.  At most
+    ``workers * _QUEUE_PER_WORKER`` reads are in flight, and *paths* is
+    pulled lazily, so a consumer that stops early stops the reads.
+    """
+    n_workers = _READ_WORKERS if workers is None else max(1, workers)
+    if n_workers == 1:
+        for path in paths:
+            yield path, _read_or_none(path)
+        return
+    pending: deque[tuple[str, Future[bytes | None]]] = deque()
+    it = iter(paths)
+    pool = ThreadPoolExecutor(max_workers=n_workers)
+    try:
+        for path in it:
+            pending.append((path, pool.submit(_read_or_none, path)))
+            if len(pending) >= n_workers * _QUEUE_PER_WORKER:
+                break
+        while pending:
+            path, future = pending.popleft()
+            nxt = next(it, None)
+            if nxt is not None:
+                pending.append((nxt, pool.submit(_read_or_none, nxt)))
+            yield path, future.result()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _read_or_none(path: str) -> bytes | None:
+    try:
+        return read_bytes(path)
+    except OSError:
+        return None
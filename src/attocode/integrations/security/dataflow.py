@@ -21,7 +21,8 @@ import logging
 import os
 import re
 from dataclasses import dataclass
-from pathlib import Path
+
+from attocode.integrations.context.workspace import read_text, workspace_snapshot
 
 logger = logging.getLogger(__name__)
 
@@ -379,7 +380,7 @@ def analyze_file(
         return []
 
     try:
-        content = Path(file_path).read_text(encoding="utf-8", errors="replace")
+        content = read_text(file_path)
     except OSError:
         return []
 
@@ -448,13 +449,13 @@ def analyze_project(
     if paths:
         file_list = [os.path.join(project_dir, p) for p in paths]
     else:
-        file_list = []
-        for dirpath, dirnames, filenames in os.walk(project_dir):
-            dirnames[:] = [d for d in dirnames if d not in _SKIP_DIRS]
-            for fname in filenames:
-                ext = os.path.splitext(fname)[1].lower()
-                if ext in _SCAN_EXTS:
-                    file_list.append(os.path.join(dirpath, fname))
+        file_list = [
+            os.path.join(project_dir, f.rel_path)
+            for f in workspace_snapshot(project_dir).files(
+                skip_dirs=_SKIP_DIRS, skip_dot_dirs=False,
+            )
+            if os.path.splitext(f.rel_path)[1].lower() in _SCAN_EXTS
+        ]
 
     for abs_path in file_list:
         if not os.path.isfile(abs_path):
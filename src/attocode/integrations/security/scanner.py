@@ -44,6 +44,16 @@ _PATTERN_DEFINITION_FILES = {
 }
 
 
+def _in_skipped_dir(dir_parts: tuple[str, ...], depth: int) -> bool:
+    """Whether a directory below the first *depth* parts repeats an ancestor's name."""
+    seen = set(dir_parts[:depth])
+    for part in dir_parts[depth:]:
+        if part in seen:
+            return True
+        seen.add(part)
+    return False
+
+
 @dataclass(slots=True)
 class SecurityFinding:
     """A single security finding."""
@@ -191,63 +201,57 @@ class SecurityScanner:
             SKIP_EXTENSIONS,
             SKIP_FILENAMES,
         )
+        from attocode.integrations.context.workspace import (
+            decode_text,
+            read_many,
+            workspace_snapshot,
+        )
 
-        for dirpath, dirnames, filenames in os.walk(scan_root):
-            rel_dir = os.path.relpath(dirpath, self.root_dir)
-            rel_parts = set(Path(rel_dir).parts) if rel_dir not in (".", "") else set()
-            # Filter ignored directories
-            dirnames[:] = [
-                d for d in dirnames
-                if d not in DEFAULT_IGNORES
-                and d not in _EXTRA_IGNORED_DIRS
-                and d not in rel_parts
-                and not d.startswith(".")
-            ]
-
-            for filename in filenames:
-                if filename.startswith(".") and filename not in _SCANNABLE_DOTFILES:
-                    continue
-                if filename in SKIP_FILENAMES:
-                    continue
-                ext = Path(filename).suffix.lower()
-                if ext in SKIP_EXTENSIONS:
-                    continue
-                if ext not in _SCANNABLE_EXTENSIONS:
-                    continue
-
-                full_path = os.path.join(dirpath, filename)
-                try:
-                    rel_path = os.path.relpath(full_path, self.root_dir)
-                except ValueError:
-                    continue
-                rel_path_norm = os.path.normpath(rel_path)
-
-                if rel_path_norm in _PATTERN_DEFINITION_FILES:
-                    continue
-
-                try:
-                    content = Path(full_path).read_text(
-                        encoding="utf-8", errors="replace",
-                    )
-                except OSError:
-                    continue
+        snapshot = workspace_snapshot(self.root_dir)
+        subdir = os.path.relpath(os.path.realpath(scan_root), snapshot.root)
+        depth = 0 if subdir == "." else len(Path(subdir).parts)
 
-                files_scanned += 1
-                language = self._language_map.get(ext, "")
+        selected: dict[str, tuple[str, str]] = {}
+        listed = snapshot.files(subdir, skip_dirs=DEFAULT_IGNORES | _EXTRA_IGNORED_DIRS)
+        for entry in listed:
+            dir_parts, filename = os.path.split(entry.rel_path)
+            if filename.startswith(".") and filename not in _SCANNABLE_DOTFILES:
+                continue
+            if filename in SKIP_FILENAMES:
+                continue
+            ext = Path(filename).suffix.lower()
+            if ext in SKIP_EXTENSIONS:
+                continue
+            if ext not in _SCANNABLE_EXTENSIONS:
+                continue
+            if _in_skipped_dir(Path(dir_parts).parts, depth):
+                continue
+            if os.path.normpath(entry.rel_path) in _PATTERN_DEFINITION_FILES:
+                continue
+            selected[entry.path] = (entry.rel_path, ext)
 
-                if run_secrets:
-                    findings.extend(
-                        self._scan_content(content, rel_path, SECRET_PATTERNS, language),
-                    )
+        for full_path, raw in read_many(selected):
+            if raw is None:
+                continue
+            content = decode_text(raw)
+            rel_path, ext = selected[full_path]
 
-                if run_patterns:
+            files_scanned += 1
+            language = self._language_map.get(ext, "")
+
+            if run_secrets:
+                findings.extend(
+                    self._scan_content(content, rel_path, SECRET_PATTERNS, language),
+                )
+
+            if run_patterns:
+                findings.extend(
+                    self._scan_content(content, rel_path, ANTI_PATTERNS, language),
+                )
+                if self._custom_patterns:
                     findings.extend(
-                        self._scan_content(content, rel_path, ANTI_PATTERNS, language),
+                        self._scan_content(content, rel_path, self._custom_patterns, language),
                     )
-                    if self._custom_patterns:
-                        findings.extend(
-                            self._scan_content(content, rel_path, self._custom_patterns, language),
-                        )
 
         return files_scanned, findings
 
@@ -63,9 +63,7 @@ class ASTExplorerMini(Widget):
             return
 
         file_count = len(svc._ast_cache)
-        symbol_count = sum(
-            len(v) for v in svc.index.definitions.values()
-        ) if svc.index else 0
+        symbol_count = svc.index.definition_count() if svc.index else 0
 
         root = tree.root
         root.label = f"AST Index ({file_count} files, {symbol_count} symbols)"
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import asyncio
+import os
 from collections.abc import AsyncGenerator, Callable
 from pathlib import Path
 from typing import Any
@@ -16,6 +17,19 @@ from attocode.types.agent import AgentConfig
 from attocode.types.budget import ExecutionBudget
 
 
+@pytest.fixture(autouse=True, scope="session")
+def _isolated_cas_dir(tmp_path_factory: pytest.TempPathFactory):
+    """Keep the shared parse/CAS cache out of the developer's ~/.cache."""
+    if "ATTOCODE_CAS_DIR" in os.environ:
+        yield
+        return
+    os.environ["ATTOCODE_CAS_DIR"] = str(tmp_path_factory.mktemp("cas"))
+    try:
+        yield
+    finally:
+        os.environ.pop("ATTOCODE_CAS_DIR", None)
+
+
 @pytest.fixture
 def tmp_workdir(tmp_path: Path) -> Path:
     """Provide a temporary working directory for file operation tests."""
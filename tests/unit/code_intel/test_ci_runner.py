@@ -196,3 +196,20 @@ class TestCIRunner:
             sarif = json.loads(Path(sarif_path).read_text())
             assert sarif["version"] == "2.1.0"
             assert len(sarif["runs"][0]["results"]) > 0
+
+    def test_fail_fast_stops_at_first_hit(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for i in range(5):
+                src = Path(tmpdir) / f"vuln{i}.py"
+                src.write_text("result = __import__('subprocess').call(cmd, shell=True)\n")
+
+            config = CIConfig(fail_on=RuleSeverity.MEDIUM, min_confidence=0.3)
+            full = CIRunner(tmpdir, config=config).run()
+            config.fail_fast = True
+            result = CIRunner(tmpdir, config=config).run()
+
+            assert result.stopped_early
+            assert result.exit_code == 1
+            assert len({f.file for f in result.findings}) == 1
+            assert len({f.file for f in full.findings}) == 5
+            assert "fail_fast" in format_ci_summary(result)
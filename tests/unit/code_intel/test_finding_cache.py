@@ -0,0 +1,167 @@
+"""Tests for the content-keyed rule finding cache."""
+
+from __future__ import annotations
+
+import re
+
+import pytest
+
+from attocode.code_intel.rules import executor
+from attocode.code_intel.rules.finding_cache import FindingCache, rule_key
+from attocode.code_intel.rules.loader import load_builtin_rules
+from attocode.code_intel.rules.model import (
+    RuleCategory,
+    RuleSeverity,
+    UnifiedRule,
+)
+from attocode.code_intel.rules.packs.pack_loader import list_example_packs, load_pack
+from attocode.code_intel.rules.profiling import RuleProfiler
+
+_SOURCES = {
+    "app.py": (
+        "import os, pickle\n"
+        "password = 'hunter2'\n"
+        "def f(x=[]):\n"
+        "    eval(x)\n"
+        "    return pickle.loads(x)\n"
+    ),
+    "lib/util.py": "def add(a, b):\n    return a + b\n",
+    "server.ts": "const q = { $gt: 1 };\nconsole.log(token);\n",
+    "copy.ts": "const q = { $gt: 1 };\nconsole.log(token);\n",
+}
+
+
+def _snapshot(findings):
+    return [
+        (f.rule_id, f.file, f.line, f.severity, f.description, f.captures, f.suggested_fix)
+        for f in findings
+    ]
+
+
+@pytest.fixture
+def rules() -> list[UnifiedRule]:
+    rules = load_builtin_rules()
+    for manifest in list_example_packs():
+        rules.extend(load_pack(manifest))
+    return rules
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    monkeypatch.setattr(executor, "_ast_grep_available", lambda: False)
+    monkeypatch.delenv("ATTOCODE_FINDING_CACHE", raising=False)
+    for name, text in _SOURCES.items():
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+    return tmp_path
+
+
+def _files(project) -> list[str]:
+    return sorted(str(p) for p in project.rglob("*") if p.suffix in (".py", ".ts"))
+
+
+def _scan(project, rules, *, cache=None, profiler=None):
+    return executor.execute_rules(
+        _files(project), rules, project_dir=str(project), cache=cache, profiler=profiler,
+    )
+
+
+class TestFindingCache:
+    def test_warm_run_matches_fresh_scan(self, project, rules):
+        fresh = _snapshot(_scan(project, rules))
+        cache = FindingCache.open(str(project))
+        assert _snapshot(_scan(project, rules, cache=cache)) == fresh
+        assert (cache.hits, cache.misses) == (0, 4)
+
+        cache = FindingCache.open(str(project))
+        assert _snapshot(_scan(project, rules, cache=cache)) == fresh
+        assert (cache.hits, cache.misses) == (4, 0)
+
+    def test_only_edited_files_are_rescanned(self, project, rules):
+        _scan(project, rules, cache=FindingCache.open(str(project)))
+        (project / "lib" / "util.py").write_text(
+            "def add(a, b):\n    return eval(a) + b\n", encoding="utf-8",
+        )
+        cache = FindingCache.open(str(project))
+        warm = _snapshot(_scan(project, rules, cache=cache))
+        assert (cache.hits, cache.misses) == (3, 1)
+        assert warm == _snapshot(_scan(project, rules))
+        assert any(f[1] == "lib/util.py" for f in warm)
+
+    def test_profiler_counts_cache_hits(self, project, rules):
+        cold = RuleProfiler()
+        findings = _scan(project, rules, cache=FindingCache.open(str(project)), profiler=cold)
+        warm = RuleProfiler()
+        assert _snapshot(
+            _scan(project, rules, cache=FindingCache.open(str(project)), profiler=warm),
+        ) == _snapshot(findings)
+
+        cold_stats, warm_stats = cold.get_stats(), warm.get_stats()
+        assert set(cold_stats) == set(warm_stats)
+        for qid, stats in warm_stats.items():
+            assert (stats.files_scanned, stats.cache_hits) == (0, cold_stats[qid].files_scanned)
+            assert stats.match_count == cold_stats[qid].match_count
+        assert sum(s.match_count for s in warm_stats.values()) == len(findings)
+        # Uncached scans count the same files per rule.
+        plain = RuleProfiler()
+        _scan(project, rules, profiler=plain)
+        assert {q: s.files_scanned for q, s in plain.get_stats().items()} == {
+            q: s.files_scanned for q, s in cold_stats.items()
+        }
+
+    def test_rule_edits(self, project, rules):
+        _scan(project, rules, cache=FindingCache.open(str(project)))
+        eval_rules = [r for r in rules if r.pattern is not None and "eval" in r.pattern.pattern]
+        assert eval_rules
+        # Metadata comes from the live rule: no rescan needed.
+        eval_rules[0].severity = RuleSeverity.INFO
+        cache = FindingCache.open(str(project))
+        warm = _snapshot(_scan(project, rules, cache=cache))
+        assert cache.misses == 0
+        assert warm == _snapshot(_scan(project, rules))
+        # A pattern edit changes the rule key of every file it applies to.
+        eval_rules[0].pattern = re.compile(r"\bnever_matches_anything\(")
+        cache = FindingCache.open(str(project))
+        warm = _snapshot(_scan(project, rules, cache=cache))
+        assert cache.misses > 0
+        assert warm == _snapshot(_scan(project, rules))
+
+    def test_rule_subset_reuses_wider_scan(self, project, rules):
+        _scan(project, rules, cache=FindingCache.open(str(project)))
+        security = [r for r in rules if r.category == RuleCategory.SECURITY]
+        cache = FindingCache.open(str(project))
+        warm = _snapshot(_scan(project, security, cache=cache))
+        assert cache.misses == 0
+        assert warm == _snapshot(_scan(project, security))
+
+    def test_abandoned_scan_stores_nothing(self, project, rules):
+        cache = FindingCache.open(str(project))
+        stream = executor.iter_findings(
+            _files(project), rules, project_dir=str(project), cache=cache,
+        )
+        next(stream)
+        stream.close()
+        cache = FindingCache.open(str(project))
+        _scan(project, rules, cache=cache)
+        assert cache.hits == 0
+
+    def test_disabled_by_environment(self, project, monkeypatch):
+        monkeypatch.setenv("ATTOCODE_FINDING_CACHE", "0")
+        assert FindingCache.open(str(project)) is None
+
+
+class TestRuleKey:
+    def test_key_tracks_matching_fields_only(self):
+        base = dict(
+            id="r", name="r", description="d",
+            severity=RuleSeverity.HIGH, category=RuleCategory.SECURITY,
+        )
+        long = "x" * 300
+        rule = UnifiedRule(pattern=re.compile(long + "a"), **base)
+        same = UnifiedRule(pattern=re.compile(long + "a"), confidence=0.1, **base)
+        other = UnifiedRule(pattern=re.compile(long + "b"), **base)
+        assert rule_key(rule, "re") == rule_key(same, "re")
+        assert rule_key(rule, "re") != rule_key(other, "re")
+        assert rule_key(rule, "re") != rule_key(rule, "sg")
+        assert rule_key(rule, "re").startswith("r:re:")
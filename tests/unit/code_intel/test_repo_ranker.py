@@ -52,6 +52,13 @@ class TestPageRank:
         total = sum(scores.values())
         assert total == pytest.approx(1.0, abs=0.01)
 
+    def test_personalized(self) -> None:
+        adj = {"a": ["b"], "b": [], "c": ["d"], "d": []}
+        scores = pagerank(adj, personalization={"c": 1.0})
+        assert scores["d"] > scores["b"]
+        assert scores["a"] == pytest.approx(0.0)
+        assert sum(scores.values()) == pytest.approx(1.0)
+
 
 class TestRankRepoFiles:
     def test_basic_ranking(self) -> None:
@@ -76,6 +83,14 @@ class TestRankRepoFiles:
         auth_entry = next((e for e in result.entries if e.path == "src/auth.py"), None)
         assert auth_entry is not None
 
+    def test_task_files_seed_ranking(self) -> None:
+        adj = {f"src/m{i}.py": ["src/hub.py"] for i in range(5)}
+        adj["src/auth.py"] = ["src/tokens.py"]
+        result = rank_repo_files(adj, task_context="fix auth login")
+        paths = [e.path for e in result.entries]
+        # tokens.py doesn't match the task but auth.py depends on it
+        assert paths.index("src/tokens.py") < paths.index("src/hub.py")
+
     def test_exclude_tests(self) -> None:
         adj = {
             "src/core.py": [],
@@ -0,0 +1,211 @@
+"""Tests for the literal prefilter of Tier-1 regex rules."""
+
+from __future__ import annotations
+
+import random
+import re
+
+import pytest
+
+from attocode.code_intel.rules import executor
+from attocode.code_intel.rules.combinators import (
+    CompositePattern,
+    EitherNode,
+    NotNode,
+    RegexNode,
+)
+from attocode.code_intel.rules.loader import load_builtin_rules
+from attocode.code_intel.rules.model import RuleCategory, RuleSeverity, UnifiedRule
+from attocode.code_intel.rules.packs.pack_loader import list_example_packs, load_pack
+from attocode.code_intel.rules.prefilter import RulePrefilter, regex_atoms
+
+
+def _rule(rule_id: str, pattern: str | None = None, **kwargs) -> UnifiedRule:
+    return UnifiedRule(
+        id=rule_id,
+        name=rule_id,
+        description=rule_id,
+        severity=RuleSeverity.MEDIUM,
+        category=RuleCategory.SECURITY,
+        pattern=re.compile(pattern) if pattern is not None else None,
+        **kwargs,
+    )
+
+
+def _atoms(pattern: str, *, ascii_words: bool = False) -> tuple[set[str] | None, str]:
+    atoms, lookup = regex_atoms(re.compile(pattern), ascii_words=ascii_words)
+    return (set(atoms) if atoms is not None else None), lookup
+
+
+def _brute_candidates(self, content, lines):
+    for index in range(len(lines)):
+        yield index, self.rules
+
+
+class TestRegexAtoms:
+    def test_literal_runs(self):
+        assert _atoms(r"\bdangerous_func\s*\(") == ({"dangerous_func"}, "exact")
+        assert _atoms(r"x?abc") == ({"abc"}, "exact")
+        assert _atoms(r"\w+!!") == ({"!!"}, "exact")
+
+    def test_alternations_and_classes(self):
+        assert _atoms(r"e(?:val|xec)\s*\(") == ({"eval", "exec"}, "exact")
+        assert _atoms(r"\$(?:gt|ne)\b") == ({"$gt", "$ne"}, "exact")
+        assert _atoms(r"\.(?:get|post)\(")[0] == {".get(", ".post("}
+
+    def test_unfilterable(self):
+        assert _atoms(r".*")[0] is None
+        assert _atoms(r"(?:foo)?\s+")[0] is None
+        assert _atoms(r"[^x]+")[0] is None
+        assert _atoms(r"(?i:secret)")[0] is None
+
+    def test_case_insensitive_atoms_are_folded(self):
+        assert _atoms(r"(?i)Api_Key") == ({"api_key"}, "folded")
+        assert _atoms(r"ApiKey", ascii_words=True) == ({"ApiKey"}, "exact")
+
+    def test_word_classes_need_ascii_words(self):
+        ip = r"""['"]\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}['"]"""
+        assert _atoms(ip)[0] == {"."}
+        assert _atoms(ip, ascii_words=True)[0] == {f"{d}." for d in "0123456789"}
+
+
+# Fragments for random patterns and lines: literals that share prefixes,
+# classes, optional parts, flags, and characters that only match under
+# Unicode or case-insensitive rules.
+_PATTERN_PARTS = [
+    "ev", "al", "exec", "key", "Key", "_", r"\.", r"\(", "=", "!!",
+    r"\d", r"\d{1,3}", r"\w", r"\w+", r"\s*", r"\b", "[ab]", "[A-C]",
+    "[^x]", "(?:get|set)", "(?:a|)", "x?", "(?:key)*", ".", ".*",
+    "(ab)+", "(?i:k)", "s", "k", "i",
+]
+_LINE_PARTS = [
+    "eval", "exec", "EVAL", "key", "KEY", "Key", "_", ".", "(", "=", "!!",
+    "1", "22", "abc", "get", "set", "x", " ", "\t", "s", "k", "i",
+    "\u017f", "\u212a", "\u0130", "\u00e9", "\u0663", "\u2014",
+]
+
+
+def _random_pattern(rng: random.Random) -> str:
+    body = "".join(rng.choice(_PATTERN_PARTS) for _ in range(rng.randint(1, 5)))
+    if rng.random() < 0.2:
+        body = f"{body}|{rng.choice(_PATTERN_PARTS)}{rng.choice(_PATTERN_PARTS)}"
+    return ("(?i)" if rng.random() < 0.3 else "") + body
+
+
+class TestRulePrefilter:
+    def test_candidates_cover_every_match(self):
+        rng = random.Random(0)
+        for _ in range(300):
+            rules = [
+                _rule(f"r{i}", _random_pattern(rng)) for i in range(rng.randint(1, 6))
+            ]
+            prefilter = RulePrefilter(rules)
+            lines = [
+                "".join(rng.choice(_LINE_PARTS) for _ in range(rng.randint(0, 8)))
+                for _ in range(rng.randint(1, 12))
+            ]
+            content = rng.choice(["\n", "\r\n"]).join(lines)
+            lines = content.splitlines()
+            offered = {
+                index: [rule.id for rule in line_rules]
+                for index, line_rules in prefilter.candidates(content, lines)
+            }
+            for index, line in enumerate(lines):
+                matching = [rule.id for rule in rules if rule.pattern.search(line)]
+                chosen = offered.get(index, [])
+                assert set(matching) <= set(chosen), (line, rules)
+                assert chosen == [rule.id for rule in rules if rule.id in chosen]
+
+    def test_composite_rules_use_primary_atoms(self):
+        rule = _rule(
+            "either",
+            composite_pattern=CompositePattern(
+                primary=EitherNode([
+                    RegexNode(re.compile(r"pickle\.loads\(")),
+                    RegexNode(re.compile(r"yaml\.load\(")),
+                ]),
+                constraints=[NotNode(RegexNode(re.compile(r"Loader=")))],
+            ),
+        )
+        negated = _rule(
+            "negated",
+            composite_pattern=CompositePattern(primary=NotNode(RegexNode(re.compile("x")))),
+        )
+        content = "a = 1\nyaml.load(s)\nb = 2\npickle.loads(d)\n"
+        prefilter = RulePrefilter([rule])
+        assert [i for i, _ in prefilter.candidates(content, content.splitlines())] == [1, 3]
+        prefilter = RulePrefilter([negated, rule])
+        offered = dict(prefilter.candidates(content, content.splitlines()))
+        assert [r.id for r in offered[0]] == ["negated"]
+        assert [r.id for r in offered[1]] == ["negated", "either"]
+
+    def test_non_ascii_words_fall_back_to_unicode_atoms(self):
+        rule = _rule("ip", r"\d\.\d")
+        prefilter = RulePrefilter([rule])
+        content = "x = '\u0663.\u0663'\n"  # Arabic-Indic digits
+        offered = dict(prefilter.candidates(content, content.splitlines()))
+        assert offered[0] == [rule]
+
+    def test_fold_traps_disable_folded_lookup(self):
+        rule = _rule("key", r"(?i)key")
+        prefilter = RulePrefilter([rule])
+        content = "no match é\nKEY = 1\n"
+        assert [i for i, _ in prefilter.candidates(content, content.splitlines())] == [1]
+        content = "no match here\n\u212aEY = 1\n"  # Kelvin sign
+        assert rule.pattern.search(content.splitlines()[1])
+        offered = dict(prefilter.candidates(content, content.splitlines()))
+        assert set(offered) == {0, 1}
+
+
+class TestExecutorEquivalence:
+    @pytest.fixture
+    def rules(self) -> list[UnifiedRule]:
+        rules = load_builtin_rules()
+        for manifest in list_example_packs():
+            rules.extend(load_pack(manifest))
+        return rules
+
+    def test_findings_match_full_scan(self, tmp_path, monkeypatch, rules):
+        sources = {
+            "app.py": (
+                "import os, pickle\n"
+                "password = 'hunter2'  # — not for prod\n"
+                "API_KEY = \"sk-ant-REDACTED\"\n"
+                "host = '10.0.0.12'\n"
+                "def f(x=[]):\n"
+                "    eval(x)\n"
+                "    return pickle.loads(x)\n"
+                "# TODO: security review\n"
+            ),
+            "server.ts": (
+                "const q = { $gt: 1 };\n"
+                "console.log(token);\n"
+                "setTimeout(\"run()\", 0);\n"
+                "if (a && a.b && a.b.c) {}\n"
+            ),
+            "main.go": (
+                "package main\n"
+                "func main() {\n"
+                "\t_ = os.Remove(p)\n"
+                "\tfmt.Println(\"debug\")\n"
+                "}\n"
+            ),
+        }
+        files = []
+        for name, text in sources.items():
+            path = tmp_path / name
+            path.write_text(text, encoding="utf-8")
+            files.append(str(path))
+        monkeypatch.setattr(executor, "_ast_grep_available", lambda: False)
+
+        def snapshot(findings):
+            return [
+                (f.rule_id, f.file, f.line, f.description, f.captures, f.suggested_fix)
+                for f in findings
+            ]
+
+        fast = snapshot(executor.execute_rules(files, rules, project_dir=str(tmp_path)))
+        monkeypatch.setattr(RulePrefilter, "candidates", _brute_candidates)
+        full = snapshot(executor.execute_rules(files, rules, project_dir=str(tmp_path)))
+        assert fast == full
+        assert len(fast) > 5
@@ -136,6 +136,31 @@ class TestFastSearchSelectivity:
         idx.close()
 
 
+class TestFastSearchPositional:
+    def test_matches_served_from_snapshot(self, tmp_path: Path) -> None:
+        proj = _create_project(tmp_path, {
+            "a.py": "def unique_thing():\n    return unique_thing\n",
+            "b.py": "def other(): pass\n",
+        })
+        idx = TrigramIndex(index_dir=str(proj / ".attocode" / "index"), positional=True)
+        idx.build(str(proj))
+        with patch.object(Path, "read_text", side_effect=AssertionError("file read")):
+            result = _call_fast_search(proj, idx, pattern="unique_thing")
+        assert "a.py:1: def unique_thing():" in result
+        assert "a.py:2: return unique_thing" in result
+        assert "matched from content snapshot" in result
+        idx.close()
+
+    def test_without_snapshot_reads_files(self, tmp_path: Path) -> None:
+        proj = _create_project(tmp_path, {"a.py": "def unique_thing(): pass\n"})
+        idx = TrigramIndex(index_dir=str(proj / ".attocode" / "index"))
+        idx.build(str(proj))
+        result = _call_fast_search(proj, idx, pattern="unique_thing")
+        assert "a.py:1: def unique_thing(): pass" in result
+        assert "content snapshot" not in result
+        idx.close()
+
+
 # ---------------------------------------------------------------------------
 # Diagnostics formatting (via QueryResult directly)
 # ---------------------------------------------------------------------------
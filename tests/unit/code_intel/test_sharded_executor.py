@@ -0,0 +1,88 @@
+"""Tests for sharded, streaming rule execution."""
+
+from __future__ import annotations
+
+import pytest
+
+from attocode.code_intel.rules import executor
+from attocode.code_intel.rules.loader import load_builtin_rules
+from attocode.code_intel.rules.packs.pack_loader import list_example_packs, load_pack
+
+_SOURCES = {
+    "app.py": (
+        "import os, pickle\n"
+        "password = 'hunter2'\n"
+        "API_KEY = \"sk-ant-REDACTED\"\n"
+        "def f(x=[]):\n"
+        "    eval(x)\n"
+        "    return pickle.loads(x)\n"
+    ),
+    "server.ts": (
+        "const q = { $gt: 1 };\n"
+        "console.log(token);\n"
+        "setTimeout(\"run()\", 0);\n"
+    ),
+    "main.go": (
+        "package main\n"
+        "func main() {\n"
+        "\tfmt.Println(\"debug\")\n"
+        "}\n"
+    ),
+}
+
+
+def _snapshot(findings):
+    return [
+        (f.rule_id, f.file, f.line, f.description, f.captures, f.suggested_fix)
+        for f in findings
+    ]
+
+
+@pytest.fixture
+def rules():
+    rules = load_builtin_rules()
+    for manifest in list_example_packs():
+        rules.extend(load_pack(manifest))
+    return rules
+
+
+@pytest.fixture
+def files(tmp_path, monkeypatch) -> list[str]:
+    monkeypatch.setattr(executor, "_ast_grep_available", lambda: False)
+    paths = []
+    for copy in range(3):
+        for name, text in _SOURCES.items():
+            path = tmp_path / f"m{copy}" / name
+            path.parent.mkdir(exist_ok=True)
+            path.write_text(text, encoding="utf-8")
+            paths.append(str(path))
+    return paths
+
+
+class TestShardedExecution:
+    def test_worker_pool_matches_serial_scan(self, tmp_path, rules, files):
+        serial = executor.execute_rules(files, rules, project_dir=str(tmp_path))
+        sharded = executor.execute_rules(files, rules, project_dir=str(tmp_path), workers=2)
+        assert _snapshot(sharded) == _snapshot(serial)
+        assert len(serial) > 10
+
+    def test_batches_group_findings_by_file(self, tmp_path, rules, files):
+        batches = list(executor.iter_findings(files, rules, project_dir=str(tmp_path)))
+        flagged = {f.file for f in executor.execute_rules(files, rules, project_dir=str(tmp_path))}
+        assert sorted(batch[0].file for batch in batches) == sorted(flagged)
+        for batch in batches:
+            assert len({f.file for f in batch}) == 1
+            assert [f.line for f in batch] == sorted(f.line for f in batch)
+
+    def test_closing_the_stream_stops_the_pool(self, tmp_path, rules, files):
+        stream = executor.iter_findings(files, rules, project_dir=str(tmp_path), workers=2)
+        first = next(stream)
+        stream.close()
+        assert first
+
+    def test_automatic_workers(self, monkeypatch):
+        monkeypatch.delenv(executor._WORKERS_ENV, raising=False)
+        assert executor._resolve_workers(None, 10) == 1
+        assert executor._resolve_workers(3, 2) == 2
+        monkeypatch.setenv(executor._WORKERS_ENV, "4")
+        assert executor._resolve_workers(None, 10) == 4
@@ -617,3 +617,96 @@ class TestStructuralFallback:
         else:
             # No ast-grep — regex covers the universal rule.
             assert len(findings) == 1
+
+
+class TestBatchedScan:
+    """All structural rules of a language share one ``sg scan`` per file chunk."""
+
+    @pytest.fixture
+    def sources(self, tmp_path: Path) -> dict[str, list[str]]:
+        py = []
+        for i in range(3):
+            p = tmp_path / f"m{i}.py"
+            p.write_text(
+                f"def f{i}(x):\n    print(x)\n    eval(x)\n    len(x)\n",
+                encoding="utf-8",
+            )
+            py.append(str(p))
+        go = tmp_path / "main.go"
+        go.write_text(
+            "package main\n\nfunc main() {\n\tfmt.Println(1)\n}\n",
+            encoding="utf-8",
+        )
+        return {"python": py, "go": [str(go)]}
+
+    @pytest.fixture
+    def rules(self) -> list[UnifiedRule]:
+        go_rule = _structural_rule("go-println", "fmt.Println($X)", languages=["go"])
+        go_rule.structural_context = "func f() { fmt.Println($X) }"
+        go_rule.structural_selector = "call_expression"
+        return [
+            _structural_rule("no-print", "print($X)", languages=["python"]),
+            _structural_rule("no-eval", "eval($X)"),
+            _structural_rule("no-len", "len($X)", languages=["python"]),
+            go_rule,
+        ]
+
+    @needs_ast_grep
+    def test_one_scan_per_language_matches_per_rule_runs(
+        self, monkeypatch: pytest.MonkeyPatch, tmp_path: Path, sources, rules,
+    ):
+        import subprocess
+
+        from attocode.code_intel.rules import executor as ex
+
+        per_rule = [
+            f for rule in rules
+            for f in _execute_structural_rule(rule, sources, project_dir=str(tmp_path))
+        ]
+        calls: list[list[str]] = []
+        real_run = subprocess.run
+
+        def _spy(cmd, *args, **kwargs):
+            calls.append(cmd)
+            return real_run(cmd, *args, **kwargs)
+
+        monkeypatch.setattr(ex.subprocess, "run", _spy)
+        batched = [
+            f for found in ex._iter_structural_batches(
+                rules, sources, project_dir=str(tmp_path),
+            )
+            for f in found
+        ]
+
+        assert len(calls) == 2  # python and go
+        key = lambda f: (f.file, f.line, f.rule_id, f.description)  # noqa: E731
+        assert sorted(map(key, batched)) == sorted(map(key, per_rule))
+        assert {f.rule_id for f in batched} == {
+            "test/no-print", "test/no-eval", "test/no-len", "test/go-println",
+        }
+
+    @needs_ast_grep
+    def test_rejected_batch_is_retried_rule_by_rule(self, tmp_path: Path, sources, rules):
+        from attocode.code_intel.rules import executor as ex
+
+        broken = _structural_rule("broken", "print($X", languages=["python"])
+        findings = [
+            f for found in ex._iter_structural_batches(
+                [broken, *rules], sources, project_dir=str(tmp_path),
+            )
+            for f in found
+        ]
+        assert "test/broken" not in {f.rule_id for f in findings}
+        assert sum(f.rule_id == "test/no-print" for f in findings) == 3
+
+    def test_chunks_respect_file_and_byte_limits(self, monkeypatch: pytest.MonkeyPatch):
+        from attocode.code_intel.rules import executor as ex
+
+        monkeypatch.setattr(ex, "_AST_GREP_CHUNK_FILES", 3)
+        monkeypatch.setattr(ex, "_AST_GREP_CHUNK_BYTES", 40)
+        files = [f"/src/file_{i:02d}.py" for i in range(8)]  # 17 bytes + separator
+        chunks = ex._chunk_paths(files)
+        assert [f for chunk in chunks for f in chunk] == files
+        assert [len(chunk) for chunk in chunks] == [2, 2, 2, 2]
+        monkeypatch.setattr(ex, "_AST_GREP_CHUNK_BYTES", 1000)
+        assert [len(chunk) for chunk in ex._chunk_paths(files)] == [3, 3, 2]
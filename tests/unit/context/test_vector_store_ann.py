@@ -0,0 +1,206 @@
+"""Tests for the IVF approximate search backend of ``VectorStore``."""
+
+from __future__ import annotations
+
+import os
+
+import pytest
+
+from attocode.integrations.context import vector_store as vs
+from attocode.integrations.context.ann_index import IVFFlatIndex
+from attocode.integrations.context.vector_store import VectorEntry, VectorStore
+
+pytestmark = pytest.mark.skipif(not vs._HAS_NUMPY, reason="numpy not installed")
+
+if vs._HAS_NUMPY:
+    import numpy as np
+
+DIM = 8
+N = 400
+
+
+def _clustered(n: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((10, DIM))
+    return (centers[rng.integers(0, 10, n)] + 0.2 * rng.standard_normal((n, DIM))).astype(np.float32)
+
+
+def _entries(vecs, start: int = 0) -> list[VectorEntry]:
+    return [
+        VectorEntry(
+            id=f"id_{start + i}",
+            file_path=f"src/file_{(start + i) % 20}.py",
+            chunk_type="function",
+            name=f"fn_{start + i}",
+            text=f"def fn_{start + i}(): ...",
+            vector=v.tolist(),
+        )
+        for i, v in enumerate(vecs)
+    ]
+
+
+@pytest.fixture
+def ivf_store(tmp_path, monkeypatch):
+    monkeypatch.setattr(vs, "_ANN_MIN_ROWS", 100)
+    s = VectorStore(db_path=str(tmp_path / "embeddings.db"), dimension=DIM, ann_backend="ivf")
+    s.upsert_batch(_entries(_clustered(N)))
+    yield s
+    s.close()
+
+
+def _exact_ids(store: VectorStore, query, top_k: int = 10, **kw) -> list[str]:
+    store.ann_backend = "exact"
+    try:
+        return [r.id for r in store.search(query, top_k=top_k, **kw)]
+    finally:
+        store.ann_backend = "ivf"
+
+
+class TestIVFFlatIndex:
+    def test_full_probe_scores_every_row(self, tmp_path):
+        matrix = _clustered(N)
+        norms = np.linalg.norm(matrix, axis=1)
+        index = IVFFlatIndex.train(
+            str(tmp_path / "t.ivf"), matrix, norms, np.ones(N, dtype=bool), "tok", nlist=16,
+        )
+        q = matrix[3] / norms[3]
+        rows, dots = index.score(q, index.nlist, matrix)
+        assert sorted(rows.tolist()) == list(range(N))
+        np.testing.assert_allclose(dots[np.argsort(rows)], matrix @ q, rtol=1e-5, atol=1e-5)
+
+    def test_appended_rows_are_probed_as_tail(self, tmp_path):
+        matrix = _clustered(N)
+        norms = np.linalg.norm(matrix, axis=1)
+        index = IVFFlatIndex.train(
+            str(tmp_path / "t.ivf"), matrix, norms, np.ones(N, dtype=bool), "tok", nlist=16,
+        )
+        grown = np.vstack([matrix, matrix[:5]])
+        assert index.extend(grown) is False  # small tail, lists not regrouped
+        rows, _ = index.score(matrix[2] / norms[2], 1, grown)
+        assert N + 2 in rows.tolist()
+
+    def test_save_and_load_round_trip(self, tmp_path):
+        matrix = _clustered(N)
+        norms = np.linalg.norm(matrix, axis=1)
+        base = str(tmp_path / "t.ivf")
+        index = IVFFlatIndex.train(base, matrix, norms, np.ones(N, dtype=bool), "tok", nlist=16)
+        index.save()
+        loaded = IVFFlatIndex.load(base, DIM)
+        assert loaded is not None
+        assert loaded.token == "tok"
+        q = matrix[7] / norms[7]
+        assert sorted(loaded.score(q, 4, matrix)[0].tolist()) == sorted(
+            index.score(q, 4, matrix)[0].tolist()
+        )
+        assert IVFFlatIndex.load(base, DIM + 1) is None
+
+
+    def test_quantized_lists(self, tmp_path):
+        matrix = _clustered(N)
+        scales = (np.abs(matrix).max(axis=1) / 127).astype(np.float32)
+        quant = np.round(matrix / scales[:, None]).astype(np.int8)
+        norms = np.linalg.norm(quant, axis=1) * scales
+        base = str(tmp_path / "t.ivf")
+        index = IVFFlatIndex.train(base, quant, norms, np.ones(N, dtype=bool), "tok", nlist=16)
+        assert index.dtype == "int8" and index._vectors.dtype == np.int8
+        q = matrix[3] / np.linalg.norm(matrix[3])
+        rows, dots = index.score(q, index.nlist, quant, scales)
+        expected = (quant.astype(np.float32) @ q) * scales
+        np.testing.assert_allclose(dots[np.argsort(rows)], expected, rtol=1e-5, atol=1e-5)
+
+        index.save()
+        loaded = IVFFlatIndex.load(base, DIM)
+        assert loaded is not None and loaded.dtype == "int8"
+        assert loaded.extend(quant) is False
+        # Switching back to float32 rows regroups the lists
+        assert loaded.extend(matrix) is True
+        assert loaded._vectors.dtype == np.float32
+
+
+class TestStoreIVFSearch:
+    def test_matches_exact_search(self, ivf_store):
+        vecs = _clustered(20, seed=1)
+        for q in vecs:
+            assert [r.id for r in ivf_store.search(q.tolist(), top_k=5)][:1] == _exact_ids(
+                ivf_store, q.tolist(), top_k=5,
+            )[:1]
+        assert os.path.exists(ivf_store._ann_path() + ".npz")
+
+    def test_small_store_stays_exact(self, tmp_path):
+        s = VectorStore(db_path=str(tmp_path / "e.db"), dimension=DIM, ann_backend="ivf")
+        try:
+            s.upsert_batch(_entries(_clustered(50)))
+            assert s.search(_clustered(1, seed=2)[0].tolist(), top_k=3)
+            assert s._ann is None
+        finally:
+            s.close()
+
+    def test_new_rows_are_searchable_without_retrain(self, ivf_store):
+        ivf_store.search(_clustered(1, seed=1)[0].tolist(), top_k=1)
+        centroids = ivf_store._ann.centroids
+        target = np.full(DIM, 5.0, dtype=np.float32)
+        target[0] = -5.0
+        ivf_store.upsert_batch(_entries([target], start=N))
+
+        results = ivf_store.search(target.tolist(), top_k=1)
+        assert [r.id for r in results] == [f"id_{N}"]
+        assert ivf_store._ann.centroids is centroids
+
+    def test_selective_filter_falls_back_to_exact(self, ivf_store):
+        # Only 20 rows match, so the probed lists cannot fill top_k=25
+        q = _clustered(1, seed=3)[0].tolist()
+        results = ivf_store.search(q, top_k=25, file_filter="src/file_7.py")
+        assert {r.file_path for r in results} == {"src/file_7.py"}
+        assert [r.id for r in results] == _exact_ids(
+            ivf_store, q, top_k=25, file_filter="src/file_7.py",
+        )
+
+    def test_reopen_loads_saved_index(self, ivf_store, tmp_path):
+        q = _clustered(1, seed=4)[0].tolist()
+        expected = [r.id for r in ivf_store.search(q, top_k=5)]
+        centroids = ivf_store._ann.centroids.copy()
+        ivf_store.close()
+
+        reopened = VectorStore(
+            db_path=str(tmp_path / "embeddings.db"), dimension=DIM, ann_backend="ivf",
+        )
+        try:
+            assert [r.id for r in reopened.search(q, top_k=5)] == expected
+            np.testing.assert_array_equal(reopened._ann.centroids, centroids)
+        finally:
+            reopened.close()
+
+    def test_clear_all_drops_index(self, ivf_store):
+        ivf_store.search(_clustered(1, seed=5)[0].tolist(), top_k=1)
+        ivf_store.clear_all()
+        assert ivf_store._ann is None
+        assert not os.path.exists(ivf_store._ann_path() + ".npz")
+
+    def test_unknown_backend_falls_back_to_exact(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("ATTOCODE_VECTOR_INDEX", "hnsw")
+        s = VectorStore(db_path=str(tmp_path / "e.db"), dimension=DIM)
+        try:
+            assert s.ann_backend == "exact"
+        finally:
+            s.close()
+
+    @pytest.mark.parametrize("mode", ["int8", "float16"])
+    def test_quantized_store_probes_quantized_rows(self, tmp_path, monkeypatch, mode):
+        monkeypatch.setattr(vs, "_ANN_MIN_ROWS", 100)
+        vecs = _clustered(N)
+        s = VectorStore(
+            db_path=str(tmp_path / "q.db"), dimension=DIM, ann_backend="ivf", quantization=mode,
+        )
+        try:
+            s.upsert_batch(_entries(vecs))
+            for q in _clustered(10, seed=5):
+                results = s.search(q.tolist(), top_k=5)
+                assert results[0].id == _exact_ids(s, q.tolist(), top_k=5)[0]
+                # The shortlist is rescored against the float32 rows
+                for r in results:
+                    vec = vecs[int(r.id.removeprefix("id_"))]
+                    cosine = vec @ q / (np.linalg.norm(vec) * np.linalg.norm(q))
+                    assert r.score == pytest.approx(float(cosine), abs=1e-4)
+            assert s._ann.dtype == s._vec_quant.dtype.name
+        finally:
+            s.close()
@@ -0,0 +1,180 @@
+"""Tests for the memory-mapped matrix behind ``VectorStore`` search.
+
+Covers the append/tombstone write path, the in-place cache patching that
+avoids reloading every vector after a save, cross-connection invalidation,
+compaction, recovery when the matrix file is missing, and the per-file
+filter masks.
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import struct
+
+import pytest
+
+from attocode.integrations.context import vector_store as vs
+from attocode.integrations.context.vector_store import VectorEntry, VectorStore
+
+pytestmark = pytest.mark.skipif(not vs._HAS_NUMPY, reason="numpy not installed")
+
+DIM = 4
+
+
+def _entry(i: int, vec: list[float] | None = None, file_path: str = "") -> VectorEntry:
+    return VectorEntry(
+        id=f"id_{i}",
+        file_path=file_path or f"src/file_{i % 3}.py",
+        chunk_type="function",
+        name=f"fn_{i}",
+        text=f"def fn_{i}(): ...",
+        vector=vec or [float(i + 1), 1.0, 0.0, float(i % 2)],
+    )
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = VectorStore(db_path=str(tmp_path / "embeddings.db"), dimension=DIM)
+    s.upsert_batch([_entry(i) for i in range(6)])
+    yield s
+    s.close()
+
+
+def _matrix_files(store: VectorStore) -> list[str]:
+    base = os.path.basename(store.db_path) + ".matrix-"
+    return sorted(f for f in os.listdir(os.path.dirname(store.db_path)) if f.startswith(base))
+
+
+def _ids(results) -> list[str]:
+    return [r.id for r in results]
+
+
+class TestMatrixSearch:
+    def test_results_carry_lazily_fetched_text(self, store):
+        results = store.search([6.0, 1.0, 0.0, 1.0], top_k=3)
+        assert results[0].id == "id_5"
+        assert results[0].text == "def fn_5(): ..."
+        assert results[0].name == "fn_5"
+        assert results[0].chunk_type == "function"
+
+    def test_reopen_reuses_persisted_matrix(self, store, tmp_path):
+        expected = store.search([1.0, 1.0, 0.0, 0.0], top_k=6)
+        files = _matrix_files(store)
+        store.close()
+
+        reopened = VectorStore(db_path=str(tmp_path / "embeddings.db"), dimension=DIM)
+        try:
+            assert _ids(reopened.search([1.0, 1.0, 0.0, 0.0], top_k=6)) == _ids(expected)
+            assert _matrix_files(reopened) == files
+            assert len(reopened._vec_row_ids) == 6  # nothing re-appended
+        finally:
+            reopened.close()
+
+    def test_upsert_patches_cache_without_reload(self, store):
+        store.search([1.0, 0.0, 0.0, 0.0], top_k=1)
+        store.upsert(_entry(0, vec=[0.0, 0.0, 9.0, 0.0]))
+        assert store._vec_loaded_version == store._vec_cache_version
+
+        results = store.search([0.0, 0.0, 1.0, 0.0], top_k=1)
+        assert _ids(results) == ["id_0"]
+        assert len(store._vec_row_ids) == 7  # old id_0 row tombstoned, not rewritten
+        assert int(store._vec_live.sum()) == 6
+
+    def test_delete_by_file_tombstones_rows(self, store):
+        store.search([1.0, 1.0, 0.0, 0.0], top_k=1)
+        deleted = store.delete_by_file("src/file_0.py")
+        assert deleted == 2
+        assert store._vec_loaded_version == store._vec_cache_version
+
+        results = store.search([1.0, 1.0, 0.0, 0.0], top_k=10)
+        assert all(r.file_path != "src/file_0.py" for r in results)
+        assert len(results) == 4
+
+    def test_write_from_other_connection_is_picked_up(self, store):
+        store.search([1.0, 1.0, 0.0, 0.0], top_k=1)
+        conn = sqlite3.connect(store.db_path)
+        conn.execute(
+            "UPDATE vectors SET vector = ?, produced_at = produced_at + 1 WHERE id = 'id_2'",
+            (struct.pack(f"{DIM}f", 0.0, 0.0, 0.0, 5.0),),
+        )
+        conn.commit()
+        conn.close()
+
+        results = store.search([0.0, 0.0, 0.0, 1.0], top_k=1)
+        assert _ids(results) == ["id_2"]
+
+    def test_missing_matrix_file_is_rebuilt(self, store, tmp_path):
+        expected = _ids(store.search([1.0, 1.0, 0.0, 0.0], top_k=6))
+        store.close()
+        for name in os.listdir(tmp_path):
+            if ".matrix-" in name:
+                os.remove(tmp_path / name)
+
+        reopened = VectorStore(db_path=str(tmp_path / "embeddings.db"), dimension=DIM)
+        try:
+            assert _ids(reopened.search([1.0, 1.0, 0.0, 0.0], top_k=6)) == expected
+            assert len(_matrix_files(reopened)) == 1
+        finally:
+            reopened.close()
+
+
+class TestCompaction:
+    def test_tombstones_are_compacted(self, store, monkeypatch):
+        monkeypatch.setattr(vs, "_COMPACT_MIN_DEAD", 0)
+        store.search([1.0, 1.0, 0.0, 0.0], top_k=1)
+        old_files = _matrix_files(store)
+        for _ in range(3):
+            store.upsert_batch([_entry(i) for i in range(6)])
+
+        results = store.search([6.0, 1.0, 0.0, 1.0], top_k=6)
+        assert results[0].id == "id_5"
+        assert len(store._vec_row_ids) == 6
+        assert bool(store._vec_live.all())
+        assert _matrix_files(store) != old_files
+        assert len(_matrix_files(store)) == 1
+
+    def test_clear_all_resets_matrix(self, store):
+        store.search([1.0, 1.0, 0.0, 0.0], top_k=1)
+        assert store.clear_all() == 6
+        assert store.search([1.0, 1.0, 0.0, 0.0], top_k=5) == []
+        assert os.path.getsize(os.path.join(
+            os.path.dirname(store.db_path), _matrix_files(store)[0],
+        )) == 0
+
+
+class TestFileFilterMasks:
+    def test_glob_filter(self, store):
+        results = store.search([1.0, 1.0, 0.0, 0.0], top_k=10, file_filter="src/file_1.*")
+        assert {r.file_path for r in results} == {"src/file_1.py"}
+        assert len(results) == 2
+
+    def test_existing_files_filter(self, store):
+        existing = {"src/file_0.py", "src/file_2.py"}
+        results = store.search([1.0, 1.0, 0.0, 0.0], top_k=10, existing_files=existing)
+        assert {r.file_path for r in results} == existing
+
+    def test_masks_extend_to_new_files(self, store):
+        existing = {"src/file_0.py", "src/new.py"}
+        store.search([1.0, 1.0, 0.0, 0.0], top_k=10, file_filter="*new*", existing_files=existing)
+        store.upsert(_entry(9, file_path="src/new.py"))
+
+        results = store.search(
+            [1.0, 1.0, 0.0, 0.0], top_k=10, file_filter="*new*", existing_files=existing,
+        )
+        assert [r.id for r in results] == ["id_9"]
+
+    def test_mutated_existing_set_is_recomputed(self, store):
+        existing = {"src/file_0.py"}
+        store.search([1.0, 1.0, 0.0, 0.0], top_k=10, existing_files=existing)
+        existing.add("src/file_1.py")
+        results = store.search([1.0, 1.0, 0.0, 0.0], top_k=10, existing_files=existing)
+        assert {r.file_path for r in results} == {"src/file_0.py", "src/file_1.py"}
+
+    def test_swapped_existing_member_is_recomputed(self, store):
+        existing = {"src/file_0.py"}
+        store.search([1.0, 1.0, 0.0, 0.0], top_k=10, existing_files=existing)
+        existing.discard("src/file_0.py")
+        existing.add("src/file_1.py")
+        results = store.search([1.0, 1.0, 0.0, 0.0], top_k=10, existing_files=existing)
+        assert {r.file_path for r in results} == {"src/file_1.py"}
@@ -0,0 +1,157 @@
+"""Tests for quantized (int8 / float16) matrix storage in ``VectorStore``."""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+
+import pytest
+
+from attocode.integrations.context import vector_store as vs
+from attocode.integrations.context.vector_store import VectorEntry, VectorStore
+
+pytestmark = pytest.mark.skipif(not vs._HAS_NUMPY, reason="numpy not installed")
+
+if vs._HAS_NUMPY:
+    import numpy as np
+
+DIM = 16
+N = 300
+
+
+def _vectors(n: int, seed: int = 0):
+    return np.random.default_rng(seed).standard_normal((n, DIM)).astype(np.float32)
+
+
+def _entries(vecs, start: int = 0) -> list[VectorEntry]:
+    return [
+        VectorEntry(
+            id=f"id_{start + i}",
+            file_path=f"src/file_{(start + i) % 10}.py",
+            chunk_type="function",
+            name=f"fn_{start + i}",
+            text=f"def fn_{start + i}(): ...",
+            vector=v.tolist(),
+        )
+        for i, v in enumerate(vecs)
+    ]
+
+
+def _sidecars(tmp_path) -> list[str]:
+    return sorted(
+        name.rsplit(".", 1)[1] for name in os.listdir(tmp_path)
+        if ".matrix-" in name and not name.endswith(".f32")
+    )
+
+
+def _stored_mode(db_path: str) -> str | None:
+    conn = sqlite3.connect(db_path)
+    try:
+        row = conn.execute(
+            "SELECT value FROM store_metadata WHERE key = 'quantization'"
+        ).fetchone()
+    finally:
+        conn.close()
+    return row[0] if row else None
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "embeddings.db")
+    store = VectorStore(db_path=path, dimension=DIM)
+    store.upsert_batch(_entries(_vectors(N)))
+    store.close()
+    return path
+
+
+def _search(path: str, queries, quantization: str = "", top_k: int = 5):
+    store = VectorStore(db_path=path, dimension=DIM, quantization=quantization)
+    try:
+        return [
+            [(r.id, r.score) for r in store.search(q.tolist(), top_k=top_k)]
+            for q in queries
+        ]
+    finally:
+        store.close()
+
+
+class TestQuantizedSearch:
+    @pytest.mark.parametrize("mode", ["int8", "float16"])
+    def test_rescored_results_match_float32(self, db_path, mode):
+        queries = _vectors(10, seed=1)
+        exact = _search(db_path, queries, "none")
+        assert _search(db_path, queries, mode) == exact
+
+    def test_int8_sidecars_written(self, db_path, tmp_path):
+        _search(db_path, _vectors(1, seed=2), "int8")
+        assert _sidecars(tmp_path) == ["i8", "i8scale"]
+        data = [n for n in os.listdir(tmp_path) if n.endswith(".i8")][0]
+        assert os.path.getsize(tmp_path / data) == N * DIM
+
+    def test_appended_rows_are_quantized(self, db_path):
+        store = VectorStore(db_path=db_path, dimension=DIM, quantization="int8")
+        try:
+            store.search(_vectors(1, seed=3)[0].tolist(), top_k=1)
+            target = np.zeros(DIM, dtype=np.float32)
+            target[0] = 50.0
+            store.upsert_batch(_entries([target], start=N))
+            assert store._vec_loaded_version == store._vec_cache_version
+            assert len(store._vec_quant) == N + 1
+
+            results = store.search(target.tolist(), top_k=1)
+            assert [r.id for r in results] == [f"id_{N}"]
+            assert results[0].score == 1.0
+        finally:
+            store.close()
+
+
+class TestQuantizationMigration:
+    def test_existing_store_is_migrated_and_mode_persists(self, db_path, tmp_path):
+        assert _stored_mode(db_path) is None  # predates quantization
+        _search(db_path, _vectors(1, seed=4), "float16")
+        assert _stored_mode(db_path) == "float16"
+        assert _sidecars(tmp_path) == ["f16"]
+
+        store = VectorStore(db_path=db_path, dimension=DIM)
+        try:
+            assert store.quantization == "float16"
+        finally:
+            store.close()
+
+    def test_switching_mode_drops_old_sidecars(self, db_path, tmp_path):
+        _search(db_path, _vectors(1, seed=5), "int8")
+        _search(db_path, _vectors(1, seed=5), "float16")
+        assert _sidecars(tmp_path) == ["f16"]
+        _search(db_path, _vectors(1, seed=5), "none")
+        assert _sidecars(tmp_path) == []
+
+    def test_env_var_selects_mode(self, db_path, monkeypatch):
+        monkeypatch.setenv("ATTOCODE_VECTOR_QUANTIZATION", "int8")
+        store = VectorStore(db_path=db_path, dimension=DIM)
+        try:
+            assert store.quantization == "int8"
+        finally:
+            store.close()
+
+    def test_unknown_mode_keeps_stored(self, db_path):
+        _search(db_path, _vectors(1, seed=6), "int8")
+        store = VectorStore(db_path=db_path, dimension=DIM, quantization="int4")
+        try:
+            assert store.quantization == "int8"
+        finally:
+            store.close()
+
+    def test_compaction_replaces_sidecars(self, db_path, tmp_path, monkeypatch):
+        monkeypatch.setattr(vs, "_COMPACT_MIN_DEAD", 0)
+        store = VectorStore(db_path=db_path, dimension=DIM, quantization="int8")
+        try:
+            store.search(_vectors(1, seed=7)[0].tolist(), top_k=1)
+            vecs = _vectors(N, seed=8)
+            store.upsert_batch(_entries(vecs))
+            store.upsert_batch(_entries(vecs))
+            results = store.search(vecs[3].tolist(), top_k=1)
+            assert [r.id for r in results] == ["id_3"]
+            assert len(store._vec_quant) == N
+        finally:
+            store.close()
+        assert _sidecars(tmp_path) == ["i8", "i8scale"]
@@ -181,6 +181,206 @@ class TestIndexStoreRoundtrip:
         assert idx.callers_of["bar"] == {"foo"}
         store.close()
 
+    def test_persist_all_matches_persist_file(self, tmp_path):
+        from attocode.integrations.context.index_store import StoredFile
+
+        def build(db: str) -> tuple[CrossRefIndex, IndexStore]:
+            store = IndexStore(db_path=str(tmp_path / db))
+            store.save_files_batch([
+                StoredFile(path=p, mtime=1.0, size=10, language="python",
+                           line_count=10, content_hash="h")
+                for p in ("a.py", "b.py")
+            ])
+            idx = CrossRefIndex()
+            idx.set_store(store)
+            idx.add_definition(_def("foo", file="a.py"))
+            idx.add_definition(_def("bar", file="b.py", line=3))
+            idx.add_reference(_ref("bar", caller="foo", file="a.py", line=2))
+            idx.add_reference(_ref("foo", caller="bar", file="b.py", line=4))
+            return idx, store
+
+        per_file, store_a = build("a.db")
+        for path in ("a.py", "b.py"):
+            per_file.persist_file(path)
+        bulk, store_b = build("b.db")
+        bulk.persist_all()
+
+        def rows(store: IndexStore) -> tuple[list, list]:
+            syms = sorted((s.file_path, s.qualified_name, s.line) for s in store.load_symbols())
+            refs = sorted(
+                (r.file_path, r.symbol_name, r.line, r.caller_qualified_name)
+                for r in store.load_references()
+            )
+            return syms, refs
+
+        assert rows(store_b) == rows(store_a)
+        assert len(rows(store_b)[1]) == 2
+        store_a.close()
+        store_b.close()
+
+
+class TestFileRefsMap:
+    def test_remove_file_only_touches_its_refs(self):
+        idx = CrossRefIndex()
+        idx.add_reference(_ref("bar", caller="foo", file="a.py"))
+        idx.add_reference(_ref("bar", caller="baz", file="b.py"))
+        idx.add_reference(_ref("qux", file="a.py", line=2))
+
+        idx.remove_file("a.py")
+
+        assert [r.file_path for r in idx.references["bar"]] == ["b.py"]
+        assert "qux" not in idx.references
+        assert "a.py" not in idx.file_refs
+        assert idx.file_refs["b.py"] == idx.references["bar"]
+
+    def test_lsp_replacement_updates_file_refs(self):
+        idx = CrossRefIndex()
+        idx.add_reference(_ref("bar", file="a.py", line=5))
+        idx.merge_lsp_results("a.py", [], [_ref("bar", caller="foo", file="a.py", line=5)])
+
+        assert [r.source for r in idx.file_refs["a.py"]] == ["lsp"]
+        assert idx.file_refs["a.py"] == idx.references["bar"]
+
+    def test_views_return_copies(self):
+        ref = _ref("bar", file="a.py")
+        idx = CrossRefIndex()
+        idx.add_reference(ref)
+        idx.references["bar"].clear()
+        assert idx.file_refs == {"a.py": [ref]}
+        idx.remove_file("a.py")
+        assert idx.references == {}
+
+
+class TestLazyStoreMode:
+    @staticmethod
+    def _stored(tmp_path) -> IndexStore:
+        from attocode.integrations.context.index_store import StoredFile
+
+        store = IndexStore(db_path=str(tmp_path / "lazy.db"))
+        store.save_files_batch([
+            StoredFile(path=p, mtime=1.0, size=10, language="python",
+                       line_count=10, content_hash="h")
+            for p in ("a.py", "b.py")
+        ])
+        idx = CrossRefIndex()
+        idx.set_store(store)
+        idx.add_definition(_def("parse_config", file="a.py"))
+        idx.add_definition(_def("Loader.load", file="a.py", line=10))
+        idx.add_definition(_def("main", file="b.py"))
+        idx.add_reference(_ref("parse_config", caller="main", file="b.py", line=3))
+        idx.add_reference(_ref("Loader.load", caller="main", file="b.py", line=4))
+        idx.add_reference(_ref("main", caller="parse_config", file="a.py", line=2))
+        idx.persist_all()
+        store.save_dependencies("b.py", {"a.py"})
+        return store
+
+    def _pair(self, tmp_path) -> tuple[CrossRefIndex, CrossRefIndex]:
+        store = self._stored(tmp_path)
+        eager, lazy = CrossRefIndex(), CrossRefIndex()
+        for idx, mode in ((eager, False), (lazy, True)):
+            idx.set_store(store)
+            idx.load_from_store(lazy=mode)
+        return eager, lazy
+
+    def test_lazy_load_keeps_only_names(self, tmp_path):
+        _, lazy = self._pair(tmp_path)
+        assert lazy.lazy
+        assert lazy.definitions == {} and lazy.references == {}
+        assert lazy.file_symbols["a.py"] == {"parse_config", "Loader.load"}
+        assert lazy.get_dependents("a.py") == {"b.py"}
+        assert lazy.definition_count() == 3
+
+    def test_queries_match_eager(self, tmp_path):
+        eager, lazy = self._pair(tmp_path)
+
+        def locs(items):
+            return sorted((loc.qualified_name, loc.file_path, loc.start_line) for loc in items)
+
+        for name in ("parse_config", "load", "Loader.load", "missing"):
+            assert locs(lazy.get_definitions(name)) == locs(eager.get_definitions(name))
+        for query in ("parse", "config", "load", "mai"):
+            assert locs(loc for loc, _ in lazy.search_definitions(query)) == locs(
+                loc for loc, _ in eager.search_definitions(query)
+            )
+        for name in ("parse_config", "load", "main"):
+            assert sorted((r.file_path, r.line) for r in lazy.get_references(name)) == sorted(
+                (r.file_path, r.line) for r in eager.get_references(name)
+            )
+        assert lazy.get_callers("parse_config", depth=2) == eager.get_callers(
+            "parse_config", depth=2,
+        ) == {"main", "parse_config"}
+        assert lazy.get_callees("main") == eager.get_callees("main")
+        assert locs(lazy.get_file_definitions("a.py")) == locs(
+            eager.get_file_definitions("a.py"),
+        )
+
+    def test_reindexed_file_overrides_store(self, tmp_path):
+        _, lazy = self._pair(tmp_path)
+        lazy.get_references("parse_config")  # warm the LRU with the old rows
+        lazy.remove_file("b.py")
+        assert lazy.get_references("parse_config") == []
+        assert lazy.get_definitions("main") == []
+        assert not lazy.search_definitions("main")
+
+        lazy.add_definition(_def("run", file="b.py"))
+        lazy.add_reference(_ref("parse_config", caller="run", file="b.py", line=9))
+        assert [r.line for r in lazy.get_references("parse_config")] == [9]
+        assert lazy.get_callers("parse_config") == {"run"}
+        assert lazy.definition_count() == 3
+
+    def test_lsp_merge_on_stored_file_keeps_its_rows(self, tmp_path):
+        _, lazy = self._pair(tmp_path)
+        lazy.merge_lsp_results("a.py", [_def("parse_config", file="a.py")], [])
+        assert [loc.source for loc in lazy.get_definitions("parse_config")] == ["lsp"]
+        assert len(lazy._store.load_symbols("a.py")) == 2
+
+    def test_materialize_loads_everything(self, tmp_path):
+        eager, lazy = self._pair(tmp_path)
+        lazy.remove_file("b.py")
+        lazy.materialize()
+        assert not lazy.lazy
+        assert set(lazy.definitions) == {"parse_config", "Loader.load"}
+        assert set(lazy.references) == {"main"}
+        assert lazy.search_definitions("config")
+
+    def test_env_selects_mode(self, tmp_path, monkeypatch):
+        store = self._stored(tmp_path)
+        monkeypatch.setenv("ATTOCODE_XREF_LAZY", "1")
+        idx = CrossRefIndex()
+        idx.set_store(store)
+        idx.load_from_store()
+        assert idx.lazy
+        monkeypatch.delenv("ATTOCODE_XREF_LAZY")
+        idx = CrossRefIndex()
+        idx.set_store(store)
+        idx.load_from_store()
+        assert not idx.lazy  # small store: eager by default
+
+    def test_ast_service_warm_start(self, tmp_path, monkeypatch):
+        from attocode.integrations.context.ast_service import ASTService
+
+        src = tmp_path / "src"
+        src.mkdir()
+        (src / "util.py").write_text("def helper(x):\n    return x\n", encoding="utf-8")
+        (src / "app.py").write_text(
+            "from util import helper\n\n\ndef run():\n    return helper(1)\n",
+            encoding="utf-8",
+        )
+        ASTService(str(tmp_path)).initialize(force=True)
+
+        monkeypatch.setenv("ATTOCODE_XREF_LAZY", "1")
+        svc = ASTService(str(tmp_path))
+        svc.initialize()
+        assert svc.index.lazy
+        assert [loc.file_path for loc in svc.find_symbol("helper")] == ["src/util.py"]
+        assert {r.file_path for r in svc.get_callers("helper")} == {"src/app.py"}
+        assert [loc.name for loc in svc.get_file_symbols("src/app.py")] == ["run"]
+
+        (src / "app.py").write_text("def run():\n    return 2\n", encoding="utf-8")
+        svc.notify_file_changed(str(src / "app.py"))
+        assert svc.get_callers("helper") == []
+        assert [loc.name for loc in svc.get_file_symbols("src/app.py")] == ["run"]
+
 
 class TestConcurrentMutation:
     """Review C3 — CrossRefIndex must tolerate concurrent ``add_*`` and
@@ -186,6 +186,199 @@ class TestDiscoverFiles:
         assert importances == sorted(importances, reverse=True)
 
 
+class TestDiscoveryCache:
+    @staticmethod
+    def _count_reads(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+        from attocode.integrations.context import codebase_context
+
+        reads: list[str] = []
+        real = codebase_context._count_lines
+
+        def _counting(path: str) -> int:
+            reads.append(os.path.basename(path))
+            return real(path)
+
+        monkeypatch.setattr(codebase_context, "_count_lines", _counting)
+        return reads
+
+    def test_rediscovery_reads_only_changed_files(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        _create_project(tmp_path)
+        reads = self._count_reads(monkeypatch)
+        mgr = CodebaseContextManager(root_dir=str(tmp_path))
+        first = {f.relative_path: f.line_count for f in mgr.discover_files()}
+        assert "main.py" in reads
+
+        reads.clear()
+        (tmp_path / "src" / "utils.py").write_text("def helper():\n    return 42\n\n\n")
+        (tmp_path / "src" / "extra.py").write_text("x = 1\n")
+        (tmp_path / "src" / "main.py").unlink()
+        files = {f.relative_path: f.line_count for f in mgr.discover_files()}
+        assert sorted(reads) == ["extra.py", "utils.py"]
+        assert files[os.path.join("src", "utils.py")] == 4
+        assert os.path.join("src", "main.py") not in files
+        assert files[os.path.join("tests", "test_main.py")] == first[os.path.join("tests", "test_main.py")]
+
+    def test_line_counts_persist_in_attocode_dir(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        _create_project(tmp_path)
+        (tmp_path / ".attocode").mkdir()
+        CodebaseContextManager(root_dir=str(tmp_path)).discover_files()
+        assert (tmp_path / ".attocode" / "index" / "symbols.db").exists()
+
+        reads = self._count_reads(monkeypatch)
+        files = CodebaseContextManager(root_dir=str(tmp_path)).discover_files()
+        assert reads == []
+        assert all(f.line_count > 0 for f in files if f.language == "python")
+
+    def test_git_listing_matches_walk(self, tmp_path: Path) -> None:
+        import shutil
+        import subprocess
+
+        if shutil.which("git") is None:
+            pytest.skip("git not installed")
+        _create_project(tmp_path)
+        (tmp_path / "generated").mkdir()
+        (tmp_path / "generated" / "big.py").write_text("x = 1\n")
+        (tmp_path / ".gitignore").write_text("generated/\n")
+        subprocess.run(["git", "init", "-q"], cwd=tmp_path, check=True)
+        subprocess.run(["git", "add", "-A"], cwd=tmp_path, check=True)
+
+        def _key(files: list[FileInfo]) -> list[tuple[str, int, float]]:
+            return sorted((f.relative_path, f.line_count, f.importance) for f in files)
+
+        mgr = CodebaseContextManager(root_dir=str(tmp_path), use_git_ls_files=True)
+        walked = CodebaseContextManager(root_dir=str(tmp_path))
+        listed = mgr.discover_files()
+        assert os.path.join("generated", "big.py") not in {f.relative_path for f in listed}
+        (tmp_path / "generated").rename(tmp_path / "gen")  # un-ignore for the walk
+        (tmp_path / "gen" / "big.py").unlink()
+        assert _key(listed) == _key(walked.discover_files())
+
+        # Warm: index unchanged, so only modified/untracked files are re-read
+        (tmp_path / "src" / "utils.py").write_text("a = 1\nb = 2\nc = 3\n")
+        (tmp_path / "src" / "new.py").write_text("n = 1\n")
+        assert _key(mgr.discover_files()) == _key(walked.discover_files())
+        (tmp_path / "src" / "new.py").unlink()
+        assert _key(mgr.discover_files()) == _key(walked.discover_files())
+
+
+class TestIncrementalDependencyGraph:
+    @staticmethod
+    def _count_parses(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+        from attocode.integrations.context import parse_pool
+
+        parsed: list[str] = []
+        real = parse_pool._parse_one
+
+        def _counting(path: str):
+            parsed.append(os.path.basename(path))
+            return real(path)
+
+        monkeypatch.setattr(parse_pool, "_parse_one", _counting)
+        return parsed
+
+    @staticmethod
+    def _edges(graph: DependencyGraph) -> tuple[dict, dict]:
+        return (
+            {k: v for k, v in graph.forward.items() if v},
+            {k: v for k, v in graph.reverse.items() if v},
+        )
+
+    def test_random_edits_match_full_build(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        import random
+
+        monkeypatch.setenv("ATTOCODE_PARSE_CACHE", "0")
+        rng = random.Random(7)
+        (tmp_path / "pyproject.toml").write_text(
+            '[tool.setuptools]\npackage-dir = {"" = "src"}\n',
+        )
+        names = [f"m{i}" for i in range(12)]
+        pkgs = ["src/pkg", "src/pkg/sub", "lib"]
+        for pkg in pkgs:
+            (tmp_path / pkg).mkdir(parents=True, exist_ok=True)
+        mgr = CodebaseContextManager(root_dir=str(tmp_path))
+        for _ in range(25):
+            for _ in range(rng.randint(1, 4)):
+                pkg = rng.choice(pkgs)
+                target = tmp_path / pkg / f"{rng.choice(names)}.py"
+                if target.exists() and rng.random() < 0.3:
+                    target.unlink()
+                    continue
+                lines = [
+                    rng.choice([
+                        f"import pkg.{rng.choice(names)}",
+                        f"from pkg.sub import {rng.choice(names)}",
+                        f"from . import {rng.choice(names)}",
+                        f"from .{rng.choice(names)} import x",
+                        f"import {rng.choice(names)}",
+                    ])
+                    for _ in range(rng.randint(0, 3))
+                ]
+                target.write_text("\n".join(lines) + f"\nv = {rng.random()}\n")
+            files = mgr.discover_files()
+            known = [info for _, info, _ in mgr._known_files.values()]
+            expected = build_dependency_graph(known, str(tmp_path))
+            assert self._edges(mgr.dependency_graph) == self._edges(expected)
+            assert {f.relative_path for f in files} == set(mgr._known_files)
+
+    def test_unchanged_files_are_not_reparsed(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        monkeypatch.setenv("ATTOCODE_PARSE_CACHE", "0")
+        (tmp_path / "a.py").write_text("import b\n")
+        (tmp_path / "b.py").write_text("x = 1\n")
+        (tmp_path / "c.py").write_text("import d\n")
+        parsed = self._count_parses(monkeypatch)
+        mgr = CodebaseContextManager(root_dir=str(tmp_path))
+        mgr.discover_files()
+        assert sorted(parsed) == ["a.py", "b.py", "c.py"]
+        assert mgr.dependency_graph.get_imports("a.py") == {"b.py"}
+        assert mgr.dependency_graph.get_imports("c.py") == set()
+
+        # Adding d.py resolves c.py's dangling import without re-parsing c.py
+        parsed.clear()
+        (tmp_path / "d.py").write_text("y = 2\n")
+        mgr.discover_files()
+        assert parsed == ["d.py"]
+        assert mgr.dependency_graph.get_importers("d.py") == {"c.py"}
+
+        parsed.clear()
+        (tmp_path / "b.py").unlink()
+        mgr.discover_files()
+        assert parsed == []
+        assert mgr.dependency_graph.get_imports("a.py") == set()
+        assert "b.py" not in mgr.dependency_graph.reverse
+
+    def test_import_lists_persist_in_attocode_dir(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        monkeypatch.setenv("ATTOCODE_PARSE_CACHE", "0")
+        (tmp_path / ".attocode").mkdir()
+        (tmp_path / "a.py").write_text("import b\n")
+        (tmp_path / "b.py").write_text("x = 1\n")
+        first = CodebaseContextManager(root_dir=str(tmp_path))
+        first.discover_files()
+
+        parsed = self._count_parses(monkeypatch)
+        second = CodebaseContextManager(root_dir=str(tmp_path))
+        second.discover_files()
+        assert parsed == []
+        assert self._edges(second.dependency_graph) == self._edges(first.dependency_graph)
+
+    def test_large_repos_get_a_graph(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setenv("ATTOCODE_PARSE_CACHE", "0")
+        for i in range(5_001):
+            (tmp_path / f"m{i}.py").write_text("import m0\n" if i else "")
+        mgr = CodebaseContextManager(root_dir=str(tmp_path))
+        mgr.discover_files()
+        assert len(mgr.dependency_graph.get_importers("m0.py")) == 5_000
+
+
 class TestDetectLanguage:
     def test_known_extensions(self) -> None:
         assert EXTENSION_LANGUAGES[".py"] == "python"
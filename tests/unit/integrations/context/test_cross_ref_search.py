@@ -180,6 +180,18 @@ class TestSearchDefinitions:
         # Public "internal" should rank higher than "_internal"
         assert scores["internal"] > scores["_internal"]
 
+    def test_limited_search_matches_full_ranking(self):
+        idx = CrossRefIndex()
+        for i in range(40):
+            kind = ("class", "function", "method")[i % 3]
+            name = f"{'_' if i % 5 == 0 else ''}parse{'Config' if i % 2 else 'Tree'}{i}"
+            idx.add_definition(_loc(name, name, kind, f"src/m{i}.py"))
+        idx.add_definition(_loc("parse", "parse", "function", "src/p.py"))
+        for query in ("parse", "parseConfig", "config", "Tree1", "rseCon"):
+            full = idx.search_definitions(query, limit=1000)
+            for limit in (1, 3, 10):
+                assert idx.search_definitions(query, limit=limit) == full[:limit], query
+
     def test_class_ranked_higher_than_function(self):
         idx = CrossRefIndex()
         idx.add_definition(_loc("Config", "Config", "class", "a.py"))
@@ -219,6 +231,19 @@ class TestRemoveFileCleanup:
         assert "AppRouter" in names
         assert "Router" not in names
 
+    def test_search_follows_updates_after_first_query(self):
+        idx = CrossRefIndex()
+        idx.add_definition(_loc("parseConfig", "parseConfig", "function", "a.py"))
+        assert idx.search_definitions("parse")  # builds the name index
+        idx.add_definition(_loc("ConfigParser", "ConfigParser", "class", "b.py"))
+        names = {loc.qualified_name for loc, _ in idx.search_definitions("fIgPa")}
+        assert names == {"ConfigParser"}
+        idx.remove_file("a.py")
+        assert idx.search_definitions("parsec") == []
+        assert [loc.qualified_name for loc, _ in idx.search_definitions("Conf")] == [
+            "ConfigParser",
+        ]
+
     def test_remove_all_files_empties_indexes(self):
         idx = CrossRefIndex()
         idx.add_definition(_loc("Foo", "Foo", "class", "a.py"))
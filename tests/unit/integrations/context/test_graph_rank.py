@@ -0,0 +1,103 @@
+"""Tests for the sparse PageRank used by dependency-graph ranking."""
+
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from attocode.integrations.context import graph_rank
+from attocode.integrations.context.codebase_context import DependencyGraph
+from attocode.integrations.context.graph_rank import (
+    LinkMatrix,
+    personalized_rank,
+    power_iteration,
+)
+
+
+def _random_graph(seed: int, n: int = 300) -> DependencyGraph:
+    rng = random.Random(seed)
+    graph = DependencyGraph()
+    for i in range(n):
+        for _ in range(rng.randint(0, 4)):
+            graph.add_edge(f"f{i}.py", f"f{int(rng.paretovariate(1.1)) % n}.py")
+    return graph
+
+
+def _reference_pagerank(graph: DependencyGraph, damping: float = 0.85) -> dict[str, float]:
+    """The dict-of-sets power iteration DependencyGraph.pagerank used to run."""
+    nodes = set(graph.forward) | set(graph.reverse)
+    n = len(nodes)
+    scores = dict.fromkeys(nodes, 1.0 / n)
+    for _ in range(20):
+        new = {}
+        for node in nodes:
+            rank_sum = sum(
+                scores[i] / len(graph.forward[i]) for i in graph.reverse.get(node, ())
+            )
+            new[node] = (1 - damping) / n + damping * rank_sum
+        diff = max(abs(new[k] - scores[k]) for k in nodes)
+        scores = new
+        if diff < 1e-6:
+            break
+    top = max(scores.values())
+    return {k: v / top for k, v in scores.items()}
+
+
+class TestDependencyGraphPageRank:
+    def test_matches_reference_iteration(self) -> None:
+        graph = _random_graph(0)
+        expected = _reference_pagerank(graph)
+        scores = graph.pagerank()
+        assert scores.keys() == expected.keys()
+        assert all(scores[k] == pytest.approx(expected[k], abs=1e-4) for k in expected)
+
+    def test_edge_changes_invalidate_cached_links(self) -> None:
+        graph = _random_graph(1)
+        graph.pagerank()
+        for i in range(40):
+            graph.add_edge(f"new{i}.py", "f7.py")
+        graph.set_imports("f3.py", {"f9.py"})
+        graph.remove_file("f5.py")
+        expected = _reference_pagerank(graph)
+        scores = graph.pagerank()
+        assert scores.keys() == expected.keys()
+        assert all(scores[k] == pytest.approx(expected[k], abs=1e-4) for k in expected)
+
+    def test_personalized_favors_seed_dependencies(self) -> None:
+        graph = DependencyGraph()
+        for i in range(10):
+            graph.add_edge(f"m{i}.py", "hub.py")
+        graph.add_edge("task.py", "helper.py")
+        assert graph.pagerank()["hub.py"] > graph.pagerank()["helper.py"]
+        scores = graph.pagerank(personalization={"task.py": 1.0})
+        assert scores["helper.py"] > scores["hub.py"]
+
+
+class TestPowerIteration:
+    def test_warm_start_converges_faster(self) -> None:
+        graph = _random_graph(2, n=2000)
+        matrix = LinkMatrix.from_adjacency(graph.forward, graph.reverse)
+        cold, cold_rounds = power_iteration(matrix, iterations=100, tolerance=1e-10)
+        graph.add_edge("f1.py", "f2.py")
+        changed = LinkMatrix.from_adjacency(graph.forward, graph.reverse)
+        start = changed.vector(matrix.to_dict(cold))
+        _, warm_rounds = power_iteration(changed, iterations=100, tolerance=1e-10, start=start)
+        assert warm_rounds < cold_rounds
+
+    def test_pure_python_fallback_matches(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        graph = _random_graph(3)
+        seeds = {"f1.py": 1.0, "f2.py": 0.5}
+        fast = personalized_rank(graph.forward, seeds)
+        monkeypatch.setattr(graph_rank, "_HAS_NUMPY", False)
+        slow = personalized_rank(graph.forward, seeds)
+        assert slow.keys() == fast.keys()
+        assert all(slow[k] == pytest.approx(fast[k], abs=1e-9) for k in fast)
+
+    def test_undirected_reaches_importers(self) -> None:
+        links = {"a.py": {"center.py"}, "center.py": {"b.py"}, "c.py": {"d.py"}}
+        directed = personalized_rank(links, {"center.py": 1.0})
+        undirected = personalized_rank(links, {"center.py": 1.0}, undirected=True)
+        assert directed["a.py"] == pytest.approx(0.0)
+        assert undirected["a.py"] > 0.0
+        assert undirected["c.py"] == pytest.approx(0.0)
@@ -0,0 +1,91 @@
+"""Tests for the brute-force search fallback (grep_scan)."""
+
+from __future__ import annotations
+
+import re
+from pathlib import Path
+
+from attocode.integrations.context.grep_scan import grep_files, iter_search_files
+
+
+def _create_tree(tmp_path: Path, files: dict[str, str]) -> Path:
+    for name, content in files.items():
+        fpath = tmp_path / name
+        fpath.parent.mkdir(parents=True, exist_ok=True)
+        fpath.write_text(content)
+    return tmp_path
+
+
+class TestIterSearchFiles:
+    def test_sorted_path_order(self, tmp_path: Path) -> None:
+        root = _create_tree(tmp_path, {
+            "a.py": "", "a/b.py": "", "a-b.py": "", "a/c/d.py": "", "B.py": "", "z/y.py": "",
+        })
+        expected = [p for p in sorted(root.rglob("*")) if p.is_file()]
+        assert list(iter_search_files(root)) == expected
+
+    def test_prunes_skip_dirs_extensions_and_dotfiles(self, tmp_path: Path) -> None:
+        root = _create_tree(tmp_path, {
+            "src/app.py": "",
+            "node_modules/pkg/index.js": "",
+            ".git/config": "",
+            ".venv/lib/x.py": "",
+            "__pycache__/app.cpython-312.pyc": "",
+            "logo.png": "",
+            ".env": "",
+        })
+        assert [p.relative_to(root).as_posix() for p in iter_search_files(root)] == ["src/app.py"]
+
+    def test_honors_gitignore(self, tmp_path: Path) -> None:
+        root = _create_tree(tmp_path, {
+            ".gitignore": "generated/\n*.log\n",
+            "generated/out.py": "",
+            "keep.py": "",
+            "debug.log": "",
+            "sub/trace.log": "",
+        })
+        assert [p.relative_to(root).as_posix() for p in iter_search_files(root)] == ["keep.py"]
+
+    def test_subdirectory_uses_project_gitignore(self, tmp_path: Path) -> None:
+        root = _create_tree(tmp_path, {
+            ".gitignore": "sub/skip/\n",
+            "sub/skip/a.py": "",
+            "sub/keep.py": "",
+        })
+        found = list(iter_search_files(root / "sub", root))
+        assert [p.relative_to(root).as_posix() for p in found] == ["sub/keep.py"]
+
+
+class TestGrepFiles:
+    def test_parallel_matches_serial_order(self, tmp_path: Path) -> None:
+        files = {f"d{i % 7}/f{i:03d}.py": f"x\nneedle {i}\ny\nneedle again {i}\n" for i in range(120)}
+        root = _create_tree(tmp_path, files)
+        regex = re.compile(r"needle")
+        paths = list(iter_search_files(root))
+        serial = grep_files(regex, paths, max_results=10_000, workers=1)
+        parallel = grep_files(regex, paths, max_results=10_000, workers=4)
+        assert parallel == serial
+        assert len(serial) == 240
+        assert serial[0] == (root / "d0" / "f000.py", 2, "needle 0")
+
+    def test_stops_at_max_results(self, tmp_path: Path) -> None:
+        root = _create_tree(tmp_path, {f"f{i:03d}.py": "hit\nhit\n" for i in range(200)})
+        pulled: list[Path] = []
+
+        def tracked():
+            for path in iter_search_files(root):
+                pulled.append(path)
+                yield path
+
+        hits = grep_files(re.compile("hit"), tracked(), max_results=5, workers=2)
+        assert [(p.name, i) for p, i, _ in hits] == [
+            ("f000.py", 1), ("f000.py", 2), ("f001.py", 1), ("f001.py", 2), ("f002.py", 1),
+        ]
+        assert len(pulled) < 200
+
+    def test_skips_undecodable_and_missing(self, tmp_path: Path) -> None:
+        root = _create_tree(tmp_path, {"ok.py": "match\n"})
+        (root / "bad.txt").write_bytes(b"match \xff\n")
+        paths = [root / "bad.txt", root / "missing.py", root / "ok.py"]
+        hits = grep_files(re.compile("match"), paths, max_results=10, workers=2)
+        assert hits == [(root / "ok.py", 1, "match")]
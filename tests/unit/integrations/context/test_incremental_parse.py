@@ -0,0 +1,219 @@
+"""Tests for incremental tree-sitter re-parsing and the TreeCache."""
+
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from attocode.integrations.context.codebase_ast import parse_file
+from attocode.integrations.context.incremental_parse import TreeCache
+from attocode.integrations.context.ts_parser import (
+    is_available,
+    ts_parse_file,
+    ts_reparse_file,
+)
+
+pytestmark = pytest.mark.skipif(
+    not is_available("python"), reason="tree-sitter-python not installed",
+)
+
+_SOURCE = '''import os
+from typing import Any
+
+LIMIT = 10
+
+
+@decorator
+def top(a, b=1):
+    """Doc."""
+    return a + b
+
+
+class Base:
+    def method(self, x: int) -> int:
+        return x
+
+    async def other(self):
+        pass
+
+
+class Child(Base):
+    def method(self, x):
+        return super().method(x)
+
+
+def tail():
+    pass
+'''
+
+
+_GO_SOURCE = """package m
+
+import "fmt"
+
+type T struct{ a int }
+
+func (t T) Get() int { return t.a }
+
+type U interface{ Get() int }
+
+func (u *U) Put(x int) {}
+
+func Free(a, b int) int {
+\treturn a + b
+}
+
+func (t *T) Set(a int) { fmt.Println(a) }
+"""
+
+_JS_SOURCE = """import { a } from './a';
+
+const LIMIT = 10;
+
+class Base {
+  method(x) { return x; }
+}
+
+class Child extends Base {
+  method(x) { return super.method(x); }
+  async other() {}
+}
+
+function top(a, b = 1) {
+  return a + b;
+}
+
+export function tail() {}
+"""
+
+_JAVA_SOURCE = """package m;
+
+import java.util.List;
+
+public class Base {
+    public int method(int x) { return x; }
+}
+
+class Child extends Base {
+    private void other() {}
+
+    static class Inner {
+        void run() {}
+    }
+}
+
+interface Shape {
+    double area();
+}
+"""
+
+# (file name, source, snippets inserted at random offsets)
+_RANDOM_EDIT_CASES = {
+    "python": ("m.py", _SOURCE, [
+        "\n", "x", "  ", "(", "# note\n", "@wrap\n", "import sys\n",
+        "def added(q):\n    return q\n", "class New:\n    def m(self): pass\n",
+    ]),
+    "go": ("m.go", _GO_SOURCE, [
+        "\n", "x", "T", "U", "{", "// note\n", "type T struct{}\n", "type V int\n",
+        "func (v V) M() {}\n", "func (t *T) N() {}\n", "func f() {}\n",
+    ]),
+    "javascript": ("m.js", _JS_SOURCE, [
+        "\n", "x", "{", "}", "// note\n", "class Base {}\n", "class New { m() {} }\n",
+        "function added(q) { return q; }\n", "import b from 'b';\n",
+    ]),
+    "java": ("M.java", _JAVA_SOURCE, [
+        "\n", "x", "{", "}", "// note\n", "class Base {}\n", "class New { void m() {} }\n",
+        "interface I { void i(); }\n", "int f() { return 1; }\n",
+    ]),
+}
+
+
+class TestReparse:
+    @pytest.mark.parametrize("language", sorted(_RANDOM_EDIT_CASES))
+    def test_random_edits_match_full_parse(self, language):
+        if not is_available(language):
+            pytest.skip(f"tree-sitter-{language} not installed")
+        name, source, snippets = _RANDOM_EDIT_CASES[language]
+        rng = random.Random(0)
+        source = source * 4
+        state = ts_reparse_file(name, source, language)
+        for _ in range(200):
+            start = rng.randrange(len(source) + 1)
+            end = min(len(source), start + rng.choice([0, 0, 1, 8, 40]))
+            insert = rng.choice(snippets) if rng.random() < 0.7 else ""
+            source = source[:start] + insert + source[end:]
+            state = ts_reparse_file(name, source, language, state)
+            assert state.result == ts_parse_file(name, content=source, language=language)
+
+    def test_unchanged_nodes_are_not_walked_again(self, monkeypatch):
+        from attocode.integrations.context import ts_parser
+
+        state = ts_reparse_file("m.py", _SOURCE, "python")
+        walked: list[str] = []
+        real = ts_parser._find_name
+
+        def _spy(node, source_bytes):
+            name = real(node, source_bytes)
+            walked.append(name)
+            return name
+
+        monkeypatch.setattr(ts_parser, "_find_name", _spy)
+        edited = _SOURCE.replace("return a + b", "return a - b\n\n")
+        state = ts_reparse_file("m.py", edited, "python", state)
+        assert "top" in walked
+        assert "Child" not in walked and "tail" not in walked
+        assert state.result == ts_parse_file("m.py", content=edited, language="python")
+        tail = next(f for f in state.result["functions"] if f["name"] == "tail")
+        assert tail["start_line"] == edited.splitlines().index("def tail():") + 1
+
+    def test_cross_node_methods_disable_reuse(self):
+        if not is_available("go"):
+            pytest.skip("tree-sitter-go not installed")
+        source = "package m\n\ntype T struct{}\n\nfunc (t *T) M() {}\n"
+        state = ts_reparse_file("m.go", source, "go")
+        assert state.chunks is None
+        source = source.replace("M()", "N()")
+        state = ts_reparse_file("m.go", source, "go", state)
+        assert state.result == ts_parse_file("m.go", content=source, language="go")
+
+    def test_renamed_class_reclaims_methods(self):
+        if not is_available("go"):
+            pytest.skip("tree-sitter-go not installed")
+        original = "package m\n\ntype T struct{ a int }\n\nfunc (t T) Get() {}\n"
+        state = ts_reparse_file("m.go", original, "go")
+        for source in (original.replace("type T", "type U"), original):
+            state = ts_reparse_file("m.go", source, "go", state)
+            assert state.result == ts_parse_file("m.go", content=source, language="go")
+
+
+class TestTreeCache:
+    def test_parse_matches_parse_file(self, tmp_path):
+        path = tmp_path / "m.py"
+        path.write_text(_SOURCE)
+        cache = TreeCache()
+        assert cache.parse(str(path)) == parse_file(str(path))
+        path.write_text(_SOURCE.replace("def tail", "def renamed"))
+        assert str(path) in cache
+        assert cache.parse(str(path)) == parse_file(str(path))
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        cache = TreeCache(max_files=2)
+        paths = []
+        for i in range(3):
+            path = tmp_path / f"m{i}.py"
+            path.write_text(f"def f{i}():\n    pass\n")
+            paths.append(str(path))
+        cache.parse(paths[0])
+        cache.parse(paths[1])
+        cache.parse(paths[0])
+        cache.parse(paths[2])
+        assert len(cache) == 2
+        assert paths[0] in cache and paths[1] not in cache
+
+    def test_other_languages_fall_back(self, tmp_path):
+        path = tmp_path / "notes.txt"
+        path.write_text("hello\n")
+        cache = TreeCache()
+        assert cache.parse(str(path)) == parse_file(str(path))
+        assert len(cache) == 0
@@ -200,6 +200,33 @@ class TestBulkOperations:
         assert stats["references"] == 0
         assert stats["dependencies"] == 0
 
+    def test_symbols_and_references_batch_replaces(self, populated_store):
+        populated_store.save_symbols_and_references_batch(
+            ["src/main.py", "src/utils.py"],
+            [("src/main.py", "run", "run", "function", 3, 9, "tree-sitter")],
+            [
+                ("src/utils.py", "run", "call", 7, 0, "tree-sitter", "parse"),
+                ("src/main.py", "run", "call", 4, 0, "lsp", ""),
+            ],
+        )
+        assert [s.name for s in populated_store.load_symbols()] == ["run"]
+        refs = sorted(populated_store.load_references(), key=lambda r: r.file_path)
+        assert [(r.file_path, r.line, r.source) for r in refs] == [
+            ("src/main.py", 4, "lsp"), ("src/utils.py", 7, "tree-sitter"),
+        ]
+        assert refs[1].caller_qualified_name == "parse"
+
+    def test_symbols_and_references_batch_rolls_back(self, populated_store):
+        import sqlite3
+
+        with pytest.raises(sqlite3.IntegrityError):
+            populated_store.save_symbols_and_references_batch(
+                ["src/main.py"],
+                [("src/missing.py", "x", "x", "function", 1, 1, "tree-sitter")],
+                [],
+            )
+        assert len(populated_store.load_symbols("src/main.py")) == 2
+
     def test_record_and_get_scan_time(self, store):
         assert store.get_last_scan_time() is None
         store.record_scan_time()
@@ -0,0 +1,72 @@
+"""Tests for the BM25 keyword postings (term -> doc ids / term frequencies)."""
+
+from __future__ import annotations
+
+import math
+
+import pytest
+
+from attocode.integrations.context import keyword_index
+from attocode.integrations.context.keyword_index import KeywordPostings
+
+_DOCS = [
+    {"budget": 2, "check": 1},
+    {"budget": 1, "token": 3},
+    {"auth": 1, "token": 1},
+    {},
+]
+_LENS = [3, 4, 2, 0]
+
+
+def _naive_bm25(terms: list[str], k1: float, b: float, avg_dl: float) -> dict[int, float]:
+    n = len(_DOCS)
+    scores: dict[int, float] = {}
+    for doc_id, tf_map in enumerate(_DOCS):
+        score = 0.0
+        for term in terms:
+            tf = tf_map.get(term, 0)
+            if tf == 0:
+                continue
+            df = sum(1 for d in _DOCS if term in d)
+            idf = math.log((n - df + 0.5) / (df + 0.5) + 1.0)
+            dl = _LENS[doc_id] or 1
+            score += idf * (tf * (k1 + 1)) / (tf + k1 * (1 - b + b * dl / avg_dl))
+        if score > 0:
+            scores[doc_id] = score
+    return scores
+
+
+@pytest.fixture(params=[True, False], ids=["numpy", "pure-python"])
+def numpy_mode(request, monkeypatch):
+    if request.param and not keyword_index._HAS_NUMPY:
+        pytest.skip("numpy not installed")
+    monkeypatch.setattr(keyword_index, "_HAS_NUMPY", request.param)
+    return request.param
+
+
+class TestKeywordPostings:
+    def test_inverts_term_freqs(self) -> None:
+        postings = KeywordPostings.from_term_freqs(_DOCS, _LENS)
+        assert postings.n_docs == 4
+        assert postings.n_terms == 4
+        assert postings.df("token") == 2
+        assert postings.df("missing") == 0
+        ids, tfs = postings.postings["token"]
+        assert list(ids) == [1, 2]
+        assert list(tfs) == [3, 1]
+
+    def test_rows_round_trip(self) -> None:
+        postings = KeywordPostings.from_term_freqs(_DOCS, _LENS)
+        restored = KeywordPostings.from_rows(list(postings.to_rows()), _LENS)
+        assert {t: (list(i), list(f)) for t, (i, f) in restored.postings.items()} == {
+            t: (list(i), list(f)) for t, (i, f) in postings.postings.items()
+        }
+
+    @pytest.mark.parametrize("terms", [["budget"], ["budget", "token"], ["token", "token"], ["nope"]])
+    def test_score_matches_naive_bm25(self, numpy_mode: bool, terms: list[str]) -> None:
+        postings = KeywordPostings.from_term_freqs(_DOCS, _LENS)
+        ids, scores, hits = postings.score(terms, k1=2.2, b=0.3, avg_dl=2.25)
+        expected = _naive_bm25(terms, k1=2.2, b=0.3, avg_dl=2.25)
+        assert list(ids) == sorted(expected)
+        assert list(scores) == pytest.approx([expected[d] for d in sorted(expected)])
+        assert list(hits) == [sum(1 for t in terms if t in _DOCS[d]) for d in sorted(expected)]
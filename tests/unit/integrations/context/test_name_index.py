@@ -0,0 +1,60 @@
+"""Tests for the prefix/trigram NameIndex behind symbol search."""
+
+from __future__ import annotations
+
+import random
+
+from attocode.integrations.context import name_index
+from attocode.integrations.context.name_index import NameIndex
+
+
+def _names(n: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    parts = ["get", "set", "parse", "config", "load", "http", "server", "x", "io", "_"]
+    return list({"".join(rng.choice(parts) for _ in range(rng.randint(1, 4))) for _ in range(n)})
+
+
+def _check(index: NameIndex, live: set[str], queries: list[str]) -> None:
+    for q in queries:
+        assert sorted(index.with_prefix(q)) == sorted(n for n in live if n.startswith(q)), q
+        assert sorted(index.containing(q)) == sorted(n for n in live if q in n), q
+
+
+class TestNameIndex:
+    QUERIES = ["", "g", "ge", "get", "pars", "config", "rse", "http_", "xio", "zzz", "_"]
+
+    def test_build_matches_scan(self):
+        names = _names(500)
+        index = NameIndex.build(names)
+        assert len(index) == len(names)
+        _check(index, set(names), self.QUERIES)
+
+    def test_incremental_updates_match_scan(self, monkeypatch):
+        monkeypatch.setattr(name_index, "_MIN_RESORT", 8)
+        monkeypatch.setattr(name_index, "_MIN_COMPACT", 16)
+        rng = random.Random(1)
+        pool = _names(400, seed=2)
+        live = set(pool[:100])
+        index = NameIndex.build(live)
+        for step in range(600):
+            name = rng.choice(pool)
+            if name in live and rng.random() < 0.6:
+                index.discard(name)
+                live.discard(name)
+            else:
+                index.add(name)
+                live.add(name)
+            if step % 50 == 0:
+                _check(index, live, self.QUERIES)
+        _check(index, live, self.QUERIES)
+        assert len(index) == len(live)
+
+    def test_readd_after_discard(self):
+        index = NameIndex.build(["alpha", "beta"])
+        index.discard("alpha")
+        assert index.with_prefix("al") == []
+        assert index.containing("lph") == []
+        index.add("alpha")
+        assert index.with_prefix("al") == ["alpha"]
+        assert index.containing("lph") == ["alpha"]
+        assert "alpha" in index
@@ -0,0 +1,154 @@
+"""Tests for the blob-keyed parse cache shared across checkouts."""
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from attocode.integrations.context import ast_service, parse_pool
+from attocode.integrations.context.ast_service import ASTService
+from attocode.integrations.context.codebase_ast import parse_file
+from attocode.integrations.context.parse_cache import ParseCache
+from attocode.integrations.context.parse_pool import iter_parsed
+
+_SOURCE = """\
+def helper(x):
+    return x * 2
+
+
+class Service:
+    def run(self):
+        return helper(3)
+"""
+
+
+def _checkout(root: Path, count: int = 6) -> Path:
+    src = root / "src"
+    src.mkdir(parents=True)
+    for i in range(count):
+        (src / f"mod_{i}.py").write_text(_SOURCE + f"\nVALUE_{i} = {i}\n", encoding="utf-8")
+    return root
+
+
+@pytest.fixture
+def cas_dir(tmp_path: Path, monkeypatch) -> Path:
+    path = tmp_path / "cas"
+    monkeypatch.setenv("ATTOCODE_CAS_DIR", str(path))
+    monkeypatch.setenv("ATTOCODE_PARSE_WORKERS", "1")
+    return path
+
+
+@pytest.fixture
+def parse_calls(monkeypatch) -> list[str]:
+    calls: list[str] = []
+
+    def _counting(path: str, content: str | None = None):
+        calls.append(path)
+        return parse_file(path, content)
+
+    monkeypatch.setattr(parse_pool, "parse_file", _counting)
+    return calls
+
+
+class TestParseCache:
+    def test_second_worktree_reuses_parses(self, tmp_path, cas_dir, parse_calls):
+        first = ASTService(str(_checkout(tmp_path / "wt1")))
+        first.initialize(force=True)
+        assert len(parse_calls) == 6
+
+        parse_calls.clear()
+        second = ASTService(str(_checkout(tmp_path / "wt2")))
+        second.initialize(force=True)
+        assert parse_calls == []
+        assert second._parse_cache.hits >= 6
+
+        rel = "src/mod_2.py"
+        assert second._ast_cache[rel].path == str(tmp_path / "wt2" / rel)
+        strip = lambda a: (a.functions, a.classes, a.imports, a.top_level_vars)  # noqa: E731
+        assert strip(second._ast_cache[rel]) == strip(first._ast_cache[rel])
+        refs = lambda svc: sorted(  # noqa: E731
+            (r.file_path, r.line, r.caller_qualified_name) for r in svc.get_callers("helper")
+        )
+        assert refs(second) == refs(first)
+
+    def test_call_sites_are_cached(self, tmp_path, cas_dir, monkeypatch):
+        ASTService(str(_checkout(tmp_path / "wt1"))).initialize(force=True)
+        scans: list[int] = []
+        real = ast_service._extract_call_sites
+        monkeypatch.setattr(
+            ast_service, "_extract_call_sites",
+            lambda content, ast: scans.append(1) or real(content, ast),
+        )
+        svc = ASTService(str(_checkout(tmp_path / "wt2")))
+        svc.initialize(force=True)
+        assert scans == []
+        assert {r.file_path for r in svc.get_callers("helper")} == {
+            f"src/mod_{i}.py" for i in range(6)
+        }
+
+    def test_identical_blobs_parse_once(self, tmp_path, cas_dir, parse_calls):
+        root = _checkout(tmp_path / "wt", count=1)
+        copy = root / "src" / "copy.py"
+        copy.write_text((root / "src" / "mod_0.py").read_text(), encoding="utf-8")
+        paths = [str(root / "src" / "mod_0.py"), str(copy)]
+        cache = ParseCache.open(str(root))
+        results = list(iter_parsed(paths, cache=cache))
+        assert len(parse_calls) == 1
+        assert [p for p, _ in results] == paths
+        assert results[1][1].path == str(copy)
+        assert results[1][1].functions == results[0][1].functions
+
+    def test_cached_asts_are_read_as_yielded(self, tmp_path, cas_dir, parse_calls, monkeypatch):
+        root = _checkout(tmp_path / "wt", count=4)
+        paths = sorted(str(p) for p in (root / "src").glob("*.py"))
+        list(iter_parsed(paths[:3], cache=ParseCache.open(str(root))))
+        parse_calls.clear()
+
+        reads: list[str] = []
+        real = ParseCache.get_ast
+        monkeypatch.setattr(
+            ParseCache, "get_ast",
+            lambda self, oid, path: reads.append(path) or real(self, oid, path),
+        )
+        stream = iter_parsed(paths, cache=ParseCache.open(str(root)))
+        assert next(stream)[0] == paths[0]
+        assert reads == paths[:1]
+        rest = list(stream)
+        assert reads == paths[:3]
+        assert parse_calls == paths[3:]
+        assert [p for p, _ in rest] == paths[1:]
+
+    def test_evicted_entry_is_parsed(self, tmp_path, cas_dir, parse_calls, monkeypatch):
+        root = _checkout(tmp_path / "wt", count=1)
+        paths = [str(root / "src" / "mod_0.py")]
+        list(iter_parsed(paths, cache=ParseCache.open(str(root))))
+        parse_calls.clear()
+
+        monkeypatch.setattr(ParseCache, "get_ast", lambda self, oid, path: None)
+        [(_, ast)] = list(iter_parsed(paths, cache=ParseCache.open(str(root))))
+        assert parse_calls == paths
+        assert [f.name for f in ast.functions] == ["helper"]
+
+    def test_changed_file_misses(self, tmp_path, cas_dir):
+        root = _checkout(tmp_path / "wt", count=1)
+        path = str(root / "src" / "mod_0.py")
+        cache = ParseCache.open(str(root))
+        cache.resolve([path])
+        assert cache.oid_for(path) is not None
+        Path(path).write_text("def other():\n    pass\n", encoding="utf-8")
+        assert cache.oid_for(path) is None
+        assert [f.name for f in cache.parse(path).functions] == ["other"]
+
+    def test_key_depends_on_parser(self, tmp_path, cas_dir):
+        a = ParseCache.open()
+        b = ParseCache.open(indexer_name="other", parser_modules=("json",))
+        oid = "sha256:" + "0" * 64
+        assert a.key(oid, "ast", "python") != b.key(oid, "ast", "python")
+        assert a.key(oid, "ast", "python") != a.key(oid, "ast", "go")
+        a.put(oid, "symbols", "python", [{"name": "x"}])
+        assert a.get(oid, "symbols", "python") == [{"name": "x"}]
+        assert b.get(oid, "symbols", "python") is None
+
+    def test_disabled_by_env(self, cas_dir, monkeypatch):
+        monkeypatch.setenv("ATTOCODE_PARSE_CACHE", "0")
+        assert ParseCache.open() is None
@@ -0,0 +1,131 @@
+"""Tests for the process-pool parse pipeline used by ASTService."""
+from __future__ import annotations
+
+import pickle
+import threading
+from pathlib import Path
+
+import pytest
+
+from attocode.integrations.context.ast_service import ASTService
+from attocode.integrations.context.codebase_ast import parse_file
+from attocode.integrations.context.hydration import TIER_MEDIUM
+from attocode.integrations.context.parse_pool import (
+    iter_parsed,
+    pack_ast,
+    resolve_workers,
+    unpack_ast,
+)
+
+_PY_SOURCE = '''\
+import os
+from typing import Any as A
+
+LIMIT = 3
+
+
+@decorator
+class Widget(Base, metaclass=Meta):
+    """A widget."""
+
+    size: int = 0
+
+    @staticmethod
+    def build(name: str, *args, key=None, **kw) -> "Widget":
+        return Widget()
+
+
+async def fetch(url, timeout=5):
+    yield url
+'''
+
+
+def _write_files(root: Path, count: int) -> list[str]:
+    src = root / "src"
+    src.mkdir(exist_ok=True)
+    paths = []
+    for i in range(count):
+        p = src / f"mod_{i}.py"
+        p.write_text(f"def func_{i}(x):\n    return x + {i}\n", encoding="utf-8")
+        paths.append(str(p))
+    return paths
+
+
+class TestPackedPayload:
+    def test_round_trip_preserves_ast(self, tmp_path: Path):
+        f = tmp_path / "w.py"
+        f.write_text(_PY_SOURCE, encoding="utf-8")
+        ast = parse_file(str(f))
+        assert ast.classes and ast.functions and ast.imports
+        assert unpack_ast(pickle.loads(pickle.dumps(pack_ast(ast)))) == ast
+
+    def test_packed_pickle_is_smaller(self, tmp_path: Path):
+        f = tmp_path / "w.py"
+        f.write_text(_PY_SOURCE, encoding="utf-8")
+        ast = parse_file(str(f))
+        assert len(pickle.dumps(pack_ast(ast))) < len(pickle.dumps(ast))
+
+
+class TestIterParsed:
+    def test_inline_matches_parse_file(self, tmp_path: Path):
+        paths = _write_files(tmp_path, 5)
+        results = list(iter_parsed(paths, workers=1))
+        assert [p for p, _ in results] == paths
+        assert [a for _, a in results] == [parse_file(p) for p in paths]
+
+    def test_process_pool_preserves_order(self, tmp_path: Path):
+        paths = _write_files(tmp_path, 40)
+        results = list(iter_parsed(paths, workers=2, chunk_size=7))
+        assert [p for p, _ in results] == paths
+        assert [a for _, a in results] == [parse_file(p) for p in paths]
+
+    def test_stop_event_ends_early(self, tmp_path: Path):
+        paths = _write_files(tmp_path, 10)
+        stop = threading.Event()
+        seen = []
+        for path, _ in iter_parsed(paths, workers=1):
+            seen.append(path)
+            if len(seen) == 3:
+                break
+        stop.set()
+        assert len(seen) == 3
+        assert list(iter_parsed(paths, workers=1, stop=stop)) == []
+
+    def test_resolve_workers(self, monkeypatch):
+        monkeypatch.delenv("ATTOCODE_PARSE_WORKERS", raising=False)
+        assert resolve_workers(None, 10) == 1
+        assert resolve_workers(3, 10) == 3
+        monkeypatch.setenv("ATTOCODE_PARSE_WORKERS", "2")
+        assert resolve_workers(None, 10) == 2
+        monkeypatch.setenv("ATTOCODE_PARSE_WORKERS", "many")
+        assert resolve_workers(None, 10) == 1
+
+
+class TestASTServiceUsesPool:
+    @pytest.fixture
+    def forced_pool(self, monkeypatch):
+        monkeypatch.setenv("ATTOCODE_PARSE_WORKERS", "2")
+
+    def test_initialize_matches_serial(self, tmp_path: Path, forced_pool, monkeypatch):
+        _write_files(tmp_path, 40)
+        pooled = ASTService(str(tmp_path))
+        pooled.initialize(force=True)
+
+        monkeypatch.setenv("ATTOCODE_PARSE_WORKERS", "1")
+        serial = ASTService(str(tmp_path))
+        serial.initialize(force=True)
+
+        assert pooled._ast_cache == serial._ast_cache
+        assert len(pooled._ast_cache) == 40
+        assert pooled.find_symbol("func_7")
+
+    def test_hydration_reports_progress(self, tmp_path: Path, forced_pool):
+        _write_files(tmp_path, 1100)
+        svc = ASTService(str(tmp_path))
+        state = svc.initialize_skeleton()
+        assert state.tier == TIER_MEDIUM
+        svc._hydration_state.phase = "hydrating"
+        svc._run_hydration()
+        assert state.phase == "ready"
+        assert state.parsed_files == 1100
+        assert state.reference_indexed_files == 1100
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import os
+import random
 from pathlib import Path
 
 import pytest
@@ -10,6 +11,7 @@ import pytest
 from attocode.integrations.context.semantic_search import (
     IndexProgress,
     SemanticSearchManager,
+    _FileCappedTopK,
     _KeywordDoc,
     _tokenize,
 )
@@ -234,12 +236,69 @@ class TestKeywordSearchContent:
         results = mgr._keyword_search("", top_k=5, file_filter="")
         assert results == []
 
+    def test_postings_reloaded_from_cache(self, repo_with_files: Path) -> None:
+        """A second manager reuses the persisted postings and ranks identically."""
+        first = self._make_mgr(repo_with_files)
+        expected = first._keyword_search("budget tokens", top_k=10, file_filter="")
+
+        second = self._make_mgr(repo_with_files)
+        second._build_keyword_index()
+        assert all(not d.term_freqs for d in second._kw_docs)  # JSON not decoded
+        results = second._keyword_search("budget tokens", top_k=10, file_filter="")
+        assert [(r.file_path, r.name, r.score) for r in results] == [
+            (r.file_path, r.name, r.score) for r in expected
+        ]
+
+    def test_stale_file_rebuilds_postings(self, repo_with_files: Path) -> None:
+        mgr = self._make_mgr(repo_with_files)
+        assert not mgr._keyword_search("quarantine", top_k=5, file_filter="")
+
+        target = repo_with_files / "auth.py"
+        target.write_text(
+            'def quarantine_session(token: str) -> None:\n'
+            '    """Quarantine a suspicious session."""\n',
+            encoding="utf-8",
+        )
+        mgr.invalidate_file(str(target))
+        results = mgr._keyword_search("quarantine", top_k=5, file_filter="")
+        assert results and results[0].name == "quarantine_session"
+
 
 # ============================================================
 # Background Indexer Tests
 # ============================================================
 
 
+class TestFileCappedTopK:
+    @staticmethod
+    def _sorted_top(items, k, cap):
+        counts: dict[str, int] = {}
+        out = []
+        for score, doc_id, path in sorted(items, key=lambda x: (-x[0], x[1])):
+            if counts.get(path, 0) < cap and len(out) < k:
+                counts[path] = counts.get(path, 0) + 1
+                out.append((score, doc_id))
+        return out
+
+    def test_matches_sort_and_bounds_kth_score(self) -> None:
+        rng = random.Random(0)
+        for _ in range(500):
+            k, cap = rng.randint(1, 6), rng.randint(0, 3)
+            items = [
+                (float(rng.randint(0, 9)), i, f"f{rng.randint(0, 4)}")
+                for i in range(rng.randint(0, 40))
+            ]
+            rng.shuffle(items)
+            running = _FileCappedTopK(k, cap)
+            for n, (score, doc_id, path) in enumerate(items, 1):
+                running.add(path, score, doc_id)
+                floor = running.threshold()
+                if floor is not None:
+                    expected = self._sorted_top(items[:n], k, cap)
+                    assert len(expected) == k and expected[-1][0] >= floor
+            assert running.top() == self._sorted_top(items, k, cap)
+
+
 class TestBackgroundIndexer:
     def test_index_progress_defaults(self) -> None:
         progress = IndexProgress()
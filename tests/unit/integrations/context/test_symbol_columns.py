@@ -0,0 +1,145 @@
+"""Tests for the columnar tables and CSR graphs behind CrossRefIndex."""
+
+from __future__ import annotations
+
+import random
+
+from attocode.integrations.context import symbol_columns
+from attocode.integrations.context.cross_references import CrossRefIndex, SymbolRef
+from attocode.integrations.context.symbol_columns import (
+    Graph,
+    GraphView,
+    MultiMap,
+    RecordsView,
+    RowTable,
+    StringTable,
+)
+
+
+def _refs_table(strings: StringTable) -> RowTable:
+    return RowTable(
+        strings, SymbolRef,
+        ("symbol_name", "ref_kind", "file_path", "line", "source", "caller_qualified_name"),
+        (True, True, True, False, True, True),
+        key="symbol_name", file="file_path",
+    )
+
+
+class TestRowTable:
+    def test_groups_follow_removals_and_compaction(self, monkeypatch):
+        monkeypatch.setattr(symbol_columns, "_MIN_COMPACT", 4)
+        rng = random.Random(0)
+        table = _refs_table(StringTable())
+        expected: list[SymbolRef] = []
+        for step in range(400):
+            if step % 7 == 6:
+                path = f"f{rng.randrange(10)}.py"
+                table.remove_file(path)
+                expected = [r for r in expected if r.file_path != path]
+            else:
+                ref = SymbolRef(
+                    f"s{rng.randrange(15)}", "call", f"f{rng.randrange(10)}.py",
+                    rng.randrange(1, 500), caller_qualified_name=f"c{rng.randrange(5)}",
+                )
+                table.append(ref)
+                expected.append(ref)
+        assert len(table) == len(expected)
+        by_name: dict[str, list[SymbolRef]] = {}
+        for ref in expected:
+            by_name.setdefault(ref.symbol_name, []).append(ref)
+        assert dict(RecordsView(table)) == by_name
+        for path in {r.file_path for r in expected}:
+            assert table.file_records(path) == [r for r in expected if r.file_path == path]
+
+    def test_remove_file_reports_emptied_keys(self):
+        table = _refs_table(StringTable())
+        table.append(SymbolRef("a", "call", "x.py", 1))
+        table.append(SymbolRef("a", "call", "y.py", 1))
+        table.append(SymbolRef("b", "call", "x.py", 2))
+        assert table.remove_file("x.py") == ["b"]
+        assert table.remove_file("missing.py") == []
+        assert [r.file_path for r in table.records("a")] == ["y.py"]
+
+    def test_replace_keeps_position(self):
+        table = _refs_table(StringTable())
+        table.append(SymbolRef("a", "call", "x.py", 1))
+        table.append(SymbolRef("a", "call", "x.py", 2))
+        row = table.find("a", "x.py", "line", 1)
+        table.replace(row, SymbolRef("a", "call", "x.py", 1, source="lsp"))
+        assert [r.source for r in table.records("a")] == ["lsp", "tree-sitter"]
+        assert table.find("a", "x.py", "line", 3) == -1
+
+
+class TestGraph:
+    def test_matches_dict_of_sets(self, monkeypatch):
+        monkeypatch.setattr(symbol_columns, "_MIN_OVERLAY", 8)
+        rng = random.Random(1)
+        graph = Graph()
+        fwd: dict[int, set[int]] = {}
+        for _ in range(3000):
+            src, dst = rng.randrange(40), rng.randrange(40)
+            op = rng.random()
+            if op < 0.6:
+                graph.add(src, dst)
+                fwd.setdefault(src, set()).add(dst)
+            elif op < 0.9:
+                graph.discard(src, dst)
+                fwd.get(src, set()).discard(dst)
+            elif op < 0.95:
+                graph.pop_successors(src)
+                fwd.pop(src, None)
+            else:
+                graph.pop_predecessors(dst)
+                for out in fwd.values():
+                    out.discard(dst)
+        fwd = {k: v for k, v in fwd.items() if v}
+        rev: dict[int, set[int]] = {}
+        for src, out in fwd.items():
+            for dst in out:
+                rev.setdefault(dst, set()).add(src)
+        assert len(graph) == sum(len(v) for v in fwd.values())
+        assert {n: set(graph.successors(n)) for n in graph.sources()} == fwd
+        assert {n: set(graph.predecessors(n)) for n in graph.targets()} == rev
+        for node in range(40):
+            assert len(graph.successors(node)) == len(fwd.get(node, ()))
+
+    def test_reach_handles_cycles(self):
+        graph = Graph()
+        for src, dst in [(0, 1), (1, 2), (2, 0), (2, 3)]:
+            graph.add(src, dst)
+        graph.compact()
+        assert graph.reach(0, 1) == {1}
+        assert graph.reach(0, 10) == {0, 1, 2, 3}
+        assert graph.reach(3, 2, reverse=True) == {2, 1}
+
+    def test_view_maps_strings(self):
+        strings = StringTable()
+        graph = Graph()
+        graph.add(strings.intern("a.py"), strings.intern("b.py"))
+        assert GraphView(graph, strings) == {"a.py": {"b.py"}}
+        assert GraphView(graph, strings, reverse=True) == {"b.py": {"a.py"}}
+        assert "c.py" not in GraphView(graph, strings)
+
+
+class TestMultiMap:
+    def test_singletons_unbox_and_rebox(self):
+        mm = MultiMap()
+        assert mm.add("parse", "a.parse") is True
+        assert mm.add("parse", "a.parse") is False
+        assert mm["parse"] == ("a.parse",)
+        mm.add("parse", "b.parse")
+        assert set(mm["parse"]) == {"a.parse", "b.parse"}
+        assert mm.discard("parse", "a.parse") is False
+        assert mm.get("parse") == ("b.parse",)
+        assert mm.discard("parse", "other") is False
+        assert mm.discard("parse", "b.parse") is True
+        assert mm == {} and mm.get("parse") == ()
+
+
+class TestIndexStorage:
+    def test_strings_are_interned(self):
+        idx = CrossRefIndex()
+        for line in range(3):
+            idx.add_reference(SymbolRef("".join(["pa", "rse"]), "call", "".join(["m", ".py"]), line))
+        refs = idx.references["parse"]
+        assert refs[0].file_path is refs[1].file_path is refs[2].file_path
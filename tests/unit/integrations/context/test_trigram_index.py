@@ -212,14 +212,16 @@ class TestTrigramIndexLifecycle:
         assert set(candidates1 or []) == set(candidates2 or [])
         idx2.close()
 
-    def test_update_file_invalidates(self, tmp_path: Path) -> None:
+    def test_update_file_keeps_index_ready(self, tmp_path: Path) -> None:
         proj = _create_project(tmp_path, {"a.py": "hello\n"})
         idx = TrigramIndex(index_dir=str(proj / ".attocode" / "index"))
         idx.build(str(proj))
         assert idx.is_ready() is True
 
         idx.update_file("a.py", b"changed content")
-        assert idx.is_ready() is False
+        assert idx.is_ready() is True
+        assert idx.query("changed") == ["a.py"]
+        assert idx.query("hello") == []
         idx.close()
 
     def test_remove_file(self, tmp_path: Path) -> None:
@@ -277,13 +279,42 @@ class TestTrigramGrepIntegration:
 # update_file and remove_file
 # ---------------------------------------------------------------------------
 class TestTrigramIndexUpdateRemove:
-    def test_update_file_marks_not_ready(self, tmp_path: Path) -> None:
+    def test_update_file_adds_new_file(self, tmp_path: Path) -> None:
         proj = _create_project(tmp_path, {"a.py": "hello world\n"})
         idx = TrigramIndex(index_dir=str(proj / ".attocode" / "index"))
         idx.build(str(proj))
-        assert idx.is_ready()
-        idx.update_file("a.py", b"changed content")
-        assert not idx.is_ready()
+        idx.update_file("new.py", b"def brand_new(): pass\n")
+        assert idx.query("brand_new") == ["new.py"]
+        assert idx.query("hello") == ["a.py"]
+        idx.close()
+
+    def test_update_file_binary_content_removes(self, tmp_path: Path) -> None:
+        proj = _create_project(tmp_path, {"a.py": "hello world\n"})
+        idx = TrigramIndex(index_dir=str(proj / ".attocode" / "index"))
+        idx.build(str(proj))
+        idx.update_file("a.py", b"\x00\x01\x02\x03" * 100)
+        assert idx.query("hello") == []
+        assert "a.py" not in idx._path_to_file_id
+        idx.close()
+
+    def test_update_file_skips_paths_build_skips(self, tmp_path: Path) -> None:
+        proj = _create_project(tmp_path, {"a.py": "hello world\n"})
+        idx = TrigramIndex(index_dir=str(proj / ".attocode" / "index"))
+        idx.build(str(proj))
+        for path in (".env", ".git/config", "node_modules/pkg/index.js", "src/.cache/x.py"):
+            idx.update_file(path, b"secret_token = 1\n")
+        assert idx.query("secret_token") == []
+        idx.update_file("src/ok.py", b"secret_token = 1\n")
+        assert idx.query("secret_token") == ["src/ok.py"]
+        idx.close()
+
+    def test_remove_file_tombstones_query_results(self, tmp_path: Path) -> None:
+        proj = _create_project(tmp_path, {"a.py": "hello\n", "b.py": "hello\n"})
+        idx = TrigramIndex(index_dir=str(proj / ".attocode" / "index"))
+        idx.build(str(proj))
+        idx.remove_file("a.py")
+        assert idx.query("hello") == ["b.py"]
+        assert idx.delta_stats()["tombstones"] == 1
         idx.close()
 
     def test_remove_file_drops_mapping(self, tmp_path: Path) -> None:
@@ -543,3 +574,402 @@ class TestExplainMode:
         assert result.threshold_triggered is False
         assert result.candidates is not None
         idx.close()
+
+
+# ---------------------------------------------------------------------------
+# Delta segment persistence and compaction
+# ---------------------------------------------------------------------------
+class TestTrigramIndexDelta:
+    def test_delta_survives_reload(self, tmp_path: Path) -> None:
+        proj = _create_project(tmp_path, {"a.py": "hello\n", "b.py": "world\n"})
+        index_dir = str(proj / ".attocode" / "index")
+        idx = TrigramIndex(index_dir=index_dir)
+        idx.build(str(proj))
+        idx.update_file("a.py", b"goodbye\n")
+        idx.remove_file("b.py")
+        idx.close()
+
+        idx2 = TrigramIndex(index_dir=index_dir)
+        assert idx2.load() is True
+        assert idx2.query("goodbye") == ["a.py"]
+        assert idx2.query("hello") == []
+        assert idx2.query("world") == []
+        assert idx2.delta_stats()["log_records"] == 2
+        idx2.close()
+
+    def test_repeated_updates_keep_single_entry(self, tmp_path: Path) -> None:
+        proj = _create_project(tmp_path, {"a.py": "hello\n"})
+        idx = TrigramIndex(index_dir=str(proj / ".attocode" / "index"))
+        idx.build(str(proj))
+        for i in range(5):
+            idx.update_file("a.py", f"version_{i}\n".encode())
+        assert idx.query("version_4") == ["a.py"]
+        assert idx.query("version_3") == []
+        assert idx.delta_stats()["delta_files"] == 1
+        idx.close()
+
+    def test_compact_folds_delta_into_base(self, tmp_path: Path) -> None:
+        proj = _create_project(tmp_path, {"a.py": "hello\n", "b.py": "world\n"})
+        index_dir = str(proj / ".attocode" / "index")
+        idx = TrigramIndex(index_dir=index_dir)
+        idx.build(str(proj))
+        idx.update_file("a.py", b"goodbye\n")
+        idx.update_file("c.py", b"fresh file\n")
+        idx.remove_file("b.py")
+
+        stats = idx.compact()
+        assert stats["compacted"] is True
+        assert stats["files_merged"] == 2
+        assert idx.delta_stats() == {
+            "delta_files": 0, "tombstones": 0, "delta_trigrams": 0, "log_records": 0,
+        }
+        assert not os.path.exists(os.path.join(index_dir, "trigrams.delta"))
+        assert idx.query("goodbye") == ["a.py"]
+        assert idx.query("fresh") == ["c.py"]
+        assert idx.query("world") == []
+        idx.close()
+
+        idx2 = TrigramIndex(index_dir=index_dir)
+        assert idx2.load() is True
+        assert idx2.query("fresh") == ["c.py"]
+        idx2.close()
+
+    def test_compact_noop_without_delta(self, tmp_path: Path) -> None:
+        proj = _create_project(tmp_path, {"a.py": "hello\n"})
+        idx = TrigramIndex(index_dir=str(proj / ".attocode" / "index"))
+        idx.build(str(proj))
+        assert idx.compact()["compacted"] is False
+        idx.close()
+
+    def test_threshold_triggers_background_compaction(self, tmp_path: Path) -> None:
+        import time
+
+        proj = _create_project(tmp_path, {"a.py": "hello\n"})
+        idx = TrigramIndex(index_dir=str(proj / ".attocode" / "index"), compact_threshold=2)
+        idx.build(str(proj))
+        idx.update_file("x.py", b"xray\n")
+        idx.update_file("y.py", b"yankee\n")
+        deadline = time.monotonic() + 5.0
+        while idx.delta_stats()["delta_files"] and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert idx.delta_stats()["delta_files"] == 0
+        assert idx.query("yankee") == ["y.py"]
+        idx.close()
+
+    def test_rebuild_discards_stale_delta(self, tmp_path: Path) -> None:
+        proj = _create_project(tmp_path, {"a.py": "hello\n"})
+        index_dir = str(proj / ".attocode" / "index")
+        idx = TrigramIndex(index_dir=index_dir)
+        idx.build(str(proj))
+        idx.update_file("a.py", b"edited in delta\n")
+        idx.build(str(proj))
+        assert idx.query("hello") == ["a.py"]
+        assert idx.query("edited") == []
+        assert idx.delta_stats()["log_records"] == 0
+        idx.close()
+
+    def test_torn_log_tail_is_ignored(self, tmp_path: Path) -> None:
+        proj = _create_project(tmp_path, {"a.py": "hello\n"})
+        index_dir = str(proj / ".attocode" / "index")
+        idx = TrigramIndex(index_dir=index_dir)
+        idx.build(str(proj))
+        idx.update_file("b.py", b"second file\n")
+        idx.close()
+        with open(os.path.join(index_dir, "trigrams.delta"), "ab") as f:
+            f.write(b"\x01\x02\x03")
+
+        idx2 = TrigramIndex(index_dir=index_dir)
+        assert idx2.load() is True
+        assert idx2.query("second") == ["b.py"]
+        idx2.update_file("c.py", b"third file\n")
+        idx2.close()
+
+        idx3 = TrigramIndex(index_dir=index_dir)
+        idx3.load()
+        assert idx3.query("third") == ["c.py"]
+        idx3.close()
+
+
+# ---------------------------------------------------------------------------
+# Vectorized / parallel build pipeline
+# ---------------------------------------------------------------------------
+class TestTrigramBuildPipeline:
+    def test_vectorized_kernel_matches_scalar(self) -> None:
+        import random
+
+        from attocode.integrations.context import trigram_index as ti
+
+        rng = random.Random(7)
+        samples = [
+            b"",
+            b"ab",
+            b"def hello_world():\n\treturn 42\r\n",
+            "unicode ünïcödé → λ".encode(),
+            bytes(rng.randrange(256) for _ in range(4096)),
+        ]
+        for content in samples:
+            assert set(ti._trigram_hashes_array(content).tolist()) == (
+                ti._extract_trigrams_from_bytes(content)
+            )
+
+    def test_parallel_build_matches_inline(self, tmp_path: Path, monkeypatch) -> None:
+        from attocode.integrations.context import trigram_index as ti
+
+        files = {f"pkg/mod_{i}.py": f"def func_{i}(): return 'token_{i % 3}'\n" for i in range(12)}
+        proj = _create_project(tmp_path, files)
+        monkeypatch.setattr(ti, "_BATCH_SIZE", 4)
+
+        inline = TrigramIndex(index_dir=str(proj / ".attocode" / "index"))
+        stats = inline.build(str(proj), workers=1)
+        assert stats["workers"] == 1
+        expected = {p: sorted(inline.query(p) or []) for p in ("func_7", "token_1", "return")}
+        inline.close()
+
+        parallel_dir = tmp_path / "parallel_index"
+        parallel = TrigramIndex(index_dir=str(parallel_dir))
+        stats = parallel.build(str(proj), workers=2)
+        assert stats["workers"] == 2
+        assert stats["files_indexed"] == 12
+        assert set(stats["phase_ms"]) == {"enumerate", "extract", "merge", "write", "load"}
+        for pattern, paths in expected.items():
+            assert sorted(parallel.query(pattern) or []) == paths
+        parallel.close()
+
+    def test_build_without_numpy(self, tmp_path: Path, monkeypatch) -> None:
+        from attocode.integrations.context import trigram_index as ti
+
+        proj = _create_project(tmp_path, {"a.py": "def hello(): pass\n", "b.py": "world\n"})
+        monkeypatch.setattr(ti, "_HAS_NUMPY", False)
+        idx = TrigramIndex(index_dir=str(proj / ".attocode" / "index"))
+        stats = idx.build(str(proj))
+        assert stats["files_indexed"] == 2
+        assert idx.query("hello") == ["a.py"]
+        idx.update_file("b.py", b"hello again\n")
+        assert sorted(idx.query("hello") or []) == ["a.py", "b.py"]
+        idx.close()
+
+    def test_edits_during_build_are_replayed(self, tmp_path: Path, monkeypatch) -> None:
+        from attocode.integrations.context import trigram_index as ti
+
+        proj = _create_project(tmp_path, {"a.py": "hello\n"})
+        idx = TrigramIndex(index_dir=str(proj / ".attocode" / "index"))
+        idx.build(str(proj))
+
+        real_extract_all = ti._extract_all
+
+        def _extract_then_edit(*args, **kwargs):
+            result = real_extract_all(*args, **kwargs)
+            idx.update_file("late.py", b"arrived mid build\n")
+            return result
+
+        monkeypatch.setattr(ti, "_extract_all", _extract_then_edit)
+        idx.build(str(proj))
+        assert idx.query("arrived") == ["late.py"]
+        assert idx.query("hello") == ["a.py"]
+        idx.close()
+
+
+# ---------------------------------------------------------------------------
+# Postings format v2 (delta + varint) and v1 compatibility
+# ---------------------------------------------------------------------------
+def _write_v1_index(index_dir: Path, postings: dict[int, list[int]]) -> None:
+    """Rewrite lookup/postings in the legacy fixed-width v1 layout."""
+    import struct
+
+    from attocode.integrations.context import trigram_index as ti
+
+    blob = bytearray()
+    entries = []
+    for h in sorted(postings):
+        ids = sorted(postings[h])
+        part = struct.pack(f"<I{len(ids)}I", len(ids), *ids)
+        entries.append(struct.pack("<IQI", h, len(blob), len(part)))
+        blob += part
+    header = struct.pack("<IHIh", ti._MAGIC, 1, len(entries), 0)
+    (index_dir / "trigrams.lookup").write_bytes(header + b"".join(entries))
+    (index_dir / "trigrams.postings").write_bytes(bytes(blob))
+
+
+class TestPostingsFormat:
+    def test_varint_roundtrip_large_gaps(self) -> None:
+        import numpy as np
+
+        from attocode.integrations.context import trigram_index as ti
+
+        ids = [0, 1, 127, 128, 16_383, 16_384, 2_097_152, 268_435_456, 4_294_967_295]
+        gaps = [b - a for a, b in zip([0, *ids], ids, strict=False)]
+        buf = ti._encode_varints(gaps)
+        assert ti._decode_varints(buf, len(gaps)) == gaps
+        decoded = ti._decode_varint_array(np.frombuffer(buf, dtype=np.uint8))
+        assert decoded.tolist() == gaps
+
+    def test_vectorized_and_scalar_encoders_agree(self) -> None:
+        import random
+        import struct
+
+        import numpy as np
+
+        from attocode.integrations.context import trigram_index as ti
+
+        rng = random.Random(3)
+        postings = {
+            rng.randrange(2**32): sorted(rng.sample(range(1, 500_000), rng.randrange(1, 40)))
+            for _ in range(200)
+        }
+        hashes = np.array([h for h, ids in postings.items() for _ in ids], dtype=np.uint32)
+        file_ids = np.array([f for ids in postings.values() for f in ids], dtype=np.uint32)
+        lookup, blob, n = ti._encode_pairs(hashes, file_ids)
+        assert n == len(postings)
+        assert (lookup, blob) == ti._encode_postings(postings)
+
+        for h, offset, length in struct.iter_unpack("<IQI", lookup[ti._HEADER_SIZE:]):
+            assert ti._decode_posting_list(blob, offset, length) == postings[h]
+            assert ti._decode_posting_array(blob, offset, length).tolist() == postings[h]
+
+    def test_v2_is_smaller_than_v1(self, tmp_path: Path) -> None:
+        files = {f"m{i}.py": "def common_function(): return shared_value\n" for i in range(300)}
+        proj = _create_project(tmp_path, files)
+        index_dir = proj / ".attocode" / "index"
+        idx = TrigramIndex(index_dir=str(index_dir))
+        idx.build(str(proj))
+        v2_size = (index_dir / "trigrams.postings").stat().st_size
+        fids = sorted(idx._file_id_to_path)
+        idx.close()
+        # Every file holds every trigram: v1 spends 4 bytes per posting.
+        assert v2_size < 4 * len(fids) * 30
+
+    def test_loads_and_queries_v1_index(self, tmp_path: Path) -> None:
+        from attocode.integrations.context import trigram_index as ti
+
+        proj = _create_project(tmp_path, {"a.py": "hello world\n", "b.py": "hello there\n"})
+        index_dir = proj / ".attocode" / "index"
+        idx = TrigramIndex(index_dir=str(index_dir))
+        idx.build(str(proj))
+        path_ids = dict(idx._path_to_file_id)
+        idx.close()
+
+        postings: dict[int, list[int]] = {}
+        for rel, fid in path_ids.items():
+            for h in ti._extract_trigrams_from_bytes((proj / rel).read_bytes()):
+                postings.setdefault(h, []).append(fid)
+        _write_v1_index(index_dir, postings)
+
+        legacy = TrigramIndex(index_dir=str(index_dir))
+        assert legacy.load() is True
+        assert legacy._format_version == 1
+        assert sorted(legacy.query("hello") or []) == ["a.py", "b.py"]
+        assert legacy.query("there") == ["b.py"]
+
+        # Compaction rewrites the base in the current format.
+        legacy.update_file("c.py", b"hello again\n")
+        assert legacy.compact()["compacted"] is True
+        assert legacy._format_version == ti._VERSION
+        assert sorted(legacy.query("hello") or []) == ["a.py", "b.py", "c.py"]
+        legacy.close()
+
+
+def _grep_files(proj: Path, pattern: str, paths: list[str]) -> list[tuple[str, int, str]]:
+    """Reference result: read each file and match line by line."""
+    import re
+
+    regex = re.compile(pattern)
+    hits: list[tuple[str, int, str]] = []
+    for rel in paths:
+        try:
+            text = (proj / rel).read_text(encoding="utf-8", errors="strict")
+        except (UnicodeDecodeError, OSError):
+            continue
+        hits.extend((rel, i, line) for i, line in enumerate(text.splitlines(), 1) if regex.search(line))
+    return hits
+
+
+class TestPositionalMode:
+    _FILES = {
+        "a.py": "def hello():\n    return 'hello world'\n\nx = hello()",
+        "b.py": "first\r\nhello crlf\r\n",
+        "c.py": "form\x0cfeed hello\nnext hello line\n",
+        "d.py": "nothing to see\n",
+    }
+
+    def _build(self, tmp_path: Path, **kwargs) -> tuple[Path, TrigramIndex]:
+        proj = _create_project(tmp_path, self._FILES)
+        idx = TrigramIndex(index_dir=str(proj / ".attocode" / "index"), positional=True, **kwargs)
+        stats = idx.build(str(proj))
+        assert stats["positional"] is True
+        assert stats["snapshot_bytes"] > 0
+        return proj, idx
+
+    @pytest.mark.parametrize(
+        "pattern", ["hello", r"hello\(\)", r"def \w+\(\)", "^x = ", r"hello$", "crlf$", "o w"],
+    )
+    def test_matches_file_reads(self, tmp_path: Path, pattern: str) -> None:
+        import re
+
+        proj, idx = self._build(tmp_path)
+        paths = sorted(self._FILES)
+        assert idx.search_lines(re.compile(pattern), paths) == _grep_files(proj, pattern, paths)
+        idx.close()
+
+    def test_no_file_io(self, tmp_path: Path) -> None:
+        import re
+
+        proj, idx = self._build(tmp_path)
+        for rel in self._FILES:
+            (proj / rel).unlink()
+        hits = idx.search_lines(re.compile("hello"), ["a.py"], max_results=2)
+        assert hits == [("a.py", 1, "def hello():"), ("a.py", 2, "    return 'hello world'")]
+        idx.close()
+
+    def test_non_utf8_files_skipped(self, tmp_path: Path) -> None:
+        import re
+
+        proj, idx = self._build(tmp_path)
+        (proj / "latin.txt").write_bytes(b"caf\xe9 hello\n")
+        idx.update_file("latin.txt", (proj / "latin.txt").read_bytes())
+        assert "latin.txt" in idx.query("hello")
+        assert idx.search_lines(re.compile("hello"), ["latin.txt"]) == []
+        idx.close()
+
+    def test_delta_edits_survive_reload_and_compaction(self, tmp_path: Path) -> None:
+        import re
+
+        proj, idx = self._build(tmp_path)
+        idx.update_file("d.py", b"now hello here\n")
+        idx.remove_file("a.py")
+        regex = re.compile("hello")
+        expected = [("b.py", 2, "hello crlf"), ("d.py", 1, "now hello here")]
+        assert idx.search_lines(regex, ["a.py", "b.py", "d.py"]) == expected
+        idx.close()
+
+        reloaded = TrigramIndex(index_dir=str(proj / ".attocode" / "index"))
+        assert reloaded.load()
+        assert reloaded.has_positions()
+        assert reloaded.search_lines(regex, ["a.py", "b.py", "d.py"]) == expected
+        assert reloaded.compact()["compacted"]
+        assert reloaded.has_positions()
+        assert reloaded.search_lines(regex, ["a.py", "b.py", "d.py"]) == expected
+        reloaded.close()
+
+    def test_non_positional_build_drops_snapshot(self, tmp_path: Path) -> None:
+        import re
+
+        proj, idx = self._build(tmp_path)
+        idx.close()
+        plain = TrigramIndex(index_dir=str(proj / ".attocode" / "index"))
+        plain.build(str(proj))
+        assert not plain.has_positions()
+        assert plain.search_lines(re.compile("hello"), ["a.py"]) is None
+        assert not (proj / ".attocode" / "index" / "trigrams.content").exists()
+        plain.close()
+
+    def test_snapshot_for_other_base_ignored(self, tmp_path: Path) -> None:
+        proj, idx = self._build(tmp_path)
+        idx.close()
+        index_dir = proj / ".attocode" / "index"
+        saved = (index_dir / "trigrams.lines").read_bytes()
+        TrigramIndex(index_dir=str(index_dir), positional=True).build(str(proj))
+        (index_dir / "trigrams.lines").write_bytes(saved)
+        stale = TrigramIndex(index_dir=str(index_dir))
+        assert stale.load()
+        assert not stale.has_positions()
+        stale.close()
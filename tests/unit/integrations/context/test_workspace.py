@@ -0,0 +1,253 @@
+"""Tests for the shared workspace snapshot and content cache."""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pytest
+
+from attocode.integrations.context import workspace
+from attocode.integrations.context.workspace import (
+    ContentCache,
+    WorkspaceSnapshot,
+    decode_text,
+    read_many,
+    workspace_snapshot,
+)
+
+_OLD_NS = 1_000_000_000_000_000_000  # 2001-09-09, far outside the racy window
+
+
+def _create_tree(tmp_path: Path, files: dict[str, str]) -> Path:
+    for name, content in files.items():
+        fpath = tmp_path / name
+        fpath.parent.mkdir(parents=True, exist_ok=True)
+        fpath.write_text(content)
+    return tmp_path
+
+
+def _age(*paths: Path) -> None:
+    for path in paths:
+        os.utime(path, ns=(_OLD_NS, _OLD_NS))
+
+
+@pytest.fixture
+def cache(monkeypatch) -> ContentCache:
+    fresh = ContentCache(max_bytes=1 << 20)
+    monkeypatch.setattr(workspace, "_content_cache", fresh)
+    return fresh
+
+
+class TestWorkspaceSnapshot:
+    def test_sorted_order_and_pruning(self, tmp_path: Path) -> None:
+        root = _create_tree(tmp_path, {
+            "a.py": "", "a/b.py": "", "a-b.py": "", "a/c/d.py": "", "B.py": "",
+            ".env": "", "node_modules/x.js": "", ".git/config": "", "build/out.py": "",
+        })
+        (root / "link").symlink_to(root / "a", target_is_directory=True)
+        listed = [f.rel_path for f in WorkspaceSnapshot(root=str(root)).files()]
+        assert listed == [".env", "B.py", "a/b.py", "a/c/d.py", "a-b.py", "a.py"]
+
+    def test_subdir_is_listed_even_if_pruned(self, tmp_path: Path) -> None:
+        root = _create_tree(tmp_path, {"build/out.py": "", "build/dist/x.py": "", "src/a.py": ""})
+        snapshot = WorkspaceSnapshot(root=str(root))
+        assert [f.rel_path for f in snapshot.files("build")] == ["build/out.py"]
+        assert [f.rel_path for f in snapshot.files()] == ["src/a.py"]
+        with pytest.raises(ValueError):
+            snapshot.files("../elsewhere")
+
+    def test_consumers_choose_their_skip_dirs(self, tmp_path: Path) -> None:
+        root = _create_tree(tmp_path, {
+            "a.py": "", "vendor/v.py": "", ".hidden/h.py": "", "node_modules/n.js": "",
+        })
+        snapshot = WorkspaceSnapshot(root=str(root))
+        assert [f.rel_path for f in snapshot.files()] == ["a.py"]
+        assert [f.rel_path for f in snapshot.files(skip_dirs={"node_modules"})] == [
+            "a.py", "vendor/v.py",
+        ]
+        everything = snapshot.files(skip_dirs=(), skip_dot_dirs=False)
+        assert [f.rel_path for f in everything] == [
+            ".hidden/h.py", "a.py", "node_modules/n.js", "vendor/v.py",
+        ]
+        # Listings made for a wider consumer survive a narrower refresh.
+        snapshot.files()
+        assert "vendor" in snapshot._dirs
+
+    def test_removed_directories_are_forgotten(self, tmp_path: Path) -> None:
+        root = _create_tree(tmp_path, {"a/b/c.py": "", "d.py": ""})
+        snapshot = WorkspaceSnapshot(root=str(root))
+        snapshot.files()
+        (root / "a" / "b" / "c.py").unlink()
+        (root / "a" / "b").rmdir()
+        (root / "a").rmdir()
+        assert [f.rel_path for f in snapshot.files()] == ["d.py"]
+        assert set(snapshot._dirs) == {""}
+
+    def test_unchanged_directories_are_not_relisted(self, tmp_path: Path, monkeypatch) -> None:
+        root = _create_tree(tmp_path, {"a/x.py": "", "b/y.py": ""})
+        _age(root, root / "a", root / "b")
+        snapshot = WorkspaceSnapshot(root=str(root))
+        snapshot.files()
+
+        listed: list[str] = []
+        real_scandir = os.scandir
+
+        def counting(path):
+            listed.append(os.path.relpath(path, root))
+            return real_scandir(path)
+
+        monkeypatch.setattr(workspace.os, "scandir", counting)
+        assert [f.rel_path for f in snapshot.files()] == ["a/x.py", "b/y.py"]
+        assert listed == []
+
+        (root / "b" / "z.py").write_text("")
+        assert [f.rel_path for f in snapshot.files()] == ["a/x.py", "b/y.py", "b/z.py"]
+        assert listed == ["b"]
+
+    def test_recently_changed_directories_are_relisted(self, tmp_path: Path) -> None:
+        root = _create_tree(tmp_path, {"a.py": ""})
+        snapshot = WorkspaceSnapshot(root=str(root))
+        snapshot.files()
+        st = os.stat(root)
+        (root / "b.py").write_text("")
+        os.utime(root, ns=(st.st_atime_ns, st.st_mtime_ns))  # same-tick change
+        assert [f.rel_path for f in snapshot.files()] == ["a.py", "b.py"]
+
+    def test_shared_per_resolved_root(self, tmp_path: Path) -> None:
+        (tmp_path / "real").mkdir()
+        (tmp_path / "alias").symlink_to(tmp_path / "real", target_is_directory=True)
+        assert workspace_snapshot(str(tmp_path / "alias")) is workspace_snapshot(
+            str(tmp_path / "real"),
+        )
+
+
+class TestContentCache:
+    def test_hits_until_stat_changes(self, tmp_path: Path, cache: ContentCache) -> None:
+        path = tmp_path / "a.py"
+        path.write_text("one")
+        _age(path)
+        assert workspace.read_bytes(str(path)) == b"one"
+        assert workspace.read_bytes(str(path)) == b"one"
+        assert (cache.hits, cache.misses) == (1, 1)
+
+        path.write_text("three")
+        assert workspace.read_bytes(str(path)) == b"three"
+        assert cache.misses == 2
+
+    def test_recent_files_are_not_kept(self, tmp_path: Path, cache: ContentCache) -> None:
+        path = tmp_path / "a.py"
+        path.write_text("one")
+        assert workspace.read_bytes(str(path)) == b"one"
+        st = os.stat(path)
+        path.write_text("two")  # same size, possibly the same mtime tick
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+        assert workspace.read_bytes(str(path)) == b"two"
+        assert len(cache) == 0
+
+    def test_budget_evicts_least_recently_used(self, tmp_path: Path) -> None:
+        cache = ContentCache(max_bytes=16 * 100)
+        paths = []
+        for i in range(20):
+            path = tmp_path / f"f{i}.py"
+            path.write_bytes(b"x" * 100)
+            _age(path)
+            paths.append(str(path))
+            cache.read(str(path))
+        assert len(cache) == 16
+        cache.read(paths[0])
+        assert cache.hits == 0
+        cache.read(paths[-1])
+        assert cache.hits == 1
+
+    def test_disabled_budget_reads_through(self, tmp_path: Path) -> None:
+        path = tmp_path / "a.py"
+        path.write_text("one")
+        _age(path)
+        cache = ContentCache(max_bytes=0)
+        assert cache.read(str(path)) == cache.read(str(path)) == b"one"
+        assert len(cache) == 0
+
+    def test_budget_from_environment(self, monkeypatch) -> None:
+        monkeypatch.setenv("ATTOCODE_WORKSPACE_CACHE_MB", "0.5")
+        assert workspace._cache_budget() == 512 * 1024
+        monkeypatch.setenv("ATTOCODE_WORKSPACE_CACHE_MB", "0")
+        assert workspace._cache_budget() == 0
+
+
+class TestReaders:
+    def test_read_many_keeps_input_order(self, tmp_path: Path, cache: ContentCache) -> None:
+        paths = []
+        for i in range(50):
+            path = tmp_path / f"f{i:02d}.py"
+            path.write_text(f"content {i}")
+            paths.append(str(path))
+        paths.insert(7, str(tmp_path / "missing.py"))
+        serial = list(read_many(paths, workers=1))
+        assert list(read_many(paths, workers=4)) == serial
+        assert serial[7] == (str(tmp_path / "missing.py"), None)
+        assert serial[0] == (paths[0], b"content 0")
+
+    def test_decode_matches_read_text(self, tmp_path: Path) -> None:
+        path = tmp_path / "a.txt"
+        path.write_bytes(b"a\r\nb\rc\n\xff\r")
+        assert decode_text(path.read_bytes()) == path.read_text(encoding="utf-8", errors="replace")
+
+
+class TestSharedReads:
+    def test_scanners_share_reads(self, tmp_path: Path, cache: ContentCache) -> None:
+        from attocode.integrations.security.dataflow import analyze_project
+        from attocode.integrations.security.scanner import SecurityScanner
+
+        root = _create_tree(tmp_path, {
+            "app.py": "import os\ndef f(request):\n    os.system(request.args['c'])\n",
+            "web/page.js": "el.innerHTML = location.hash;\n",
+            "site/skip.py": "password = 'hunter2hunter2'\n",
+        })
+        _age(*(p for p in root.rglob("*") if p.is_file()))
+        SecurityScanner(root_dir=str(root)).scan(mode="full")
+        assert cache.misses == 2  # site/ is skipped by the security scanner
+        analyze_project(str(root))  # reads site/ as well
+        assert (cache.hits, cache.misses) == (2, 3)
+
+
+class TestConsumerSkipSets:
+    """Sharing the listing keeps each scanner's own directory skip set."""
+
+    @pytest.fixture
+    def root(self, tmp_path: Path) -> Path:
+        return _create_tree(tmp_path, {
+            "app.py": "", "vendor/v.py": "", "out/o.py": "", "site/s.py": "",
+            ".hidden/h.py": "", "build/b.py": "", "node_modules/n.js": "",
+        })
+
+    def test_trigram_index(self, root: Path) -> None:
+        from attocode.integrations.context.trigram_index import TrigramIndex
+
+        assert TrigramIndex._enumerate_files(root) == [
+            "app.py", "out/o.py", "site/s.py", "vendor/v.py",
+        ]
+
+    def test_grep_fallback(self, root: Path) -> None:
+        from attocode.integrations.context.grep_scan import iter_search_files
+
+        assert [p.relative_to(root).as_posix() for p in iter_search_files(root)] == [
+            "app.py", "out/o.py", "site/s.py", "vendor/v.py",
+        ]
+
+    def test_dataflow(self, root: Path) -> None:
+        from attocode.integrations.security.dataflow import analyze_project
+
+        assert analyze_project(str(root)).files_analyzed == 5  # .hidden, out, site, vendor
+
+    def test_rules_runner(self, root: Path) -> None:
+        from attocode.code_intel.tools.rule_tools import _collect_files
+
+        found = {os.path.relpath(p, root) for p in _collect_files(None, "", str(root))}
+        assert found == {".hidden/h.py", "app.py", "out/o.py", "site/s.py", "vendor/v.py"}
+
+    def test_security_scanner(self, root: Path) -> None:
+        from attocode.integrations.security.scanner import SecurityScanner
+
+        report = SecurityScanner(root_dir=str(root)).scan(mode="quick")
+        assert report.files_scanned == 1  # DEFAULT_IGNORES, site/ and dot-dirs skipped